@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark for repeated code detection.
+
+Generates a module of about 5,000 lines and times finding repeated blocks of
+three statements in every function, once with the previous approach (copying
+and unparsing every window of statements) and once with the normalized
+statement hashes now used by ``CodeSmellAnalyzer``.
+"""
+
+import argparse
+import ast
+import copy
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from refactron.analyzers.code_smell_analyzer import CodeSmellAnalyzer
+from refactron.core.clones import StatementHashes, repeated_windows
+from refactron.core.config import RefactronConfig
+from refactron.core.parsed_module import ParsedModule
+
+FUNCTION = '''
+
+def function_{index}(items, limit={index}):
+    """Process the items."""
+    total = count = 0
+    total += items[0] * limit
+    if total > {index}:
+        count += 1
+    total += items[1] * limit
+    if total > {index}:
+        count += 1
+    total += items[2] * limit
+    if total > {index}:
+        count += 1
+    for item in items:
+        if item % 2 == 0:
+            total += item
+        else:
+            total -= item
+    result = [value * 2 for value in items if value > total]
+    summary = {{"total": total, "count": count}}
+    while total > limit:
+        total //= 2
+    return summary, result
+'''
+
+
+def generate_source(lines: int) -> str:
+    """Return a module of about ``lines`` lines of functions."""
+    per_function = FUNCTION.count("\n")
+    return "".join(FUNCTION.format(index=index) for index in range(lines // per_function))
+
+
+def legacy_repeated_blocks(tree: ast.Module) -> Dict[str, List[int]]:
+    """Find repeated blocks the way the analyzer did before statement hashes."""
+
+    class PatternVisitor(ast.NodeTransformer):
+        def visit_Constant(self, node: ast.Constant) -> ast.AST:
+            return ast.Constant(value="CONST")
+
+        def visit_Name(self, node: ast.Name) -> ast.AST:
+            if isinstance(node.ctx, ast.Store):
+                return node
+            return ast.Name(id="VAR", ctx=node.ctx)
+
+    def pattern(statement: ast.stmt) -> str:
+        return ast.unparse(PatternVisitor().visit(copy.deepcopy(statement)))
+
+    found = {}
+    for function in ast.walk(tree):
+        if not isinstance(function, ast.FunctionDef) or len(function.body) < 6:
+            continue
+        blocks: Dict[str, List[int]] = {}
+        for i in range(len(function.body) - 2):
+            signature = "|||".join(pattern(stmt) for stmt in function.body[i : i + 3])
+            blocks.setdefault(signature, []).append(function.body[i].lineno)
+        for occurrences in blocks.values():
+            if len(occurrences) > 1:
+                found[function.name] = occurrences
+                break
+    return found
+
+
+def hashed_repeated_blocks(tree: ast.Module) -> Dict[str, List[int]]:
+    """Find repeated blocks from normalized statement hashes."""
+    hashes = StatementHashes.build(tree)
+    found = {}
+    for function in ast.walk(tree):
+        if not isinstance(function, ast.FunctionDef) or len(function.body) < 6:
+            continue
+        repeated = repeated_windows(hashes.sequence(function.body), 3)
+        if repeated:
+            found[function.name] = [function.body[start].lineno for start in repeated[0]]
+    return found
+
+
+def median_time(operation: Callable[[], object], iterations: int) -> float:
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run(lines: int, iterations: int) -> Dict[str, float]:
+    """Time both detectors and the whole code smell analyzer on a generated module."""
+    source = generate_source(lines)
+    tree = ast.parse(source)
+
+    legacy = legacy_repeated_blocks(tree)
+    hashed = hashed_repeated_blocks(tree)
+    assert legacy == hashed, "both detectors must report the same blocks"
+
+    analyzer = CodeSmellAnalyzer(RefactronConfig())
+    path = Path("generated.py")
+
+    return {
+        "lines": source.count("\n"),
+        "functions": len(hashed),
+        "legacy": median_time(lambda: legacy_repeated_blocks(tree), iterations),
+        "hashed": median_time(lambda: hashed_repeated_blocks(tree), iterations),
+        "analyzer": median_time(
+            lambda: analyzer.analyze_module(ParsedModule(path, source)), iterations
+        ),
+    }
+
+
+def print_results(results: Dict[str, float]) -> None:
+    """Print benchmark results in a formatted table."""
+    print("\n" + "=" * 80)
+    print("REFACTRON REPEATED CODE BENCHMARK RESULTS")
+    print("=" * 80 + "\n")
+    print(
+        f"Lines: {results['lines']:.0f}, functions with repeated blocks: {results['functions']:.0f}"
+    )
+    print(f"  Copy and unparse (previous): {results['legacy'] * 1000:.1f}ms")
+    print(f"  Statement hashes:            {results['hashed'] * 1000:.1f}ms")
+    print(f"  Speedup:                     {results['legacy'] / results['hashed']:.1f}x")
+    print(f"  Code smell analyzer (total): {results['analyzer'] * 1000:.1f}ms")
+    print()
+
+
+def main() -> None:
+    """Run the repeated code benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=5_000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    print("🚀 Starting Refactron Repeated Code Benchmark...\n")
+    print_results(run(args.lines, args.iterations))
+    print("✅ Benchmarking complete!")
+
+
+if __name__ == "__main__":
+    main()
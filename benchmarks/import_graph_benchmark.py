@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the project-wide import graph.
+
+Generates a synthetic project of packages whose modules import each other,
+then times a full graph build, loading the saved graph, an update after a
+one-file edit and cycle detection.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from refactron.core.import_graph import ImportGraph
+
+PACKAGES = 100
+BODY = '''
+
+def function_{index}(value):
+    """Return a value derived from the argument."""
+    result = value * {index}
+    for item in range(3):
+        result += item
+    return result
+
+
+class Class{index}:
+    def method(self):
+        return function_{index}(1)
+'''
+
+
+def generate_project(root: Path, modules: int, seed: int = 0) -> List[Path]:
+    """Write ``modules`` modules spread over ``PACKAGES`` packages under ``root``."""
+    rng = random.Random(seed)
+    per_package = max(1, modules // PACKAGES)
+    names = [f"pkg{i // per_package}.mod{i % per_package}" for i in range(modules)]
+    files = []
+
+    for package in sorted({name.split(".")[0] for name in names}):
+        (root / package).mkdir(parents=True, exist_ok=True)
+        (root / package / "__init__.py").write_text("")
+        files.append(root / package / "__init__.py")
+
+    for index, name in enumerate(names):
+        package, module = name.split(".")
+        imports = ["import os", "from typing import List"]
+        for target in rng.sample(names, 5):
+            target_package, target_module = target.split(".")
+            if target_package == package:
+                imports.append(f"from . import {target_module}")
+            else:
+                imports.append(f"from {target_package}.{target_module} import function_0")
+        path = root / package / f"{module}.py"
+        path.write_text("\n".join(imports) + BODY.format(index=index))
+        files.append(path)
+
+    return files
+
+
+def timed(func):  # type: ignore[no-untyped-def]
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(modules: int, workers: int) -> Dict[str, float]:
+    """Run every step of the benchmark on a fresh project."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "project"
+        files = generate_project(root, modules)
+        saved = Path(tmp) / "graph.json"
+
+        graph, build_seconds = timed(lambda: ImportGraph.build(root, files, workers))
+        _, save_seconds = timed(lambda: graph.save(saved))
+        loaded, load_seconds = timed(lambda: ImportGraph.load(saved, root))
+        assert loaded is not None
+
+        edited = files[len(files) // 2]
+        edited.write_text(edited.read_text() + "\nimport pkg0.mod0\n")
+        _, update_seconds = timed(lambda: loaded.update_files([edited]))
+        _, refresh_seconds = timed(lambda: loaded.update(files))
+        cycles, cycle_seconds = timed(loaded.cycles)
+
+        return {
+            "modules": len(files),
+            "edges": sum(len(graph.imports_of(name)) for name in graph.modules),
+            "cycles": len(cycles),
+            "build": build_seconds,
+            "save": save_seconds,
+            "load": load_seconds,
+            "update_one_file": update_seconds,
+            "refresh_all": refresh_seconds,
+            "cycles_seconds": cycle_seconds,
+        }
+
+
+def print_results(results: Dict[str, float]) -> None:
+    """Print benchmark results in a formatted table."""
+    print("\n" + "=" * 80)
+    print("REFACTRON IMPORT GRAPH BENCHMARK RESULTS")
+    print("=" * 80 + "\n")
+    print(f"Modules: {results['modules']:.0f}, edges: {results['edges']:.0f}")
+    print(f"  Full build:              {results['build']:.3f}s")
+    print(f"  Save:                    {results['save']:.3f}s")
+    print(f"  Load:                    {results['load']:.3f}s")
+    print(f"  Update after one edit:   {results['update_one_file'] * 1000:.1f}ms")
+    print(f"  Refresh (stat all files): {results['refresh_all'] * 1000:.1f}ms")
+    print(f"  Cycle detection:         {results['cycles_seconds'] * 1000:.1f}ms")
+    print(f"  Cycles found:            {results['cycles']:.0f}")
+    print()
+
+
+def main() -> None:
+    """Run the import graph benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=10_000)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for the build")
+    args = parser.parse_args()
+
+    print("🚀 Starting Refactron Import Graph Benchmark...\n")
+    print(f"Generating a project with {args.modules} modules...")
+    print_results(run(args.modules, args.jobs))
+    print("✅ Benchmarking complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the compact issue store.
+
+Compares the memory retained by a plain list of ``CodeIssue`` objects with an
+``IssueStore`` holding the same issues, and the time needed to build each.
+Issues are generated the way analyzers produce them: a new message string per
+issue, repeated rule IDs and suggestions, and a few hundred files.
+"""
+
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+from refactron.core.issue_store import IssueStore
+from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+
+SIZES = {
+    "small": 10_000,
+    "medium": 100_000,
+    "large": 500_000,
+}
+
+FILES = 500
+
+RULES = [
+    ("C001", IssueCategory.COMPLEXITY, IssueLevel.WARNING, "Function '{name}' is too complex"),
+    ("S001", IssueCategory.CODE_SMELL, IssueLevel.INFO, "Magic number {value} in '{name}'"),
+    ("SEC001", IssueCategory.SECURITY, IssueLevel.ERROR, "Dangerous call in '{name}'"),
+    ("TH001", IssueCategory.TYPE_HINTS, IssueLevel.INFO, "Function '{name}' lacks a return type"),
+]
+
+
+def generate_issues(count: int) -> Iterator[CodeIssue]:
+    """Generate ``count`` issues spread over ``FILES`` files."""
+    paths = [Path(f"src/package/module_{i}.py") for i in range(FILES)]
+
+    for i in range(count):
+        rule_id, category, level, template = RULES[i % len(RULES)]
+        name = f"function_{i % 997}"
+        yield CodeIssue(
+            category=category,
+            level=level,
+            message=template.format(name=name, value=i % 50),
+            file_path=paths[i % FILES],
+            line_number=i % 2000 + 1,
+            column=i % 40,
+            suggestion=f"Review rule {rule_id}",
+            rule_id=rule_id,
+            confidence=0.9,
+            metadata={"function": name},
+        )
+
+
+def measure(build: Callable[[], Any]) -> Dict[str, float]:
+    """Return the memory retained by ``build()``'s result and the time taken."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"bytes": retained, "seconds": elapsed}
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Print benchmark results in a formatted table."""
+    print("\n" + "=" * 80)
+    print("REFACTRON ISSUE MEMORY BENCHMARK RESULTS")
+    print("=" * 80 + "\n")
+
+    for result in results:
+        print(f"Issues: {result['size']} ({result['count']} issues)")
+        print(f"  Memory (list):      {result['list_bytes'] / 1024 / 1024:.1f} MiB")
+        print(f"  Memory (store):     {result['store_bytes'] / 1024 / 1024:.1f} MiB")
+        print(f"  Build time (list):  {result['list_seconds']:.3f}s")
+        print(f"  Build time (store): {result['store_seconds']:.3f}s")
+        print(f"  Memory saved:       {result['saved']:.1%}")
+        print()
+
+
+def main() -> None:
+    """Run the issue memory benchmark."""
+    print("🚀 Starting Refactron Issue Memory Benchmark...\n")
+    results = []
+
+    for size, count in SIZES.items():
+        print(f"Benchmarking with {size} issue set...")
+        as_list = measure(lambda: list(generate_issues(count)))
+        as_store = measure(lambda: IssueStore(generate_issues(count)))
+        results.append(
+            {
+                "size": size,
+                "count": count,
+                "list_bytes": as_list["bytes"],
+                "list_seconds": as_list["seconds"],
+                "store_bytes": as_store["bytes"],
+                "store_seconds": as_store["seconds"],
+                "saved": 1 - as_store["bytes"] / as_list["bytes"],
+            }
+        )
+
+    print_results(results)
+    print("✅ Benchmarking complete!")
+
+
+if __name__ == "__main__":
+    main()
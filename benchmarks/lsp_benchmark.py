@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the language server while typing in a large file.
+
+Opens a generated module of about 3,000 lines in a ``LanguageServer`` and
+types into it one character at a time. Reports how quickly the server
+answers a request while it is analyzing, how many analyses the edits cost,
+and how long after the last keystroke the diagnostics arrive.
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from typing import Any, Dict
+
+from refactron.core.lsp import LanguageServer, read_message, write_message
+
+URI = "file:///benchmark/generated.py"
+
+FUNCTION = '''
+
+def function_{index}(items, limit={index}):
+    """Process the items."""
+    total = 0
+    for item in items:
+        if item > limit:
+            total += item * 2
+        else:
+            total -= item
+    return total
+'''
+
+
+def generate_source(lines: int) -> str:
+    """Return a module of about ``lines`` lines of functions."""
+    per_function = FUNCTION.count("\n")
+    return "import os\n" + "".join(
+        FUNCTION.format(index=index) for index in range(lines // per_function)
+    )
+
+
+class CountingServer(LanguageServer):
+    """Counts the analyses actually run."""
+
+    analyzed = 0
+
+    def analysis(self, *args: Any) -> Any:
+        before = len(self.analyses)
+        result = super().analysis(*args)
+        if len(self.analyses) != before:
+            CountingServer.analyzed += 1
+        return result
+
+
+def run(lines: int, keystrokes: int, interval: float) -> Dict[str, float]:
+    """Type into a generated module and time the server's answers."""
+    to_server_r, to_server_w = os.pipe()
+    to_client_r, to_client_w = os.pipe()
+    server = CountingServer(os.fdopen(to_server_r, "rb"), os.fdopen(to_client_w, "wb"))
+    out = os.fdopen(to_server_w, "wb")
+    incoming = os.fdopen(to_client_r, "rb")
+    threading.Thread(target=server.serve, daemon=True).start()
+
+    received: Dict[Any, float] = {}
+    done = threading.Event()
+
+    def read() -> None:
+        while True:
+            message = read_message(incoming)
+            if message is None:
+                return
+            if "id" in message:
+                received[message["id"]] = time.perf_counter()
+            elif message.get("method") == "textDocument/publishDiagnostics":
+                if message["params"]["version"] == keystrokes + 1:
+                    received["diagnostics"] = time.perf_counter()
+                    done.set()
+
+    threading.Thread(target=read, daemon=True).start()
+
+    def send(message: Dict[str, Any]) -> None:
+        write_message(out, {"jsonrpc": "2.0", **message})
+
+    source = generate_source(lines)
+    send({"id": 0, "method": "initialize", "params": {"capabilities": {}}})
+    send(
+        {
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": source}
+            },
+        }
+    )
+    time.sleep(1.0)
+
+    sent: Dict[Any, float] = {}
+    for version in range(2, keystrokes + 2):
+        position = {"line": 0, "character": 9 + version - 2}
+        send(
+            {
+                "method": "textDocument/didChange",
+                "params": {
+                    "textDocument": {"uri": URI, "version": version},
+                    "contentChanges": [
+                        {"range": {"start": position, "end": position}, "text": "x"}
+                    ],
+                },
+            }
+        )
+        # Answered by the message loop itself, so it shows whether typing is ever blocked
+        sent[version] = time.perf_counter()
+        send({"id": version, "method": "refactron/unknown", "params": {}})
+        time.sleep(interval)
+    last_keystroke = time.perf_counter()
+    done.wait(30)
+
+    latencies = [received[key] - sent[key] for key in sent if key in received]
+    send({"id": "shutdown", "method": "shutdown"})
+    send({"method": "exit"})
+    return {
+        "lines": source.count("\n"),
+        "keystrokes": keystrokes,
+        "analyses": CountingServer.analyzed - 1,
+        "median_latency": statistics.median(latencies),
+        "max_latency": max(latencies),
+        "diagnostics_after": received["diagnostics"] - last_keystroke,
+    }
+
+
+def print_results(results: Dict[str, float]) -> None:
+    """Print benchmark results in a formatted table."""
+    print("\n" + "=" * 80)
+    print("REFACTRON LANGUAGE SERVER BENCHMARK RESULTS")
+    print("=" * 80 + "\n")
+    print(f"Lines: {results['lines']:.0f}, keystrokes: {results['keystrokes']:.0f}")
+    print(f"  Analyses run for the keystrokes:      {results['analyses']:.0f}")
+    print(f"  Request latency while typing:         {results['median_latency'] * 1000:.1f}ms")
+    print(f"  Worst request latency:                {results['max_latency'] * 1000:.1f}ms")
+    print(f"  Diagnostics after the last keystroke: {results['diagnostics_after'] * 1000:.0f}ms")
+    print()
+
+
+def main() -> None:
+    """Run the language server benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=3_000)
+    parser.add_argument("--keystrokes", type=int, default=40)
+    parser.add_argument("--interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print("🚀 Starting Refactron Language Server Benchmark...\n")
+    print_results(run(args.lines, args.keystrokes, args.interval))
+    print("✅ Benchmarking complete!")
+
+
+if __name__ == "__main__":
+    main()
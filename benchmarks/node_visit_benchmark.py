@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Node visit benchmark for the shared analyzer traversal.
+
+Compares running every analyzer over one shared traversal of the AST with
+giving each analyzer its own traversal, and reports how many AST nodes were
+visited, how many rule calls were made and how long each strategy took.
+"""
+
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from refactron import Refactron
+from refactron.core.config import RefactronConfig
+from refactron.core.dispatch import NodeDispatcher, run_analyzers
+from refactron.core.parsed_module import ParsedModule
+
+SIZES = {
+    "small": 100,
+    "medium": 500,
+    "large": 2000,
+}
+
+
+def generate_source(lines: int) -> str:
+    """Generate Python source of roughly the given number of lines."""
+    parts = ["# Auto-generated benchmark module\nimport os\nimport sys\n"]
+
+    for i in range(lines // 12):
+        parts.append(
+            f"""
+def function_{i}(param1, param2, param3):
+    '''Docstring for function_{i}.'''
+    result = 0
+    for j in range(10):
+        if j % 2 == 0:
+            result += j * param1
+        else:
+            result -= j * param2
+    items = list(map(str, range(param3)))
+    return result + len(items)
+"""
+        )
+
+    return "".join(parts)
+
+
+def count_visits(refactron: Refactron, source: str) -> Dict[str, int]:
+    """Count node visits for the shared traversal and for one traversal per analyzer."""
+    shared = NodeDispatcher()
+    run_analyzers(refactron.analyzers, ParsedModule(Path("bench.py"), source), shared)
+
+    separate_visits = 0
+    separate_calls = 0
+    for analyzer in refactron.analyzers:
+        dispatcher = NodeDispatcher()
+        run_analyzers([analyzer], ParsedModule(Path("bench.py"), source), dispatcher)
+        separate_visits += dispatcher.nodes_visited
+        separate_calls += dispatcher.rule_calls
+
+    return {
+        "shared_visits": shared.nodes_visited,
+        "shared_calls": shared.rule_calls,
+        "separate_visits": separate_visits,
+        "separate_calls": separate_calls,
+    }
+
+
+def time_strategy(refactron: Refactron, source: str, shared: bool, iterations: int = 5) -> float:
+    """Return the median time of analyzing ``source`` with the given strategy."""
+    times = []
+
+    for _ in range(iterations):
+        # A fresh module each run so the parse is timed as well
+        module = ParsedModule(Path("bench.py"), source)
+        start = time.perf_counter()
+        if shared:
+            run_analyzers(refactron.analyzers, module)
+        else:
+            for analyzer in refactron.analyzers:
+                run_analyzers([analyzer], module)
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Print benchmark results in a formatted table."""
+    print("\n" + "=" * 80)
+    print("REFACTRON NODE VISIT BENCHMARK RESULTS")
+    print("=" * 80 + "\n")
+
+    for result in results:
+        print(f"File size: {result['size']} ({result['lines']} lines)")
+        print(f"  Node visits (shared):     {result['shared_visits']}")
+        print(f"  Node visits (separate):   {result['separate_visits']}")
+        print(f"  Rule calls:               {result['shared_calls']}")
+        print(f"  Median time (shared):     {result['shared_time']:.4f}s")
+        print(f"  Median time (separate):   {result['separate_time']:.4f}s")
+        print(f"  Visits saved:             {result['saved']:.1%}")
+        print()
+
+
+def main() -> None:
+    """Run the node visit benchmark."""
+    print("🚀 Starting Refactron Node Visit Benchmark...\n")
+
+    refactron = Refactron(RefactronConfig.default())
+    results = []
+
+    for size, lines in SIZES.items():
+        print(f"Benchmarking with {size} file...")
+        source = generate_source(lines)
+        result: Dict[str, Any] = {"size": size, "lines": source.count("\n")}
+        result.update(count_visits(refactron, source))
+        result["shared_time"] = time_strategy(refactron, source, shared=True)
+        result["separate_time"] = time_strategy(refactron, source, shared=False)
+        result["saved"] = 1 - result["shared_visits"] / result["separate_visits"]
+        results.append(result)
+
+    print_results(results)
+    print("✅ Benchmarking complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark for loading analyzers from the plugin registry.
+
+Creates a ``Refactron`` in fresh interpreters with every built-in analyzer
+enabled and with only one, and reports the time and the analyzer modules
+imported, to show that disabled plugins are never loaded. Also times the
+scan of installed entry points, which only runs when a configuration names
+a plugin that is not built in.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from refactron.core import registry
+from refactron.core.config import RefactronConfig
+
+CREATE = """
+import json, sys, time
+start = time.perf_counter()
+from refactron.core.config import RefactronConfig
+from refactron.core.refactron import Refactron
+config = RefactronConfig(enabled_analyzers={analyzers!r}, enabled_refactorers=[])
+config.cache_enabled = False
+Refactron(config)
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "modules": sorted(m for m in sys.modules if m.startswith("refactron.analyzers.")),
+}}))
+"""
+
+
+def median_time(operation: Callable[[], object], iterations: int) -> float:
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def create(analyzers: List[str], iterations: int) -> Dict[str, Any]:
+    """Create a Refactron with ``analyzers`` in fresh interpreters."""
+    runs = []
+    for _ in range(iterations):
+        process = subprocess.run(
+            [sys.executable, "-c", CREATE.format(analyzers=analyzers)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(json.loads(process.stdout))
+    return {
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "modules": len(runs[-1]["modules"]) - 1,  # Not counting base_analyzer
+    }
+
+
+def run(iterations: int) -> Dict[str, Any]:
+    """Time creating Refactron with all and with one analyzer, and the entry point scan."""
+    return {
+        "all": create(RefactronConfig().enabled_analyzers, iterations),
+        "one": create(["security"], iterations),
+        "scan": median_time(lambda: registry._entry_points(registry.ANALYZER_GROUP), iterations),
+    }
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print benchmark results in a formatted table."""
+    print("\n" + "=" * 80)
+    print("REFACTRON PLUGIN REGISTRY BENCHMARK RESULTS")
+    print("=" * 80 + "\n")
+    for key, label in (("all", "All built-in analyzers enabled"), ("one", "Only security enabled")):
+        print(f"{label}:")
+        print(f"  Refactron() with imports:  {results[key]['seconds'] * 1000:.1f}ms")
+        print(f"  Analyzer modules imported: {results[key]['modules']}")
+    print(f"Entry point scan (skipped for built-in names): {results['scan'] * 1000:.1f}ms")
+    print()
+
+
+def main() -> None:
+    """Run the plugin registry benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    print("🚀 Starting Refactron Plugin Registry Benchmark...\n")
+    print_results(run(args.iterations))
+    print("✅ Benchmarking complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the start-up time of the ``refactron`` command.
+
+Imports ``refactron.cli`` in fresh interpreters under ``python -X importtime``
+and reports the median cumulative import time, the modules it loads and the
+wall time of ``refactron --version``. Exits with status 1 when the import
+takes longer than the budget or loads a module that only commands doing
+analysis should need, so it can guard against start-up regressions in CI.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+# Median cumulative import time of refactron.cli, in milliseconds
+STARTUP_BUDGET_MS = 150.0
+
+# Modules that importing the CLI must not load; commands import them when needed
+DEFERRED_MODULES = (
+    "refactron.analyzers",
+    "refactron.refactorers",
+    "refactron.autofix.engine",
+    "refactron.autofix.fixers",
+    "refactron.core.refactron",
+    "refactron.core.lsp",
+    "refactron.core.daemon",
+    "refactron.core.watch",
+    "refactron.core.import_graph",
+    "refactron.core.symbols",
+    "radon",
+    "libcst",
+    "astroid",
+    "rich",
+    "yaml",
+)
+
+
+def import_cli() -> Tuple[float, List[str]]:
+    """Import the CLI in a fresh interpreter; return its import time and the modules loaded."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import refactron.cli"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    cumulative = 0.0
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, total, name = line[len("import time:") :].split("|")
+        modules.append(name.strip())
+        if name.strip() == "refactron.cli":
+            cumulative = int(total) / 1000
+    return cumulative, modules
+
+
+def deferred(modules: List[str]) -> List[str]:
+    """Return the modules that should have been left for the commands to import."""
+    return sorted(
+        {
+            name
+            for name in modules
+            if any(name == prefix or name.startswith(prefix + ".") for prefix in DEFERRED_MODULES)
+        }
+    )
+
+
+def run_version() -> float:
+    """Return the wall time of ``refactron --version``, interpreter start-up included."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "refactron.cli", "--version"],
+        capture_output=True,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def run(iterations: int) -> Dict[str, Any]:
+    """Time the CLI import and ``refactron --version`` over fresh interpreters."""
+    imports = []
+    modules: List[str] = []
+    for _ in range(iterations):
+        seconds, modules = import_cli()
+        imports.append(seconds)
+    versions = [run_version() for _ in range(iterations)]
+    return {
+        "import_ms": statistics.median(imports),
+        "modules": len(modules),
+        "refactron_modules": sorted({m for m in modules if m.startswith("refactron")}),
+        "deferred": deferred(modules),
+        "version_ms": statistics.median(versions) * 1000,
+    }
+
+
+def print_results(results: Dict[str, Any], budget: float) -> None:
+    """Print benchmark results in a formatted table."""
+    print("\n" + "=" * 80)
+    print("REFACTRON STARTUP BENCHMARK RESULTS")
+    print("=" * 80 + "\n")
+    print(f"  Import of refactron.cli:   {results['import_ms']:.1f}ms (budget {budget:.0f}ms)")
+    print(f"  refactron --version:       {results['version_ms']:.1f}ms")
+    print(f"  Modules imported:          {results['modules']}")
+    print(f"  Refactron modules:         {', '.join(results['refactron_modules'])}")
+    if results["deferred"]:
+        print(f"  Loaded too early:          {', '.join(results['deferred'])}")
+    print()
+
+
+def main() -> None:
+    """Run the startup benchmark and fail when it is over budget."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    print("🚀 Starting Refactron Startup Benchmark...\n")
+    results = run(args.iterations)
+    print_results(results, args.budget_ms)
+
+    failures = []
+    if results["import_ms"] > args.budget_ms:
+        failures.append(f"import took {results['import_ms']:.1f}ms")
+    if results["deferred"]:
+        failures.append(f"{len(results['deferred'])} module(s) loaded at start-up")
+    if failures:
+        print(f"❌ Startup budget exceeded: {'; '.join(failures)}")
+        sys.exit(1)
+    print("✅ Benchmarking complete!")
+
+
+if __name__ == "__main__":
+    main()
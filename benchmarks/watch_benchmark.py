@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark for continuous analysis with ``refactron watch``.
+
+Generates a project of small modules and compares analyzing the whole tree
+again after a one-file edit with the update of an ``AnalysisWatcher``,
+which re-analyzes only the edited file. Also times an idle snapshot, the
+work done on every poll when nothing changed.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from refactron import Refactron
+from refactron.core.config import RefactronConfig
+from refactron.core.watch import AnalysisWatcher
+
+MODULE = '''"""Module {index}."""
+
+from pkg.module_{previous} import function_{previous}
+
+
+def function_{index}(items, limit={index}):
+    """Process the items."""
+    total = function_{previous}(items[:1])
+    for item in items:
+        if item > limit:
+            total += item
+        else:
+            total -= item
+    return total
+'''
+
+
+def generate_project(root: Path, modules: int) -> None:
+    """Write ``modules`` modules into a package under ``root``."""
+    package = root / "pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    for index in range(modules):
+        source = MODULE.format(index=index, previous=(index - 1) % modules)
+        (package / f"module_{index}.py").write_text(source)
+
+
+def median_time(operation: Callable[[], object], iterations: int) -> float:
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run(modules: int, iterations: int) -> Dict[str, float]:
+    """Time a full analysis, a watcher update after an edit and an idle snapshot."""
+    config = RefactronConfig.default()
+    config.cache_enabled = False
+    refactron = Refactron(config)
+
+    with tempfile.TemporaryDirectory(prefix="rfw") as tmp:
+        root = Path(tmp)
+        generate_project(root, modules)
+        edited = root / "pkg" / "module_0.py"
+        original = edited.read_text()
+
+        full = median_time(lambda: refactron.analyze(root), iterations)
+
+        with AnalysisWatcher(refactron, root, use_inotify=False) as watcher:
+            start = time.perf_counter()
+            watcher.start()
+            first = time.perf_counter() - start
+
+            edits = []
+            for iteration in range(iterations):
+                edited.write_text(original + f"\n\nVALUE = {'1' * (iteration + 1)}\n")
+                start = time.perf_counter()
+                update = watcher.poll()
+                edits.append(time.perf_counter() - start)
+                assert update is not None and update.analyzed == [edited]
+
+            idle = median_time(watcher.changes, iterations)
+
+    return {
+        "modules": modules,
+        "full": full,
+        "first": first,
+        "update": statistics.median(edits),
+        "idle": idle,
+    }
+
+
+def print_results(results: Dict[str, float]) -> None:
+    """Print benchmark results in a formatted table."""
+    print("\n" + "=" * 80)
+    print("REFACTRON WATCH BENCHMARK RESULTS")
+    print("=" * 80 + "\n")
+    print(f"Modules: {results['modules']:.0f}")
+    print(f"  Full analysis after each edit:   {results['full'] * 1000:.1f}ms")
+    print(f"  Watcher start (full analysis):   {results['first'] * 1000:.1f}ms")
+    print(f"  Watcher update after an edit:    {results['update'] * 1000:.1f}ms")
+    print(f"  Speedup per edit:                {results['full'] / results['update']:.1f}x")
+    print(f"  Idle snapshot (nothing changed): {results['idle'] * 1000:.1f}ms")
+    print()
+
+
+def main() -> None:
+    """Run the watch benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    print("🚀 Starting Refactron Watch Benchmark...\n")
+    print_results(run(args.modules, args.iterations))
+    print("✅ Benchmarking complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,14 @@ Refactron - The Intelligent Code Refactoring Transformer
 A powerful Python library for code refactoring, optimization, and technical debt elimination.
 """
 
-from refactron.core.analysis_result import AnalysisResult
-from refactron.core.refactor_result import RefactorResult
-from refactron.core.refactron import Refactron
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from refactron.core.analysis_result import AnalysisResult
+    from refactron.core.issue_store import IssueStore
+    from refactron.core.refactor_result import RefactorResult
+    from refactron.core.refactron import Refactron
 
 __version__ = "1.0.0"
 __author__ = "Om Sherikar"
@@ -15,4 +20,26 @@ __all__ = [
     "Refactron",
     "AnalysisResult",
     "RefactorResult",
+    "IssueStore",
 ]
+
+# Public names and their modules, imported on first access so that
+# ``import refactron`` (and the CLI) does not load every analyzer up front
+_LAZY_ATTRIBUTES = {
+    "Refactron": "refactron.core.refactron",
+    "AnalysisResult": "refactron.core.analysis_result",
+    "RefactorResult": "refactron.core.refactor_result",
+    "IssueStore": "refactron.core.issue_store",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> Any:
+    return sorted(set(globals()) | set(__all__))
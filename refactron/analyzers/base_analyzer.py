@@ -1,15 +1,56 @@
 """Base analyzer class."""
 
+import ast
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Dict, List, Tuple, Type
 
 from refactron.core.config import RefactronConfig
+from refactron.core.dispatch import NODE_TYPES_ATTR, RuleContext, run_analyzers
 from refactron.core.models import CodeIssue
+from refactron.core.parsed_module import ParsedModule
+from refactron.core.registry import COST_MODERATE
+
+_RULE_NAMES: Dict[type, List[Tuple[str, tuple]]] = {}
 
 
 class BaseAnalyzer(ABC):
-    """Base class for all analyzers."""
+    """
+    Base class for all analyzers.
+
+    Analyzers declare checks as methods decorated with
+    :func:`refactron.core.dispatch.node_rule`. All analyzers running over a
+    file share one :class:`ParsedModule` and one traversal of its tree; each
+    rule is called only for the node types it registered for. Per-file state
+    lives on the :class:`RuleContext`, and :meth:`finish_module` turns it into
+    the final issue list.
+
+    Analyzers may instead override :meth:`analyze_module`, or only the older
+    :meth:`analyze`, which keeps working unchanged.
+
+    Subclasses describe themselves to the plugin registry with the class
+    attributes ``node_types`` (filled in from their node rules unless set),
+    ``cost`` (see :data:`refactron.core.registry.COST_CLASSES`) and
+    ``cacheable``. Set ``cacheable = False`` when issues depend on anything
+    besides the file and the configuration; such analyzers run again on
+    files whose other results come from the cache. Set
+    ``uses_project_layout = True`` when issues depend on which modules are
+    first-party (see :mod:`refactron.core.module_resolver`); cache entries
+    are then also keyed by the first-party names of the file's project.
+    """
+
+    node_types: Tuple[Type[ast.AST], ...] = ()
+    cost = COST_MODERATE
+    cacheable = True
+    uses_project_layout = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "node_types" not in vars(cls):
+            declared: List[Type[ast.AST]] = []
+            for _, node_types in cls._rule_names():
+                declared.extend(t for t in node_types if t not in declared)
+            cls.node_types = tuple(declared)
 
     def __init__(self, config: RefactronConfig):
         """
@@ -20,11 +61,81 @@ class BaseAnalyzer(ABC):
         """
         self.config = config
 
-    @abstractmethod
+    @classmethod
+    def _rule_names(cls) -> List[Tuple[str, tuple]]:
+        """Return ``(attribute, node_types)`` of the node rules, in declaration order."""
+        names = _RULE_NAMES.get(cls)
+        if names is None:
+            names = []
+            seen = set()
+            for klass in reversed(cls.__mro__):
+                for attr, value in vars(klass).items():
+                    node_types = getattr(value, NODE_TYPES_ATTR, None)
+                    if node_types is not None and attr not in seen:
+                        seen.add(attr)
+                        names.append((attr, node_types))
+            _RULE_NAMES[cls] = names
+        return names
+
+    def node_rules(self) -> List[Tuple[tuple, Callable]]:
+        """Return ``(node_types, bound_rule)`` pairs in declaration order."""
+        return [(node_types, getattr(self, attr)) for attr, node_types in self._rule_names()]
+
+    @property
+    def uses_node_rules(self) -> bool:
+        """Whether this analyzer runs through the shared node dispatcher."""
+        cls: Type[BaseAnalyzer] = type(self)
+        return (
+            cls.analyze_module is BaseAnalyzer.analyze_module
+            and cls.analyze is BaseAnalyzer.analyze
+            and bool(self.node_rules())
+        )
+
+    def should_analyze(self, module: ParsedModule) -> bool:
+        """Return False to skip a module entirely, before it is parsed."""
+        return True
+
+    def begin_module(self, context: RuleContext) -> None:
+        """Prepare per-file state before the traversal starts."""
+        pass
+
+    def finish_module(self, context: RuleContext) -> List[CodeIssue]:
+        """
+        Produce the final issues for a file once the traversal is done.
+
+        Override to add whole-module checks or to filter issues.
+        """
+        return context.issues
+
+    def on_syntax_error(self, module: ParsedModule, error: SyntaxError) -> List[CodeIssue]:
+        """Return issues to report when the module cannot be parsed."""
+        return []
+
+    def analyze_module(self, module: ParsedModule) -> List[CodeIssue]:
+        """
+        Analyze a parsed module and return detected issues.
+
+        Args:
+            module: Parsed module shared across analyzers
+
+        Returns:
+            List of detected code issues
+        """
+        if type(self).analyze is not BaseAnalyzer.analyze:
+            return self.analyze(module.file_path, module.source)
+        if not self.node_rules():
+            raise NotImplementedError(
+                f"{type(self).__name__} must declare node rules or implement analyze_module()"
+            )
+        return run_analyzers([self], module)[0]
+
     def analyze(self, file_path: Path, source_code: str) -> List[CodeIssue]:
         """
         Analyze source code and return detected issues.
 
+        Compatibility entry point: wraps the source in a :class:`ParsedModule`
+        and delegates to :meth:`analyze_module`.
+
         Args:
             file_path: Path to the file being analyzed
             source_code: Source code content
@@ -32,7 +143,7 @@ class BaseAnalyzer(ABC):
         Returns:
             List of detected code issues
         """
-        pass
+        return self.analyze_module(ParsedModule(file_path, source_code))
 
     @property
     @abstractmethod
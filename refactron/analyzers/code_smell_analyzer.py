@@ -1,360 +1,263 @@
 """Analyzer for code smells and anti-patterns."""
 
 import ast
-import copy
-from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Union
 
 from refactron.analyzers.base_analyzer import BaseAnalyzer
+from refactron.core.clones import repeated_windows
+from refactron.core.dispatch import RuleContext, node_rule
 from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+from refactron.core.parsed_module import ParsedModule
+from refactron.core.registry import COST_MODERATE
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+NESTING_NODES = (ast.If, ast.For, ast.While, ast.With, ast.Try)
 
 
 class CodeSmellAnalyzer(BaseAnalyzer):
     """Detects common code smells and anti-patterns."""
 
+    cost = COST_MODERATE
+
+    MAX_NESTING_DEPTH = 4
+    # Consecutive statements that make up a repeated block
+    REPEATED_BLOCK_STATEMENTS = 3
+    # Smallest function body, in AST nodes, reported as a duplicate of another
+    MIN_DUPLICATE_FUNCTION_NODES = 20
+
     @property
     def name(self) -> str:
         return "code_smells"
 
-    def analyze(self, file_path: Path, source_code: str) -> List[CodeIssue]:
+    def begin_module(self, context: RuleContext) -> None:
+        """Initialize per-file state collected during the traversal."""
+        context.state["functions"] = []
+        context.state["nesting_depth"] = {}
+
+    def finish_module(self, context: RuleContext) -> List[CodeIssue]:
         """
-        Analyze code for smells and anti-patterns.
+        Add checks that need the whole module to the node rule results.
 
         Args:
-            file_path: Path to the file
-            source_code: Source code content
+            context: Rule context of the analyzed module
 
         Returns:
             List of detected code smell issues
         """
-        issues = []
-
-        try:
-            tree = ast.parse(source_code)
-
-            # Check for various code smells
-            issues.extend(self._check_too_many_parameters(tree, file_path))
-            issues.extend(self._check_nested_depth(tree, file_path, source_code))
-            issues.extend(self._check_duplicate_code(tree, file_path))
-            issues.extend(self._check_magic_numbers(tree, file_path))
-            issues.extend(self._check_missing_docstrings(tree, file_path))
-            issues.extend(self._check_unused_imports(tree, file_path, source_code))
-            issues.extend(self._check_repeated_code_blocks(tree, file_path))
+        issues = list(context.issues)
+        issues.extend(self._report_nested_depth(context))
+        issues.extend(self._report_duplicate_code(context))
+        issues.extend(self._report_unused_imports(context))
+        return issues
 
-        except SyntaxError as e:
-            issue = CodeIssue(
+    def on_syntax_error(self, module: ParsedModule, error: SyntaxError) -> List[CodeIssue]:
+        """Report the syntax error itself as an issue."""
+        return [
+            CodeIssue(
                 category=IssueCategory.CODE_SMELL,
                 level=IssueLevel.ERROR,
-                message=f"Syntax error: {str(e)}",
-                file_path=file_path,
-                line_number=getattr(e, "lineno", 1),
+                message=f"Syntax error: {str(error)}",
+                file_path=module.file_path,
+                line_number=getattr(error, "lineno", 1),
             )
-            issues.append(issue)
+        ]
 
-        return issues
-
-    def _check_too_many_parameters(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.FunctionDef, ast.AsyncFunctionDef)
+    def _check_too_many_parameters(self, node: FunctionNode, context: RuleContext) -> None:
         """Check for functions with too many parameters."""
-        issues = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                param_count = len(node.args.args)
-
-                if param_count > self.config.max_parameters:
-                    issue = CodeIssue(
-                        category=IssueCategory.CODE_SMELL,
-                        level=IssueLevel.WARNING,
-                        message=f"Function '{node.name}' has too many parameters ({param_count})",
-                        file_path=file_path,
-                        line_number=node.lineno,
-                        suggestion=(
-                            f"Consider using a configuration object or breaking down the function. "
-                            f"Current: {param_count} parameters, "
-                            f"recommended: ≤ {self.config.max_parameters}"
-                        ),
-                        rule_id="S001",
-                        metadata={"parameter_count": param_count},
-                    )
-                    issues.append(issue)
-
-        return issues
+        param_count = len(node.args.args)
+
+        if param_count > self.config.max_parameters:
+            context.report(
+                CodeIssue(
+                    category=IssueCategory.CODE_SMELL,
+                    level=IssueLevel.WARNING,
+                    message=f"Function '{node.name}' has too many parameters ({param_count})",
+                    file_path=context.file_path,
+                    line_number=node.lineno,
+                    suggestion=(
+                        f"Consider using a configuration object or breaking down the function. "
+                        f"Current: {param_count} parameters, "
+                        f"recommended: ≤ {self.config.max_parameters}"
+                    ),
+                    rule_id="S001",
+                    metadata={"parameter_count": param_count},
+                )
+            )
 
-    def _check_nested_depth(
-        self,
-        tree: ast.AST,
-        file_path: Path,
-        source_code: str,
-    ) -> List[CodeIssue]:
-        """Check for deeply nested code structures."""
-        issues = []
-        max_depth = 4
+    @node_rule(*NESTING_NODES)
+    def _check_nested_depth(self, node: ast.AST, context: RuleContext) -> None:
+        """Record the nesting depth of this block within each enclosing function."""
+        nesting_depth: Dict[FunctionNode, int] = context.state["nesting_depth"]
+        depth = 1
 
-        def get_nesting_depth(node: ast.AST, depth: int = 0) -> int:
-            """Calculate maximum nesting depth."""
-            if isinstance(node, (ast.If, ast.For, ast.While, ast.With, ast.Try)):
+        for ancestor in reversed(context.ancestors):
+            if isinstance(ancestor, NESTING_NODES):
                 depth += 1
+            elif isinstance(ancestor, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if depth > nesting_depth.get(ancestor, 0):
+                    nesting_depth[ancestor] = depth
 
-            max_child_depth = depth
-            for child in ast.iter_child_nodes(node):
-                child_depth = get_nesting_depth(child, depth)
-                max_child_depth = max(max_child_depth, child_depth)
-
-            return max_child_depth
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                depth = get_nesting_depth(node)
-
-                if depth > max_depth:
-                    issue = CodeIssue(
-                        category=IssueCategory.CODE_SMELL,
-                        level=IssueLevel.WARNING,
-                        message=f"Function '{node.name}' has deep nesting (depth: {depth})",
-                        file_path=file_path,
-                        line_number=node.lineno,
-                        suggestion="Consider extracting nested logic into separate functions "
-                        "or using early returns to reduce nesting.",
-                        rule_id="S002",
-                        metadata={"nesting_depth": depth},
-                    )
-                    issues.append(issue)
+    def _report_nested_depth(self, context: RuleContext) -> List[CodeIssue]:
+        """Report functions with deeply nested code structures."""
+        issues = []
+        max_depth = self.MAX_NESTING_DEPTH
+        functions = sorted(
+            context.state["nesting_depth"].items(),
+            key=lambda entry: (entry[0].lineno, entry[0].col_offset),
+        )
+
+        for node, depth in functions:
+            if depth > max_depth:
+                issue = CodeIssue(
+                    category=IssueCategory.CODE_SMELL,
+                    level=IssueLevel.WARNING,
+                    message=f"Function '{node.name}' has deep nesting (depth: {depth})",
+                    file_path=context.file_path,
+                    line_number=node.lineno,
+                    suggestion="Consider extracting nested logic into separate functions "
+                    "or using early returns to reduce nesting.",
+                    rule_id="S002",
+                    metadata={"nesting_depth": depth},
+                )
+                issues.append(issue)
 
         return issues
 
-    def _check_duplicate_code(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for potential duplicate code."""
-        issues = []
+    @node_rule(ast.FunctionDef, ast.AsyncFunctionDef)
+    def _collect_functions(self, node: FunctionNode, context: RuleContext) -> None:
+        """Collect function definitions for the duplicate code check."""
+        context.state["functions"].append(node)
 
-        # Simple heuristic: look for multiple functions with similar names
-        function_names: List[str] = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                function_names.append(node.name)
-
-        # Check for functions with numbered suffixes (potential duplication)
-        base_names: Set[str] = set()
-        for name in function_names:
-            if name[-1].isdigit():
-                base_name = name.rstrip("0123456789")
-                if base_name in base_names:
-                    # Found potential duplication
-                    for node in ast.walk(tree):
-                        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                            if node.name.startswith(base_name):
-                                issue = CodeIssue(
-                                    category=IssueCategory.CODE_SMELL,
-                                    level=IssueLevel.INFO,
-                                    message=f"Potential duplicate function: '{node.name}'",
-                                    file_path=file_path,
-                                    line_number=node.lineno,
-                                    suggestion=(
-                                        "Consider consolidating similar functions or using "
-                                        "parameters."
-                                    ),
-                                    rule_id="S003",
-                                )
-                                issues.append(issue)
-                                break
-                base_names.add(base_name)
+    def _report_duplicate_code(self, context: RuleContext) -> List[CodeIssue]:
+        """Report functions whose bodies are the same once names and constants are normalized."""
+        issues = []
+        hashes = context.module.statement_hashes
+        functions: List[FunctionNode] = context.state["functions"]
+
+        originals: Dict[int, FunctionNode] = {}
+        for function in functions:
+            body = function.body
+            if ast.get_docstring(function) is not None:
+                body = body[1:]
+            if not body or hashes.size(body) < self.MIN_DUPLICATE_FUNCTION_NODES:
+                continue
+
+            original = originals.setdefault(hashes.combined(body), function)
+            if original is function:
+                continue
+            issue = CodeIssue(
+                category=IssueCategory.CODE_SMELL,
+                level=IssueLevel.INFO,
+                message=f"Potential duplicate function: '{function.name}'",
+                file_path=context.file_path,
+                line_number=function.lineno,
+                suggestion=(
+                    f"Same body as '{original.name}' (line {original.lineno}). "
+                    "Consider consolidating similar functions or using parameters."
+                ),
+                rule_id="S003",
+                metadata={"duplicate_of": original.name, "duplicate_line": original.lineno},
+            )
+            issues.append(issue)
 
         return issues
 
-    def _check_magic_numbers(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.Constant)
+    def _check_magic_numbers(self, node: ast.Constant, context: RuleContext) -> None:
         """Check for magic numbers (unexplained numeric constants)."""
-        issues = []
-
-        for node in ast.walk(tree):
-            # Use ast.Constant for Python 3.8+ (ast.Num is deprecated)
-            if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
-                # Ignore common acceptable numbers
-                if node.value not in (0, 1, -1, 2):
-                    issue = CodeIssue(
+        # Use ast.Constant for Python 3.8+ (ast.Num is deprecated)
+        if isinstance(node.value, (int, float)):
+            # Ignore common acceptable numbers
+            if node.value not in (0, 1, -1, 2):
+                context.report(
+                    CodeIssue(
                         category=IssueCategory.CODE_SMELL,
                         level=IssueLevel.INFO,
                         message=f"Magic number found: {node.value}",
-                        file_path=file_path,
+                        file_path=context.file_path,
                         line_number=node.lineno if hasattr(node, "lineno") else 0,
                         suggestion="Consider extracting this number into a named constant.",
                         rule_id="S004",
                         metadata={"value": node.value},
                     )
-                    issues.append(issue)
-
-        return issues
+                )
 
-    def _check_missing_docstrings(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    def _check_missing_docstrings(
+        self, node: Union[FunctionNode, ast.ClassDef], context: RuleContext
+    ) -> None:
         """Check for missing docstrings in functions and classes."""
-        issues = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-                # Skip private functions (starting with _)
-                if node.name.startswith("_") and not node.name.startswith("__"):
-                    continue
-
-                docstring = ast.get_docstring(node)
-                if not docstring:
-                    entity_type = "Class" if isinstance(node, ast.ClassDef) else "Function"
-                    issue = CodeIssue(
-                        category=IssueCategory.MAINTAINABILITY,
-                        level=IssueLevel.INFO,
-                        message=f"{entity_type} '{node.name}' is missing a docstring",
-                        file_path=file_path,
-                        line_number=node.lineno,
-                        suggestion=(
-                            f"Add a docstring to explain what this {entity_type.lower()} does."
-                        ),
-                        rule_id="S005",
-                    )
-                    issues.append(issue)
-
-        return issues
-
-    def _check_unused_imports(
-        self, tree: ast.AST, file_path: Path, source_code: str
-    ) -> List[CodeIssue]:
-        """Check for unused imports more accurately."""
-        issues = []
-        imported_names = {}
-        used_names = set()
-
-        # Collect all imports
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    name = alias.asname if alias.asname else alias.name.split(".")[0]
-                    imported_names[name] = (alias.name, node.lineno)
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    for alias in node.names:
-                        if alias.name != "*":
-                            name = alias.asname if alias.asname else alias.name
-                            imported_names[name] = (
-                                f"{node.module}.{alias.name}",
-                                node.lineno,
-                            )
-
-        # Collect all name usages
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Store):
-                used_names.add(node.id)
-            elif isinstance(node, ast.Attribute):
-                # Get the base name for attribute access
-                if isinstance(node.value, ast.Name):
-                    used_names.add(node.value.id)
-
-        # Find unused imports
-        for name, (full_name, lineno) in imported_names.items():
-            if name not in used_names:
-                # Special case: check if it's used in type hints or docstrings
-                # This is a simple check - a more comprehensive one would parse type hints
-                if name not in source_code:
-                    continue
-
-                # Check if it appears anywhere after the import line
-                lines = source_code.split("\n")
-                import_line = lineno - 1
-                found_usage = False
-                for i in range(import_line + 1, len(lines)):
-                    if name in lines[i]:
-                        # Could be a comment or string, but we'll be conservative
-                        found_usage = True
-                        break
-
-                if not found_usage:
-                    issue = CodeIssue(
-                        category=IssueCategory.CODE_SMELL,
-                        level=IssueLevel.INFO,
-                        message=f"Unused import: '{full_name}'",
-                        file_path=file_path,
-                        line_number=lineno,
-                        suggestion=f"Remove unused import '{full_name}'",
-                        rule_id="S006",
-                        metadata={"import": full_name},
-                    )
-                    issues.append(issue)
-
-        return issues
+        name = node.name
+
+        # Skip private functions (starting with _)
+        if name.startswith("_") and not name.startswith("__"):
+            return
+
+        docstring = ast.get_docstring(node)
+        if not docstring:
+            entity_type = "Class" if isinstance(node, ast.ClassDef) else "Function"
+            context.report(
+                CodeIssue(
+                    category=IssueCategory.MAINTAINABILITY,
+                    level=IssueLevel.INFO,
+                    message=f"{entity_type} '{name}' is missing a docstring",
+                    file_path=context.file_path,
+                    line_number=node.lineno,
+                    suggestion=f"Add a docstring to explain what this {entity_type.lower()} does.",
+                    rule_id="S005",
+                )
+            )
 
-    def _check_repeated_code_blocks(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for repeated code blocks within functions."""
+    def _report_unused_imports(self, context: RuleContext) -> List[CodeIssue]:
+        """Detect imported names that are never used, from the module's symbol table."""
         issues = []
 
-        def get_statement_pattern(node: ast.AST) -> str:
-            """Get a normalized pattern of a statement for comparison."""
-            try:
-                # Replace all constant values and names to create a pattern
-                class PatternVisitor(ast.NodeTransformer):
-                    def visit_Constant(self, node):
-                        return ast.Constant(value="CONST")
-
-                    def visit_Name(self, node):
-                        if isinstance(node.ctx, ast.Store):
-                            # Keep variable names on the left side of assignments
-                            return node
-                        # Replace variable names on the right side
-                        return ast.Name(id="VAR", ctx=node.ctx)
-
-                # Create a copy and transform it
-                pattern_node = copy.deepcopy(node)
-                pattern_node = PatternVisitor().visit(pattern_node)
-                # Use ast.unparse if available (Python 3.9+), otherwise fallback
-                if hasattr(ast, "unparse"):
-                    result: str = ast.unparse(pattern_node)  # type: ignore[assignment]
-                    return result
-                else:
-                    # Fallback for older Python versions - use ast.dump
-                    return ast.dump(pattern_node)
-            except Exception:
-                return ""
-
-        # Analyze each function
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Collect patterns of statement blocks (3+ consecutive lines)
-                statement_blocks: Dict[str, List[int]] = {}
-
-                if len(node.body) < 6:  # Need at least 6 statements for meaningful duplication
-                    continue
-
-                # Look for blocks of 3 consecutive statements
-                for i in range(len(node.body) - 2):
-                    block = []
-                    for j in range(3):
-                        if i + j < len(node.body):
-                            stmt = node.body[i + j]
-                            pattern = get_statement_pattern(stmt)
-                            if pattern:
-                                block.append(pattern)
-
-                    if len(block) == 3:
-                        block_sig = "|||".join(block)
-                        if block_sig not in statement_blocks:
-                            statement_blocks[block_sig] = []
-                        statement_blocks[block_sig].append(node.body[i].lineno)
-
-                # Find duplicates
-                for block_sig, occurrences in statement_blocks.items():
-                    if len(occurrences) > 1:
-                        issue = CodeIssue(
-                            category=IssueCategory.CODE_SMELL,
-                            level=IssueLevel.WARNING,
-                            message=(
-                                f"Repeated code block found in function '{node.name}' "
-                                f"({len(occurrences)} occurrences)"
-                            ),
-                            file_path=file_path,
-                            line_number=occurrences[0],
-                            suggestion=(
-                                "Consider extracting repeated code into a separate function "
-                                "to reduce duplication and improve maintainability."
-                            ),
-                            rule_id="S007",
-                            metadata={"occurrences": len(occurrences), "lines": occurrences},
-                        )
-                        issues.append(issue)
-                        break  # Only report once per function
+        for binding in context.module.symbols.unused_imports():
+            full_name = binding.module or binding.name
+            issue = CodeIssue(
+                category=IssueCategory.CODE_SMELL,
+                level=IssueLevel.INFO,
+                message=f"Unused import: '{full_name}'",
+                file_path=context.file_path,
+                line_number=binding.lineno,
+                suggestion=f"Remove unused import '{full_name}'",
+                rule_id="S006",
+                metadata={"import": full_name},
+            )
+            issues.append(issue)
 
         return issues
+
+    @node_rule(ast.FunctionDef, ast.AsyncFunctionDef)
+    def _check_repeated_code_blocks(self, node: FunctionNode, context: RuleContext) -> None:
+        """Check for repeated blocks of consecutive statements within functions."""
+        if len(node.body) < 6:  # Need at least 6 statements for meaningful duplication
+            return
+
+        hashes = context.module.statement_hashes.sequence(node.body)
+        repeated = repeated_windows(hashes, self.REPEATED_BLOCK_STATEMENTS)
+        if not repeated:
+            return
+
+        # Only report once per function, for the first block that repeats
+        occurrences = [node.body[start].lineno for start in repeated[0]]
+        context.report(
+            CodeIssue(
+                category=IssueCategory.CODE_SMELL,
+                level=IssueLevel.WARNING,
+                message=(
+                    f"Repeated code block found in function '{node.name}' "
+                    f"({len(occurrences)} occurrences)"
+                ),
+                file_path=context.file_path,
+                line_number=occurrences[0],
+                suggestion=(
+                    "Consider extracting repeated code into a separate function "
+                    "to reduce duplication and improve maintainability."
+                ),
+                rule_id="S007",
+                metadata={"occurrences": len(occurrences), "lines": occurrences},
+            )
+        )
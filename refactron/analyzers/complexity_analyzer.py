@@ -1,30 +1,39 @@
 """Analyzer for code complexity metrics."""
 
 import ast
-from pathlib import Path
-from typing import List, Union
-
-from radon.complexity import cc_visit
-from radon.metrics import mi_visit
+from typing import Dict, List, Union
 
 from refactron.analyzers.base_analyzer import BaseAnalyzer
+from refactron.core.dispatch import RuleContext, node_rule
 from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+from refactron.core.parsed_module import ParsedModule
+from refactron.core.registry import COST_MODERATE
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
 
 
 class ComplexityAnalyzer(BaseAnalyzer):
     """Analyzes code complexity using cyclomatic complexity and other metrics."""
 
+    cost = COST_MODERATE
+
+    MAX_LOOP_DEPTH = 3
+    MAX_CHAIN_LENGTH = 4
+
     @property
     def name(self) -> str:
         return "complexity"
 
-    def analyze(self, file_path: Path, source_code: str) -> List[CodeIssue]:
+    def begin_module(self, context: RuleContext) -> None:
+        """Track the deepest loop nesting seen inside each function."""
+        context.state["loop_depth"] = {}
+
+    def finish_module(self, context: RuleContext) -> List[CodeIssue]:
         """
-        Analyze complexity of the source code.
+        Add module-level complexity metrics to the issues found by node rules.
 
         Args:
-            file_path: Path to the file
-            source_code: Source code content
+            context: Rule context of the analyzed module
 
         Returns:
             List of complexity-related issues
@@ -32,93 +41,70 @@ class ComplexityAnalyzer(BaseAnalyzer):
         issues = []
 
         try:
-            # Cyclomatic complexity
-            complexity_results = cc_visit(source_code)
-
-            for result in complexity_results:
-                if result.complexity > self.config.max_function_complexity:
-                    level = self._get_complexity_level(result.complexity)
-
-                    issue = CodeIssue(
-                        category=IssueCategory.COMPLEXITY,
-                        level=level,
-                        message=(
-                            f"Function '{result.name}' has high complexity ({result.complexity})"
-                        ),
-                        file_path=file_path,
-                        line_number=result.lineno,
-                        suggestion=(
-                            f"Consider breaking this function into smaller functions. "
-                            f"Current complexity: {result.complexity}, "
-                            f"recommended: ≤ {self.config.max_function_complexity}"
-                        ),
-                        rule_id="C001",
-                        metadata={"complexity": result.complexity, "type": "cyclomatic"},
-                    )
-                    issues.append(issue)
-
-            # Maintainability index
-            try:
-                mi_score = mi_visit(source_code, multi=True)
-                if mi_score < 20:
-                    issue = CodeIssue(
-                        category=IssueCategory.MAINTAINABILITY,
-                        level=IssueLevel.WARNING,
-                        message=f"Low maintainability index: {mi_score:.1f}",
-                        file_path=file_path,
-                        line_number=1,
-                        suggestion="Consider refactoring to improve maintainability. "
-                        "Score < 20 indicates difficult to maintain code.",
-                        rule_id="M001",
-                        metadata={"maintainability_index": mi_score},
-                    )
-                    issues.append(issue)
-            except Exception:
-                pass  # MI calculation can fail on some code
-
-            # Function length check
-            try:
-                tree = ast.parse(source_code)
-                for node in ast.walk(tree):
-                    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                        func_length = self._get_function_length(node, source_code)
-
-                        if func_length > self.config.max_function_length:
-                            issue = CodeIssue(
-                                category=IssueCategory.COMPLEXITY,
-                                level=IssueLevel.WARNING,
-                                message=(
-                                    f"Function '{node.name}' is too long ({func_length} lines)"
-                                ),
-                                file_path=file_path,
-                                line_number=node.lineno,
-                                suggestion=(
-                                    f"Consider breaking this function into smaller functions. "
-                                    f"Current length: {func_length} lines, "
-                                    f"recommended: ≤ {self.config.max_function_length} lines"
-                                ),
-                                rule_id="C002",
-                                metadata={"length": func_length},
-                            )
-                            issues.append(issue)
-
-                # Check for nested loop depth
-                issues.extend(self._check_nested_loops(tree, file_path))
-
-                # Check for method call chain complexity
-                issues.extend(self._check_call_chain_complexity(tree, file_path))
-
-            except SyntaxError:
-                pass
-
+            issues.extend(self._check_module_metrics(context.module))
         except Exception as e:
             # If analysis fails, create an error issue
+            issues.append(self._failure_issue(context.module, e))
+
+        issues.extend(context.issues)
+        issues.extend(self._report_nested_loops(context))
+        return issues
+
+    def on_syntax_error(self, module: ParsedModule, error: SyntaxError) -> List[CodeIssue]:
+        """Report files that cannot be parsed as an analysis failure."""
+        return [self._failure_issue(module, error)]
+
+    def _failure_issue(self, module: ParsedModule, error: Exception) -> CodeIssue:
+        """Create the issue reported when complexity analysis fails."""
+        return CodeIssue(
+            category=IssueCategory.COMPLEXITY,
+            level=IssueLevel.ERROR,
+            message=f"Failed to analyze complexity: {str(error)}",
+            file_path=module.file_path,
+            line_number=1,
+        )
+
+    def _check_module_metrics(self, module: ParsedModule) -> List[CodeIssue]:
+        """Check cyclomatic complexity per function and the maintainability index."""
+        issues = []
+        file_path = module.file_path
+
+        # Cyclomatic complexity and maintainability, computed once per module
+        code_metrics = module.code_metrics
+
+        for result in code_metrics.blocks:
+            if result.complexity > self.config.max_function_complexity:
+                level = self._get_complexity_level(result.complexity)
+
+                issue = CodeIssue(
+                    category=IssueCategory.COMPLEXITY,
+                    level=level,
+                    message=f"Function '{result.name}' has high complexity ({result.complexity})",
+                    file_path=file_path,
+                    line_number=result.lineno,
+                    suggestion=(
+                        f"Consider breaking this function into smaller functions. "
+                        f"Current complexity: {result.complexity}, "
+                        f"recommended: ≤ {self.config.max_function_complexity}"
+                    ),
+                    rule_id="C001",
+                    metadata={"complexity": result.complexity, "type": "cyclomatic"},
+                )
+                issues.append(issue)
+
+        # Maintainability index; None only for metrics computed without line counts
+        mi_score = code_metrics.maintainability_index
+        if mi_score is not None and mi_score < 20:
             issue = CodeIssue(
-                category=IssueCategory.COMPLEXITY,
-                level=IssueLevel.ERROR,
-                message=f"Failed to analyze complexity: {str(e)}",
+                category=IssueCategory.MAINTAINABILITY,
+                level=IssueLevel.WARNING,
+                message=f"Low maintainability index: {mi_score:.1f}",
                 file_path=file_path,
                 line_number=1,
+                suggestion="Consider refactoring to improve maintainability. "
+                "Score < 20 indicates difficult to maintain code.",
+                rule_id="M001",
+                metadata={"maintainability_index": mi_score},
             )
             issues.append(issue)
 
@@ -134,9 +120,7 @@ class ComplexityAnalyzer(BaseAnalyzer):
             return IssueLevel.WARNING
         return IssueLevel.INFO
 
-    def _get_function_length(
-        self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef], source_code: str
-    ) -> int:
+    def _get_function_length(self, node: FunctionNode) -> int:
         """Calculate the number of lines in a function."""
         if hasattr(node, "end_lineno") and node.end_lineno:
             return node.end_lineno - node.lineno + 1
@@ -144,53 +128,77 @@ class ComplexityAnalyzer(BaseAnalyzer):
         # Fallback: count lines in the function body
         return len(node.body)
 
-    def _check_nested_loops(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for deeply nested loops."""
-        issues = []
-        max_loop_depth = 3
+    @node_rule(ast.FunctionDef, ast.AsyncFunctionDef)
+    def _check_function_length(self, node: FunctionNode, context: RuleContext) -> None:
+        """Check for functions that are too long."""
+        func_length = self._get_function_length(node)
+
+        if func_length > self.config.max_function_length:
+            context.report(
+                CodeIssue(
+                    category=IssueCategory.COMPLEXITY,
+                    level=IssueLevel.WARNING,
+                    message=f"Function '{node.name}' is too long ({func_length} lines)",
+                    file_path=context.file_path,
+                    line_number=node.lineno,
+                    suggestion=(
+                        f"Consider breaking this function into smaller functions. "
+                        f"Current length: {func_length} lines, "
+                        f"recommended: ≤ {self.config.max_function_length} lines"
+                    ),
+                    rule_id="C002",
+                    metadata={"length": func_length},
+                )
+            )
+
+    @node_rule(ast.For, ast.While)
+    def _check_nested_loops(self, node: ast.AST, context: RuleContext) -> None:
+        """Record the loop nesting depth of this loop within each enclosing function."""
+        loop_depth: Dict[FunctionNode, int] = context.state["loop_depth"]
+        depth = 1
 
-        def get_loop_depth(node: ast.AST, depth: int = 0) -> int:
-            """Calculate maximum loop nesting depth."""
-            if isinstance(node, (ast.For, ast.While)):
+        for ancestor in reversed(context.ancestors):
+            if isinstance(ancestor, (ast.For, ast.While)):
                 depth += 1
+            elif isinstance(ancestor, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if depth > loop_depth.get(ancestor, 0):
+                    loop_depth[ancestor] = depth
 
-            max_child_depth = depth
-            for child in ast.iter_child_nodes(node):
-                child_depth = get_loop_depth(child, depth)
-                max_child_depth = max(max_child_depth, child_depth)
-
-            return max_child_depth
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                loop_depth = get_loop_depth(node)
-
-                if loop_depth > max_loop_depth:
-                    issue = CodeIssue(
-                        category=IssueCategory.COMPLEXITY,
-                        level=IssueLevel.WARNING,
-                        message=(
-                            f"Function '{node.name}' has deeply nested loops "
-                            f"(depth: {loop_depth})"
-                        ),
-                        file_path=file_path,
-                        line_number=node.lineno,
-                        suggestion=(
-                            "Consider extracting nested loop logic into separate functions "
-                            "or using list comprehensions where appropriate. "
-                            f"Current depth: {loop_depth}, recommended: ≤ {max_loop_depth}"
-                        ),
-                        rule_id="C003",
-                        metadata={"loop_depth": loop_depth},
-                    )
-                    issues.append(issue)
+    def _report_nested_loops(self, context: RuleContext) -> List[CodeIssue]:
+        """Report functions whose loops nest deeper than the limit."""
+        issues = []
+        max_loop_depth = self.MAX_LOOP_DEPTH
+        functions = sorted(
+            context.state["loop_depth"].items(),
+            key=lambda entry: (entry[0].lineno, entry[0].col_offset),
+        )
+
+        for node, loop_depth in functions:
+            if loop_depth > max_loop_depth:
+                issue = CodeIssue(
+                    category=IssueCategory.COMPLEXITY,
+                    level=IssueLevel.WARNING,
+                    message=(
+                        f"Function '{node.name}' has deeply nested loops (depth: {loop_depth})"
+                    ),
+                    file_path=context.file_path,
+                    line_number=node.lineno,
+                    suggestion=(
+                        "Consider extracting nested loop logic into separate functions "
+                        "or using list comprehensions where appropriate. "
+                        f"Current depth: {loop_depth}, recommended: ≤ {max_loop_depth}"
+                    ),
+                    rule_id="C003",
+                    metadata={"loop_depth": loop_depth},
+                )
+                issues.append(issue)
 
         return issues
 
-    def _check_call_chain_complexity(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.Call)
+    def _check_call_chain_complexity(self, node: ast.Call, context: RuleContext) -> None:
         """Check for complex method call chains."""
-        issues = []
-        max_chain_length = 4
+        max_chain_length = self.MAX_CHAIN_LENGTH
 
         def get_chain_length(node: ast.AST) -> int:
             """Calculate the length of a method call chain."""
@@ -201,26 +209,23 @@ class ComplexityAnalyzer(BaseAnalyzer):
             else:
                 return 0
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                chain_length = get_chain_length(node)
-
-                if chain_length > max_chain_length:
-                    issue = CodeIssue(
-                        category=IssueCategory.COMPLEXITY,
-                        level=IssueLevel.INFO,
-                        message=f"Complex method call chain detected (length: {chain_length})",
-                        file_path=file_path,
-                        line_number=node.lineno if hasattr(node, "lineno") else 0,
-                        suggestion=(
-                            "Consider breaking long call chains into intermediate "
-                            "variables to improve readability and debugging. "
-                            f"Current chain length: {chain_length}, "
-                            f"recommended: ≤ {max_chain_length}"
-                        ),
-                        rule_id="C004",
-                        metadata={"chain_length": chain_length},
-                    )
-                    issues.append(issue)
-
-        return issues
+        chain_length = get_chain_length(node)
+
+        if chain_length > max_chain_length:
+            context.report(
+                CodeIssue(
+                    category=IssueCategory.COMPLEXITY,
+                    level=IssueLevel.INFO,
+                    message=f"Complex method call chain detected (length: {chain_length})",
+                    file_path=context.file_path,
+                    line_number=node.lineno if hasattr(node, "lineno") else 0,
+                    suggestion=(
+                        "Consider breaking long call chains into intermediate "
+                        "variables to improve readability and debugging. "
+                        f"Current chain length: {chain_length}, "
+                        f"recommended: ≤ {max_chain_length}"
+                    ),
+                    rule_id="C004",
+                    metadata={"chain_length": chain_length},
+                )
+            )
@@ -1,307 +1,369 @@
 """Analyzer for dead code - unused functions, variables, and imports."""
 
 import ast
-from pathlib import Path
-from typing import Dict, List, Set, Union
+from typing import List, Optional, Set, Union
 
 from refactron.analyzers.base_analyzer import BaseAnalyzer
-from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+from refactron.core.dispatch import RuleContext, node_rule
+from refactron.core.models import CodeIssue, FileMetrics, IssueCategory, IssueLevel
+from refactron.core.reference_index import CLASS, ReferenceIndex
+from refactron.core.registry import COST_EXPENSIVE
+from refactron.core.symbols import CLASS as CLASS_SCOPE
+from refactron.core.symbols import DEFINITION, FUNCTION, Scope, SymbolTable
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
 
 
 class DeadCodeAnalyzer(BaseAnalyzer):
     """Detects unused code that can be safely removed."""
 
+    # Checked against the project-wide reference index when analyzing a directory
+    cost = COST_EXPENSIVE
+
     @property
     def name(self) -> str:
         return "dead_code"
 
-    def analyze(self, file_path: Path, source_code: str) -> List[CodeIssue]:
+    def finish_module(self, context: RuleContext) -> List[CodeIssue]:
         """
-        Analyze code for unused elements.
+        Add checks that need the whole module to the node rule results.
 
         Args:
-            file_path: Path to the file
-            source_code: Source code content
+            context: Rule context of the analyzed module
 
         Returns:
             List of dead code issues
         """
+        symbols = context.module.symbols
+        issues = self._report_unused_functions(symbols, context)
+        issues.extend(self._report_unused_variables(symbols, context))
+        issues.extend(context.issues)
+        return issues
+
+    def _report_unused_functions(
+        self, symbols: SymbolTable, context: RuleContext
+    ) -> List[CodeIssue]:
+        """Detect functions that are defined but never referenced."""
         issues = []
 
-        try:
-            tree = ast.parse(source_code)
+        for binding in symbols.bindings:
+            node = binding.node
+            if binding.kind != DEFINITION or not isinstance(
+                node, (ast.FunctionDef, ast.AsyncFunctionDef)
+            ):
+                continue
+            func_name = binding.name
+            # Skip special methods, private functions and decorated (registered) functions
+            if func_name.startswith("_") or node.decorator_list:
+                continue
+            # Methods are used through attributes, including those of base classes
+            # they override; __all__ entries are part of the API
+            if (
+                binding.used
+                or func_name in symbols.attributes
+                or (binding.scope is symbols.module and symbols.is_exported(func_name))
+                or (binding.scope.kind == CLASS_SCOPE and _overrides(binding.scope, func_name))
+            ):
+                continue
+
+            issue = CodeIssue(
+                category=IssueCategory.MAINTAINABILITY,
+                level=IssueLevel.INFO,
+                message=f"Function '{func_name}' is defined but never called",
+                file_path=context.file_path,
+                line_number=binding.lineno,
+                suggestion=(
+                    f"Remove unused function '{func_name}' or export it if it's part of the API"
+                ),
+                rule_id="DEAD001",
+                metadata={"function": func_name, "module_level": binding.scope is symbols.module},
+            )
+            issues.append(issue)
 
-            # Check for various types of dead code
-            issues.extend(self._check_unused_functions(tree, file_path))
-            issues.extend(self._check_unused_variables(tree, file_path))
-            issues.extend(self._check_unreachable_code(tree, file_path))
-            issues.extend(self._check_empty_functions(tree, file_path))
-            issues.extend(self._check_redundant_conditions(tree, file_path))
+        return issues
 
-        except SyntaxError:
-            pass
+    def apply_reference_index(self, metrics: FileMetrics, index: ReferenceIndex) -> None:
+        """
+        Judge a file's module-level functions and classes by the whole project.
 
-        return issues
+        Module-level functions reported as never called in their own file are
+        dropped when another module uses them, methods when another module
+        reads an attribute of their name, and classes used nowhere in the
+        project are reported. Files the index does not know are left as is.
 
-    def _check_unused_functions(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Detect functions that are defined but never called."""
+        Args:
+            metrics: Results of this analyzer and the others for one file
+            index: Reference index of the project the file belongs to
+        """
+        if not index.knows(metrics.file_path):
+            return
+
+        before = len(metrics.issues)
+        unreferenced = index.unreferenced(metrics.file_path)
+        unused_functions = {(d.name, d.line_number) for d in unreferenced if d.kind != CLASS}
+        metrics.issues = [
+            issue
+            for issue in metrics.issues
+            if issue.rule_id != "DEAD001"
+            or (
+                (issue.metadata.get("function"), issue.line_number) in unused_functions
+                if issue.metadata.get("module_level")
+                else not index.reads_attribute(issue.metadata.get("function", ""))
+            )
+        ]
+
+        for definition in unreferenced:
+            if definition.kind != CLASS:
+                continue
+            metrics.issues.append(
+                CodeIssue(
+                    category=IssueCategory.MAINTAINABILITY,
+                    level=IssueLevel.INFO,
+                    message=f"Class '{definition.name}' is never used in the project",
+                    file_path=metrics.file_path,
+                    line_number=definition.line_number,
+                    suggestion=(
+                        f"Remove unused class '{definition.name}' or export it if it's part "
+                        f"of the API"
+                    ),
+                    rule_id="DEAD007",
+                    metadata={"class": definition.name},
+                )
+            )
+
+        if metrics.profile is not None:
+            change = len(metrics.issues) - before
+            metrics.profile.issues += change
+            stats = metrics.profile.analyzers.get(self.name)
+            if stats is not None:
+                stats.issues += change
+
+    def _report_unused_variables(
+        self, symbols: SymbolTable, context: RuleContext
+    ) -> List[CodeIssue]:
+        """Detect local variables that are assigned but never read in their function."""
         issues = []
 
-        # Collect all function definitions
-        defined_functions: Dict[str, int] = {}  # name -> line_number
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Skip special methods and private functions
-                if not node.name.startswith("_"):
-                    defined_functions[node.name] = node.lineno
-
-        # Collect all function calls
-        called_functions: Set[str] = set()
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name):
-                    called_functions.add(node.func.id)
-                elif isinstance(node.func, ast.Attribute):
-                    called_functions.add(node.func.attr)
-
-        # Find uncalled functions
-        for func_name, line_num in defined_functions.items():
-            if func_name not in called_functions:
-                # Check if it might be exported or used in __all__
-                is_exported = self._is_exported(tree, func_name)
-
-                if not is_exported:
-                    issue = CodeIssue(
-                        category=IssueCategory.MAINTAINABILITY,
-                        level=IssueLevel.INFO,
-                        message=f"Function '{func_name}' is defined but never called",
-                        file_path=file_path,
-                        line_number=line_num,
-                        suggestion=(
-                            f"Remove unused function '{func_name}' or export it if it's part "
-                            f"of the API"
-                        ),
-                        rule_id="DEAD001",
-                        metadata={"function": func_name},
-                    )
-                    issues.append(issue)
-
-        return issues
+        for scope in symbols.scopes:
+            if scope.kind != FUNCTION or isinstance(scope.node, ast.Lambda):
+                continue
 
-    def _check_unused_variables(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Detect variables that are assigned but never used."""
-        issues = []
+            for var_name, bindings in scope.bindings.items():
+                if var_name.startswith("_") or var_name in scope.references:
+                    continue
+                # Only plain "name = value" assignments are reported
+                assignments = [
+                    binding
+                    for binding in bindings
+                    if isinstance(binding.statement, ast.Assign)
+                    and binding.node in binding.statement.targets
+                ]
+                if not assignments:
+                    continue
 
-        # This is a simplified check - full analysis requires scope tracking
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Track variables in this function
-                assigned_vars: Dict[str, int] = {}
-                used_vars: Set[str] = set()
-
-                for child in ast.walk(node):
-                    # Track assignments
-                    if isinstance(child, ast.Assign):
-                        for target in child.targets:
-                            if isinstance(target, ast.Name):
-                                assigned_vars[target.id] = child.lineno
-
-                    # Track usages
-                    elif isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
-                        used_vars.add(child.id)
-
-                # Find unused variables
-                for var_name, line_num in assigned_vars.items():
-                    if var_name not in used_vars and not var_name.startswith("_"):
-                        issue = CodeIssue(
-                            category=IssueCategory.MAINTAINABILITY,
-                            level=IssueLevel.INFO,
-                            message=(
-                                f"Variable '{var_name}' is assigned but never used in function "
-                                f"'{node.name}'"
-                            ),
-                            file_path=file_path,
-                            line_number=line_num,
-                            suggestion=(
-                                f"Remove unused variable '{var_name}' or use _ if intentionally "
-                                f"unused"
-                            ),
-                            rule_id="DEAD002",
-                            metadata={"variable": var_name, "function": node.name},
-                        )
-                        issues.append(issue)
+                issue = CodeIssue(
+                    category=IssueCategory.MAINTAINABILITY,
+                    level=IssueLevel.INFO,
+                    message=(
+                        f"Variable '{var_name}' is assigned but never used in function "
+                        f"'{scope.name}'"
+                    ),
+                    file_path=context.file_path,
+                    line_number=assignments[-1].lineno,
+                    suggestion=(
+                        f"Remove unused variable '{var_name}' or use _ if intentionally unused"
+                    ),
+                    rule_id="DEAD002",
+                    metadata={"variable": var_name, "function": scope.name},
+                )
+                issues.append(issue)
 
         return issues
 
-    def _check_unreachable_code(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.FunctionDef, ast.AsyncFunctionDef)
+    def _check_unreachable_code(self, node: FunctionNode, context: RuleContext) -> None:
         """Detect code that can never be executed."""
-        issues = []
+        # Check for code after return statement
+        found_return = False
 
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Check for code after return statement
-                found_return = False
-
-                for i, stmt in enumerate(node.body):
-                    if found_return and i < len(node.body):
-                        issue = CodeIssue(
-                            category=IssueCategory.MAINTAINABILITY,
-                            level=IssueLevel.WARNING,
-                            message=f"Unreachable code after return statement in '{node.name}'",
-                            file_path=file_path,
-                            line_number=stmt.lineno,
-                            suggestion="Remove unreachable code or fix control flow logic",
-                            rule_id="DEAD003",
-                            metadata={"function": node.name},
-                        )
-                        issues.append(issue)
-                        break
-
-                    if isinstance(stmt, ast.Return):
-                        found_return = True
-
-            # Check for code after break/continue in loops
-            elif isinstance(node, (ast.For, ast.While)):
-                self._check_loop_unreachable(node, file_path, issues)
+        for i, stmt in enumerate(node.body):
+            if found_return and i < len(node.body):
+                context.report(
+                    CodeIssue(
+                        category=IssueCategory.MAINTAINABILITY,
+                        level=IssueLevel.WARNING,
+                        message=f"Unreachable code after return statement in '{node.name}'",
+                        file_path=context.file_path,
+                        line_number=stmt.lineno,
+                        suggestion="Remove unreachable code or fix control flow logic",
+                        rule_id="DEAD003",
+                        metadata={"function": node.name},
+                    )
+                )
+                break
 
-        return issues
+            if isinstance(stmt, ast.Return):
+                found_return = True
 
+    @node_rule(ast.For, ast.While)
     def _check_loop_unreachable(
-        self, loop_node: Union[ast.For, ast.While], file_path: Path, issues: List[CodeIssue]
+        self, loop_node: Union[ast.For, ast.While], context: RuleContext
     ) -> None:
-        """Check for unreachable code in loops."""
+        """Check for code after break/continue in loops."""
         found_break = False
 
         for i, stmt in enumerate(loop_node.body):
             if found_break and i < len(loop_node.body):
-                issue = CodeIssue(
-                    category=IssueCategory.MAINTAINABILITY,
-                    level=IssueLevel.WARNING,
-                    message="Unreachable code after break statement",
-                    file_path=file_path,
-                    line_number=stmt.lineno,
-                    suggestion="Remove unreachable code or fix loop logic",
-                    rule_id="DEAD003",
+                context.report(
+                    CodeIssue(
+                        category=IssueCategory.MAINTAINABILITY,
+                        level=IssueLevel.WARNING,
+                        message="Unreachable code after break statement",
+                        file_path=context.file_path,
+                        line_number=stmt.lineno,
+                        suggestion="Remove unreachable code or fix loop logic",
+                        rule_id="DEAD003",
+                    )
                 )
-                issues.append(issue)
                 break
 
             if isinstance(stmt, ast.Break):
                 found_break = True
 
-    def _check_empty_functions(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.FunctionDef, ast.AsyncFunctionDef)
+    def _check_empty_functions(self, node: FunctionNode, context: RuleContext) -> None:
         """Detect functions that are empty or only contain pass."""
-        issues = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Skip special methods
-                if node.name.startswith("__") and node.name.endswith("__"):
-                    continue
+        # Skip special methods
+        if node.name.startswith("__") and node.name.endswith("__"):
+            return
+
+        # Check if function body is empty or only has pass/docstring
+        is_empty = True
+        has_docstring = False
+
+        for stmt in node.body:
+            if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
+                # This is a docstring
+                has_docstring = True
+            elif not isinstance(stmt, ast.Pass):
+                is_empty = False
+                break
 
-                # Check if function body is empty or only has pass/docstring
-                is_empty = True
-                has_docstring = False
+        if is_empty and not has_docstring:
+            context.report(
+                CodeIssue(
+                    category=IssueCategory.MAINTAINABILITY,
+                    level=IssueLevel.INFO,
+                    message=f"Empty function: '{node.name}'",
+                    file_path=context.file_path,
+                    line_number=node.lineno,
+                    suggestion="Remove empty function or implement it. "
+                    "If it's a placeholder, add a docstring or TODO comment",
+                    rule_id="DEAD004",
+                    metadata={"function": node.name},
+                )
+            )
 
-                for stmt in node.body:
-                    if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
-                        # This is a docstring
-                        has_docstring = True
-                    elif not isinstance(stmt, ast.Pass):
-                        is_empty = False
-                        break
+    @node_rule(ast.If)
+    def _check_redundant_conditions(self, node: ast.If, context: RuleContext) -> None:
+        """Detect redundant or always-true/false conditions."""
+        file_path = context.file_path
 
-                if is_empty and not has_docstring:
-                    issue = CodeIssue(
+        # Check for conditions that are always True or False
+        if isinstance(node.test, ast.Constant):
+            if node.test.value is True:
+                context.report(
+                    CodeIssue(
                         category=IssueCategory.MAINTAINABILITY,
-                        level=IssueLevel.INFO,
-                        message=f"Empty function: '{node.name}'",
+                        level=IssueLevel.WARNING,
+                        message="Condition is always True",
                         file_path=file_path,
                         line_number=node.lineno,
-                        suggestion="Remove empty function or implement it. "
-                        "If it's a placeholder, add a docstring or TODO comment",
-                        rule_id="DEAD004",
-                        metadata={"function": node.name},
+                        suggestion=(
+                            "Remove the if statement and keep the body, or fix the condition"
+                        ),
+                        rule_id="DEAD005",
                     )
-                    issues.append(issue)
-
-        return issues
-
-    def _check_redundant_conditions(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Detect redundant or always-true/false conditions."""
-        issues = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.If):
-                # Check for conditions that are always True or False
-                if isinstance(node.test, ast.Constant):
-                    if node.test.value is True:
-                        issue = CodeIssue(
-                            category=IssueCategory.MAINTAINABILITY,
-                            level=IssueLevel.WARNING,
-                            message="Condition is always True",
-                            file_path=file_path,
-                            line_number=node.lineno,
-                            suggestion=(
-                                "Remove the if statement and keep the body, or fix the condition"
-                            ),
-                            rule_id="DEAD005",
-                        )
-                        issues.append(issue)
-
-                    elif node.test.value is False:
-                        issue = CodeIssue(
-                            category=IssueCategory.MAINTAINABILITY,
-                            level=IssueLevel.WARNING,
-                            message="Condition is always False - this code never executes",
-                            file_path=file_path,
-                            line_number=node.lineno,
-                            suggestion="Remove this dead code or fix the condition",
-                            rule_id="DEAD005",
-                        )
-                        issues.append(issue)
-
-                # Check for redundant comparisons like if x == True:
-                elif isinstance(node.test, ast.Compare):
-                    if len(node.test.ops) == 1 and isinstance(node.test.ops[0], ast.Eq):
-                        if len(node.test.comparators) == 1:
-                            comparator = node.test.comparators[0]
-                            if isinstance(comparator, ast.Constant):
-                                if comparator.value is True:
-                                    issue = CodeIssue(
-                                        category=IssueCategory.STYLE,
-                                        level=IssueLevel.INFO,
-                                        message="Redundant comparison with True",
-                                        file_path=file_path,
-                                        line_number=node.lineno,
-                                        suggestion="Use 'if x:' instead of 'if x == True:'",
-                                        rule_id="DEAD006",
-                                    )
-                                    issues.append(issue)
-                                elif comparator.value is False:
-                                    issue = CodeIssue(
-                                        category=IssueCategory.STYLE,
-                                        level=IssueLevel.INFO,
-                                        message="Redundant comparison with False",
-                                        file_path=file_path,
-                                        line_number=node.lineno,
-                                        suggestion="Use 'if not x:' instead of 'if x == False:'",
-                                        rule_id="DEAD006",
-                                    )
-                                    issues.append(issue)
+                )
 
-        return issues
+            elif node.test.value is False:
+                context.report(
+                    CodeIssue(
+                        category=IssueCategory.MAINTAINABILITY,
+                        level=IssueLevel.WARNING,
+                        message="Condition is always False - this code never executes",
+                        file_path=file_path,
+                        line_number=node.lineno,
+                        suggestion="Remove this dead code or fix the condition",
+                        rule_id="DEAD005",
+                    )
+                )
 
-    def _is_exported(self, tree: ast.AST, name: str) -> bool:
-        """Check if a name is explicitly exported via __all__."""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name) and target.id == "__all__":
-                        if isinstance(node.value, (ast.List, ast.Tuple)):
-                            for elt in node.value.elts:
-                                if isinstance(elt, ast.Constant) and elt.value == name:
-                                    return True
-        return False
+        # Check for redundant comparisons like if x == True:
+        elif isinstance(node.test, ast.Compare):
+            if len(node.test.ops) == 1 and isinstance(node.test.ops[0], ast.Eq):
+                if len(node.test.comparators) == 1:
+                    comparator = node.test.comparators[0]
+                    if isinstance(comparator, ast.Constant):
+                        if comparator.value is True:
+                            context.report(
+                                CodeIssue(
+                                    category=IssueCategory.STYLE,
+                                    level=IssueLevel.INFO,
+                                    message="Redundant comparison with True",
+                                    file_path=file_path,
+                                    line_number=node.lineno,
+                                    suggestion="Use 'if x:' instead of 'if x == True:'",
+                                    rule_id="DEAD006",
+                                )
+                            )
+                        elif comparator.value is False:
+                            context.report(
+                                CodeIssue(
+                                    category=IssueCategory.STYLE,
+                                    level=IssueLevel.INFO,
+                                    message="Redundant comparison with False",
+                                    file_path=file_path,
+                                    line_number=node.lineno,
+                                    suggestion="Use 'if not x:' instead of 'if x == False:'",
+                                    rule_id="DEAD006",
+                                )
+                            )
+
+
+def _overrides(scope: Scope, name: str, seen: Optional[Set[Scope]] = None) -> bool:
+    """
+    Whether a method of the class of ``scope`` may override one of a base class.
+
+    Bases defined in the same module are looked up; any other base, except
+    ``object``, may define the name and call the method through it.
+    """
+    seen = seen if seen is not None else {scope}
+    node = scope.node
+    assert isinstance(node, ast.ClassDef)
+    for base in node.bases:
+        base_scope = _local_class(scope, base)
+        if base_scope is None:
+            if not (isinstance(base, ast.Name) and base.id == "object"):
+                return True
+        elif base_scope not in seen:
+            seen.add(base_scope)
+            if name in base_scope.bindings or _overrides(base_scope, name, seen):
+                return True
+    return False
+
+
+def _local_class(scope: Scope, base: ast.expr) -> Optional[Scope]:
+    """Return the scope of the class a base expression names, if defined in the same module."""
+    if not isinstance(base, ast.Name) or scope.parent is None:
+        return None
+    defining = scope.parent.lookup(base.id)
+    if defining is None:
+        return None
+    bindings = defining.bindings.get(base.id, [])
+    if len(bindings) != 1 or not isinstance(bindings[0].node, ast.ClassDef):
+        return None
+    for child in defining.children:
+        if child.node is bindings[0].node:
+            return child
+    return None
@@ -2,16 +2,75 @@
 
 import ast
 import fnmatch
+import os
+import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple, Union
 
 from refactron.analyzers.base_analyzer import BaseAnalyzer
+from refactron.core.config import RefactronConfig
+from refactron.core.dispatch import RuleContext, node_rule
 from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+from refactron.core.parsed_module import ParsedModule
+from refactron.core.registry import COST_CHEAP
+
+# Lowercase path fragments marking test and example files
+TEST_PATH_INDICATORS = ("test_", "_test.", "tests/", "/test/", "testing/")
+DEMO_PATH_INDICATORS = ("example", "demo", "sample", "tutorial")
+# Lowercase path fragments of files whose hardcoded secrets are likely made up
+SAMPLE_SECRET_PATH_INDICATORS = ("test", "example", "demo", "sample")
+
+# Rules that are less critical in test and example files
+TEST_TOLERANT_RULES = frozenset({"SEC001", "SEC002", "SEC011"})
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional[Pattern[str]]:
+    """
+    Compile fnmatch patterns into one regular expression, or None if there are none.
+
+    Matching a path against the result is equivalent to ``fnmatch.fnmatch``
+    with each pattern in turn: ``*`` also matches ``/``.
+    """
+    regexes = [fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns]
+    if not regexes:
+        return None
+    return re.compile("|".join(f"(?:{regex})" for regex in regexes))
+
+
+def _matches(pattern: Optional[Pattern[str]], path: str) -> bool:
+    return pattern is not None and pattern.match(path) is not None
+
+
+@dataclass(frozen=True)
+class SecurityFileContext:
+    """Security decisions for one file, made once from its path before it is parsed."""
+
+    # Whether the file matches security_ignore_patterns
+    ignored: bool
+    # Rules whose security_rule_whitelist patterns match the file
+    whitelisted_rules: FrozenSet[str]
+    is_test_file: bool
+    is_demo_file: bool
+    # Whether SEC003 findings get the lower confidence of sample secrets
+    has_sample_secrets: bool = False
+
+    def confidence(self, rule_id: str) -> float:
+        """Confidence multiplier (0.0-1.0) for issues of a rule in this file."""
+        if rule_id not in TEST_TOLERANT_RULES:
+            return 1.0
+        if self.is_test_file:
+            return SecurityAnalyzer.TEST_FILE_CONFIDENCE_MULTIPLIER
+        if self.is_demo_file:
+            return SecurityAnalyzer.DEMO_FILE_CONFIDENCE_MULTIPLIER
+        return 1.0
 
 
 class SecurityAnalyzer(BaseAnalyzer):
     """Detects common security vulnerabilities and unsafe code patterns."""
 
+    cost = COST_CHEAP
+
     # Confidence score constants
     TEST_FILE_CONFIDENCE_MULTIPLIER = 0.6
     DEMO_FILE_CONFIDENCE_MULTIPLIER = 0.7
@@ -52,26 +111,96 @@ class SecurityAnalyzer(BaseAnalyzer):
         "httplib2.Http",
     }
 
+    # Variable name fragments that suggest a hardcoded secret
+    SECRET_PATTERNS = [
+        "password",
+        "passwd",
+        "pwd",
+        "secret",
+        "api_key",
+        "apikey",
+        "token",
+        "auth",
+        "credential",
+        "private_key",
+    ]
+
+    # Common metadata variables that should be ignored (not actual secrets)
+    METADATA_WHITELIST = {
+        "__author__",
+        "__maintainer__",
+        "__email__",
+        "__version__",
+        "__license__",
+        "__copyright__",
+        "__credits__",
+        "__status__",
+        "__date__",
+        "__all__",
+        "__name__",
+        "__file__",
+        "__doc__",
+    }
+
     @property
     def name(self) -> str:
         return "security"
 
+    def __init__(self, config: RefactronConfig):
+        """
+        Initialize the analyzer, compiling the ignore and whitelist patterns once.
+
+        Args:
+            config: Refactron configuration
+        """
+        super().__init__(config)
+        self._ignore_patterns = compile_patterns(config.security_ignore_patterns)
+        self._whitelist_patterns = {
+            rule_id: compile_patterns(patterns)
+            for rule_id, patterns in config.security_rule_whitelist.items()
+        }
+        # Context of the most recent file; each file is checked several times in a row
+        self._last_context: Optional[Tuple[Path, SecurityFileContext]] = None
+
+    def file_context(self, file_path: Path) -> SecurityFileContext:
+        """
+        Return the security decisions for a file, made from its path alone.
+
+        Args:
+            file_path: Path to the file being analyzed
+
+        Returns:
+            The file's context, computed once per file
+        """
+        last = self._last_context
+        if last is not None and last[0] == file_path:
+            return last[1]
+
+        path_str = os.path.normcase(str(file_path))
+        lowered = str(file_path).lower()
+        context = SecurityFileContext(
+            ignored=_matches(self._ignore_patterns, path_str),
+            whitelisted_rules=frozenset(
+                rule_id
+                for rule_id, pattern in self._whitelist_patterns.items()
+                if _matches(pattern, path_str)
+            ),
+            is_test_file=any(indicator in lowered for indicator in TEST_PATH_INDICATORS),
+            is_demo_file=any(indicator in lowered for indicator in DEMO_PATH_INDICATORS),
+            has_sample_secrets=any(
+                indicator in lowered for indicator in SAMPLE_SECRET_PATH_INDICATORS
+            ),
+        )
+        self._last_context = (file_path, context)
+        return context
+
     def _is_ignored_file(self, file_path: Path) -> bool:
         """Check if file should be ignored for security checks."""
-        path_str = str(file_path)
-        for pattern in self.config.security_ignore_patterns:
-            if fnmatch.fnmatch(path_str, pattern):
-                return True
-        return False
+        return self.file_context(file_path).ignored
 
     def _is_rule_whitelisted(self, rule_id: str, file_path: Path) -> bool:
         """Check if a rule is whitelisted for a specific file."""
-        whitelist = self.config.security_rule_whitelist.get(rule_id, [])
-        path_str = str(file_path)
-        for pattern in whitelist:
-            if fnmatch.fnmatch(path_str, pattern):
-                return True
-        return False
+        return rule_id in self.file_context(file_path).whitelisted_rules
 
     def _get_context_confidence(self, file_path: Path, rule_id: str) -> float:
         """
@@ -84,68 +213,36 @@ class SecurityAnalyzer(BaseAnalyzer):
         Returns:
             Confidence multiplier (0.0-1.0)
         """
-        path_str = str(file_path).lower()
-
-        # Test files get lower confidence for certain rules
-        test_indicators = ["test_", "_test.", "tests/", "/test/", "testing/"]
-        is_test_file = any(indicator in path_str for indicator in test_indicators)
-
-        # Rules that are less critical in test files
-        test_tolerant_rules = ["SEC001", "SEC002", "SEC011"]
+        return self.file_context(file_path).confidence(rule_id)
 
-        if is_test_file and rule_id in test_tolerant_rules:
-            return self.TEST_FILE_CONFIDENCE_MULTIPLIER
+    def should_analyze(self, module: ParsedModule) -> bool:
+        """Skip files matching the security ignore patterns, from the path alone."""
+        return not self.file_context(module.file_path).ignored
 
-        # Example/demo files get lower confidence
-        demo_indicators = ["example", "demo", "sample", "tutorial"]
-        is_demo_file = any(indicator in path_str for indicator in demo_indicators)
+    def begin_module(self, context: RuleContext) -> None:
+        """Initialize per-file state collected during the traversal."""
+        context.state["security"] = self.file_context(context.file_path)
+        context.state["string_concat_vars"] = {}
+        context.state["execute_name_args"] = []
 
-        if is_demo_file and rule_id in test_tolerant_rules:
-            return self.DEMO_FILE_CONFIDENCE_MULTIPLIER
-
-        return 1.0  # Default full confidence
-
-    def analyze(self, file_path: Path, source_code: str) -> List[CodeIssue]:
+    def finish_module(self, context: RuleContext) -> List[CodeIssue]:
         """
-        Analyze code for security vulnerabilities.
+        Resolve deferred checks and filter the collected security issues.
 
         Args:
-            file_path: Path to the file
-            source_code: Source code content
+            context: Rule context of the analyzed module
 
         Returns:
             List of security-related issues
         """
-        # Check if file is in ignore list
-        if self._is_ignored_file(file_path):
-            return []
-
-        issues = []
-
-        try:
-            tree = ast.parse(source_code)
-
-            # Check for various security issues
-            issues.extend(self._check_dangerous_functions(tree, file_path))
-            issues.extend(self._check_dangerous_imports(tree, file_path))
-            issues.extend(self._check_hardcoded_secrets(tree, file_path))
-            issues.extend(self._check_sql_injection(tree, file_path))
-            issues.extend(self._check_command_injection(tree, file_path))
-            issues.extend(self._check_weak_crypto(tree, file_path))
-            issues.extend(self._check_unsafe_yaml(tree, file_path))
-            issues.extend(self._check_assert_statements(tree, file_path))
-            issues.extend(self._check_sql_parameterization(tree, file_path))
-            issues.extend(self._check_ssrf_vulnerabilities(tree, file_path))
-            issues.extend(self._check_insecure_random(tree, file_path))
-            issues.extend(self._check_weak_ssl_tls(tree, file_path))
-
-        except SyntaxError:
-            pass
+        whitelisted = context.state["security"].whitelisted_rules
+        issues = list(context.issues)
+        issues.extend(self._report_sql_parameterization_vars(context))
 
         # Filter out whitelisted rules and low confidence issues
         filtered_issues = []
         for issue in issues:
-            if issue.rule_id and self._is_rule_whitelisted(issue.rule_id, file_path):
+            if issue.rule_id in whitelisted:
                 continue
 
             if issue.confidence < self.config.security_min_confidence:
@@ -155,303 +252,230 @@ class SecurityAnalyzer(BaseAnalyzer):
 
         return filtered_issues
 
-    def _check_dangerous_functions(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.Call)
+    def _check_dangerous_functions(self, node: ast.Call, context: RuleContext) -> None:
         """Check for dangerous built-in functions."""
-        issues = []
+        func_name = self._get_function_name(node.func)
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                func_name = self._get_function_name(node.func)
-
-                if func_name in self.DANGEROUS_FUNCTIONS:
-                    # Calculate context-aware confidence
-                    confidence = self._get_context_confidence(file_path, "SEC001")
-
-                    issue = CodeIssue(
-                        category=IssueCategory.SECURITY,
-                        level=IssueLevel.CRITICAL,
-                        message=f"Dangerous function '{func_name}()' used",
-                        file_path=file_path,
-                        line_number=node.lineno,
-                        suggestion=self.DANGEROUS_FUNCTIONS[func_name],
-                        rule_id="SEC001",
-                        confidence=confidence,
-                        metadata={"function": func_name},
-                    )
-                    issues.append(issue)
+        if func_name in self.DANGEROUS_FUNCTIONS:
+            # Calculate context-aware confidence
+            confidence = context.state["security"].confidence("SEC001")
 
-        return issues
+            context.report(
+                CodeIssue(
+                    category=IssueCategory.SECURITY,
+                    level=IssueLevel.CRITICAL,
+                    message=f"Dangerous function '{func_name}()' used",
+                    file_path=context.file_path,
+                    line_number=node.lineno,
+                    suggestion=self.DANGEROUS_FUNCTIONS[func_name],
+                    rule_id="SEC001",
+                    confidence=confidence,
+                    metadata={"function": func_name},
+                )
+            )
 
-    def _check_dangerous_imports(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.Import, ast.ImportFrom)
+    def _check_dangerous_imports(
+        self, node: Union[ast.Import, ast.ImportFrom], context: RuleContext
+    ) -> None:
         """Check for dangerous module imports."""
-        issues = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.Import, ast.ImportFrom)):
-                modules = []
+        modules = []
 
-                if isinstance(node, ast.Import):
-                    modules = [alias.name for alias in node.names]
-                elif isinstance(node, ast.ImportFrom) and node.module:
-                    modules = [node.module]
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules = [node.module]
 
-                for module in modules:
-                    if module in self.DANGEROUS_MODULES:
-                        # Calculate context-aware confidence
-                        confidence = self._get_context_confidence(file_path, "SEC002")
+        for module in modules:
+            if module in self.DANGEROUS_MODULES:
+                # Calculate context-aware confidence
+                confidence = context.state["security"].confidence("SEC002")
 
-                        issue = CodeIssue(
-                            category=IssueCategory.SECURITY,
-                            level=IssueLevel.WARNING,
-                            message=f"Dangerous module '{module}' imported",
-                            file_path=file_path,
-                            line_number=node.lineno,
-                            suggestion=self.DANGEROUS_MODULES[module],
-                            rule_id="SEC002",
-                            confidence=confidence,
-                            metadata={"module": module},
-                        )
-                        issues.append(issue)
-
-        return issues
+                context.report(
+                    CodeIssue(
+                        category=IssueCategory.SECURITY,
+                        level=IssueLevel.WARNING,
+                        message=f"Dangerous module '{module}' imported",
+                        file_path=context.file_path,
+                        line_number=node.lineno,
+                        suggestion=self.DANGEROUS_MODULES[module],
+                        rule_id="SEC002",
+                        confidence=confidence,
+                        metadata={"module": module},
+                    )
+                )
 
-    def _check_hardcoded_secrets(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.Assign)
+    def _check_hardcoded_secrets(self, node: ast.Assign, context: RuleContext) -> None:
         """Check for hardcoded passwords, API keys, tokens."""
-        issues = []
-
-        secret_patterns = [
-            "password",
-            "passwd",
-            "pwd",
-            "secret",
-            "api_key",
-            "apikey",
-            "token",
-            "auth",
-            "credential",
-            "private_key",
-        ]
-
-        # Common metadata variables that should be ignored (not actual secrets)
-        metadata_whitelist = {
-            "__author__",
-            "__maintainer__",
-            "__email__",
-            "__version__",
-            "__license__",
-            "__copyright__",
-            "__credits__",
-            "__status__",
-            "__date__",
-            "__all__",
-            "__name__",
-            "__file__",
-            "__doc__",
-        }
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        var_name = target.id.lower()
-
-                        # Skip common package metadata variables
-                        if target.id in metadata_whitelist:
-                            continue
-
-                        # Check if variable name suggests it contains a secret
-                        if any(pattern in var_name for pattern in secret_patterns):
-                            # Check if it's assigned a string literal
-                            if isinstance(node.value, ast.Constant) and isinstance(
-                                node.value.value, str
-                            ):
-                                value = node.value.value
-                                # Ignore empty strings and obvious placeholders
-                                if value and value not in ["", "TODO", "CHANGEME", "your-key-here"]:
-                                    # Lower confidence for test/example files
-                                    confidence = 0.8
-                                    path_str = str(file_path).lower()
-                                    if any(
-                                        ind in path_str
-                                        for ind in ["test", "example", "demo", "sample"]
-                                    ):
-                                        confidence = 0.5
-
-                                    issue = CodeIssue(
-                                        category=IssueCategory.SECURITY,
-                                        level=IssueLevel.CRITICAL,
-                                        message=(
-                                            f"Potential hardcoded secret in variable '{target.id}'"
-                                        ),
-                                        file_path=file_path,
-                                        line_number=node.lineno,
-                                        suggestion=(
-                                            "Store secrets in environment variables or a secure "
-                                            "vault, never hardcode them in source code"
-                                        ),
-                                        rule_id="SEC003",
-                                        confidence=confidence,
-                                        metadata={"variable": target.id},
-                                    )
-                                    issues.append(issue)
-
-        return issues
-
-    def _check_sql_injection(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for potential SQL injection vulnerabilities."""
-        issues = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                func_name = self._get_function_name(node.func)
+        for target in node.targets:
+            if not isinstance(target, ast.Name):
+                continue
 
-                # Check for execute() calls with string formatting
-                if func_name in ["execute", "executemany", "raw"]:
-                    if node.args:
-                        arg = node.args[0]
+            var_name = target.id.lower()
 
-                        # Check for f-strings, % formatting, or .format()
-                        if isinstance(arg, ast.JoinedStr):  # f-string
-                            issue = CodeIssue(
-                                category=IssueCategory.SECURITY,
-                                level=IssueLevel.CRITICAL,
-                                message="Potential SQL injection via f-string in execute()",
-                                file_path=file_path,
-                                line_number=node.lineno,
-                                suggestion=(
-                                    "Use parameterized queries instead: cursor.execute(sql, "
-                                    "(param1, param2))"
-                                ),
-                                rule_id="SEC004",
-                                confidence=0.9,
-                            )
-                            issues.append(issue)
+            # Skip common package metadata variables
+            if target.id in self.METADATA_WHITELIST:
+                continue
 
-                        elif isinstance(arg, ast.BinOp) and isinstance(
-                            arg.op, ast.Mod
-                        ):  # % formatting
-                            issue = CodeIssue(
+            # Check if variable name suggests it contains a secret
+            if any(pattern in var_name for pattern in self.SECRET_PATTERNS):
+                # Check if it's assigned a string literal
+                if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+                    value = node.value.value
+                    # Ignore empty strings and obvious placeholders
+                    if value and value not in ["", "TODO", "CHANGEME", "your-key-here"]:
+                        # Lower confidence for test/example files
+                        confidence = 0.8
+                        if context.state["security"].has_sample_secrets:
+                            confidence = 0.5
+
+                        context.report(
+                            CodeIssue(
                                 category=IssueCategory.SECURITY,
                                 level=IssueLevel.CRITICAL,
-                                message="Potential SQL injection via % formatting in execute()",
-                                file_path=file_path,
+                                message=f"Potential hardcoded secret in variable '{target.id}'",
+                                file_path=context.file_path,
                                 line_number=node.lineno,
                                 suggestion=(
-                                    "Use parameterized queries instead: cursor.execute(sql, "
-                                    "(param1, param2))"
+                                    "Store secrets in environment variables or a secure "
+                                    "vault, never hardcode them in source code"
                                 ),
-                                rule_id="SEC004",
-                                confidence=0.9,
+                                rule_id="SEC003",
+                                confidence=confidence,
+                                metadata={"variable": target.id},
                             )
-                            issues.append(issue)
-
-        return issues
-
-    def _check_command_injection(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for command injection vulnerabilities."""
-        issues = []
-
-        dangerous_calls = ["os.system", "subprocess.call", "subprocess.Popen", "os.popen"]
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                func_name = self._get_full_function_name(node.func)
-
-                if any(dangerous in func_name for dangerous in dangerous_calls):
-                    # Check if shell=True is used
-                    for keyword in node.keywords:
-                        if keyword.arg == "shell" and isinstance(keyword.value, ast.Constant):
-                            if keyword.value.value is True:
-                                issue = CodeIssue(
-                                    category=IssueCategory.SECURITY,
-                                    level=IssueLevel.CRITICAL,
-                                    message=(
-                                        f"Command injection risk: {func_name}() with shell=True"
-                                    ),
-                                    file_path=file_path,
-                                    line_number=node.lineno,
-                                    suggestion=(
-                                        "Avoid shell=True. Use subprocess with list of arguments "
-                                        "instead"
-                                    ),
-                                    rule_id="SEC005",
-                                    confidence=0.95,
-                                )
-                                issues.append(issue)
-
-        return issues
-
-    def _check_weak_crypto(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for weak cryptographic algorithms."""
-        issues = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.Import, ast.ImportFrom)):
-                if isinstance(node, ast.ImportFrom) and node.module == "hashlib":
-                    for alias in node.names:
-                        if alias.name in self.WEAK_CRYPTO:
-                            issue = CodeIssue(
-                                category=IssueCategory.SECURITY,
-                                level=IssueLevel.WARNING,
-                                message=f"Weak cryptographic algorithm: {alias.name}",
-                                file_path=file_path,
-                                line_number=node.lineno,
-                                suggestion=self.WEAK_CRYPTO[alias.name],
-                                rule_id="SEC006",
-                                confidence=0.85,
-                                metadata={"algorithm": alias.name},
-                            )
-                            issues.append(issue)
+                        )
 
-        return issues
+    @node_rule(ast.Call)
+    def _check_sql_injection(self, node: ast.Call, context: RuleContext) -> None:
+        """Check for potential SQL injection vulnerabilities."""
+        func_name = self._get_function_name(node.func)
 
-    def _check_unsafe_yaml(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for unsafe YAML loading."""
-        issues = []
+        # Check for execute() calls with string formatting
+        if func_name in ["execute", "executemany", "raw"] and node.args:
+            arg = node.args[0]
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                func_name = self._get_full_function_name(node.func)
+            # Check for f-strings, % formatting, or .format()
+            if isinstance(arg, ast.JoinedStr):  # f-string
+                context.report(
+                    CodeIssue(
+                        category=IssueCategory.SECURITY,
+                        level=IssueLevel.CRITICAL,
+                        message="Potential SQL injection via f-string in execute()",
+                        file_path=context.file_path,
+                        line_number=node.lineno,
+                        suggestion=(
+                            "Use parameterized queries instead: cursor.execute(sql, "
+                            "(param1, param2))"
+                        ),
+                        rule_id="SEC004",
+                        confidence=0.9,
+                    )
+                )
 
-                if "yaml.load" in func_name and "safe_load" not in func_name:
-                    issue = CodeIssue(
+            elif isinstance(arg, ast.BinOp) and isinstance(arg.op, ast.Mod):  # % formatting
+                context.report(
+                    CodeIssue(
                         category=IssueCategory.SECURITY,
-                        level=IssueLevel.ERROR,
-                        message="Unsafe YAML loading with yaml.load()",
-                        file_path=file_path,
+                        level=IssueLevel.CRITICAL,
+                        message="Potential SQL injection via % formatting in execute()",
+                        file_path=context.file_path,
                         line_number=node.lineno,
                         suggestion=(
-                            "Use yaml.safe_load() instead to prevent arbitrary code execution"
+                            "Use parameterized queries instead: cursor.execute(sql, "
+                            "(param1, param2))"
                         ),
-                        rule_id="SEC007",
-                        confidence=0.95,
+                        rule_id="SEC004",
+                        confidence=0.9,
                     )
-                    issues.append(issue)
+                )
 
-        return issues
+    @node_rule(ast.Call)
+    def _check_command_injection(self, node: ast.Call, context: RuleContext) -> None:
+        """Check for command injection vulnerabilities."""
+        dangerous_calls = ["os.system", "subprocess.call", "subprocess.Popen", "os.popen"]
+        func_name = self._get_full_function_name(node.func)
+
+        if any(dangerous in func_name for dangerous in dangerous_calls):
+            # Check if shell=True is used
+            for keyword in node.keywords:
+                if keyword.arg == "shell" and isinstance(keyword.value, ast.Constant):
+                    if keyword.value.value is True:
+                        context.report(
+                            CodeIssue(
+                                category=IssueCategory.SECURITY,
+                                level=IssueLevel.CRITICAL,
+                                message=f"Command injection risk: {func_name}() with shell=True",
+                                file_path=context.file_path,
+                                line_number=node.lineno,
+                                suggestion=(
+                                    "Avoid shell=True. Use subprocess with list of arguments "
+                                    "instead"
+                                ),
+                                rule_id="SEC005",
+                                confidence=0.95,
+                            )
+                        )
 
-    def _check_assert_statements(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for assert statements used for security checks."""
-        issues = []
+    @node_rule(ast.ImportFrom)
+    def _check_weak_crypto(self, node: ast.ImportFrom, context: RuleContext) -> None:
+        """Check for weak cryptographic algorithms."""
+        if node.module == "hashlib":
+            for alias in node.names:
+                if alias.name in self.WEAK_CRYPTO:
+                    context.report(
+                        CodeIssue(
+                            category=IssueCategory.SECURITY,
+                            level=IssueLevel.WARNING,
+                            message=f"Weak cryptographic algorithm: {alias.name}",
+                            file_path=context.file_path,
+                            line_number=node.lineno,
+                            suggestion=self.WEAK_CRYPTO[alias.name],
+                            rule_id="SEC006",
+                            confidence=0.85,
+                            metadata={"algorithm": alias.name},
+                        )
+                    )
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Assert):
-                # Asserts can be disabled with -O flag, making them unreliable for security
-                # Lower confidence since asserts are common and context-dependent
-                issue = CodeIssue(
+    @node_rule(ast.Call)
+    def _check_unsafe_yaml(self, node: ast.Call, context: RuleContext) -> None:
+        """Check for unsafe YAML loading."""
+        func_name = self._get_full_function_name(node.func)
+
+        if "yaml.load" in func_name and "safe_load" not in func_name:
+            context.report(
+                CodeIssue(
                     category=IssueCategory.SECURITY,
-                    level=IssueLevel.INFO,
-                    message="Assert statement used - can be disabled with -O flag",
-                    file_path=file_path,
+                    level=IssueLevel.ERROR,
+                    message="Unsafe YAML loading with yaml.load()",
+                    file_path=context.file_path,
                     line_number=node.lineno,
-                    suggestion="Don't use assert for security checks or input validation. "
-                    "Use explicit if statements and raise exceptions instead",
-                    rule_id="SEC008",
-                    confidence=0.6,
+                    suggestion="Use yaml.safe_load() instead to prevent arbitrary code execution",
+                    rule_id="SEC007",
+                    confidence=0.95,
                 )
-                issues.append(issue)
+            )
 
-        return issues
+    @node_rule(ast.Assert)
+    def _check_assert_statements(self, node: ast.Assert, context: RuleContext) -> None:
+        """Check for assert statements used for security checks."""
+        # Asserts can be disabled with -O flag, making them unreliable for security
+        # Lower confidence since asserts are common and context-dependent
+        context.report(
+            CodeIssue(
+                category=IssueCategory.SECURITY,
+                level=IssueLevel.INFO,
+                message="Assert statement used - can be disabled with -O flag",
+                file_path=context.file_path,
+                line_number=node.lineno,
+                suggestion="Don't use assert for security checks or input validation. "
+                "Use explicit if statements and raise exceptions instead",
+                rule_id="SEC008",
+                confidence=0.6,
+            )
+        )
 
     def _get_function_name(self, node: ast.AST) -> str:
         """Extract function name from a call node."""
@@ -472,231 +496,213 @@ class SecurityAnalyzer(BaseAnalyzer):
             return node.attr
         return ""
 
-    def _check_sql_parameterization(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.Assign)
+    def _collect_string_concat_vars(self, node: ast.Assign, context: RuleContext) -> None:
+        """Collect variables assigned from string concatenation or .format()."""
+        string_concat_vars: Dict[str, int] = context.state["string_concat_vars"]
+
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                # Check if the assignment uses string concatenation or .format()
+                if isinstance(node.value, ast.BinOp) and isinstance(node.value.op, ast.Add):
+                    # Check if at least one side is a string
+                    if isinstance(node.value.left, ast.Constant) or isinstance(
+                        node.value.right, ast.Constant
+                    ):
+                        string_concat_vars[target.id] = node.lineno
+                elif isinstance(node.value, ast.Call) and isinstance(
+                    node.value.func, ast.Attribute
+                ):
+                    if node.value.func.attr == "format":
+                        string_concat_vars[target.id] = node.lineno
+
+    @node_rule(ast.Call)
+    def _check_sql_parameterization(self, node: ast.Call, context: RuleContext) -> None:
         """Check for proper SQL parameterization usage."""
-        issues = []
+        func_name = self._get_function_name(node.func)
 
-        # First pass: collect all variable assignments with string operations
-        string_concat_vars = {}
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        # Check if the assignment uses string concatenation or .format()
-                        if isinstance(node.value, ast.BinOp) and isinstance(node.value.op, ast.Add):
-                            # Check if at least one side is a string
-                            if isinstance(node.value.left, ast.Constant) or isinstance(
-                                node.value.right, ast.Constant
-                            ):
-                                string_concat_vars[target.id] = node.lineno
-                        elif isinstance(node.value, ast.Call) and isinstance(
-                            node.value.func, ast.Attribute
-                        ):
-                            if node.value.func.attr == "format":
-                                string_concat_vars[target.id] = node.lineno
-
-        # Second pass: check execute() calls
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                func_name = self._get_function_name(node.func)
-
-                # Check for execute() calls
-                if func_name in ["execute", "executemany"]:
-                    # Check if parameterized queries are being used properly
-                    if len(node.args) >= 1:
-                        arg = node.args[0]
-
-                        # Check for string concatenation in SQL queries
-                        if isinstance(arg, ast.BinOp) and isinstance(arg.op, ast.Add):
-                            issue = CodeIssue(
-                                category=IssueCategory.SECURITY,
-                                level=IssueLevel.CRITICAL,
-                                message=(
-                                    "SQL query uses string concatenation - "
-                                    "use parameterized queries"
-                                ),
-                                file_path=file_path,
-                                line_number=node.lineno,
-                                suggestion=(
-                                    "Use parameterized queries: cursor.execute("
-                                    "'SELECT * FROM table WHERE id = ?', (value,))"
-                                ),
-                                rule_id="SEC009",
-                                confidence=0.9,
-                            )
-                            issues.append(issue)
-
-                        # Check for .format() method calls
-                        elif isinstance(arg, ast.Call) and isinstance(arg.func, ast.Attribute):
-                            if arg.func.attr == "format":
-                                issue = CodeIssue(
-                                    category=IssueCategory.SECURITY,
-                                    level=IssueLevel.CRITICAL,
-                                    message=(
-                                        "SQL query uses .format() - " "use parameterized queries"
-                                    ),
-                                    file_path=file_path,
-                                    line_number=node.lineno,
-                                    suggestion=(
-                                        "Use parameterized queries with placeholders "
-                                        "instead of .format()"
-                                    ),
-                                    rule_id="SEC009",
-                                    confidence=0.9,
-                                )
-                                issues.append(issue)
-
-                        # Check if the variable was created with string concatenation/format
-                        elif isinstance(arg, ast.Name) and arg.id in string_concat_vars:
-                            issue = CodeIssue(
-                                category=IssueCategory.SECURITY,
-                                level=IssueLevel.CRITICAL,
-                                message=(
-                                    f"SQL query variable '{arg.id}' uses unsafe string "
-                                    "operations - use parameterized queries"
-                                ),
-                                file_path=file_path,
-                                line_number=node.lineno,
-                                suggestion=(
-                                    "Use parameterized queries: cursor.execute("
-                                    "'SELECT * FROM table WHERE id = ?', (value,))"
-                                ),
-                                rule_id="SEC009",
-                                confidence=0.85,
-                            )
-                            issues.append(issue)
+        # Check for execute() calls
+        if func_name not in ["execute", "executemany"] or len(node.args) < 1:
+            return
 
-        return issues
+        arg = node.args[0]
 
-    def _check_ssrf_vulnerabilities(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for Server-Side Request Forgery (SSRF) vulnerabilities."""
-        issues = []
+        # Check for string concatenation in SQL queries
+        if isinstance(arg, ast.BinOp) and isinstance(arg.op, ast.Add):
+            context.report(
+                CodeIssue(
+                    category=IssueCategory.SECURITY,
+                    level=IssueLevel.CRITICAL,
+                    message="SQL query uses string concatenation - use parameterized queries",
+                    file_path=context.file_path,
+                    line_number=node.lineno,
+                    suggestion=(
+                        "Use parameterized queries: cursor.execute("
+                        "'SELECT * FROM table WHERE id = ?', (value,))"
+                    ),
+                    rule_id="SEC009",
+                    confidence=0.9,
+                )
+            )
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                func_name = self._get_full_function_name(node.func)
-
-                # Check for HTTP request functions with user-controlled URLs
-                for ssrf_func in self.SSRF_FUNCTIONS:
-                    if ssrf_func in func_name:
-                        # Check if URL parameter is potentially user-controlled
-                        if node.args:
-                            url_arg = node.args[0]
-
-                            # Check for f-strings, format, or concatenation in URLs
-                            is_dynamic = (
-                                isinstance(url_arg, ast.JoinedStr)
-                                or (
-                                    isinstance(url_arg, ast.Call)
-                                    and isinstance(url_arg.func, ast.Attribute)
-                                    and url_arg.func.attr == "format"
-                                )
-                                or (
-                                    isinstance(url_arg, ast.BinOp)
-                                    and isinstance(url_arg.op, ast.Add)
-                                )
-                            )
+        # Check for .format() method calls
+        elif isinstance(arg, ast.Call) and isinstance(arg.func, ast.Attribute):
+            if arg.func.attr == "format":
+                context.report(
+                    CodeIssue(
+                        category=IssueCategory.SECURITY,
+                        level=IssueLevel.CRITICAL,
+                        message="SQL query uses .format() - use parameterized queries",
+                        file_path=context.file_path,
+                        line_number=node.lineno,
+                        suggestion=(
+                            "Use parameterized queries with placeholders instead of .format()"
+                        ),
+                        rule_id="SEC009",
+                        confidence=0.9,
+                    )
+                )
+
+        # Variables may be assigned later in the file; resolve them once traversal is done
+        elif isinstance(arg, ast.Name):
+            context.state["execute_name_args"].append((arg.id, node.lineno))
+
+    def _report_sql_parameterization_vars(self, context: RuleContext) -> List[CodeIssue]:
+        """Report execute() calls whose query variable was built unsafely."""
+        issues = []
+        string_concat_vars: Dict[str, int] = context.state["string_concat_vars"]
 
-                            if is_dynamic:
-                                issue = CodeIssue(
-                                    category=IssueCategory.SECURITY,
-                                    level=IssueLevel.ERROR,
-                                    message=(
-                                        f"Potential SSRF vulnerability in {ssrf_func}() "
-                                        "with dynamic URL"
-                                    ),
-                                    file_path=file_path,
-                                    line_number=node.lineno,
-                                    suggestion=(
-                                        "Validate and sanitize URLs. Use allowlists for domains. "
-                                        "Avoid user-controlled URLs in HTTP requests."
-                                    ),
-                                    rule_id="SEC010",
-                                    confidence=0.75,
-                                    metadata={"function": ssrf_func},
-                                )
-                                issues.append(issue)
+        for var_name, lineno in context.state["execute_name_args"]:
+            # Check if the variable was created with string concatenation/format
+            if var_name in string_concat_vars:
+                issue = CodeIssue(
+                    category=IssueCategory.SECURITY,
+                    level=IssueLevel.CRITICAL,
+                    message=(
+                        f"SQL query variable '{var_name}' uses unsafe string "
+                        "operations - use parameterized queries"
+                    ),
+                    file_path=context.file_path,
+                    line_number=lineno,
+                    suggestion=(
+                        "Use parameterized queries: cursor.execute("
+                        "'SELECT * FROM table WHERE id = ?', (value,))"
+                    ),
+                    rule_id="SEC009",
+                    confidence=0.85,
+                )
+                issues.append(issue)
 
         return issues
 
-    def _check_insecure_random(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
+    @node_rule(ast.Call)
+    def _check_ssrf_vulnerabilities(self, node: ast.Call, context: RuleContext) -> None:
+        """Check for Server-Side Request Forgery (SSRF) vulnerabilities."""
+        func_name = self._get_full_function_name(node.func)
+
+        # Check for HTTP request functions with user-controlled URLs
+        for ssrf_func in self.SSRF_FUNCTIONS:
+            if ssrf_func in func_name and node.args:
+                # Check if URL parameter is potentially user-controlled
+                url_arg = node.args[0]
+
+                # Check for f-strings, format, or concatenation in URLs
+                is_dynamic = (
+                    isinstance(url_arg, ast.JoinedStr)
+                    or (
+                        isinstance(url_arg, ast.Call)
+                        and isinstance(url_arg.func, ast.Attribute)
+                        and url_arg.func.attr == "format"
+                    )
+                    or (isinstance(url_arg, ast.BinOp) and isinstance(url_arg.op, ast.Add))
+                )
+
+                if is_dynamic:
+                    context.report(
+                        CodeIssue(
+                            category=IssueCategory.SECURITY,
+                            level=IssueLevel.ERROR,
+                            message=(
+                                f"Potential SSRF vulnerability in {ssrf_func}() with dynamic URL"
+                            ),
+                            file_path=context.file_path,
+                            line_number=node.lineno,
+                            suggestion=(
+                                "Validate and sanitize URLs. Use allowlists for domains. "
+                                "Avoid user-controlled URLs in HTTP requests."
+                            ),
+                            rule_id="SEC010",
+                            confidence=0.75,
+                            metadata={"function": ssrf_func},
+                        )
+                    )
+
+    @node_rule(ast.Import)
+    def _check_insecure_random(self, node: ast.Import, context: RuleContext) -> None:
         """Check for insecure random number generation."""
-        issues = []
+        # Check for random module imports
+        for alias in node.names:
+            if alias.name == "random":
+                # Lower confidence as random is often fine for non-security use
+                confidence = context.state["security"].confidence("SEC011")
+                context.report(
+                    CodeIssue(
+                        category=IssueCategory.SECURITY,
+                        level=IssueLevel.WARNING,
+                        message="Using 'random' module - not cryptographically secure",
+                        file_path=context.file_path,
+                        line_number=node.lineno,
+                        suggestion=(
+                            "For security-sensitive operations, use 'secrets' module instead"
+                        ),
+                        rule_id="SEC011",
+                        confidence=confidence * self.INSECURE_RANDOM_BASE_CONFIDENCE,
+                    )
+                )
 
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.Import, ast.ImportFrom)):
-                # Check for random module imports
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        if alias.name == "random":
-                            # Lower confidence as random is often fine for non-security use
-                            confidence = self._get_context_confidence(file_path, "SEC011")
-                            issue = CodeIssue(
+    @node_rule(ast.Call)
+    def _check_weak_ssl_tls(self, node: ast.Call, context: RuleContext) -> None:
+        """Check for weak SSL/TLS configurations."""
+        # Check for SSL context creation with weak settings
+        if isinstance(node.func, ast.Attribute) and node.func.attr == "SSLContext":
+            for keyword in node.keywords:
+                if keyword.arg == "verify_mode" and isinstance(keyword.value, ast.Attribute):
+                    if "CERT_NONE" in self._get_full_function_name(keyword.value):
+                        context.report(
+                            CodeIssue(
                                 category=IssueCategory.SECURITY,
-                                level=IssueLevel.WARNING,
-                                message=("Using 'random' module - not cryptographically secure"),
-                                file_path=file_path,
+                                level=IssueLevel.CRITICAL,
+                                message="SSL certificate verification disabled (CERT_NONE)",
+                                file_path=context.file_path,
                                 line_number=node.lineno,
                                 suggestion=(
-                                    "For security-sensitive operations, "
-                                    "use 'secrets' module instead"
+                                    "Always verify SSL certificates. Use CERT_REQUIRED instead."
                                 ),
-                                rule_id="SEC011",
-                                confidence=confidence * self.INSECURE_RANDOM_BASE_CONFIDENCE,
+                                rule_id="SEC012",
+                                confidence=0.95,
                             )
-                            issues.append(issue)
-
-        return issues
-
-    def _check_weak_ssl_tls(self, tree: ast.AST, file_path: Path) -> List[CodeIssue]:
-        """Check for weak SSL/TLS configurations."""
-        issues = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                # Check for SSL context creation with weak settings
-                if isinstance(node.func, ast.Attribute) and node.func.attr == "SSLContext":
-                    for keyword in node.keywords:
-                        if keyword.arg == "verify_mode" and isinstance(
-                            keyword.value, ast.Attribute
-                        ):
-                            if "CERT_NONE" in self._get_full_function_name(keyword.value):
-                                issue = CodeIssue(
-                                    category=IssueCategory.SECURITY,
-                                    level=IssueLevel.CRITICAL,
-                                    message="SSL certificate verification disabled (CERT_NONE)",
-                                    file_path=file_path,
-                                    line_number=node.lineno,
-                                    suggestion=(
-                                        "Always verify SSL certificates. Use CERT_REQUIRED instead."
-                                    ),
-                                    rule_id="SEC012",
-                                    confidence=0.95,
-                                )
-                                issues.append(issue)
-
-                # Check for requests with verify=False
-                func_name = self._get_full_function_name(node.func)
-                if any(
-                    req_func in func_name
-                    for req_func in ["requests.get", "requests.post", "requests.request"]
-                ):
-                    for keyword in node.keywords:
-                        if keyword.arg == "verify" and isinstance(keyword.value, ast.Constant):
-                            if keyword.value.value is False:
-                                issue = CodeIssue(
-                                    category=IssueCategory.SECURITY,
-                                    level=IssueLevel.CRITICAL,
-                                    message="SSL certificate verification disabled (verify=False)",
-                                    file_path=file_path,
-                                    line_number=node.lineno,
-                                    suggestion=(
-                                        "Enable SSL verification. Remove verify=False parameter."
-                                    ),
-                                    rule_id="SEC013",
-                                    confidence=0.95,
-                                )
-                                issues.append(issue)
+                        )
 
-        return issues
+        # Check for requests with verify=False
+        func_name = self._get_full_function_name(node.func)
+        if any(
+            req_func in func_name
+            for req_func in ["requests.get", "requests.post", "requests.request"]
+        ):
+            for keyword in node.keywords:
+                if keyword.arg == "verify" and isinstance(keyword.value, ast.Constant):
+                    if keyword.value.value is False:
+                        context.report(
+                            CodeIssue(
+                                category=IssueCategory.SECURITY,
+                                level=IssueLevel.CRITICAL,
+                                message="SSL certificate verification disabled (verify=False)",
+                                file_path=context.file_path,
+                                line_number=node.lineno,
+                                suggestion=(
+                                    "Enable SSL verification. Remove verify=False parameter."
+                                ),
+                                rule_id="SEC013",
+                                confidence=0.95,
+                            )
+                        )
@@ -5,14 +5,18 @@ This module provides rule-based code fixes without requiring expensive AI APIs.
 All fixers use AST analysis and pattern matching for fast, reliable transformations.
 """
 
-from refactron.autofix.engine import AutoFixEngine, FixResult
-from refactron.autofix.fixers import (
-    AddDocstringsFixer,
-    ExtractMagicNumbersFixer,
-    FixTypeHintsFixer,
-    RemoveDeadCodeFixer,
-    RemoveUnusedImportsFixer,
-)
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from refactron.autofix.engine import AutoFixEngine, FixResult
+    from refactron.autofix.fixers import (
+        AddDocstringsFixer,
+        ExtractMagicNumbersFixer,
+        FixTypeHintsFixer,
+        RemoveDeadCodeFixer,
+        RemoveUnusedImportsFixer,
+    )
 
 __all__ = [
     "AutoFixEngine",
@@ -23,3 +27,27 @@ __all__ = [
     "RemoveDeadCodeFixer",
     "FixTypeHintsFixer",
 ]
+
+# Public names and their modules, imported on first access so that importing
+# ``refactron.autofix.models`` does not load the engine and every fixer
+_LAZY_ATTRIBUTES = {
+    "AutoFixEngine": "refactron.autofix.engine",
+    "FixResult": "refactron.autofix.engine",
+    "RemoveUnusedImportsFixer": "refactron.autofix.fixers",
+    "ExtractMagicNumbersFixer": "refactron.autofix.fixers",
+    "AddDocstringsFixer": "refactron.autofix.fixers",
+    "RemoveDeadCodeFixer": "refactron.autofix.fixers",
+    "FixTypeHintsFixer": "refactron.autofix.fixers",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> Any:
+    return sorted(set(globals()) | set(__all__))
@@ -5,10 +5,21 @@ This engine uses AST analysis and pattern matching to apply safe
 automatic fixes without requiring expensive AI APIs.
 """
 
-from typing import Dict
+import ast
+from typing import Dict, Iterator, List, Optional, Tuple, Type
 
 from refactron.autofix.models import FixResult, FixRiskLevel
 from refactron.core.models import CodeIssue
+from refactron.core.registry import COST_CHEAP, FIXERS, Registry
+
+# Fixers for the issues reported by the analyzers, by rule ID
+RULE_FIXERS = {
+    "S005": "add_docstrings",
+    "S006": "remove_unused_imports",
+    "DEP001": "remove_unused_imports",
+    "DEAD002": "remove_unused_variables",
+    "DEAD003": "remove_dead_code",
+}
 
 
 class AutoFixEngine:
@@ -29,46 +40,26 @@ class AutoFixEngine:
         self.safety_level = safety_level
         self.fixers = self._register_fixers()
 
-    def _register_fixers(self) -> Dict[str, "BaseFixer"]:
-        """Register all available fixers."""
-        from refactron.autofix.fixers import (
-            AddDocstringsFixer,
-            AddMissingCommasFixer,
-            ConvertToFStringFixer,
-            ExtractMagicNumbersFixer,
-            FixIndentationFixer,
-            FixTypeHintsFixer,
-            NormalizeQuotesFixer,
-            RemoveDeadCodeFixer,
-            RemovePrintStatementsFixer,
-            RemoveTrailingWhitespaceFixer,
-            RemoveUnusedImportsFixer,
-            RemoveUnusedVariablesFixer,
-            SimplifyBooleanFixer,
-            SortImportsFixer,
-        )
-
-        fixers = {}
-        for fixer_class in [
-            RemoveUnusedImportsFixer,
-            ExtractMagicNumbersFixer,
-            AddDocstringsFixer,
-            RemoveDeadCodeFixer,
-            FixTypeHintsFixer,
-            SortImportsFixer,
-            RemoveTrailingWhitespaceFixer,
-            NormalizeQuotesFixer,
-            SimplifyBooleanFixer,
-            ConvertToFStringFixer,
-            RemoveUnusedVariablesFixer,
-            FixIndentationFixer,
-            AddMissingCommasFixer,
-            RemovePrintStatementsFixer,
-        ]:
-            fixer = fixer_class()
-            fixers[fixer.name] = fixer
-
-        return fixers
+    def _register_fixers(self) -> "FixerRegistry":
+        """Register all available fixers; each is created the first time it is looked up."""
+        return FixerRegistry(FIXERS)
+
+    def fixer_for(self, issue: CodeIssue) -> Optional["BaseFixer"]:
+        """
+        Find the fixer for an issue.
+
+        Issues name a fixer in their ``rule_id``, or are reported by an
+        analyzer under a rule ID listed in :data:`RULE_FIXERS`.
+
+        Args:
+            issue: The issue to fix
+
+        Returns:
+            The fixer, or None if no fixer handles the issue
+        """
+        if not issue.rule_id:
+            return None
+        return self.fixers.get(RULE_FIXERS.get(issue.rule_id, issue.rule_id))
 
     def can_fix(self, issue: CodeIssue) -> bool:
         """
@@ -80,7 +71,7 @@ class AutoFixEngine:
         Returns:
             True if a fixer is available, False otherwise
         """
-        return issue.rule_id in self.fixers if issue.rule_id else False
+        return self.fixer_for(issue) is not None
 
     def fix(self, issue: CodeIssue, code: str, preview: bool = True) -> FixResult:
         """
@@ -94,13 +85,12 @@ class AutoFixEngine:
         Returns:
             FixResult with success status and details
         """
-        if not self.can_fix(issue):
+        fixer = self.fixer_for(issue)
+        if fixer is None:
             return FixResult(
                 success=False, reason=f"No fixer available for issue: {issue.rule_id or 'unknown'}"
             )
 
-        fixer = self.fixers[issue.rule_id]
-
         # Check risk level
         if fixer.risk_score > self.safety_level.value:
             return FixResult(
@@ -139,8 +129,63 @@ class AutoFixEngine:
         return results
 
 
+class FixerRegistry(Dict[str, "BaseFixer"]):
+    """
+    Fixers by name, backed by a plugin registry.
+
+    Every registered fixer is listed, but a fixer is only instantiated the
+    first time it is looked up.
+    """
+
+    def __init__(self, registry: Registry):
+        super().__init__()
+        self.registry = registry
+
+    def __missing__(self, name: str) -> "BaseFixer":
+        plugin = self.registry.get(name)
+        if plugin is None:
+            raise KeyError(name)
+        fixer: BaseFixer = plugin.load()()
+        self[name] = fixer
+        return fixer
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.registry.get(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.registry.names())
+
+    def __len__(self) -> int:
+        return len(self.registry.names())
+
+    def get(  # type: ignore[override]
+        self, name: str, default: Optional["BaseFixer"] = None
+    ) -> Optional["BaseFixer"]:
+        return self[name] if name in self else default
+
+    def keys(self) -> List[str]:  # type: ignore[override]
+        return list(self)
+
+    def values(self) -> List["BaseFixer"]:  # type: ignore[override]
+        return [self[name] for name in self]
+
+    def items(self) -> List[Tuple[str, "BaseFixer"]]:  # type: ignore[override]
+        return [(name, self[name]) for name in self]
+
+
 class BaseFixer:
-    """Base class for all automatic fixers."""
+    """
+    Base class for all automatic fixers.
+
+    Subclasses describe themselves to the plugin registry with the class
+    attributes ``node_types`` (the AST nodes they change; empty for fixers
+    working on the text), ``cost`` (see
+    :data:`refactron.core.registry.COST_CLASSES`) and ``cacheable``.
+    """
+
+    node_types: Tuple[Type[ast.AST], ...] = ()
+    cost = COST_CHEAP
+    cacheable = True
 
     def __init__(self, name: str, risk_score: float = 0.0):
         """
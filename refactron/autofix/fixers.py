@@ -6,16 +6,21 @@ No expensive AI APIs required!
 """
 
 import ast
-from typing import Set
+from typing import Dict, List, Set
 
 from refactron.autofix.engine import BaseFixer
 from refactron.autofix.models import FixResult
 from refactron.core.models import CodeIssue
+from refactron.core.registry import COST_MODERATE
+from refactron.core.symbols import SymbolTable
 
 
 class RemoveUnusedImportsFixer(BaseFixer):
     """Removes unused import statements."""
 
+    node_types = (ast.Import, ast.ImportFrom)
+    cost = COST_MODERATE
+
     def __init__(self) -> None:
         super().__init__(name="remove_unused_imports", risk_score=0.0)
 
@@ -46,70 +51,67 @@ class RemoveUnusedImportsFixer(BaseFixer):
         return self.preview(issue, code)
 
     def _remove_unused_imports(self, code: str) -> dict:
-        """Remove unused imports from code."""
+        """
+        Remove unused imports from code.
+
+        Uses the same symbol table as the unused import checks, and removes
+        an import statement only when none of the names it binds is used.
+        Statements sharing a line with other code, or that are the only
+        statement of their block, are left in place.
+        """
         try:
             tree = ast.parse(code)
         except SyntaxError:
             return {"fixed": code, "removed_count": 0}
 
-        # Find all imports
-        imports = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.append(
-                        {
-                            "name": alias.asname or alias.name,
-                            "module": alias.name,
-                            "lineno": node.lineno,
-                            "type": "import",
-                        }
-                    )
-            elif isinstance(node, ast.ImportFrom):
-                for alias in node.names:
-                    if alias.name == "*":
-                        continue  # Skip wildcard imports (risky to remove)
-                    imports.append(
-                        {
-                            "name": alias.asname or alias.name,
-                            "module": node.module,
-                            "lineno": node.lineno,
-                            "type": "from",
-                        }
-                    )
-
-        # Find all name usages
-        used_names = self._find_used_names(tree)
-
-        # Identify unused imports
-        unused_lines = set()
-        for imp in imports:
-            if imp["name"] not in used_names:
-                unused_lines.add(imp["lineno"])
-
-        # Remove unused import lines
+        table = SymbolTable.build(tree)
+        unused = table.unused_imports()
+        unused_aliases = {id(binding.node) for binding in unused}
         lines = code.split("\n")
-        fixed_lines = [line for i, line in enumerate(lines, 1) if i not in unused_lines]
-
-        return {"fixed": "\n".join(fixed_lines), "removed_count": len(unused_lines)}
-
-    def _find_used_names(self, tree: ast.AST) -> Set[str]:
-        """Find all names used in the code."""
-        used_names = set()
-
-        for node in ast.walk(tree):
-            # Skip import nodes
-            if isinstance(node, (ast.Import, ast.ImportFrom)):
+        block_sizes = self._block_sizes(tree) if unused else {}
+
+        removed_lines: Set[int] = set()
+        removed_count = 0
+        seen: Set[int] = set()
+        for binding in unused:
+            statement = binding.statement
+            if statement is None or id(statement) in seen:
+                continue
+            seen.add(id(statement))
+            names = statement.names  # type: ignore[attr-defined]
+            if any(id(alias) not in unused_aliases for alias in names):
+                continue
+            if block_sizes.get(id(statement), 0) < 2 or not self._on_own_lines(statement, lines):
                 continue
+            end_lineno = getattr(statement, "end_lineno", None) or statement.lineno
+            removed_lines.update(range(statement.lineno, end_lineno + 1))
+            removed_count += 1
 
-            if isinstance(node, ast.Name):
-                used_names.add(node.id)
-            elif isinstance(node, ast.Attribute):
-                # For attribute access like 'os.path', track 'os'
-                if isinstance(node.value, ast.Name):
-                    used_names.add(node.value.id)
+        fixed_lines = [line for i, line in enumerate(lines, 1) if i not in removed_lines]
+        return {"fixed": "\n".join(fixed_lines), "removed_count": removed_count}
 
-        return used_names
+    def _block_sizes(self, tree: ast.Module) -> Dict[int, int]:
+        """Map the id of every statement to the number of statements in its block."""
+        sizes: Dict[int, int] = {id(statement): 2 for statement in tree.body}
+        for node in ast.walk(tree):
+            for field in ("body", "orelse", "finalbody"):
+                block = getattr(node, field, None)
+                if isinstance(block, list) and node is not tree:
+                    for statement in block:
+                        sizes[id(statement)] = len(block)
+        return sizes
+
+    def _on_own_lines(self, statement: ast.stmt, lines: List[str]) -> bool:
+        """Whether no other code shares the lines of ``statement``."""
+        end_lineno = getattr(statement, "end_lineno", None) or statement.lineno
+        end_col = getattr(statement, "end_col_offset", None)
+        if lines[statement.lineno - 1][: statement.col_offset].strip():
+            return False
+        if end_col is not None:
+            rest = lines[end_lineno - 1][end_col:].strip()
+            if rest and not rest.startswith("#"):
+                return False
+        return True
 
     def _create_diff(self, original: str, fixed: str) -> str:
         """Create a simple diff showing changes."""
@@ -193,6 +195,9 @@ class ExtractMagicNumbersFixer(BaseFixer):
 class AddDocstringsFixer(BaseFixer):
     """Adds missing docstrings to functions and classes."""
 
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    cost = COST_MODERATE
+
     def __init__(self) -> None:
         super().__init__(name="add_docstrings", risk_score=0.1)
 
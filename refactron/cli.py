@@ -1,18 +1,53 @@
 """Command-line interface for Refactron."""
 
+import os
+import sys
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Sequence
 
 import click
-from rich.console import Console
-from rich.table import Table
 
-from refactron import Refactron
-from refactron.autofix.engine import AutoFixEngine
 from refactron.autofix.models import FixRiskLevel
-from refactron.core.config import RefactronConfig
+from refactron.core.config import WATCH_DEBOUNCE_SECONDS, WATCH_POLL_INTERVAL, RefactronConfig
 
-console = Console()
+# Everything else is imported by the commands that use it, so that hooks
+# running a quick command do not pay for loading the analyzers or rich
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table
+
+    from refactron.core.analysis_result import AnalysisAggregate
+    from refactron.core.daemon import DaemonClient
+    from refactron.core.models import CodeIssue, FileMetrics
+    from refactron.core.profiling import AnalysisProfile
+    from refactron.core.registry import Registry
+    from refactron.core.watch import WatchUpdate
+
+
+class _LazyConsole:
+    """Stands in for the rich console, creating it when something is first printed."""
+
+    def __init__(self) -> None:
+        self._console: Optional["Console"] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console()
+        return getattr(self._console, name)
+
+
+console = _LazyConsole()
+
+# Risk levels accepted by --safety-level
+SAFETY_LEVELS = {
+    "safe": FixRiskLevel.SAFE,
+    "low": FixRiskLevel.LOW,
+    "moderate": FixRiskLevel.MODERATE,
+    "high": FixRiskLevel.HIGH,
+}
 
 
 def _load_config(config_path: Optional[str]) -> RefactronConfig:
@@ -36,15 +71,43 @@ def _validate_path(target: str) -> Path:
     return target_path
 
 
-def _print_file_count(target_path: Path) -> None:
-    """Print count of Python files if target is directory."""
+def _daemon_client(enabled: bool) -> Optional["DaemonClient"]:
+    """Return a client for the running daemon, or None to work in this process."""
+    if not enabled:
+        return None
+    import warnings
+
+    from refactron.core.daemon import DaemonClient
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", RuntimeWarning)
+        client = DaemonClient.connect()
+    for warning in caught:
+        console.print(f"[yellow]⚠️  {warning.message}[/yellow]\n")
+    if client is not None:
+        console.print("[dim]⚡ Using the running Refactron daemon[/dim]\n")
+    return client
+
+
+def _aggregated(
+    results: Iterator["FileMetrics"], aggregate: "AnalysisAggregate"
+) -> Iterator["FileMetrics"]:
+    """Add each file's metrics to the running totals before passing it on."""
+    for metrics in results:
+        aggregate.add(metrics)
+        yield metrics
+
+
+def _print_file_count(target_path: Path, files: Sequence[Path]) -> None:
+    """Print count of discovered Python files if target is directory."""
     if target_path.is_dir():
-        py_files = list(target_path.rglob("*.py"))
-        console.print(f"[dim]📁 Found {len(py_files)} Python file(s) to analyze[/dim]\n")
+        console.print(f"[dim]📁 Found {len(files)} Python file(s) to analyze[/dim]\n")
 
 
-def _create_summary_table(summary: dict) -> Table:
+def _create_summary_table(summary: dict) -> "Table":
     """Create analysis summary table."""
+    from rich.table import Table
+
     table = Table(title="Analysis Summary", show_header=True, header_style="bold magenta")
     table.add_column("Metric", style="cyan")
     table.add_column("Value", justify="right", style="green")
@@ -59,6 +122,70 @@ def _create_summary_table(summary: dict) -> Table:
     return table
 
 
+def _create_profile_tables(profile: "AnalysisProfile", limit: int = 10) -> List["Table"]:
+    """Create tables of the slowest analyzers, rules and files of a profiled analysis."""
+    from rich.table import Table
+
+    total = profile.seconds or 1.0
+
+    analyzers = Table(title="Slowest Analyzers", show_header=True, header_style="bold magenta")
+    analyzers.add_column("Analyzer", style="cyan")
+    analyzers.add_column("Time (s)", justify="right", style="green")
+    analyzers.add_column("Share", justify="right")
+    analyzers.add_column("Files", justify="right")
+    analyzers.add_column("Nodes", justify="right")
+    analyzers.add_column("Issues", justify="right")
+    for name, stats in profile.slowest_analyzers(limit):
+        analyzers.add_row(
+            name,
+            f"{stats.seconds:.3f}",
+            f"{stats.seconds / total:.0%}",
+            str(stats.files),
+            str(stats.nodes),
+            str(stats.issues),
+        )
+
+    rules = Table(title="Slowest Rules", show_header=True, header_style="bold magenta")
+    rules.add_column("Rule", style="cyan")
+    rules.add_column("Time (s)", justify="right", style="green")
+    rules.add_column("Nodes", justify="right")
+    rules.add_column("µs/node", justify="right")
+    rules.add_column("Issues", justify="right")
+    for name, stats in profile.slowest_rules(limit):
+        per_node = stats.seconds / stats.nodes * 1e6 if stats.nodes else 0.0
+        rules.add_row(
+            name, f"{stats.seconds:.3f}", str(stats.nodes), f"{per_node:.1f}", str(stats.issues)
+        )
+
+    files = Table(title="Slowest Files", show_header=True, header_style="bold magenta")
+    files.add_column("File", style="cyan")
+    files.add_column("Time (s)", justify="right", style="green")
+    files.add_column("Parse (s)", justify="right")
+    files.add_column("Nodes", justify="right")
+    files.add_column("Issues", justify="right")
+    for record in profile.slowest_files(limit):
+        files.add_row(
+            str(record.file_path),
+            f"{record.seconds:.3f}",
+            f"{record.parse_seconds:.3f}",
+            str(record.nodes),
+            str(record.issues),
+        )
+
+    return [analyzers, rules, files]
+
+
+def _print_profile(profile: "AnalysisProfile") -> None:
+    """Print the profiling tables of an analysis."""
+    console.print(
+        f"[bold]⏱️  Profile:[/bold] {profile.files} file(s), {profile.seconds:.3f}s analyzing, "
+        f"{profile.parse_seconds:.3f}s parsing, {profile.nodes} node(s)\n"
+    )
+    for table in _create_profile_tables(profile):
+        console.print(table)
+        console.print()
+
+
 def _print_status_messages(summary: dict) -> None:
     """Print status messages based on analysis results."""
     if summary["total_issues"] == 0:
@@ -70,9 +197,8 @@ def _print_status_messages(summary: dict) -> None:
         )
 
 
-def _print_detailed_issues(result) -> None:
-    """Print detailed issues list."""
-    console.print("[bold]Detailed Issues:[/bold]\n")
+def _print_issues(issues: List["CodeIssue"]) -> None:
+    """Print a list of issues with their suggestions."""
     level_icons = {
         "critical": "🔴",
         "error": "❌",
@@ -80,7 +206,7 @@ def _print_detailed_issues(result) -> None:
         "info": "ℹ️",
     }
 
-    for issue in result.all_issues:
+    for issue in issues:
         icon = level_icons.get(issue.level.value, "•")
         console.print(f"{icon} {issue}")
         if issue.suggestion:
@@ -88,6 +214,29 @@ def _print_detailed_issues(result) -> None:
         console.print()
 
 
+def _print_watch_update(update: "WatchUpdate", total_issues: int) -> None:
+    """Print the issues found and resolved by one round of re-analysis."""
+    from rich.markup import escape
+
+    parts = [f"{len(update.analyzed)} file(s) re-analyzed"]
+    if update.removed:
+        parts.append(f"{len(update.removed)} removed")
+    console.print(
+        f"[bold]🔄 {time.strftime('%H:%M:%S')}[/bold] {', '.join(parts)} "
+        f"[dim]in {update.seconds:.2f}s[/dim]"
+    )
+    for issue in update.new_issues:
+        console.print(f"   [red]+ {escape(str(issue))}[/red]")
+    for issue in update.resolved_issues:
+        console.print(f"   [green]- {escape(str(issue))}[/green]")
+    if not update.new_issues and not update.resolved_issues:
+        console.print("   [dim]No new or resolved issues[/dim]")
+    console.print(
+        f"   [dim]{total_issues} issue(s) in total "
+        f"(+{len(update.new_issues)}, -{len(update.resolved_issues)})[/dim]\n"
+    )
+
+
 def _print_helpful_tips(summary: dict, detailed: bool) -> None:
     """Print helpful tips based on results."""
     if summary["total_issues"] > 0 and not detailed:
@@ -113,8 +262,10 @@ def _confirm_apply_mode(preview: bool) -> None:
             raise SystemExit(0)
 
 
-def _create_refactor_table(summary: dict) -> Table:
+def _create_refactor_table(summary: dict) -> "Table":
     """Create refactoring summary table."""
+    from rich.table import Table
+
     table = Table(title="Refactoring Summary", show_header=True, header_style="bold magenta")
     table.add_column("Metric", style="cyan")
     table.add_column("Value", justify="right", style="green")
@@ -127,6 +278,36 @@ def _create_refactor_table(summary: dict) -> Table:
     return table
 
 
+def _create_plugin_table(
+    title: str, registry: "Registry", enabled: Optional[Sequence[str]] = None
+) -> "Table":
+    """Create a table of the plugins in a registry, importing each to read its metadata."""
+    from rich.markup import escape
+    from rich.table import Table
+
+    table = Table(title=title, show_header=True, header_style="bold magenta")
+    table.add_column("Name", style="cyan")
+    table.add_column("Source")
+    table.add_column("Node Types")
+    table.add_column("Cost")
+    table.add_column("Cacheable")
+    if enabled is not None:
+        table.add_column("Enabled")
+
+    for plugin in registry.plugins():
+        row = [plugin.name, "built-in" if plugin.builtin else str(plugin.distribution)]
+        try:
+            node_types = ", ".join(t.__name__ for t in plugin.node_types) or "module"
+            row += [node_types, plugin.cost, "yes" if plugin.cacheable else "no"]
+        except Exception as e:
+            row += [f"[red]failed to load: {escape(str(e))}[/red]", "", ""]
+        if enabled is not None:
+            row.append("[green]yes[/green]" if plugin.name in enabled else "[dim]no[/dim]")
+        table.add_row(*row)
+
+    return table
+
+
 def _print_refactor_messages(summary: dict, preview: bool) -> None:
     """Print status messages for refactoring results."""
     if summary["total_operations"] == 0:
@@ -169,39 +350,154 @@ def main() -> None:
     default=True,
     help="Show detailed or summary report",
 )
-def analyze(target: str, config: Optional[str], detailed: bool) -> None:
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of worker processes (0 = one per CPU)",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse results for files unchanged since a previous run",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory for cached results (default: ~/.refactron/cache)",
+)
+@click.option(
+    "--changed-since",
+    metavar="REV",
+    help="Only analyze Python files changed since this git revision, and their importers",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Time every analyzer, rule and file and print the slowest (disables the cache)",
+)
+@click.option(
+    "--profile-analyzer",
+    metavar="NAME",
+    help="Also run this analyzer under cProfile and save pstats (implies --profile, --jobs 1)",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    help="File for the --profile-analyzer statistics (default: NAME.pstats)",
+)
+@click.option(
+    "--daemon/--no-daemon",
+    "use_daemon",
+    default=True,
+    help="Analyze in the running daemon, if there is one",
+)
+def analyze(
+    target: str,
+    config: Optional[str],
+    detailed: bool,
+    jobs: int,
+    cache: bool,
+    cache_dir: Optional[str],
+    changed_since: Optional[str],
+    profile: bool,
+    profile_analyzer: Optional[str],
+    profile_output: Optional[str],
+    use_daemon: bool,
+) -> None:
     """
     Analyze code for issues and technical debt.
 
     TARGET: Path to file or directory to analyze
     """
+    from refactron.core.analysis_result import AnalysisAggregate
+    from refactron.core.discovery import discover_files
+    from refactron.core.incremental import GitError
+    from refactron.core.profiling import AnalysisProfile, Profiler
+
     console.print("\n🔍 [bold blue]Refactron Analysis[/bold blue]\n")
 
     # Setup
     target_path = _validate_path(target)
     cfg = _load_config(config)
-    _print_file_count(target_path)
-
-    # Run analysis
+    cfg.cache_enabled = cache
+    if cache_dir:
+        cfg.cache_dir = cache_dir
+
+    profiler = None
+    if profile or profile_analyzer:
+        # Cached files are not analyzed, so they would have no timings
+        cfg.cache_enabled = False
+        cfg.profiling_enabled = True
+        if profile_analyzer:
+            if profile_analyzer not in cfg.enabled_analyzers:
+                console.print(f"[red]❌ Unknown or disabled analyzer: {profile_analyzer}[/red]")
+                raise SystemExit(1)
+            if jobs != 1:
+                console.print("[dim]⏱️  cProfile runs in-process; using --jobs 1[/dim]")
+                jobs = 1
+        profiler = Profiler(cprofile_analyzer=profile_analyzer)
+
+    # Profiling times this process, so it never goes through the daemon
+    client = _daemon_client(use_daemon and profiler is None)
+
+    # One walk of the tree serves both the file count and the analysis
+    files = discover_files(target_path, cfg)
+    if changed_since:
+        console.print(f"[dim]🔀 Analyzing files changed since: {changed_since}[/dim]\n")
+    else:
+        _print_file_count(target_path, files)
+
+    # Run analysis, printing each file's issues as soon as it is done
+    aggregate = AnalysisAggregate(profile=AnalysisProfile() if profiler else None)
+    results: Iterator["FileMetrics"]
+    if client is not None:
+        results = _aggregated(
+            client.iter_analyze(
+                target, cfg, workers=jobs, changed_since=changed_since, files=files
+            ),
+            aggregate,
+        )
+    else:
+        from refactron.core.refactron import Refactron
+
+        results = Refactron(cfg, profiler=profiler).iter_analyze(
+            target,
+            workers=jobs,
+            changed_since=changed_since,
+            aggregate=aggregate,
+            files=files,
+        )
     try:
         with console.status("[bold green]🔎 Analyzing code...[/bold green]"):
-            refactron = Refactron(cfg)
-            result = refactron.analyze(target)
+            for metrics in results:
+                if detailed and metrics.issues:
+                    if aggregate.total_issues == metrics.issue_count:
+                        console.print("[bold]Detailed Issues:[/bold]\n")
+                    _print_issues(metrics.issues)
+    except GitError as e:
+        console.print(f"[red]❌ Could not determine changed files: {e}[/red]")
+        raise SystemExit(1)
     except Exception as e:
         console.print(f"[red]❌ Analysis failed: {e}[/red]")
         console.print("[dim]Tip: Check if all files have valid Python syntax[/dim]")
         raise SystemExit(1)
 
     # Display results
-    summary = result.summary()
+    summary = aggregate.summary()
     console.print(_create_summary_table(summary))
     console.print()
 
-    _print_status_messages(summary)
-
-    if detailed and result.all_issues:
-        _print_detailed_issues(result)
+    if aggregate.profile is not None:
+        _print_profile(aggregate.profile)
+    if profiler is not None and profile_analyzer:
+        stats_path = Path(profile_output or f"{profile_analyzer}.pstats")
+        if profiler.dump_stats(stats_path):
+            console.print(f"[dim]📈 cProfile statistics saved to: {stats_path}[/dim]\n")
 
+    _print_status_messages(summary)
     _print_helpful_tips(summary, detailed)
 
     # Exit with error code if critical issues found
@@ -228,11 +524,27 @@ def analyze(target: str, config: Optional[str], detailed: bool) -> None:
     multiple=True,
     help="Specific refactoring types to apply",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of worker processes (0 = one per CPU)",
+)
+@click.option(
+    "--daemon/--no-daemon",
+    "use_daemon",
+    default=True,
+    help="Refactor in the running daemon, if there is one",
+)
 def refactor(
     target: str,
     config: Optional[str],
     preview: bool,
     types: tuple,
+    jobs: int,
+    use_daemon: bool,
 ) -> None:
     """
     Refactor code with intelligent transformations.
@@ -247,15 +559,28 @@ def refactor(
     _print_refactor_filters(types)
     _confirm_apply_mode(preview)
 
+    client = _daemon_client(use_daemon)
+
     # Run refactoring
     try:
         with console.status("[bold green]🔎 Analyzing and generating refactorings...[/bold green]"):
-            refactron = Refactron(cfg)
-            result = refactron.refactor(
-                target,
-                preview=preview,
-                operation_types=list(types) if types else None,
-            )
+            if client is not None:
+                result = client.refactor(
+                    target,
+                    cfg,
+                    preview=preview,
+                    operation_types=list(types) if types else None,
+                    workers=jobs,
+                )
+            else:
+                from refactron.core.refactron import Refactron
+
+                result = Refactron(cfg).refactor(
+                    target,
+                    preview=preview,
+                    operation_types=list(types) if types else None,
+                    workers=jobs,
+                )
     except Exception as e:
         console.print(f"[red]❌ Refactoring failed: {e}[/red]")
         raise SystemExit(1)
@@ -293,6 +618,9 @@ def report(target: str, format: str, output: Optional[str]) -> None:
 
     TARGET: Path to file or directory to analyze
     """
+    from refactron.core.analysis_result import write_report
+    from refactron.core.refactron import Refactron
+
     console.print("\n📊 [bold blue]Generating Report[/bold blue]\n")
 
     target_path = Path(target)
@@ -308,30 +636,200 @@ def report(target: str, format: str, output: Optional[str]) -> None:
     console.print(f"[dim]📝 Format: {format.upper()}[/dim]")
 
     try:
-        with console.status("[bold green]📊 Analyzing code and generating report...[/bold green]"):
-            refactron = Refactron(cfg)
-            result = refactron.analyze(target)
-
-        report_content = result.report(detailed=True)
+        refactron = Refactron(cfg)
 
+        # The report is written while files are analyzed, one file at a time
         if output:
             output_path = Path(output)
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(output_path, "w") as f:
-                f.write(report_content)
+            with console.status(
+                "[bold green]📊 Analyzing code and generating report...[/bold green]"
+            ):
+                with open(output_path, "w") as f:
+                    write_report(refactron.iter_analyze(target), f, detailed=True)
 
             file_size = output_path.stat().st_size
             console.print(f"\n✅ Report saved to: [bold]{output}[/bold]")
             console.print(f"[dim]📦 Size: {file_size:,} bytes[/dim]")
         else:
-            console.print(report_content)
+            console.print()
+            write_report(refactron.iter_analyze(target), console.file, detailed=True)
 
     except Exception as e:
         console.print(f"[red]❌ Report generation failed: {e}[/red]")
         raise SystemExit(1)
 
 
+@main.command()
+@click.argument("target", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--config",
+    "-c",
+    type=click.Path(exists=True),
+    help="Path to configuration file",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of worker processes (0 = one per CPU)",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse the import graph saved by a previous run, rescanning changed files only",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory for the saved import graph (default: ~/.refactron/cache)",
+)
+@click.option(
+    "--include-deferred",
+    is_flag=True,
+    help="Also follow imports made inside functions",
+)
+def cycles(
+    target: str,
+    config: Optional[str],
+    jobs: int,
+    cache: bool,
+    cache_dir: Optional[str],
+    include_deferred: bool,
+) -> None:
+    """
+    Find import cycles between the modules of a project.
+
+    TARGET: Project directory
+    """
+    from refactron.core.refactron import Refactron
+
+    console.print("\n🔁 [bold blue]Import Cycles[/bold blue]\n")
+
+    target_path = _validate_path(target)
+    cfg = _load_config(config)
+    cfg.cache_enabled = cache
+    if cache_dir:
+        cfg.cache_dir = cache_dir
+
+    refactron = Refactron(cfg)
+    with console.status("[bold green]🔎 Scanning imports...[/bold green]"):
+        graph = refactron.import_graph(target_path, workers=jobs)
+        found = graph.cycles(include_deferred=include_deferred)
+
+    console.print(
+        f"[dim]📦 {len(graph.files)} modules, {graph.scanned} scanned since the last run[/dim]\n"
+    )
+    if not found:
+        console.print("[green]✅ No import cycles found[/green]")
+        return
+
+    for number, cycle in enumerate(found, 1):
+        console.print(
+            f"[bold yellow]Cycle {number}[/bold yellow] "
+            f"[dim]({len(cycle.modules)} modules)[/dim]: {' → '.join(cycle.path)}"
+        )
+        for edge in cycle.edges:
+            location = f"{graph.path_for(edge.source)}:{edge.line_number}"
+            console.print(f"   {edge.source} imports {edge.target} [dim]{location}[/dim]")
+        if len(cycle.modules) > len(cycle.edges):
+            console.print(f"   [dim]Also in this cycle: {', '.join(cycle.modules)}[/dim]")
+        console.print()
+
+    console.print(f"[red]❌ Found {len(found)} import cycle(s)[/red]")
+    raise SystemExit(1)
+
+
+@main.command()
+@click.argument("target", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--config",
+    "-c",
+    type=click.Path(exists=True),
+    help="Path to configuration file",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of worker processes (0 = one per CPU)",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse the clone index saved by a previous run, rescanning changed files only",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory for the saved clone index (default: ~/.refactron/cache)",
+)
+@click.option(
+    "--limit",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Maximum number of clone groups to show",
+)
+def clones(
+    target: str,
+    config: Optional[str],
+    jobs: int,
+    cache: bool,
+    cache_dir: Optional[str],
+    limit: int,
+) -> None:
+    """
+    Find code duplicated across the files of a project.
+
+    TARGET: Project directory
+    """
+    from refactron.core.refactron import Refactron
+
+    console.print("\n📑 [bold blue]Code Clones[/bold blue]\n")
+
+    target_path = _validate_path(target)
+    cfg = _load_config(config)
+    cfg.cache_enabled = cache
+    if cache_dir:
+        cfg.cache_dir = cache_dir
+
+    refactron = Refactron(cfg)
+    with console.status("[bold green]🔎 Fingerprinting code...[/bold green]"):
+        index = refactron.clone_index(target_path, workers=jobs)
+        groups = index.clone_groups()
+
+    console.print(
+        f"[dim]📦 {len(index.files)} files, {index.scanned} scanned since the last run[/dim]\n"
+    )
+    if not groups:
+        console.print("[green]✅ No code clones found[/green]")
+        return
+
+    root = os.path.abspath(target_path)
+    for number, group in enumerate(groups[:limit], 1):
+        console.print(
+            f"[bold yellow]Clone {number}[/bold yellow] "
+            f"[dim]({len(group.locations)} copies, {group.duplicated_lines} duplicated lines)[/dim]"
+        )
+        for location in group.locations:
+            shown = os.path.relpath(location.file_path, root)
+            console.print(f"   {shown}:{location.start_line}-{location.end_line}")
+        console.print()
+
+    if len(groups) > limit:
+        console.print(f"[dim]... and {len(groups) - limit} more[/dim]\n")
+    total = sum(group.duplicated_lines for group in groups)
+    console.print(
+        f"[yellow]⚠️  Found {len(groups)} clone group(s), {total} duplicated lines[/yellow]"
+    )
+
+
 @main.command()
 @click.argument("target", type=click.Path(exists=True))
 @click.option(
@@ -342,7 +840,7 @@ def report(target: str, format: str, output: Optional[str]) -> None:
 @click.option(
     "--safety-level",
     "-s",
-    type=click.Choice(["safe", "low", "moderate", "high"], case_sensitive=False),
+    type=click.Choice(list(SAFETY_LEVELS), case_sensitive=False),
     default="safe",
     help="Maximum risk level for automatic fixes",
 )
@@ -360,20 +858,16 @@ def autofix(
       refactron autofix myfile.py --preview
       refactron autofix myproject/ --apply --safety-level moderate
     """
+    from refactron.autofix.engine import AutoFixEngine
+    from refactron.core.discovery import discover_files
+
     console.print("\n🔧 [bold blue]Refactron Auto-fix[/bold blue]\n")
 
     # Setup
     target_path = _validate_path(target)
-    _print_file_count(target_path)
-
-    # Map safety level
-    safety_map = {
-        "safe": FixRiskLevel.SAFE,
-        "low": FixRiskLevel.LOW,
-        "moderate": FixRiskLevel.MODERATE,
-        "high": FixRiskLevel.HIGH,
-    }
-    safety = safety_map[safety_level.lower()]
+    _print_file_count(target_path, discover_files(target_path, RefactronConfig.default()))
+
+    safety = SAFETY_LEVELS[safety_level.lower()]
 
     # Initialize auto-fix engine
     engine = AutoFixEngine(safety_level=safety)
@@ -402,6 +896,164 @@ def autofix(
     )
 
 
+@main.command()
+@click.argument("target", type=click.Path(exists=True))
+@click.option(
+    "--config",
+    "-c",
+    type=click.Path(exists=True),
+    help="Path to configuration file",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of worker processes for the first analysis (0 = one per CPU)",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse results cached by previous runs for unchanged files",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory for the analysis cache (default: ~/.refactron/cache)",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=WATCH_DEBOUNCE_SECONDS,
+    show_default=True,
+    help="Seconds without further changes before re-analyzing",
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0.05),
+    default=WATCH_POLL_INTERVAL,
+    show_default=True,
+    help="Seconds between checks for changes when polling",
+)
+@click.option(
+    "--poll",
+    is_flag=True,
+    help="Poll for changes even where inotify is available",
+)
+def watch(
+    target: str,
+    config: Optional[str],
+    jobs: int,
+    cache: bool,
+    cache_dir: Optional[str],
+    debounce: float,
+    interval: float,
+    poll: bool,
+) -> None:
+    """
+    Analyze code, then re-analyze changed files as they are saved.
+
+    Each update prints the issues found and resolved since the previous one.
+    Stop with Ctrl+C.
+
+    TARGET: Path to file or directory to watch
+    """
+    from refactron.core.refactron import Refactron
+    from refactron.core.watch import AnalysisWatcher
+
+    console.print("\n👀 [bold blue]Refactron Watch[/bold blue]\n")
+
+    target_path = _validate_path(target)
+    cfg = _load_config(config)
+    cfg.cache_enabled = cache
+    if cache_dir:
+        cfg.cache_dir = cache_dir
+
+    with AnalysisWatcher(
+        Refactron(cfg), target_path, debounce=debounce, interval=interval, use_inotify=not poll
+    ) as watcher:
+        with console.status("[bold green]🔎 Analyzing code...[/bold green]"):
+            result = watcher.start(workers=jobs)
+        console.print(_create_summary_table(result.summary()))
+        console.print(
+            f"\n[dim]👀 Watching {result.total_files} file(s) for changes "
+            f"({watcher.mode}); press Ctrl+C to stop[/dim]\n"
+        )
+        try:
+            while True:
+                update = watcher.wait()
+                if update is not None:
+                    _print_watch_update(update, watcher.result.total_issues)
+        except KeyboardInterrupt:
+            pass
+    console.print("[dim]Stopped watching[/dim]")
+
+
+@main.command()
+@click.option(
+    "--config",
+    "-c",
+    type=click.Path(exists=True),
+    help="Path to configuration file",
+)
+@click.option(
+    "--safety-level",
+    "-s",
+    type=click.Choice(list(SAFETY_LEVELS), case_sensitive=False),
+    default="low",
+    show_default=True,
+    help="Maximum risk level of the fixes offered as code actions",
+)
+def lsp(config: Optional[str], safety_level: str) -> None:
+    """
+    Run a Language Server Protocol server on stdin and stdout.
+
+    Editors start this command to show Refactron issues as diagnostics
+    and offer fixes and refactorings as code actions. Unsaved buffers are
+    analyzed in memory.
+    """
+    from refactron.core.lsp import LanguageServer
+
+    try:
+        cfg = RefactronConfig.from_file(Path(config)) if config else RefactronConfig.default()
+    except Exception as e:
+        click.echo(f"Error loading configuration: {e}", err=True)
+        raise SystemExit(1)
+
+    writer = sys.stdout.buffer
+    # Stdout carries the protocol; anything else printed goes to stderr
+    sys.stdout = sys.stderr
+    server = LanguageServer(sys.stdin.buffer, writer, cfg, SAFETY_LEVELS[safety_level.lower()])
+    raise SystemExit(server.serve())
+
+
+@main.command()
+@click.option(
+    "--config",
+    "-c",
+    type=click.Path(exists=True),
+    help="Path to configuration file",
+)
+def plugins(config: Optional[str]) -> None:
+    """
+    List the analyzers, refactorers and fixers that are available.
+
+    Built-in plugins are listed with those other packages register under the
+    refactron.analyzers, refactron.refactorers and refactron.fixers entry
+    points. Add a name to enabled_analyzers or enabled_refactorers in the
+    configuration to run it.
+    """
+    from refactron.core.registry import ANALYZERS, FIXERS, REFACTORERS
+
+    cfg = _load_config(config)
+    console.print(_create_plugin_table("Analyzers", ANALYZERS, cfg.enabled_analyzers))
+    console.print()
+    console.print(_create_plugin_table("Refactorers", REFACTORERS, cfg.enabled_refactorers))
+    console.print()
+    console.print(_create_plugin_table("Fixers", FIXERS))
+
+
 @main.command()
 def init() -> None:
     """Initialize Refactron configuration in the current directory."""
@@ -419,5 +1071,83 @@ def init() -> None:
     console.print("\n[dim]Edit this file to customize Refactron behavior.[/dim]")
 
 
+@main.group()
+def daemon() -> None:
+    """
+    Run a resident process that keeps Refactron warm between commands.
+
+    While it runs, analyze and refactor send their work to it instead of
+    starting from scratch (use --no-daemon to opt out). The socket is taken
+    from REFACTRON_DAEMON_SOCKET, or ~/.refactron/daemon.sock.
+    """
+    pass
+
+
+@daemon.command("start")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Unix socket to listen on",
+)
+def daemon_start(socket_path: Optional[str]) -> None:
+    """Start the daemon in the foreground; stop it with Ctrl+C or 'refactron daemon stop'."""
+    from refactron.core.daemon import DaemonError, default_socket_path, serve
+
+    path = Path(socket_path) if socket_path else default_socket_path()
+    console.print(f"\n⚡ [bold blue]Refactron daemon[/bold blue] listening on {path}\n")
+    try:
+        serve(path)
+    except DaemonError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        raise SystemExit(1)
+    except KeyboardInterrupt:
+        pass
+    console.print("[dim]Daemon stopped[/dim]")
+
+
+@daemon.command("stop")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Unix socket of the daemon",
+)
+def daemon_stop(socket_path: Optional[str]) -> None:
+    """Stop the running daemon."""
+    from refactron.core.daemon import DaemonClient
+
+    client = DaemonClient.connect(Path(socket_path) if socket_path else None, same_code=False)
+    if client is None:
+        console.print("[yellow]No daemon is running[/yellow]")
+        raise SystemExit(1)
+    client.shutdown()
+    console.print("[green]✅ Daemon stopped[/green]")
+
+
+@daemon.command("status")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Unix socket of the daemon",
+)
+def daemon_status(socket_path: Optional[str]) -> None:
+    """Show whether the daemon is running and what it keeps in memory."""
+    from refactron.core.daemon import DaemonClient
+
+    client = DaemonClient.connect(Path(socket_path) if socket_path else None, same_code=False)
+    if client is None:
+        console.print("[yellow]No daemon is running[/yellow]")
+        raise SystemExit(1)
+    status = client.ping()
+    console.print(
+        f"[green]⚡ Daemon running[/green] Refactron {status.get('refactron_version')} "
+        f"(pid {status['pid']}) on {client.socket_path}\n"
+        f"[dim]Up {status['uptime']:.0f}s, {status['requests']} request(s), "
+        f"{status['instances']} configuration(s), {status['modules']} module(s) in memory[/dim]"
+    )
+
+
 if __name__ == "__main__":
     main()
@@ -1,64 +1,402 @@
 """Analysis result representation."""
 
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List
+from typing import IO, Any, Dict, Iterable, List, Optional, SupportsIndex, Tuple
 
-from refactron.core.models import CodeIssue, FileMetrics, IssueLevel
+from refactron.core.models import CodeIssue, FileMetrics, IssueCategory, IssueLevel
+from refactron.core.profiling import AnalysisProfile
+
+
+def _summary_lines(summary: Dict[str, int]) -> List[str]:
+    """Format the summary block of a text report."""
+    return [
+        f"📊 Files Analyzed: {summary['total_files']}",
+        f"⚠️  Total Issues: {summary['total_issues']}",
+        "",
+        "Issues by Severity:",
+        f"  🔴 Critical: {summary['critical']}",
+        f"  ❌ Errors: {summary['errors']}",
+        f"  ⚡ Warnings: {summary['warnings']}",
+        f"  ℹ️  Info: {summary['info']}",
+        "",
+    ]
+
+
+def _issue_lines(issue: CodeIssue) -> List[str]:
+    """Format a single issue of a detailed text report."""
+    lines = [str(issue)]
+    if issue.suggestion:
+        lines.append(f"  💡 Suggestion: {issue.suggestion}")
+    lines.append("")
+    return lines
+
+
+@dataclass
+class AnalysisAggregate:
+    """
+    Running totals over per-file analysis results.
+
+    Only counters are kept, so memory stays constant however many files are
+    added. Used with :meth:`Refactron.iter_analyze` to summarize a streamed
+    analysis.
+
+    Example:
+        >>> aggregate = AnalysisAggregate()
+        >>> for metrics in refactron.iter_analyze("src", aggregate=aggregate):
+        ...     print(metrics.file_path, metrics.issue_count)
+        >>> aggregate.summary()["total_issues"]
+    """
+
+    total_files: int = 0
+    total_issues: int = 0
+    level_counts: Dict[IssueLevel, int] = field(
+        default_factory=lambda: {level: 0 for level in IssueLevel}
+    )
+    # Set to collect the timing figures of a profiled analysis
+    profile: Optional[AnalysisProfile] = None
+
+    def add(self, metrics: FileMetrics) -> None:
+        """Count the issues of one more file."""
+        self.total_files += 1
+        self.total_issues += len(metrics.issues)
+        for issue in metrics.issues:
+            self.level_counts[issue.level] += 1
+        if self.profile is not None and metrics.profile is not None:
+            self.profile.add(metrics.profile)
+
+    def summary(self) -> Dict[str, int]:
+        """Get a summary of the results added so far, as :meth:`AnalysisResult.summary`."""
+        return {
+            "total_files": self.total_files,
+            "total_issues": self.total_issues,
+            "critical": self.level_counts[IssueLevel.CRITICAL],
+            "errors": self.level_counts[IssueLevel.ERROR],
+            "warnings": self.level_counts[IssueLevel.WARNING],
+            "info": self.level_counts[IssueLevel.INFO],
+        }
+
+
+def write_report(
+    file_metrics: Iterable[FileMetrics],
+    out: IO[str],
+    detailed: bool = True,
+    aggregate: Optional[AnalysisAggregate] = None,
+) -> AnalysisAggregate:
+    """
+    Write a text report while the per-file results are still being produced.
+
+    Issues are written as soon as their file's results arrive, and the
+    summary, which needs every file, comes last. Memory use does not grow
+    with the number of files.
+
+    Args:
+        file_metrics: Per-file results, e.g. from :meth:`Refactron.iter_analyze`
+        out: Text stream to write to
+        detailed: Whether to list every issue
+        aggregate: Aggregate to update; a new one is created if omitted
+
+    Returns:
+        The aggregate holding the report totals
+    """
+    if aggregate is None:
+        aggregate = AnalysisAggregate()
+
+    out.write("\n".join(["=" * 80, "REFACTRON ANALYSIS REPORT", "=" * 80, ""]) + "\n")
+    if detailed:
+        out.write("\n".join(["-" * 80, "DETAILED ISSUES", "-" * 80, ""]) + "\n")
+
+    for metrics in file_metrics:
+        aggregate.add(metrics)
+        if detailed:
+            for issue in metrics.issues:
+                out.write("\n".join(_issue_lines(issue)) + "\n")
+        out.flush()
+
+    lines = ["-" * 80, "SUMMARY", "-" * 80, ""]
+    lines.extend(_summary_lines(aggregate.summary()))
+    lines.append("=" * 80)
+    out.write("\n".join(lines) + "\n")
+    return aggregate
+
+
+# Issues of one kind, by the number of the file_metrics entry they belong to
+_Groups = Dict[int, List[CodeIssue]]
+
+
+def _group(groups: _Groups, number: int) -> List[CodeIssue]:
+    """Return the issues of an entry in ``groups``, keeping the groups in entry order."""
+    issues = groups.get(number)
+    if issues is None:
+        # Only a replaced entry can come before the last one
+        out_of_order = bool(groups) and next(reversed(groups)) > number
+        issues = groups[number] = []
+        if out_of_order:
+            ordered = sorted(groups.items())
+            groups.clear()
+            groups.update(ordered)
+    return issues
+
+
+def _flatten(groups: _Groups) -> List[CodeIssue]:
+    return [issue for issues in groups.values() for issue in issues]
+
+
+class _FileMetricsList(List[FileMetrics]):
+    """List of file metrics that keeps its owner's indexes up to date."""
+
+    def __init__(self, owner: "AnalysisResult", items: Iterable[FileMetrics] = ()):
+        super().__init__(items)
+        self._owner = owner
+
+    def __reduce__(self) -> Tuple[type, Tuple[List[FileMetrics]]]:
+        # Unpickling would call append() before the owner is set; the owner
+        # wraps the plain list again when it is restored
+        return list, (list(self),)
+
+    def append(self, metrics: FileMetrics) -> None:
+        super().append(metrics)
+        self._owner._index_file(metrics)
+
+    def extend(self, items: Iterable[FileMetrics]) -> None:
+        for metrics in items:
+            self.append(metrics)
+
+    def __iadd__(  # type: ignore[override, misc]
+        self, items: Iterable[FileMetrics]
+    ) -> "_FileMetricsList":
+        self.extend(items)
+        return self
+
+    # Any other change may reorder or drop files; rebuild the indexes lazily
+    def insert(self, index: SupportsIndex, metrics: FileMetrics) -> None:
+        super().insert(index, metrics)
+        self._owner._invalidate()
+
+    def remove(self, metrics: FileMetrics) -> None:
+        super().remove(metrics)
+        self._owner._invalidate()
+
+    def pop(self, index: SupportsIndex = -1) -> FileMetrics:
+        metrics = super().pop(index)
+        self._owner._invalidate()
+        return metrics
+
+    def clear(self) -> None:
+        super().clear()
+        self._owner._invalidate()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        super().sort(*args, **kwargs)
+        self._owner._invalidate()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._owner._invalidate()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._owner._invalidate()
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._owner._invalidate()
 
 
 @dataclass
 class AnalysisResult:
-    """Result of code analysis."""
+    """
+    Result of code analysis.
+
+    Issues are indexed by file, level, category and rule ID as file metrics
+    are appended, so :meth:`summary` and the filters do not rescan every
+    issue; the filters return new lists, copied from the indexes. Append each
+    file's metrics once its issues are complete, and use :meth:`replace` and
+    :meth:`discard` to update single files later; if a ``FileMetrics.issues``
+    list is changed in place, call :meth:`reindex`.
+    """
 
     file_metrics: List[FileMetrics] = field(default_factory=list)
     total_files: int = 0
     total_issues: int = 0
+    # Timing figures, only set when the analysis runs with profiling enabled
+    profile: Optional[AnalysisProfile] = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "file_metrics":
+            value = _FileMetricsList(self, value)
+            object.__setattr__(self, name, value)
+            self._invalidate()
+            return
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The indexes are rebuilt on access rather than pickled
+        return {
+            "file_metrics": list(self.file_metrics),
+            "total_files": self.total_files,
+            "total_issues": self.total_issues,
+            "profile": self.profile,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _invalidate(self) -> None:
+        """Drop the indexes; they are rebuilt on next access."""
+        self._indexed = False
+
+    def _ensure_indexes(self) -> None:
+        if getattr(self, "_indexed", False):
+            return
+        # Each entry of file_metrics gets a number, growing in list order, so
+        # the issues of an entry replaced in place keep their position
+        self._numbers: List[int] = []
+        self._by_file: Dict[Path, Tuple[int, FileMetrics]] = {}
+        self._all: _Groups = {}
+        self._by_level: Dict[IssueLevel, _Groups] = {level: {} for level in IssueLevel}
+        self._by_category: Dict[IssueCategory, _Groups] = {}
+        self._by_rule: Dict[Optional[str], _Groups] = {}
+        self._level_counts: Dict[IssueLevel, int] = {level: 0 for level in IssueLevel}
+        self._indexed = True
+        for metrics in self.file_metrics:
+            self._index_entry(metrics)
+
+    def _index_file(self, metrics: FileMetrics) -> None:
+        """Add a newly appended file to the indexes."""
+        if getattr(self, "_indexed", False):
+            self._index_entry(metrics)
+
+    def _index_entry(self, metrics: FileMetrics) -> None:
+        number = self._numbers[-1] + 1 if self._numbers else 0
+        self._numbers.append(number)
+        # The first file with a given path wins, like a front-to-back scan
+        self._by_file.setdefault(metrics.file_path, (number, metrics))
+        self._add_to_indexes(number, metrics)
+
+    def _add_to_indexes(self, number: int, metrics: FileMetrics) -> None:
+        for issue in metrics.issues:
+            _group(self._all, number).append(issue)
+            _group(self._by_level[issue.level], number).append(issue)
+            _group(self._by_category.setdefault(issue.category, {}), number).append(issue)
+            _group(self._by_rule.setdefault(issue.rule_id, {}), number).append(issue)
+            self._level_counts[issue.level] += 1
+
+    def _remove_from_indexes(self, number: int, metrics: FileMetrics) -> None:
+        self._all.pop(number, None)
+        for issue in metrics.issues:
+            self._by_level[issue.level].pop(number, None)
+            self._by_category.get(issue.category, {}).pop(number, None)
+            self._by_rule.get(issue.rule_id, {}).pop(number, None)
+            self._level_counts[issue.level] -= 1
+
+    def reindex(self) -> None:
+        """Rebuild the indexes after file metrics were modified in place."""
+        self._invalidate()
+        self._ensure_indexes()
+
+    def replace(self, metrics: FileMetrics) -> FileMetrics:
+        """
+        Put new metrics of an analyzed file in place of its current ones.
+
+        Only the file's issues are re-indexed, and :attr:`total_issues` is
+        adjusted, so keeping a result up to date costs as much as the files
+        that changed.
+
+        Args:
+            metrics: New metrics; their ``file_path`` names the file to replace
+
+        Returns:
+            The metrics replaced
+
+        Raises:
+            KeyError: If the result has no metrics for the file
+        """
+        self._ensure_indexes()
+        number, old = self._by_file[metrics.file_path]
+        list.__setitem__(self.file_metrics, bisect_left(self._numbers, number), metrics)
+        self._by_file[metrics.file_path] = (number, metrics)
+        self._remove_from_indexes(number, old)
+        self._add_to_indexes(number, metrics)
+        self.total_issues += metrics.issue_count - old.issue_count
+        return old
+
+    def discard(self, file_path: Path) -> Optional[FileMetrics]:
+        """
+        Drop the metrics of a file, adjusting :attr:`total_files` and :attr:`total_issues`.
+
+        Args:
+            file_path: File to drop
+
+        Returns:
+            The metrics dropped, or None if the result has none for the file
+        """
+        self._ensure_indexes()
+        if file_path not in self._by_file:
+            return None
+        number, old = self._by_file.pop(file_path)
+        position = bisect_left(self._numbers, number)
+        list.__delitem__(self.file_metrics, position)
+        del self._numbers[position]
+        self._remove_from_indexes(number, old)
+        self.total_files -= 1
+        self.total_issues -= old.issue_count
+        return old
 
     @property
     def critical_issues(self) -> List[CodeIssue]:
         """Get all critical issues across all files."""
-        issues = []
-        for metrics in self.file_metrics:
-            issues.extend(metrics.critical_issues)
-        return issues
+        return self.issues_by_level(IssueLevel.CRITICAL)
 
     @property
     def error_issues(self) -> List[CodeIssue]:
         """Get all error-level issues across all files."""
-        issues = []
-        for metrics in self.file_metrics:
-            issues.extend(metrics.error_issues)
-        return issues
+        return self.issues_by_level(IssueLevel.ERROR)
 
     @property
     def all_issues(self) -> List[CodeIssue]:
         """Get all issues across all files."""
-        issues = []
-        for metrics in self.file_metrics:
-            issues.extend(metrics.issues)
-        return issues
+        self._ensure_indexes()
+        return _flatten(self._all)
 
     def issues_by_level(self, level: IssueLevel) -> List[CodeIssue]:
         """Get issues filtered by severity level."""
-        return [issue for issue in self.all_issues if issue.level == level]
+        self._ensure_indexes()
+        return _flatten(self._by_level[level])
+
+    def issues_by_category(self, category: IssueCategory) -> List[CodeIssue]:
+        """Get issues filtered by category."""
+        self._ensure_indexes()
+        return _flatten(self._by_category.get(category, {}))
+
+    def issues_by_rule(self, rule_id: Optional[str]) -> List[CodeIssue]:
+        """Get issues reported by a specific rule."""
+        self._ensure_indexes()
+        return _flatten(self._by_rule.get(rule_id, {}))
 
     def issues_by_file(self, file_path: Path) -> List[CodeIssue]:
         """Get issues for a specific file."""
-        for metrics in self.file_metrics:
-            if metrics.file_path == file_path:
-                return metrics.issues
-        return []
+        metrics = self.metrics_for_file(file_path)
+        return metrics.issues if metrics is not None else []
+
+    def metrics_for_file(self, file_path: Path) -> Optional[FileMetrics]:
+        """Get the metrics of a specific file, or None if it was not analyzed."""
+        self._ensure_indexes()
+        entry = self._by_file.get(file_path)
+        return entry[1] if entry is not None else None
 
     def summary(self) -> Dict[str, int]:
         """Get a summary of the analysis."""
+        self._ensure_indexes()
         return {
             "total_files": self.total_files,
             "total_issues": self.total_issues,
-            "critical": len(self.critical_issues),
-            "errors": len(self.error_issues),
-            "warnings": len(self.issues_by_level(IssueLevel.WARNING)),
-            "info": len(self.issues_by_level(IssueLevel.INFO)),
+            "critical": self._level_counts[IssueLevel.CRITICAL],
+            "errors": self._level_counts[IssueLevel.ERROR],
+            "warnings": self._level_counts[IssueLevel.WARNING],
+            "info": self._level_counts[IssueLevel.INFO],
         }
 
     def report(self, detailed: bool = True) -> str:
@@ -69,16 +407,7 @@ class AnalysisResult:
         lines.append("=" * 80)
         lines.append("")
 
-        summary = self.summary()
-        lines.append(f"📊 Files Analyzed: {summary['total_files']}")
-        lines.append(f"⚠️  Total Issues: {summary['total_issues']}")
-        lines.append("")
-        lines.append("Issues by Severity:")
-        lines.append(f"  🔴 Critical: {summary['critical']}")
-        lines.append(f"  ❌ Errors: {summary['errors']}")
-        lines.append(f"  ⚡ Warnings: {summary['warnings']}")
-        lines.append(f"  ℹ️  Info: {summary['info']}")
-        lines.append("")
+        lines.extend(_summary_lines(self.summary()))
 
         if detailed and self.all_issues:
             lines.append("-" * 80)
@@ -87,10 +416,7 @@ class AnalysisResult:
             lines.append("")
 
             for issue in self.all_issues:
-                lines.append(str(issue))
-                if issue.suggestion:
-                    lines.append(f"  💡 Suggestion: {issue.suggestion}")
-                lines.append("")
+                lines.extend(_issue_lines(issue))
 
         lines.append("=" * 80)
         return "\n".join(lines)
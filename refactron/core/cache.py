@@ -0,0 +1,293 @@
+"""Persistent content-addressed cache of per-file analysis results."""
+
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from refactron.core.config import RefactronConfig
+from refactron.core.models import CodeIssue, FileMetrics, IssueCategory, IssueLevel
+from refactron.core.module_resolver import layout_fingerprint
+
+if TYPE_CHECKING:
+    from refactron.analyzers.base_analyzer import BaseAnalyzer
+
+# Bump when the on-disk entry format or the meaning of its fields changes
+CACHE_FORMAT = 2
+
+# Config fields that only control the cache itself and cannot change results
+CACHE_CONFIG_FIELDS = ("cache_enabled", "cache_dir", "cache_max_size_mb")
+
+# Other config fields that cannot change the cached per-file results
+NEUTRAL_CONFIG_FIELDS = ("profiling_enabled", "project_dead_code")
+
+DEFAULT_CACHE_DIR = Path.home() / ".refactron" / "cache"
+
+
+def config_fingerprint(config: RefactronConfig) -> str:
+    """Hash every configuration field that can influence analysis results."""
+    values = dataclasses.asdict(config)
+    for name in CACHE_CONFIG_FIELDS + NEUTRAL_CONFIG_FIELDS:
+        values.pop(name, None)
+    encoded = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def analyzer_fingerprint(analyzers: Sequence["BaseAnalyzer"]) -> str:
+    """Hash the ordered set of analyzer classes, with the versions of third-party ones."""
+    from refactron.core.registry import ANALYZERS
+
+    names = []
+    for analyzer in analyzers:
+        name = f"{type(analyzer).__module__}.{type(analyzer).__qualname__}"
+        plugin = ANALYZERS.plugin_of(type(analyzer))
+        if plugin is not None and not plugin.builtin:
+            # Plugins keep their class names across releases
+            name += f" {plugin.distribution}=={plugin.version}"
+        names.append(name)
+    return hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()
+
+
+def issue_to_dict(issue: CodeIssue) -> Dict[str, Any]:
+    """Serialize an issue to a JSON-compatible dict, without its file path."""
+    return {
+        "category": issue.category.value,
+        "level": issue.level.value,
+        "message": issue.message,
+        "line_number": issue.line_number,
+        "column": issue.column,
+        "end_line": issue.end_line,
+        "code_snippet": issue.code_snippet,
+        "suggestion": issue.suggestion,
+        "rule_id": issue.rule_id,
+        "confidence": issue.confidence,
+        "metadata": issue.metadata,
+    }
+
+
+def issue_from_dict(data: Dict[str, Any], file_path: Path) -> CodeIssue:
+    """Rebuild an issue serialized by :func:`issue_to_dict`."""
+    values = dict(data)
+    values["category"] = IssueCategory(values["category"])
+    values["level"] = IssueLevel(values["level"])
+    return CodeIssue(file_path=file_path, **values)
+
+
+def metrics_to_dict(metrics: FileMetrics) -> Dict[str, Any]:
+    """Serialize file metrics and their issues to a JSON-compatible dict."""
+    return {
+        "lines_of_code": metrics.lines_of_code,
+        "comment_lines": metrics.comment_lines,
+        "blank_lines": metrics.blank_lines,
+        "complexity": metrics.complexity,
+        "maintainability_index": metrics.maintainability_index,
+        "functions": metrics.functions,
+        "classes": metrics.classes,
+        "issues": [issue_to_dict(issue) for issue in metrics.issues],
+    }
+
+
+def metrics_from_dict(data: Dict[str, Any], file_path: Path) -> FileMetrics:
+    """Rebuild file metrics serialized by :func:`metrics_to_dict`."""
+    values = dict(data)
+    issues = [issue_from_dict(issue, file_path) for issue in values.pop("issues")]
+    return FileMetrics(file_path=file_path, issues=issues, **values)
+
+
+class AnalysisCache:
+    """
+    On-disk cache of :class:`FileMetrics`, one JSON entry per analyzed file.
+
+    Entries are keyed by the file's content hash and path together with a
+    fingerprint of the analyzer set, the analysis configuration and the
+    Refactron version, so any change to one of them misses the cache. When
+    an analyzer depends on the project layout, keys also cover the
+    first-party module names of the file's project.
+
+    Entries are written atomically (temporary file plus rename), so several
+    processes can share a cache directory. Hits refresh an entry's mtime and
+    :meth:`prune` evicts the least recently used entries once the directory
+    grows past ``max_size_bytes``.
+
+    Example:
+        >>> cache = AnalysisCache(Path(".cache"), "fingerprint")
+        >>> key = cache.key_for(Path("a.py"), b"x = 1\\n")
+        >>> cache.get(key, Path("a.py")) is None
+        True
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        fingerprint: str,
+        max_size_bytes: int = 256 * 1024 * 1024,
+        project_layout: bool = False,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            fingerprint: Hash of everything besides file contents that affects results
+            max_size_bytes: Size the cache is pruned back to by :meth:`prune`
+            project_layout: Whether keys also cover the first-party module names
+        """
+        self.cache_dir = Path(cache_dir)
+        self.fingerprint = fingerprint
+        self.max_size_bytes = max_size_bytes
+        self.project_layout = project_layout
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._entries_dir = self.cache_dir / f"v{CACHE_FORMAT}"
+
+    @classmethod
+    def from_config(
+        cls, config: RefactronConfig, analyzers: Sequence["BaseAnalyzer"]
+    ) -> "AnalysisCache":
+        """Create the cache described by ``config`` for the given analyzers."""
+        from refactron import __version__
+
+        fingerprint = hashlib.sha256(
+            "\n".join(
+                [__version__, config_fingerprint(config), analyzer_fingerprint(analyzers)]
+            ).encode("utf-8")
+        ).hexdigest()
+        cache_dir = Path(config.cache_dir).expanduser() if config.cache_dir else DEFAULT_CACHE_DIR
+        return cls(
+            cache_dir,
+            fingerprint,
+            config.cache_max_size_mb * 1024 * 1024,
+            project_layout=any(getattr(a, "uses_project_layout", False) for a in analyzers),
+        )
+
+    def key_for(self, file_path: Path, data: bytes) -> str:
+        """Return the cache key for a file with the given raw contents."""
+        digest = hashlib.sha256()
+        digest.update(self.fingerprint.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(str(Path(file_path).resolve()).encode("utf-8"))
+        digest.update(b"\0")
+        if self.project_layout:
+            digest.update(layout_fingerprint(file_path).encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self._entries_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str, file_path: Path) -> Optional[FileMetrics]:
+        """
+        Look up cached metrics.
+
+        Args:
+            key: Key from :meth:`key_for`
+            file_path: Path to attach to the returned metrics and issues
+
+        Returns:
+            Cached metrics, or None on a miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            metrics = metrics_from_dict(data, file_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, TypeError, KeyError):
+            # Corrupt or incompatible entry: drop it and recompute
+            self._remove(entry_path)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        self.hits += 1
+        return metrics
+
+    def put(self, key: str, metrics: FileMetrics) -> None:
+        """Store metrics under ``key``; entries that cannot be serialized are skipped."""
+        try:
+            payload = json.dumps(metrics_to_dict(metrics))
+        except (TypeError, ValueError):
+            return
+
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp_name, entry_path)
+            except BaseException:
+                self._remove(Path(tmp_name))
+                raise
+        except OSError:
+            # The cache is an optimization; never fail an analysis because of it
+            return
+        self.writes += 1
+
+    def prune(self) -> int:
+        """
+        Evict least recently used entries until the cache fits its size bound.
+
+        Returns:
+            Number of entries removed
+        """
+        entries: List[Tuple[float, int, Path]] = []
+        total = 0
+
+        try:
+            buckets = list(os.scandir(self._entries_dir))
+        except OSError:
+            return 0
+
+        for bucket in buckets:
+            if not bucket.is_dir():
+                continue
+            try:
+                with os.scandir(bucket.path) as it:
+                    for entry in it:
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+                        total += stat.st_size
+            except OSError:
+                continue
+
+        removed = 0
+        if total <= self.max_size_bytes:
+            return removed
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size_bytes:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        for bucket in self._entries_dir.glob("*"):
+            for path in bucket.glob("*"):
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
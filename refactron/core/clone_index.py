@@ -0,0 +1,381 @@
+"""Project-wide index of code fingerprints for finding clones across files."""
+
+import ast
+import json
+import os
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from refactron.core.clones import StatementHashes, sized_windows, winnow
+from refactron.core.config import RefactronConfig
+from refactron.core.import_graph import absolute_path, write_json_atomically
+
+# Bump when the on-disk index format or the fingerprinting changes
+INDEX_FORMAT = 1
+
+# Smallest clone worth reporting, in AST nodes
+MIN_CLONE_NODES = 50
+# Winnowing window: clones spanning this many consecutive windows are always found
+WINNOW_WINDOW = 4
+
+
+@dataclass(frozen=True)
+class CloneLocation:
+    """Lines of one copy of a clone."""
+
+    file_path: Path
+    start_line: int
+    end_line: int
+
+    @property
+    def lines(self) -> int:
+        return self.end_line - self.start_line + 1
+
+
+@dataclass
+class CloneGroup:
+    """Places where the same normalized code appears, in file and line order."""
+
+    locations: List[CloneLocation] = field(default_factory=list)
+
+    @property
+    def duplicated_lines(self) -> int:
+        """Lines that could be removed by keeping a single copy."""
+        return sum(location.lines for location in self.locations[1:])
+
+
+@dataclass
+class ModuleFingerprints:
+    """The fingerprints selected for one file, with the lines each one covers."""
+
+    file_path: Path
+    mtime_ns: int
+    size: int
+    hashes: "array[int]" = field(default_factory=lambda: array("Q"))
+    # Start and end line of each fingerprint, interleaved
+    lines: "array[int]" = field(default_factory=lambda: array("L"))
+
+
+def scan_fingerprints(tree: ast.Module, entry: ModuleFingerprints) -> None:
+    """Fingerprint every statement sequence of a parsed module."""
+    statements = StatementHashes.build(tree)
+    for body in statements.bodies:
+        hashes = statements.sequence(body)
+        sizes = [statements.sizes[statement] for statement in body]
+        windows = sized_windows(hashes, sizes, MIN_CLONE_NODES)
+        for index in winnow([window[0] for window in windows], WINNOW_WINDOW):
+            value, start, end = windows[index]
+            entry.hashes.append(value)
+            entry.lines.append(body[start].lineno)
+            entry.lines.append(getattr(body[end - 1], "end_lineno", None) or body[end - 1].lineno)
+
+
+def _scan_file(file_path: Path) -> Optional[ModuleFingerprints]:
+    """Read and fingerprint one file; None if it cannot be read."""
+    try:
+        stat = file_path.stat()
+        data = file_path.read_bytes()
+    except OSError:
+        return None
+
+    entry = ModuleFingerprints(file_path, stat.st_mtime_ns, stat.st_size)
+    try:
+        tree = ast.parse(data)
+    except (SyntaxError, ValueError):
+        return entry
+    scan_fingerprints(tree, entry)
+    return entry
+
+
+def index_chunk(files: List[Path]) -> List[Optional[ModuleFingerprints]]:
+    """Fingerprint a chunk of files inside a worker process."""
+    return [_scan_file(file_path) for file_path in files]
+
+
+class CloneIndex:
+    """
+    Fingerprints of normalized code across a project, for finding clones.
+
+    Every sequence of statements is cut into windows of consecutive
+    statements just large enough to reach :data:`MIN_CLONE_NODES` AST
+    nodes, hashed with a rolling hash over the normalized statement hashes,
+    and thinned out by winnowing. An inverted index from fingerprint to
+    locations then finds the code that appears more than once without
+    comparing files pairwise. Names read and constants are normalized away,
+    so renamed copies are found too.
+
+    Like :class:`ReferenceIndex`, the index can be saved and loaded again,
+    and :meth:`update` rescans only files whose size or modification time
+    changed.
+
+    Example:
+        >>> index = CloneIndex.build(Path("src"), files)
+        >>> for group in index.clone_groups():
+        ...     print([str(location.file_path) for location in group.locations])
+    """
+
+    def __init__(self, root: Path):
+        """
+        Initialize an empty index.
+
+        Args:
+            root: Directory the project files are under
+        """
+        self.root = Path(root).resolve()
+        self.files: Dict[Path, ModuleFingerprints] = {}
+        # Files parsed by the last build or update
+        self.scanned = 0
+        self._postings: Optional[Dict[int, List[CloneLocation]]] = None
+
+    @classmethod
+    def build(
+        cls,
+        root: Path,
+        files: Sequence[Path],
+        workers: int = 1,
+        config: Optional[RefactronConfig] = None,
+    ) -> "CloneIndex":
+        """
+        Fingerprint every file and build the index.
+
+        Args:
+            root: Directory the project files are under
+            files: Python files of the project
+            workers: Number of processes to scan with
+            config: Configuration for the worker processes
+
+        Returns:
+            The built index
+        """
+        index = cls(root)
+        index._scan([absolute_path(path) for path in files], workers, config)
+        return index
+
+    def _aggregate(self) -> Dict[int, List[CloneLocation]]:
+        """Map each fingerprint seen more than once to its locations, once after each change."""
+        if self._postings is None:
+            first: Dict[int, CloneLocation] = {}
+            postings: Dict[int, List[CloneLocation]] = {}
+            for entry in self.files.values():
+                lines = entry.lines
+                for position, value in enumerate(entry.hashes):
+                    location = CloneLocation(
+                        entry.file_path, lines[2 * position], lines[2 * position + 1]
+                    )
+                    seen = first.setdefault(value, location)
+                    if seen is not location:
+                        postings.setdefault(value, [seen]).append(location)
+            self._postings = postings
+        return self._postings
+
+    def clone_groups(self) -> List[CloneGroup]:
+        """
+        Return the groups of code that appears more than once in the project.
+
+        Overlapping matches between the same files are merged into a single
+        group covering all their lines.
+
+        Returns:
+            Clone groups, those with the most duplicated lines first
+        """
+        candidates = []
+        for locations in self._aggregate().values():
+            distinct = _without_overlaps(locations)
+            if len(distinct) > 1:
+                candidates.append(distinct)
+
+        # Matches between the same files in the same order sort next to each other
+        candidates.sort(
+            key=lambda group: (
+                [str(location.file_path) for location in group],
+                [location.start_line for location in group],
+            )
+        )
+        groups: List[List[CloneLocation]] = []
+        for locations in candidates:
+            previous = groups[-1] if groups else None
+            if previous is not None and _overlap(previous, locations):
+                groups[-1] = [
+                    CloneLocation(
+                        old.file_path,
+                        min(old.start_line, new.start_line),
+                        max(old.end_line, new.end_line),
+                    )
+                    for old, new in zip(previous, locations)
+                ]
+            else:
+                groups.append(locations)
+
+        result = [CloneGroup(locations) for locations in groups]
+        result.sort(key=lambda group: -group.duplicated_lines)
+        return result
+
+    def locations(self, file_path: Path) -> List[CloneLocation]:
+        """Return the fingerprinted regions of a file."""
+        entry = self.files.get(absolute_path(file_path))
+        if entry is None:
+            return []
+        lines = entry.lines
+        return [
+            CloneLocation(entry.file_path, lines[2 * position], lines[2 * position + 1])
+            for position in range(len(entry.hashes))
+        ]
+
+    # Updates
+
+    def update(
+        self,
+        files: Sequence[Path],
+        workers: int = 1,
+        config: Optional[RefactronConfig] = None,
+    ) -> bool:
+        """
+        Bring the index in line with the current project files.
+
+        Files whose size and modification time are unchanged are not read.
+
+        Returns:
+            True if anything changed
+        """
+        current = [absolute_path(path) for path in files]
+        wanted = set(current)
+        stale = []
+        for file_path in current:
+            entry = self.files.get(file_path)
+            if entry is None:
+                stale.append(file_path)
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            if stat.st_mtime_ns != entry.mtime_ns or stat.st_size != entry.size:
+                stale.append(file_path)
+        removed = [path for path in self.files if path not in wanted]
+        return self.update_files(stale, workers, config, removed=removed)
+
+    def update_files(
+        self,
+        changed: Iterable[Path],
+        workers: int = 1,
+        config: Optional[RefactronConfig] = None,
+        removed: Iterable[Path] = (),
+    ) -> bool:
+        """
+        Rescan specific files; files that no longer exist, and ``removed``, are dropped.
+
+        Returns:
+            True if anything changed
+        """
+        changed_paths = {absolute_path(path) for path in changed}
+        dropped = {absolute_path(path) for path in removed}
+        rescan = {path for path in changed_paths - dropped if path.is_file()}
+        gone = {path for path in (changed_paths | dropped) - rescan if path in self.files}
+        if not rescan and not gone:
+            self.scanned = 0
+            return False
+
+        for path in gone:
+            del self.files[path]
+        self._scan(sorted(rescan), workers, config)
+        return True
+
+    def _scan(self, files: Sequence[Path], workers: int, config: Optional[RefactronConfig]) -> None:
+        if workers > 1 and len(files) > 1:
+            from refactron.core.parallel import map_files
+
+            results: Iterable[Optional[ModuleFingerprints]] = map_files(
+                index_chunk, files, config or RefactronConfig.default(), workers
+            )
+        else:
+            results = index_chunk(list(files))
+
+        self.scanned = 0
+        for entry in results:
+            if entry is not None:
+                self.files[entry.file_path] = entry
+                self.scanned += 1
+        self._postings = None
+
+    # Persistence
+
+    def save(self, path: Path) -> None:
+        """Write the index to ``path`` atomically."""
+        payload = {
+            "format": INDEX_FORMAT,
+            "root": str(self.root),
+            "min_nodes": MIN_CLONE_NODES,
+            "window": WINNOW_WINDOW,
+            "modules": [
+                {
+                    "path": str(entry.file_path),
+                    "mtime_ns": entry.mtime_ns,
+                    "size": entry.size,
+                    "hashes": entry.hashes.tolist(),
+                    "lines": entry.lines.tolist(),
+                }
+                for entry in self.files.values()
+            ],
+        }
+        write_json_atomically(Path(path), payload)
+
+    @classmethod
+    def load(cls, path: Path, root: Path) -> Optional["CloneIndex"]:
+        """
+        Read an index written by :meth:`save`.
+
+        Returns:
+            The index, or None if the file is missing, unreadable, in an older
+            format, fingerprinted with other settings or built for another root
+        """
+        index = cls(root)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            settings = (data.get("format"), data.get("min_nodes"), data.get("window"))
+            if settings != (INDEX_FORMAT, MIN_CLONE_NODES, WINNOW_WINDOW):
+                return None
+            if data.get("root") != str(index.root):
+                return None
+            for item in data["modules"]:
+                file_path = Path(item["path"])
+                index.files[file_path] = ModuleFingerprints(
+                    file_path,
+                    item["mtime_ns"],
+                    item["size"],
+                    array("Q", item["hashes"]),
+                    array("L", item["lines"]),
+                )
+        except (OSError, ValueError, TypeError, KeyError, AttributeError, OverflowError):
+            return None
+        return index
+
+
+def _without_overlaps(locations: List[CloneLocation]) -> List[CloneLocation]:
+    """Sort locations, dropping those that overlap an earlier one in the same file."""
+    result: List[CloneLocation] = []
+    ends: Dict[Path, int] = {}
+    for location in sorted(locations, key=_location_key):
+        if location.start_line <= ends.get(location.file_path, 0):
+            continue
+        ends[location.file_path] = location.end_line
+        result.append(location)
+    return result
+
+
+def _location_key(location: CloneLocation) -> Tuple[str, int, int]:
+    return (str(location.file_path), location.start_line, location.end_line)
+
+
+def _overlap(first: List[CloneLocation], second: List[CloneLocation]) -> bool:
+    """Whether two groups are matches between the same files that overlap in each of them."""
+    if len(first) != len(second):
+        return False
+    return all(
+        old.file_path == new.file_path
+        and new.start_line <= old.end_line
+        and old.start_line <= new.end_line
+        for old, new in zip(first, second)
+    )
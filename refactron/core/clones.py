@@ -0,0 +1,243 @@
+"""Normalized statement hashes for finding repeated and cloned code."""
+
+import ast
+import zlib
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Sequence, Tuple
+
+# Hashes are kept to 64 bits so they stay identical across processes and runs
+HASH_MASK = (1 << 64) - 1
+_MULTIPLIER = 1099511628211
+
+# Base of the polynomial rolling hash over windows of statement hashes
+WINDOW_BASE = 1000003
+
+# Structural markers mixed into the hashes
+_LIST = zlib.crc32(b"<list>")
+_NONE = zlib.crc32(b"<none>")
+# Constants and the names read by an expression are normalized away
+_CONSTANT = zlib.crc32(b"<const>")
+_VARIABLE = zlib.crc32(b"<var>")
+
+
+def _mix(value: int, item: int) -> int:
+    return ((value ^ item) * _MULTIPLIER) & HASH_MASK
+
+
+class StatementHashes:
+    """
+    Normalized hash and size of every statement in a module.
+
+    Two statements hash alike when they have the same structure once
+    constants and the names they read are normalized away; names that are
+    assigned to, attributes and function names are kept. Hashes are computed
+    bottom-up in a single pass, so each node is visited once however deeply
+    statements nest, and are stable across processes.
+
+    Example:
+        >>> hashes = StatementHashes.build(ast.parse("x = a + 1\\nx = b + 2\\n"))
+        >>> first, second = hashes.tree.body
+        >>> hashes.hashes[first] == hashes.hashes[second]
+        True
+    """
+
+    def __init__(self, tree: ast.Module):
+        self.tree = tree
+        self.hashes: Dict[ast.stmt, int] = {}
+        # Number of AST nodes under each statement, itself included
+        self.sizes: Dict[ast.stmt, int] = {}
+        # Every list of statements: module, class, function and block bodies
+        self.bodies: List[List[ast.stmt]] = []
+
+    @classmethod
+    def build(cls, tree: ast.Module) -> "StatementHashes":
+        """Hash every statement of ``tree``."""
+        result = cls(tree)
+        tokens: Dict[str, int] = {}
+        node_hashes: Dict[ast.AST, int] = {}
+        node_sizes: Dict[ast.AST, int] = {}
+
+        def token(text: str) -> int:
+            value = tokens.get(text)
+            if value is None:
+                value = tokens[text] = zlib.crc32(text.encode("utf-8", "surrogatepass"))
+            return value
+
+        # Iterative post-order: a node is hashed once all its children are
+        stack: List[Tuple[ast.AST, bool]] = [(tree, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                for name in node._fields:
+                    field = getattr(node, name, None)
+                    if isinstance(field, ast.AST):
+                        stack.append((field, False))
+                    elif isinstance(field, list):
+                        stack.extend((item, False) for item in field if isinstance(item, ast.AST))
+                continue
+
+            value = token(type(node).__name__)
+            size = 1
+            normalize_id = isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Store)
+            for name in node._fields:
+                field = getattr(node, name, None)
+                if isinstance(field, ast.AST):
+                    value = _mix(value, node_hashes[field])
+                    size += node_sizes[field]
+                elif isinstance(field, list):
+                    value = _mix(value, _LIST + len(field))
+                    for item in field:
+                        if isinstance(item, ast.AST):
+                            value = _mix(value, node_hashes[item])
+                            size += node_sizes[item]
+                        else:
+                            value = _mix(value, _NONE if item is None else token(repr(item)))
+                    if field and isinstance(field[0], ast.stmt):
+                        result.bodies.append(field)
+                elif isinstance(node, ast.Constant):
+                    if name == "value":
+                        value = _mix(value, _CONSTANT)
+                elif normalize_id and name == "id":
+                    value = _mix(value, _VARIABLE)
+                else:
+                    value = _mix(value, _NONE if field is None else token(repr(field)))
+
+            node_hashes[node] = value
+            node_sizes[node] = size
+            if isinstance(node, ast.stmt):
+                result.hashes[node] = value
+                result.sizes[node] = size
+
+        return result
+
+    def sequence(self, statements: Iterable[ast.stmt]) -> List[int]:
+        """Return the hashes of a sequence of statements."""
+        hashes = self.hashes
+        return [hashes[statement] for statement in statements]
+
+    def combined(self, statements: Iterable[ast.stmt]) -> int:
+        """Return one hash for a whole sequence of statements."""
+        value = _LIST
+        for statement in statements:
+            value = _mix(value, self.hashes[statement])
+        return value
+
+    def size(self, statements: Iterable[ast.stmt]) -> int:
+        """Return the number of AST nodes in a sequence of statements."""
+        return sum(self.sizes[statement] for statement in statements)
+
+
+def window_hashes(hashes: Sequence[int], width: int) -> List[int]:
+    """
+    Return the rolling hash of every window of ``width`` consecutive hashes.
+
+    Each window is derived from the previous one in constant time, so the
+    cost is linear in the length of ``hashes`` whatever the width.
+    """
+    if width <= 0 or len(hashes) < width:
+        return []
+    top = pow(WINDOW_BASE, width - 1, 1 << 64)
+    value = 0
+    for item in hashes[:width]:
+        value = (value * WINDOW_BASE + item) & HASH_MASK
+    windows = [value]
+    for index in range(width, len(hashes)):
+        value = (value - hashes[index - width] * top) & HASH_MASK
+        value = (value * WINDOW_BASE + hashes[index]) & HASH_MASK
+        windows.append(value)
+    return windows
+
+
+def repeated_windows(hashes: Sequence[int], width: int) -> List[List[int]]:
+    """
+    Group the start indexes of windows of ``width`` hashes that are equal.
+
+    Windows with the same rolling hash are compared item by item, so
+    collisions of the rolling hash never group different windows.
+
+    Returns:
+        Start indexes of each group with more than one window, in order of
+        the group's first window
+    """
+    buckets: Dict[int, List[List[int]]] = {}
+    order: List[List[int]] = []
+    for start, value in enumerate(window_hashes(hashes, width)):
+        groups = buckets.setdefault(value, [])
+        for group in groups:
+            first = group[0]
+            if hashes[first : first + width] == hashes[start : start + width]:
+                group.append(start)
+                break
+        else:
+            group = [start]
+            groups.append(group)
+            order.append(group)
+    return [group for group in order if len(group) > 1]
+
+
+def sized_windows(
+    hashes: Sequence[int], sizes: Sequence[int], min_size: int
+) -> List[Tuple[int, int, int]]:
+    """
+    Return the shortest windows of consecutive hashes reaching ``min_size``.
+
+    For every start index, the window grows until the sizes it covers add up
+    to at least ``min_size``. Window hashes come from prefix hashes of the
+    same polynomial as :func:`window_hashes`, so the whole pass is linear
+    even though windows differ in width.
+
+    Returns:
+        ``(hash, start, end)`` of each window, ``end`` being exclusive
+    """
+    count = len(hashes)
+    prefix = [0] * (count + 1)
+    powers = [1] * (count + 1)
+    for index, item in enumerate(hashes):
+        prefix[index + 1] = (prefix[index] * WINDOW_BASE + item) & HASH_MASK
+        powers[index + 1] = (powers[index] * WINDOW_BASE) & HASH_MASK
+
+    windows = []
+    end = 0
+    covered = 0
+    for start in range(count):
+        while end < count and covered < min_size:
+            covered += sizes[end]
+            end += 1
+        if covered < min_size:
+            break
+        value = (prefix[end] - prefix[start] * powers[end - start]) & HASH_MASK
+        windows.append((value, start, end))
+        covered -= sizes[start]
+    return windows
+
+
+def winnow(values: Sequence[int], window: int) -> List[int]:
+    """
+    Select fingerprints from a sequence of hashes by winnowing.
+
+    The rightmost minimum of every ``window`` consecutive values is selected,
+    so two sequences sharing a run of at least ``window`` values always share
+    a selected value, while only about ``2 / (window + 1)`` of the values are
+    kept. Sequences shorter than ``window`` keep their minimum.
+
+    Returns:
+        Indexes of the selected values, in increasing order
+    """
+    if not values:
+        return []
+    if len(values) <= window:
+        lowest = min(values)
+        return [len(values) - 1 - values[::-1].index(lowest)]
+
+    selected: List[int] = []
+    candidates: Deque[int] = deque()
+    for index, value in enumerate(values):
+        while candidates and values[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(index)
+        if candidates[0] <= index - window:
+            candidates.popleft()
+        if index >= window - 1 and (not selected or selected[-1] != candidates[0]):
+            selected.append(candidates[0])
+    return selected
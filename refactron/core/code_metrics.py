@@ -0,0 +1,334 @@
+"""Cyclomatic complexity, Halstead and maintainability metrics from one traversal."""
+
+import ast
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Set, Tuple
+
+from radon.metrics import mi_compute
+
+if TYPE_CHECKING:
+    from refactron.core.parsed_module import ParsedModule
+
+# Block kinds
+FUNCTION = "function"
+METHOD = "method"
+CLASS = "class"
+
+# Nodes whose operator and operands Halstead counts
+_HALSTEAD_NODES = (ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.AugAssign, ast.Compare)
+
+
+@dataclass
+class Block:
+    """
+    A function, method or class with its cyclomatic complexity.
+
+    For classes, ``complexity`` is radon's class complexity (the average
+    complexity of the methods, plus one when there are several) and
+    ``real_complexity`` the total over the class body.
+    """
+
+    name: str
+    kind: str
+    lineno: int
+    col_offset: int
+    complexity: int
+    classname: Optional[str] = None
+    real_complexity: int = 0
+    # Functions defined inside a function, which radon does not list as blocks
+    closures: List["Block"] = field(default_factory=list)
+    # Methods of a class
+    methods: List["Block"] = field(default_factory=list)
+
+    @property
+    def fullname(self) -> str:
+        """``Class.method`` for methods, the plain name otherwise."""
+        return f"{self.classname}.{self.name}" if self.classname else self.name
+
+
+@dataclass
+class Halstead:
+    """Operator and operand counts, and the Halstead measures derived from them."""
+
+    distinct_operators: int = 0
+    distinct_operands: int = 0
+    operators: int = 0
+    operands: int = 0
+
+    @property
+    def vocabulary(self) -> int:
+        return self.distinct_operators + self.distinct_operands
+
+    @property
+    def length(self) -> int:
+        return self.operators + self.operands
+
+    @property
+    def volume(self) -> float:
+        vocabulary = self.vocabulary
+        return self.length * math.log(vocabulary, 2) if vocabulary != 0 else 0
+
+    @property
+    def difficulty(self) -> float:
+        if self.distinct_operands == 0:
+            return 0
+        return (self.distinct_operators * self.operands) / float(2 * self.distinct_operands)
+
+    @property
+    def effort(self) -> float:
+        return self.difficulty * self.volume
+
+
+@dataclass
+class CodeMetrics:
+    """Complexity figures of one module."""
+
+    # Functions, then each class followed by its methods, as radon lists them
+    blocks: List[Block] = field(default_factory=list)
+    # Complexity of the whole module, the input to the maintainability index
+    total_complexity: int = 0
+    halstead: Halstead = field(default_factory=Halstead)
+    # Every function/method and class definition, nested ones included
+    functions: int = 0
+    classes: int = 0
+    # Only set by measure_module, which also counts the lines
+    maintainability_index: Optional[float] = None
+
+    @property
+    def average_complexity(self) -> float:
+        """Mean complexity of the blocks; 0.0 for a module without any."""
+        if not self.blocks:
+            return 0.0
+        return sum(block.complexity for block in self.blocks) / len(self.blocks)
+
+
+class _Frame:
+    """Complexity collected by one of radon's nested ``ComplexityVisitor`` instances."""
+
+    __slots__ = ("complexity", "functions", "classes", "classname")
+
+    def __init__(self, complexity: int, classname: Optional[str] = None):
+        self.complexity = complexity
+        self.functions: List[Block] = []
+        self.classes: List[Block] = []
+        self.classname = classname
+
+    @property
+    def functions_complexity(self) -> int:
+        return sum(block.complexity for block in self.functions) - len(self.functions)
+
+    @property
+    def classes_complexity(self) -> int:
+        return sum(block.real_complexity for block in self.classes) - len(self.classes)
+
+
+class _Walker:
+    """
+    Computes radon's complexity and Halstead figures in a single traversal.
+
+    Complexity follows ``radon.visitors.ComplexityVisitor`` and Halstead
+    ``radon.visitors.HalsteadVisitor``, including where they look at
+    different parts of the tree: class bases, keywords and decorators and
+    the contents of ``assert`` statements count for Halstead only.
+    """
+
+    def __init__(self) -> None:
+        self.operators = 0
+        self.operands = 0
+        self.operators_seen: Set[str] = set()
+        self.operands_seen: Set[Tuple[Optional[str], Any]] = set()
+        self.functions = 0
+        self.classes = 0
+
+    def walk(self, node: ast.AST, frame: Optional[_Frame], context: Optional[str]) -> None:
+        """Visit ``node`` and its children; complexity goes to ``frame`` unless it is None."""
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            self._function(node, frame, context)
+            return
+        if isinstance(node, ast.ClassDef):
+            self._class(node, frame, context)
+            return
+        if isinstance(node, _HALSTEAD_NODES):
+            self._count_halstead(node, context)
+
+        if frame is not None:
+            if isinstance(node, ast.Assert):
+                frame.complexity += 1
+                frame = None  # radon does not look inside assert statements
+            else:
+                frame.complexity += _decision_points(node)
+
+        for child in ast.iter_child_nodes(node):
+            self.walk(child, frame, context)
+
+    def _function(self, node: ast.AST, frame: Optional[_Frame], context: Optional[str]) -> None:
+        self.functions += 1
+        name = node.name  # type: ignore[attr-defined]
+        complexity = 1
+        closures: List[Block] = []
+        for child in node.body:  # type: ignore[attr-defined]
+            child_frame = _Frame(0)
+            self.walk(child, child_frame, name)
+            closures.extend(child_frame.functions)
+            complexity += child_frame.complexity
+
+        if frame is not None:
+            classname = frame.classname
+            frame.functions.append(
+                Block(
+                    name,
+                    METHOD if classname else FUNCTION,
+                    node.lineno,  # type: ignore[attr-defined]
+                    node.col_offset,  # type: ignore[attr-defined]
+                    complexity,
+                    classname,
+                    closures=closures,
+                )
+            )
+
+    def _class(self, node: ast.ClassDef, frame: Optional[_Frame], context: Optional[str]) -> None:
+        self.classes += 1
+        outside: List[ast.AST] = [*node.bases, *node.keywords, *node.decorator_list]
+        for part in outside:
+            self.walk(part, None, context)
+
+        methods: List[Block] = []
+        real_complexity = 1
+        for child in node.body:
+            child_frame = _Frame(0, node.name)
+            self.walk(child, child_frame, context)
+            methods.extend(child_frame.functions)
+            real_complexity += (
+                child_frame.complexity
+                + child_frame.functions_complexity
+                + len(child_frame.functions)
+            )
+
+        if frame is not None:
+            if methods:
+                count = len(methods)
+                complexity = int(real_complexity / float(count)) + (count > 1)
+            else:
+                complexity = real_complexity
+            frame.classes.append(
+                Block(
+                    node.name,
+                    CLASS,
+                    node.lineno,
+                    node.col_offset,
+                    complexity,
+                    real_complexity=real_complexity,
+                    methods=methods,
+                )
+            )
+
+    def _count_halstead(self, node: ast.AST, context: Optional[str]) -> None:
+        operands: Sequence[ast.AST]
+        if isinstance(node, ast.Compare):
+            self.operators += len(node.ops)
+            self.operands += len(node.comparators) + 1
+            self.operators_seen.update(type(op).__name__ for op in node.ops)
+            operands = node.comparators + [node.left]
+        else:
+            if isinstance(node, ast.BinOp):
+                operands = [node.left, node.right]
+            elif isinstance(node, ast.UnaryOp):
+                operands = [node.operand]
+            elif isinstance(node, ast.BoolOp):
+                operands = node.values
+            else:
+                operands = [node.target, node.value]  # type: ignore[attr-defined]
+            self.operators += 1
+            self.operands += len(operands)
+            self.operators_seen.add(type(node.op).__name__)  # type: ignore[attr-defined]
+
+        for operand in operands:
+            self.operands_seen.add((context, _operand_key(operand)))
+
+
+def _decision_points(node: ast.AST) -> int:
+    """Complexity radon adds for a single node, not counting its children."""
+    if isinstance(node, ast.Try):
+        return len(node.handlers) + bool(node.orelse)
+    if isinstance(node, ast.BoolOp):
+        return len(node.values) - 1
+    if isinstance(node, (ast.If, ast.IfExp)):
+        return 1
+    if isinstance(node, (ast.For, ast.While, ast.AsyncFor)):
+        return bool(node.orelse) + 1
+    if isinstance(node, ast.comprehension):
+        return len(node.ifs) + 1
+    if type(node).__name__ == "Match":
+        cases = node.cases  # type: ignore[attr-defined]
+        # A bare capture pattern ("case _:") is the else branch
+        catch_all = any(getattr(case.pattern, "pattern", False) is None for case in cases)
+        return max(0, len(cases) - catch_all)
+    return 0
+
+
+def _operand_key(operand: ast.AST) -> Any:
+    """What makes two operands the same for Halstead: names, attributes and constants."""
+    if isinstance(operand, ast.Name):
+        return operand.id
+    if isinstance(operand, ast.Attribute):
+        return operand.attr
+    if isinstance(operand, ast.Constant):
+        return operand.value
+    return operand
+
+
+def measure(tree: ast.Module) -> CodeMetrics:
+    """
+    Compute the complexity blocks and Halstead counts of a parsed module.
+
+    The figures match ``radon.visitors.ComplexityVisitor.from_ast(tree)``
+    and ``radon.metrics.h_visit_ast(tree).total``, but the tree is walked
+    only once.
+
+    Args:
+        tree: Parsed module
+
+    Returns:
+        Metrics without the maintainability index, which also needs line counts
+    """
+    walker = _Walker()
+    frame = _Frame(1)
+    walker.walk(tree, frame, None)
+
+    blocks = list(frame.functions)
+    for block in frame.classes:
+        blocks.append(block)
+        blocks.extend(block.methods)
+
+    return CodeMetrics(
+        blocks=blocks,
+        total_complexity=frame.complexity + frame.functions_complexity + frame.classes_complexity,
+        halstead=Halstead(
+            len(walker.operators_seen),
+            len(walker.operands_seen),
+            walker.operators,
+            walker.operands,
+        ),
+        functions=walker.functions,
+        classes=walker.classes,
+    )
+
+
+def measure_module(module: "ParsedModule") -> CodeMetrics:
+    """
+    Compute all metrics of a module, including radon's multi-line maintainability index.
+
+    The index equals ``radon.metrics.mi_visit(source, multi=True)``.
+
+    Raises:
+        SyntaxError: If the source cannot be parsed
+    """
+    metrics = measure(module.tree)
+    raw = module.line_counts
+    comments = raw.comments + raw.multi
+    comment_percent = comments / float(raw.sloc) * 100 if raw.sloc != 0 else 0
+    metrics.maintainability_index = float(
+        mi_compute(metrics.halstead.volume, metrics.total_complexity, raw.lloc, comment_percent)
+    )
+    return metrics
@@ -2,9 +2,13 @@
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-import yaml
+# Watch mode: seconds between two snapshots of the tree when inotify is not
+# available, and seconds without further changes before a burst of saves is
+# analyzed. Kept here so the CLI can show them without importing watch mode
+WATCH_POLL_INTERVAL = 1.0
+WATCH_DEBOUNCE_SECONDS = 0.2
 
 
 @dataclass
@@ -49,7 +53,7 @@ class RefactronConfig:
     require_preview: bool = True
     backup_enabled: bool = True
 
-    # File patterns
+    # File patterns, matched gitignore-style against paths relative to the target
     include_patterns: List[str] = field(default_factory=lambda: ["*.py"])
     exclude_patterns: List[str] = field(
         default_factory=lambda: [
@@ -60,6 +64,7 @@ class RefactronConfig:
             "**/.git/**",
         ]
     )
+    respect_gitignore: bool = True
 
     # Custom rules
     custom_rules: Dict[str, Any] = field(default_factory=dict)
@@ -75,11 +80,26 @@ class RefactronConfig:
     security_rule_whitelist: Dict[str, List[str]] = field(default_factory=dict)
     security_min_confidence: float = 0.5  # Minimum confidence to report issues
 
+    # Analysis cache settings
+    cache_enabled: bool = False
+    cache_dir: Optional[str] = None  # None = ~/.refactron/cache
+    cache_max_size_mb: int = 256
+
+    # Profiling: record per-analyzer, per-rule and per-file timings
+    profiling_enabled: bool = False
+
+    # Judge module-level functions and classes by references across the whole project.
+    # None turns it on when the cache is enabled, whose saved reference index lets
+    # results be reported before every file is analyzed
+    project_dead_code: Optional[bool] = None
+
     @classmethod
     def from_file(cls, config_path: Path) -> "RefactronConfig":
         """Load configuration from a YAML file."""
         if not config_path.exists():
             return cls()
+        # Imported here: most runs use the default configuration and never need YAML
+        import yaml
 
         with open(config_path, "r") as f:
             config_dict = yaml.safe_load(f) or {}
@@ -101,11 +121,18 @@ class RefactronConfig:
             "backup_enabled": self.backup_enabled,
             "include_patterns": self.include_patterns,
             "exclude_patterns": self.exclude_patterns,
+            "respect_gitignore": self.respect_gitignore,
             "custom_rules": self.custom_rules,
             "security_ignore_patterns": self.security_ignore_patterns,
             "security_rule_whitelist": self.security_rule_whitelist,
             "security_min_confidence": self.security_min_confidence,
+            "cache_enabled": self.cache_enabled,
+            "cache_dir": self.cache_dir,
+            "cache_max_size_mb": self.cache_max_size_mb,
+            "profiling_enabled": self.profiling_enabled,
+            "project_dead_code": self.project_dead_code,
         }
+        import yaml
 
         with open(config_path, "w") as f:
             yaml.dump(config_dict, f, default_flow_style=False)
@@ -0,0 +1,490 @@
+"""Resident analysis daemon serving analyze and refactor requests over a Unix socket."""
+
+import dataclasses
+import json
+import os
+import socket
+import socketserver
+import time
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Generator, Iterator, List, Optional, Sequence, Union
+
+from refactron import __version__
+from refactron.core import module_resolver
+from refactron.core.cache import metrics_from_dict, metrics_to_dict
+from refactron.core.config import RefactronConfig
+from refactron.core.incremental import GitError
+from refactron.core.models import FileMetrics, RefactoringOperation
+from refactron.core.parsed_module import ModuleCache
+from refactron.core.refactor_result import RefactorResult
+from refactron.core.registry import installed_plugins
+
+if TYPE_CHECKING:
+    from refactron.core.refactron import Refactron
+
+# Bump when requests or responses change incompatibly
+PROTOCOL_VERSION = 1
+
+# Socket used when neither the caller nor REFACTRON_DAEMON_SOCKET names one
+DEFAULT_SOCKET = "~/.refactron/daemon.sock"
+SOCKET_ENV_VAR = "REFACTRON_DAEMON_SOCKET"
+
+# How long a client waits to connect before assuming no daemon is running
+CONNECT_TIMEOUT = 0.5
+
+# Refactron instances kept warm, one per distinct configuration
+MAX_INSTANCES = 8
+
+# How often the server loop checks for a shutdown request
+POLL_INTERVAL = 0.5
+
+# Errors raised in the daemon that clients raise again as the same type
+_ERROR_TYPES = {"GitError": GitError, "FileNotFoundError": FileNotFoundError}
+
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot be reached or fails to handle a request."""
+
+    pass
+
+
+def default_socket_path() -> Path:
+    """Return the daemon socket path, from ``REFACTRON_DAEMON_SOCKET`` if it is set."""
+    return Path(os.environ.get(SOCKET_ENV_VAR) or DEFAULT_SOCKET).expanduser()
+
+
+def operation_to_dict(operation: RefactoringOperation) -> Dict[str, Any]:
+    """Serialize a refactoring operation to a JSON-compatible dict."""
+    return {
+        "operation_type": operation.operation_type,
+        "file_path": str(operation.file_path),
+        "line_number": operation.line_number,
+        "description": operation.description,
+        "old_code": operation.old_code,
+        "new_code": operation.new_code,
+        "risk_score": operation.risk_score,
+        "reasoning": operation.reasoning,
+        "metadata": operation.metadata,
+    }
+
+
+def operation_from_dict(data: Dict[str, Any]) -> RefactoringOperation:
+    """Rebuild an operation serialized by :func:`operation_to_dict`."""
+    values = dict(data)
+    values["file_path"] = Path(values["file_path"])
+    return RefactoringOperation(**values)
+
+
+class AnalysisDaemon:
+    """
+    Handles analyze and refactor requests with warm in-memory state.
+
+    Imported modules, a :class:`Refactron` (with its analyzers and
+    refactorers) per configuration and recently parsed modules are kept
+    between requests, so analyzing a single changed file costs little more
+    than running the analyzers over it.
+
+    Requests are dicts with a ``command`` and its arguments; each yields
+    response dicts with a ``type``: ``"file"`` or ``"operation"`` for each
+    result as it is ready, then ``"end"``, or ``"error"`` if it failed.
+
+    Example:
+        >>> daemon = AnalysisDaemon()
+        >>> [message["type"] for message in daemon.handle({"command": "ping"})]
+        ['end']
+    """
+
+    def __init__(self, max_modules: int = 256):
+        """
+        Initialize the daemon state.
+
+        Args:
+            max_modules: Number of parsed modules to keep in memory
+        """
+        self.modules = ModuleCache(max_modules)
+        self._instances: "OrderedDict[str, Refactron]" = OrderedDict()
+        self.started = time.time()
+        self.requests = 0
+        self.stopping = False
+        # The code this process runs; upgrading or installing plugins needs a restart
+        self.version = __version__
+        self.plugins = installed_plugins()
+
+    def handle(self, request: Dict[str, Any]) -> Generator[Dict[str, Any], None, None]:
+        """
+        Handle one request.
+
+        Args:
+            request: Decoded request
+
+        Yields:
+            Response messages, the last one of type ``"end"`` or ``"error"``
+        """
+        self.requests += 1
+        command = request.get("command")
+        if request.get("version", PROTOCOL_VERSION) != PROTOCOL_VERSION:
+            yield _error(DaemonError(f"Unsupported protocol version: {request.get('version')}"))
+            return
+        try:
+            if command == "ping":
+                yield {"type": "end", **self.status()}
+            elif command == "analyze":
+                yield from self._analyze(request)
+            elif command == "refactor":
+                yield from self._refactor(request)
+            elif command == "shutdown":
+                self.stopping = True
+                yield {"type": "end"}
+            else:
+                yield _error(DaemonError(f"Unknown command: {command}"))
+        except Exception as e:
+            yield _error(e)
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the daemon: process, code, uptime and what it keeps in memory."""
+        return {
+            "pid": os.getpid(),
+            "version": PROTOCOL_VERSION,
+            "refactron_version": self.version,
+            "plugins": self.plugins,
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "instances": len(self._instances),
+            "modules": len(self.modules),
+        }
+
+    def _refactron(self, request: Dict[str, Any]) -> "Refactron":
+        """Return the warm Refactron for the request's configuration, creating it if needed."""
+        # Imported here so that clients never load the analyzers
+        from refactron.core.refactron import Refactron
+
+        values = request.get("config") or {}
+        key = json.dumps(values, sort_keys=True)
+        refactron = self._instances.get(key)
+        if refactron is None:
+            refactron = Refactron(RefactronConfig(**values))
+            refactron.module_cache = self.modules
+            self._instances[key] = refactron
+            while len(self._instances) > MAX_INSTANCES:
+                self._instances.popitem(last=False)
+        self._instances.move_to_end(key)
+        return refactron
+
+    def _analyze(self, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        # Modules may have been added or removed since the last request
+        module_resolver.refresh_caches()
+        refactron = self._refactron(request)
+        files = request.get("files")
+        for metrics in refactron.iter_analyze(
+            request["target"],
+            workers=request.get("workers"),
+            changed_since=request.get("changed_since"),
+            files=[Path(path) for path in files] if files is not None else None,
+        ):
+            yield {
+                "type": "file",
+                "path": str(metrics.file_path),
+                "metrics": metrics_to_dict(metrics),
+            }
+        yield {"type": "end"}
+
+    def _refactor(self, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        refactron = self._refactron(request)
+        result = refactron.refactor(
+            request["target"],
+            preview=request.get("preview", True),
+            operation_types=request.get("operation_types"),
+            workers=request.get("workers"),
+        )
+        for operation in result.operations:
+            yield {"type": "operation", "operation": operation_to_dict(operation)}
+        yield {"type": "end", "applied": result.applied}
+
+
+def _error(error: Exception) -> Dict[str, Any]:
+    return {"type": "error", "error": type(error).__name__, "message": str(error)}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request line and writes one JSON line per response message."""
+
+    server: "_DaemonServer"
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            self._send(_error(DaemonError(f"Invalid request: {e}")))
+            return
+
+        messages = self.server.daemon.handle(request)
+        try:
+            for message in messages:
+                self._send(message)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; the next request starts afresh
+            pass
+        finally:
+            messages.close()
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _DaemonServer(socketserver.UnixStreamServer):
+    """Serves requests one at a time, so analyzers never run concurrently."""
+
+    def __init__(self, socket_path: str, daemon: AnalysisDaemon):
+        self.daemon = daemon
+        super().__init__(socket_path, _RequestHandler)
+
+
+def serve(socket_path: Optional[Path] = None, daemon: Optional[AnalysisDaemon] = None) -> None:
+    """
+    Run the daemon until a shutdown request arrives or the process is interrupted.
+
+    The socket is created readable and writable by the current user only,
+    and removed when the daemon stops.
+
+    Args:
+        socket_path: Where to listen (default: :func:`default_socket_path`)
+        daemon: Daemon state to serve with; a new one is created when None
+
+    Raises:
+        DaemonError: If another daemon is already listening on the socket
+    """
+    path = Path(socket_path) if socket_path is not None else default_socket_path()
+    if DaemonClient.connect(path) is not None:
+        raise DaemonError(f"A daemon is already running on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        # Left behind by a daemon that did not stop cleanly
+        path.unlink()
+
+    daemon = daemon or AnalysisDaemon()
+    previous_umask = os.umask(0o177)
+    try:
+        server = _DaemonServer(str(path), daemon)
+    finally:
+        os.umask(previous_umask)
+
+    server.timeout = POLL_INTERVAL
+    try:
+        with server:
+            while not daemon.stopping:
+                server.handle_request()
+    finally:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _code_difference(status: Dict[str, Any]) -> Optional[str]:
+    """Say how a daemon's code differs from this process's, or None if it runs the same."""
+    version = status.get("refactron_version")
+    if version != __version__:
+        return f"it runs Refactron {version}, this is {__version__}"
+    if status.get("plugins") != installed_plugins():
+        return "its plugins differ from the installed ones"
+    return None
+
+
+class DaemonClient:
+    """
+    Sends requests to a running daemon.
+
+    Each request uses its own connection. Results are rebuilt as the same
+    objects :class:`Refactron` returns, so callers can use either.
+
+    Example:
+        >>> client = DaemonClient.connect()
+        >>> if client is not None:
+        ...     for metrics in client.iter_analyze("src"):
+        ...         print(metrics.file_path, metrics.issue_count)
+    """
+
+    def __init__(self, socket_path: Optional[Path] = None, timeout: Optional[float] = None):
+        """
+        Initialize the client.
+
+        Args:
+            socket_path: Socket of the daemon (default: :func:`default_socket_path`)
+            timeout: Seconds to wait for each response line; None waits forever
+        """
+        self.socket_path = Path(socket_path) if socket_path is not None else default_socket_path()
+        self.timeout = timeout
+
+    @classmethod
+    def connect(
+        cls, socket_path: Optional[Path] = None, same_code: bool = True
+    ) -> Optional["DaemonClient"]:
+        """
+        Return a client if a daemon answers on the socket, None otherwise.
+
+        Args:
+            socket_path: Socket of the daemon (default: :func:`default_socket_path`)
+            same_code: Only accept a daemon running the same Refactron version
+                and plugins as this process; a :class:`RuntimeWarning` tells
+                why another one is not used, e.g. after an upgrade
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            return None
+        client = cls(socket_path)
+        if not client.socket_path.exists():
+            return None
+        try:
+            status = client.ping()
+        except DaemonError:
+            return None
+        if same_code:
+            difference = _code_difference(status)
+            if difference is not None:
+                warnings.warn(
+                    f"Not using the Refactron daemon at {client.socket_path}: {difference}; "
+                    "restart it with 'refactron daemon stop' and 'refactron daemon start'",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+                return None
+        return client
+
+    def request(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Send a request and yield the response messages up to the final one.
+
+        Raises:
+            DaemonError: If the daemon cannot be reached, or reports an error
+            GitError: If the daemon could not list changed files
+            FileNotFoundError: If the target does not exist
+        """
+        try:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        except (AttributeError, OSError) as e:
+            raise DaemonError(f"Unix sockets are not available: {e}") from e
+
+        with connection:
+            try:
+                connection.settimeout(CONNECT_TIMEOUT)
+                connection.connect(str(self.socket_path))
+                connection.settimeout(self.timeout)
+                message = {"version": PROTOCOL_VERSION, **payload}
+                connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+                stream = connection.makefile("rb")
+            except OSError as e:
+                raise DaemonError(f"Cannot reach the daemon at {self.socket_path}: {e}") from e
+
+            with stream:
+                while True:
+                    try:
+                        line = stream.readline()
+                    except OSError as e:
+                        raise DaemonError(f"Lost the connection to the daemon: {e}") from e
+                    if not line:
+                        raise DaemonError("The daemon closed the connection")
+                    response = json.loads(line)
+                    if response.get("type") == "error":
+                        error_type = _ERROR_TYPES.get(response.get("error"), DaemonError)
+                        raise error_type(response.get("message", "Unknown daemon error"))
+                    yield response
+                    if response.get("type") == "end":
+                        return
+
+    def ping(self) -> Dict[str, Any]:
+        """Return the daemon's status."""
+        return list(self.request({"command": "ping"}))[-1]
+
+    def shutdown(self) -> None:
+        """Ask the daemon to stop once the current request is done."""
+        list(self.request({"command": "shutdown"}))
+
+    def iter_analyze(
+        self,
+        target: Union[str, Path],
+        config: Optional[RefactronConfig] = None,
+        workers: Optional[int] = None,
+        changed_since: Optional[str] = None,
+        files: Optional[Sequence[Path]] = None,
+    ) -> Iterator[FileMetrics]:
+        """
+        Analyze like :meth:`Refactron.iter_analyze`, in the daemon.
+
+        Paths are sent to the daemon as absolute paths; results come back
+        with the paths as given here, or relative to the current directory
+        when ``target`` is.
+
+        Yields:
+            FileMetrics for each analyzed file
+        """
+        relative = not os.path.isabs(target)
+        originals: Dict[str, Path] = {}
+        absolute: Optional[List[str]] = None
+        if files is not None:
+            absolute = []
+            for file_path in files:
+                path = os.path.abspath(file_path)
+                originals[path] = Path(file_path)
+                absolute.append(path)
+
+        payload = {
+            "command": "analyze",
+            "target": os.path.abspath(target),
+            "config": _config_values(config),
+            "workers": workers,
+            "changed_since": changed_since,
+            "files": absolute,
+        }
+        for response in self.request(payload):
+            if response["type"] == "file":
+                path = response["path"]
+                file_path = originals.get(path) or _client_path(path, relative)
+                yield metrics_from_dict(response["metrics"], file_path)
+
+    def refactor(
+        self,
+        target: Union[str, Path],
+        config: Optional[RefactronConfig] = None,
+        preview: bool = True,
+        operation_types: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+    ) -> RefactorResult:
+        """Refactor like :meth:`Refactron.refactor`, in the daemon."""
+        payload = {
+            "command": "refactor",
+            "target": os.path.abspath(target),
+            "config": _config_values(config),
+            "preview": preview,
+            "operation_types": operation_types,
+            "workers": workers,
+        }
+        relative = not os.path.isabs(target)
+        result = RefactorResult(preview_mode=preview)
+        for response in self.request(payload):
+            if response["type"] == "operation":
+                operation = operation_from_dict(response["operation"])
+                operation.file_path = _client_path(str(operation.file_path), relative)
+                result.operations.append(operation)
+            elif response["type"] == "end":
+                result.applied = bool(response.get("applied"))
+        return result
+
+
+def _config_values(config: Optional[RefactronConfig]) -> Dict[str, Any]:
+    """The fields of a configuration, to send along with a request."""
+    if config is None:
+        return {}
+    values = dataclasses.asdict(config)
+    # Relative cache directories mean the same in the client and the daemon
+    if values.get("cache_dir"):
+        values["cache_dir"] = os.path.abspath(os.path.expanduser(values["cache_dir"]))
+    return values
+
+
+def _client_path(path: str, relative: bool) -> Path:
+    """A path from the daemon, made relative again when the caller's target was."""
+    return Path(os.path.relpath(path)) if relative else Path(path)
@@ -0,0 +1,333 @@
+"""Fast discovery of the source files to analyze under a directory."""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+from refactron.core.config import RefactronConfig
+
+GITIGNORE = ".gitignore"
+
+
+def translate_glob(pattern: str) -> str:
+    """
+    Translate a glob pattern into a regular expression over ``/``-separated paths.
+
+    ``*`` and ``?`` never match ``/``, ``**/`` matches zero or more
+    directories and a trailing ``**`` matches everything below. Character
+    classes (``[abc]``, ``[!abc]``) and backslash escapes are supported.
+    """
+    out = []
+    i, n = 0, len(pattern)
+
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                i += 2
+                if i < n and pattern[i] == "/":
+                    out.append("(?:.*/)?")
+                    i += 1
+                else:
+                    out.append(".*")
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            start = i + 1
+            if pattern[start : start + 1] in ("!", "^"):
+                start += 1
+            # A "]" right after the opening bracket is part of the class
+            end = pattern.find("]", start + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+
+    return "".join(out)
+
+
+class GlobMatcher:
+    """
+    A list of gitignore-style patterns compiled once into regular expressions.
+
+    Paths are matched relative to a base directory, using ``/`` separators:
+
+    - a pattern without a ``/`` (other than a trailing one) matches at any
+      depth, so ``*.py`` and ``venv`` match in every directory
+    - a pattern containing a ``/`` is anchored at the base directory;
+      start it with ``**/`` to match at any depth
+    - a trailing ``/`` matches directories only
+    - a trailing ``/**`` matches the directory itself as well as everything
+      in it, so the directory can be skipped without being listed
+    - a leading ``!`` re-includes paths matched by an earlier pattern; the
+      last matching pattern wins
+
+    Example:
+        >>> matcher = GlobMatcher(["**/venv/**", "*.pyc"])
+        >>> matcher.match("src/venv", is_dir=True)
+        True
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Compile the patterns.
+
+        Args:
+            patterns: Glob patterns, in order
+        """
+        # (file regex or None for directory-only patterns, directory regex, negated)
+        self._rules: List[Tuple[Optional[Pattern[str]], Pattern[str], bool]] = []
+        for pattern in patterns:
+            rule = self._compile(pattern)
+            if rule is not None:
+                self._rules.append(rule)
+
+        # Without negations, each kind of path is checked with a single regex
+        self._files: Optional[Pattern[str]] = None
+        self._dirs: Optional[Pattern[str]] = None
+        self._ordered = any(negated for _, _, negated in self._rules)
+        if not self._ordered:
+            file_rules = [r.pattern for r, _, _ in self._rules if r is not None]
+            dir_rules = [r.pattern for _, r, _ in self._rules]
+            self._files = re.compile("|".join(f"(?:{r})" for r in file_rules) or "(?!)")
+            self._dirs = re.compile("|".join(f"(?:{r})" for r in dir_rules) or "(?!)")
+
+    @staticmethod
+    def _compile(pattern: str) -> Optional[Tuple[Optional[Pattern[str]], Pattern[str], bool]]:
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+        elif pattern.startswith("\\!"):
+            pattern = pattern[1:]
+
+        dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        if not pattern:
+            return None
+
+        if "/" in pattern:
+            pattern = pattern.lstrip("/")
+        else:
+            pattern = "**/" + pattern
+
+        regex = translate_glob(pattern)
+        dir_regex = regex
+        if pattern.endswith("/**"):
+            dir_regex = f"{regex}|{translate_glob(pattern[:-3])}"
+
+        file_re = None if dir_only else re.compile(regex)
+        return file_re, re.compile(dir_regex), negated
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def match(self, path: str, is_dir: bool = False) -> Optional[bool]:
+        """
+        Match a relative path against the patterns.
+
+        Args:
+            path: Path relative to the base directory, with ``/`` separators
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if the path is matched, False if it is re-included by a
+            ``!`` pattern, None if no pattern applies
+        """
+        if not self._ordered:
+            regex = self._dirs if is_dir else self._files
+            return True if regex is not None and regex.fullmatch(path) else None
+
+        for file_re, dir_re, negated in reversed(self._rules):
+            regex = dir_re if is_dir else file_re
+            if regex is not None and regex.fullmatch(path):
+                return not negated
+        return None
+
+
+def parse_gitignore(text: str) -> List[str]:
+    """Return the patterns of a ``.gitignore`` file, without comments and blank lines."""
+    patterns = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        # Trailing spaces are ignored unless escaped with a backslash
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        if stripped.startswith("\\#"):
+            stripped = stripped[1:]
+        if stripped:
+            patterns.append(stripped)
+    return patterns
+
+
+def _load_gitignore(directory: str) -> Optional[GlobMatcher]:
+    try:
+        with open(os.path.join(directory, GITIGNORE), "r", encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+    matcher = GlobMatcher(parse_gitignore(text))
+    return matcher if matcher else None
+
+
+# A .gitignore matcher and the absolute directory its patterns are relative to
+_IgnoreRules = Tuple[str, GlobMatcher]
+
+
+class FileDiscovery:
+    """
+    Walks a directory tree and yields the files selected by the configuration.
+
+    Uses :func:`os.scandir`, so file types come from the directory listing
+    without extra ``stat`` calls. Exclude patterns and ``.gitignore`` rules
+    are checked on directories before they are entered, so excluded trees
+    such as virtualenvs are never listed. Files are yielded in a stable
+    order: each directory's files sorted by name, then its subdirectories.
+
+    ``.gitignore`` files in the walked tree are honored, as are those in the
+    parent directories up to the root of the enclosing git work tree.
+    Symbolic links to directories are not followed.
+
+    Example:
+        >>> discovery = FileDiscovery.from_config(RefactronConfig())
+        >>> files = list(discovery.iter_files(Path("src")))
+    """
+
+    def __init__(
+        self,
+        include_patterns: Sequence[str] = ("*.py",),
+        exclude_patterns: Sequence[str] = (),
+        respect_gitignore: bool = True,
+    ):
+        """
+        Initialize the discovery.
+
+        Args:
+            include_patterns: Patterns a file must match to be yielded
+            exclude_patterns: Patterns of files and directories to skip
+            respect_gitignore: Whether to skip paths ignored by ``.gitignore`` files
+        """
+        self.include = GlobMatcher(include_patterns)
+        self.exclude = GlobMatcher(exclude_patterns)
+        self.respect_gitignore = respect_gitignore
+
+    @classmethod
+    def from_config(cls, config: RefactronConfig) -> "FileDiscovery":
+        """Create the discovery described by ``config``."""
+        return cls(config.include_patterns, config.exclude_patterns, config.respect_gitignore)
+
+    def iter_files(self, root: Path, directories: Optional[List[str]] = None) -> Iterator[Path]:
+        """
+        Yield the selected files under ``root``.
+
+        Args:
+            root: Directory to walk
+            directories: If given, the absolute path of every directory
+                listed is appended to it, for watching the tree for changes
+
+        Yields:
+            Paths of the selected files, starting with ``root``
+        """
+        root_str = os.fspath(root)
+        root_abs = os.path.abspath(root_str)
+        ignores = self._parent_gitignores(root_abs) if self.respect_gitignore else []
+
+        # (directory path, absolute path, path relative to root, inherited .gitignore rules)
+        stack: List[Tuple[str, str, str, List[_IgnoreRules]]] = [(root_str, root_abs, "", ignores)]
+
+        while stack:
+            dir_path, dir_abs, dir_rel, ignores = stack.pop()
+            if self.respect_gitignore:
+                local = _load_gitignore(dir_abs)
+                if local is not None:
+                    ignores = ignores + [(dir_abs, local)]
+
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            if directories is not None:
+                directories.append(dir_abs)
+
+            subdirs = []
+            for entry in entries:
+                rel = f"{dir_rel}/{entry.name}" if dir_rel else entry.name
+                entry_abs = os.path.join(dir_abs, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not self._excluded(rel, entry_abs, True, ignores):
+                            subdirs.append((entry.path, entry_abs, rel, ignores))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+
+                if self.include.match(rel) and not self._excluded(rel, entry_abs, False, ignores):
+                    yield Path(entry.path)
+
+            stack.extend(reversed(subdirs))
+
+    def _excluded(self, rel: str, path_abs: str, is_dir: bool, ignores: List[_IgnoreRules]) -> bool:
+        if self.exclude.match(rel, is_dir):
+            return True
+
+        # The deepest .gitignore with a matching pattern decides
+        for base, matcher in reversed(ignores):
+            result = matcher.match(path_abs[len(base) + 1 :].replace(os.sep, "/"), is_dir)
+            if result is not None:
+                return result
+        return False
+
+    @staticmethod
+    def _parent_gitignores(root_abs: str) -> List[_IgnoreRules]:
+        """Load the .gitignore files above ``root_abs`` within its git work tree."""
+        parents = []
+        current = root_abs
+        while True:
+            parent = os.path.dirname(current)
+            if os.path.exists(os.path.join(current, ".git")) or parent == current:
+                break
+            current = parent
+            parents.append(current)
+
+        if not os.path.exists(os.path.join(current, ".git")):
+            return []
+
+        ignores = []
+        for directory in reversed(parents):
+            matcher = _load_gitignore(directory)
+            if matcher is not None:
+                ignores.append((directory, matcher))
+        return ignores
+
+
+def discover_files(target: Path, config: RefactronConfig) -> List[Path]:
+    """
+    List the files to analyze for ``target``.
+
+    Args:
+        target: File or directory
+        config: Configuration providing the include and exclude patterns
+
+    Returns:
+        ``[target]`` for a file, otherwise the files selected under the directory
+    """
+    if target.is_file():
+        return [target]
+    return list(FileDiscovery.from_config(config).iter_files(target))
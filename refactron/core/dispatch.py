@@ -0,0 +1,234 @@
+"""Single-pass AST traversal that fans each node out to interested rules."""
+
+import ast
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from refactron.core.models import CodeIssue
+from refactron.core.parsed_module import ParsedModule
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from refactron.analyzers.base_analyzer import BaseAnalyzer
+    from refactron.core.profiling import FileProfiler
+
+NODE_TYPES_ATTR = "_refactron_node_types"
+
+RuleFunc = TypeVar("RuleFunc", bound=Callable[..., None])
+T = TypeVar("T")
+NodeRule = Callable[[Any, "RuleContext"], None]
+
+
+def node_rule(*node_types: Type[ast.AST]) -> Callable[[RuleFunc], RuleFunc]:
+    """
+    Mark an analyzer method as a rule for the given AST node types.
+
+    The decorated method is called as ``rule(node, context)`` for every node
+    of a matching type (subclasses included) during the shared traversal.
+
+    Example:
+        >>> class MyAnalyzer(BaseAnalyzer):
+        ...     @node_rule(ast.Call)
+        ...     def _check_calls(self, node, context):
+        ...         ...
+    """
+    if not node_types:
+        raise ValueError("node_rule() needs at least one node type")
+
+    def decorator(func: RuleFunc) -> RuleFunc:
+        setattr(func, NODE_TYPES_ATTR, tuple(node_types))
+        return func
+
+    return decorator
+
+
+@dataclass
+class RuleContext:
+    """Per-file, per-analyzer state handed to node rules."""
+
+    module: ParsedModule
+    ancestors: List[ast.AST] = field(default_factory=list)
+    issues: List[CodeIssue] = field(default_factory=list)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def file_path(self) -> "Path":
+        """Path of the file being analyzed."""
+        return self.module.file_path
+
+    def report(self, issue: CodeIssue) -> None:
+        """Record an issue found by a rule."""
+        self.issues.append(issue)
+
+    def enclosing(self, *node_types: Type[ast.AST]) -> Iterator[ast.AST]:
+        """Yield enclosing nodes of the given types, innermost first."""
+        for ancestor in reversed(self.ancestors):
+            if isinstance(ancestor, node_types):
+                yield ancestor
+
+
+class NodeDispatcher:
+    """
+    Walks a tree once and calls every rule registered for each node's type.
+
+    Nodes are visited depth-first in source order. While a node's rules
+    run, ``ancestors`` holds the chain of enclosing nodes from the root.
+    """
+
+    def __init__(self) -> None:
+        self.ancestors: List[ast.AST] = []
+        self.nodes_visited = 0
+        self.rule_calls = 0
+        self._rules: Dict[type, List[Tuple[int, NodeRule, RuleContext]]] = {}
+        self._resolved: Dict[type, List[Tuple[NodeRule, RuleContext]]] = {}
+        self._sequence = 0
+
+    def register(
+        self, node_types: Sequence[Type[ast.AST]], rule: NodeRule, context: RuleContext
+    ) -> None:
+        """Register a rule to be called with ``context`` for the given node types."""
+        for node_type in node_types:
+            self._rules.setdefault(node_type, []).append((self._sequence, rule, context))
+        self._sequence += 1
+        self._resolved.clear()
+
+    def add_analyzer(
+        self,
+        analyzer: "BaseAnalyzer",
+        context: RuleContext,
+        profiler: Optional["FileProfiler"] = None,
+    ) -> None:
+        """Register all node rules declared on an analyzer, timed if ``profiler`` is given."""
+        context.ancestors = self.ancestors
+        for node_types, rule in analyzer.node_rules():
+            if profiler is not None:
+                rule = profiler.wrap_rule(analyzer, rule)
+            self.register(node_types, rule, context)
+
+    @property
+    def node_types(self) -> List[type]:
+        """Node types at least one registered rule is interested in."""
+        return list(self._rules)
+
+    def _rules_for(self, node_type: type) -> List[Tuple[NodeRule, RuleContext]]:
+        """Resolve the rules for a concrete node type, in registration order."""
+        resolved = self._resolved.get(node_type)
+        if resolved is None:
+            matches: Dict[int, Tuple[NodeRule, RuleContext]] = {}
+            for base in node_type.__mro__:
+                for sequence, rule, context in self._rules.get(base, ()):
+                    matches[sequence] = (rule, context)
+            resolved = [matches[sequence] for sequence in sorted(matches)]
+            self._resolved[node_type] = resolved
+        return resolved
+
+    def run(self, tree: ast.AST) -> int:
+        """
+        Traverse ``tree`` once, dispatching every node to its rules.
+
+        Returns:
+            Number of nodes visited
+        """
+        ancestors = self.ancestors
+        stack: List[Tuple[ast.AST, bool]] = [(tree, False)]
+        visited = 0
+        calls = 0
+
+        while stack:
+            node, leaving = stack.pop()
+            if leaving:
+                ancestors.pop()
+                continue
+
+            visited += 1
+            for rule, context in self._rules_for(type(node)):
+                rule(node, context)
+                calls += 1
+
+            children = list(ast.iter_child_nodes(node))
+            if children:
+                ancestors.append(node)
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(children))
+
+        self.nodes_visited += visited
+        self.rule_calls += calls
+        return visited
+
+
+def run_analyzers(
+    analyzers: Sequence["BaseAnalyzer"],
+    module: ParsedModule,
+    dispatcher: Optional[NodeDispatcher] = None,
+    profiler: Optional["FileProfiler"] = None,
+) -> List[List[CodeIssue]]:
+    """
+    Run several analyzers over one module with a single shared traversal.
+
+    Analyzers that declare node rules are registered on one dispatcher and
+    the tree is walked once for all of them. Analyzers that implement
+    ``analyze_module`` themselves are called directly. Analyzers whose
+    ``should_analyze`` rejects the module contribute no issues.
+
+    Args:
+        analyzers: Analyzers to run
+        module: Parsed module to analyze
+        dispatcher: Dispatcher to use, e.g. to inspect visit counts afterwards
+        profiler: Records the time spent in each analyzer and node rule;
+            nothing is timed when None
+
+    Returns:
+        One list of issues per analyzer, in the order given
+    """
+    results: List[List[CodeIssue]] = [[] for _ in analyzers]
+    dispatched: List[Tuple[int, "BaseAnalyzer", RuleContext]] = []
+
+    def call(analyzer: "BaseAnalyzer", func: Callable[..., T], *args: Any) -> T:
+        if profiler is None:
+            return func(*args)
+        return profiler.call(analyzer, func, *args)
+
+    for index, analyzer in enumerate(analyzers):
+        if not analyzer.should_analyze(module):
+            continue
+        if analyzer.uses_node_rules:
+            dispatched.append((index, analyzer, RuleContext(module)))
+        else:
+            results[index] = call(analyzer, analyzer.analyze_module, module)
+
+    if dispatched:
+        error = module.syntax_error
+        if error is not None:
+            for index, analyzer, _ in dispatched:
+                results[index] = call(analyzer, analyzer.on_syntax_error, module, error)
+        else:
+            if dispatcher is None:
+                dispatcher = NodeDispatcher()
+            for _, analyzer, context in dispatched:
+                call(analyzer, analyzer.begin_module, context)
+                dispatcher.add_analyzer(analyzer, context, profiler)
+
+            dispatcher.run(module.tree)
+
+            for index, analyzer, context in dispatched:
+                results[index] = call(analyzer, analyzer.finish_module, context)
+
+    if profiler is not None:
+        for analyzer, issues in zip(analyzers, results):
+            if analyzer.name in profiler.record.analyzers:
+                profiler.finish_analyzer(analyzer, issues)
+
+    return results
@@ -0,0 +1,631 @@
+"""Project-wide import graph with import cycle detection."""
+
+import ast
+import hashlib
+import json
+import os
+import tempfile
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from refactron.core.config import RefactronConfig
+from refactron.core.incremental import resolve_relative
+from refactron.core.symbols import is_type_checking
+
+# Bump when the on-disk graph format changes
+GRAPH_FORMAT = 2
+
+# Edge kinds
+RUNTIME = "runtime"  # executed when the importing module is imported
+DEFERRED = "deferred"  # inside a function body, executed when it is called
+TYPE_CHECKING_ONLY = "type_checking"  # inside "if TYPE_CHECKING:", never executed
+
+
+def absolute_path(path: Path) -> Path:
+    """Make a path absolute without resolving symlinks, which is much cheaper."""
+    path = Path(path)
+    return path if path.is_absolute() else Path(os.path.abspath(path))
+
+
+def write_json_atomically(path: Path, payload: object) -> None:
+    """Write ``payload`` as JSON through a temporary file, so readers never see half of it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def graph_cache_path(cache_dir: Path, root: Path, kind: str = "import-graph") -> Path:
+    """Return where a project-wide index of ``root`` is saved inside a cache directory."""
+    digest = hashlib.sha256(str(Path(root).resolve()).encode("utf-8")).hexdigest()
+    return Path(cache_dir) / kind / f"{digest[:32]}.json"
+
+
+class ImportStatement(NamedTuple):
+    """An import as written in a module, with relative imports made absolute."""
+
+    module: str
+    # Names after "from module import", "*" included; empty for "import module"
+    names: Tuple[str, ...]
+    line_number: int
+    kind: str
+
+
+@dataclass(frozen=True)
+class ImportEdge:
+    """A resolved import of one project module by another."""
+
+    source: str
+    target: str
+    line_number: int
+    kind: str
+
+
+@dataclass
+class ModuleNode:
+    """A scanned project module and the imports it contains."""
+
+    name: str
+    file_path: Path
+    is_package: bool
+    mtime_ns: int
+    size: int
+    imports: List[ImportStatement] = field(default_factory=list)
+
+
+@dataclass
+class ImportCycle:
+    """
+    A set of modules that import each other.
+
+    ``modules`` is the whole strongly connected component, sorted. ``edges``
+    is one shortest cycle through its first module, so it can be shown as
+    ``a -> b -> a`` with the line of each import.
+    """
+
+    modules: List[str]
+    edges: List[ImportEdge]
+
+    @property
+    def path(self) -> List[str]:
+        """Module names along :attr:`edges`, starting and ending at the same module."""
+        if not self.edges:
+            return list(self.modules)
+        return [edge.source for edge in self.edges] + [self.edges[-1].target]
+
+
+def scan_imports(tree: ast.Module, importer: str, is_package: bool) -> List[ImportStatement]:
+    """
+    Collect the import statements of a module, without visiting expressions.
+
+    Args:
+        tree: Parsed module
+        importer: Dotted name of the module, used to resolve relative imports
+        is_package: Whether the module is a package ``__init__``
+
+    Returns:
+        Import statements in source order
+    """
+    statements: List[ImportStatement] = []
+    stack: List[Tuple[List[ast.AST], str]] = [(list(tree.body), RUNTIME)]
+
+    while stack:
+        body, kind = stack.pop()
+        for node in body:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    statements.append(ImportStatement(alias.name, (), node.lineno, kind))
+            elif isinstance(node, ast.ImportFrom):
+                module = resolve_relative(node.module, node.level, importer, is_package)
+                names = tuple(alias.name for alias in node.names)
+                statements.append(ImportStatement(module, names, node.lineno, kind))
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                stack.append((list(node.body), DEFERRED if kind == RUNTIME else kind))
+            elif isinstance(node, ast.If) and is_type_checking(node.test):
+                stack.append((list(node.body), TYPE_CHECKING_ONLY))
+                stack.append((list(node.orelse), kind))
+            else:
+                # Classes, conditionals, loops, with, try and match blocks
+                for name in ("body", "orelse", "finalbody", "handlers", "cases"):
+                    children = getattr(node, name, None)
+                    if isinstance(children, list) and children:
+                        stack.append((children, kind))
+
+    statements.sort(key=lambda statement: statement.line_number)
+    return statements
+
+
+def strongly_connected_components(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Find the strongly connected components of a directed graph (Tarjan).
+
+    Iterative, so very deep import chains cannot exhaust the recursion limit.
+
+    Args:
+        graph: Successors of every node
+
+    Returns:
+        Components in reverse topological order
+    """
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+
+        while work:
+            node, successors = work[-1]
+            descended = False
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph.get(successor, ()))))
+                    descended = True
+                    break
+                if successor in on_stack:
+                    low[node] = min(low[node], index[successor])
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+class PackageLayout:
+    """Dotted names of modules, derived from the ``__init__.py`` files above them."""
+
+    def __init__(self) -> None:
+        self._packages: Dict[Path, Optional[str]] = {}
+
+    def package(self, directory: Path) -> Optional[str]:
+        if directory not in self._packages:
+            name: Optional[str] = None
+            if (directory / "__init__.py").is_file():
+                parent = self.package(directory.parent) if directory.parent != directory else None
+                name = f"{parent}.{directory.name}" if parent else directory.name
+            self._packages[directory] = name
+        return self._packages[directory]
+
+    def module(self, file_path: Path) -> Tuple[str, bool]:
+        """Return the dotted name of a file and whether it is a package ``__init__``."""
+        package = self.package(file_path.parent)
+        if file_path.name == "__init__.py" and package:
+            return package, True
+        stem = file_path.stem
+        return (f"{package}.{stem}" if package else stem), False
+
+
+def _scan_file(file_path: Path, names: PackageLayout) -> Optional[ModuleNode]:
+    """Read and scan one file; None if it cannot be read."""
+    try:
+        stat = file_path.stat()
+        data = file_path.read_bytes()
+    except OSError:
+        return None
+
+    name, is_package = names.module(file_path)
+    node = ModuleNode(name, file_path, is_package, stat.st_mtime_ns, stat.st_size)
+    if b"import" not in data:
+        return node
+    try:
+        tree = ast.parse(data)
+    except (SyntaxError, ValueError):
+        return node
+    node.imports = scan_imports(tree, name, is_package)
+    return node
+
+
+def scan_chunk(files: List[Path]) -> List[Optional[ModuleNode]]:
+    """Scan a chunk of files inside a worker process."""
+    names = PackageLayout()
+    return [_scan_file(file_path, names) for file_path in files]
+
+
+class ImportGraph:
+    """
+    Imports between the modules of a project, kept up to date incrementally.
+
+    Module names come from the package layout: a file is part of a package
+    when its directory holds an ``__init__.py``, so ``src/pkg/mod.py`` is
+    ``pkg.mod`` when ``src`` is not a package itself. Relative imports are
+    resolved against the importing module, and ``from pkg import name``
+    points at ``pkg.name`` when that is a module of the project. Imports of
+    modules outside the project are left out.
+
+    Each edge records whether it runs when the module is imported, only
+    when a function is called, or only for type checkers; :meth:`cycles`
+    looks at import-time edges unless asked otherwise, since deferred and
+    ``TYPE_CHECKING`` imports are the usual ways to break a cycle.
+
+    The graph can be saved and loaded again; :meth:`update` then rescans only
+    files whose size or modification time changed.
+
+    Example:
+        >>> graph = ImportGraph.build(Path("src"), files)
+        >>> for cycle in graph.cycles():
+        ...     print(" -> ".join(cycle.path))
+    """
+
+    def __init__(self, root: Path):
+        """
+        Initialize an empty graph.
+
+        Args:
+            root: Directory the project files are under
+        """
+        self.root = Path(root).resolve()
+        self.files: Dict[Path, ModuleNode] = {}
+        # Files parsed by the last build or update
+        self.scanned = 0
+        self._names: Dict[str, Path] = {}
+        self._edges: Dict[str, List[ImportEdge]] = {}
+        self._importers: Optional[Dict[str, List[ImportEdge]]] = None
+
+    @classmethod
+    def build(
+        cls,
+        root: Path,
+        files: Sequence[Path],
+        workers: int = 1,
+        config: Optional[RefactronConfig] = None,
+    ) -> "ImportGraph":
+        """
+        Scan every file and build the graph.
+
+        Args:
+            root: Directory the project files are under
+            files: Python files of the project
+            workers: Number of processes to scan with
+            config: Configuration for the worker processes
+
+        Returns:
+            The built graph
+        """
+        graph = cls(root)
+        graph._scan([absolute_path(path) for path in files], workers, config)
+        return graph
+
+    # Queries
+
+    @property
+    def modules(self) -> List[str]:
+        """Names of all modules, sorted."""
+        return sorted(self._names)
+
+    def module_for(self, file_path: Path) -> Optional[str]:
+        """Return the module name of a scanned file."""
+        node = self.files.get(absolute_path(file_path))
+        return node.name if node is not None else None
+
+    def path_for(self, module: str) -> Optional[Path]:
+        """Return the file a module was scanned from."""
+        return self._names.get(module)
+
+    def imports_of(self, module: str) -> List[ImportEdge]:
+        """Edges from ``module`` to the project modules it imports."""
+        return list(self._edges.get(module, ()))
+
+    def importers_of(self, module: str) -> List[ImportEdge]:
+        """Edges from the project modules importing ``module``."""
+        if self._importers is None:
+            importers: Dict[str, List[ImportEdge]] = {}
+            for edges in self._edges.values():
+                for edge in edges:
+                    importers.setdefault(edge.target, []).append(edge)
+            self._importers = importers
+        return list(self._importers.get(module, ()))
+
+    def cycles(self, include_deferred: bool = False) -> List[ImportCycle]:
+        """
+        Find import cycles.
+
+        Args:
+            include_deferred: Also follow imports made inside functions
+
+        Returns:
+            One cycle per strongly connected component, ordered by module name
+        """
+        kinds = {RUNTIME, DEFERRED} if include_deferred else {RUNTIME}
+        successors: Dict[str, List[str]] = {}
+        first_edge: Dict[Tuple[str, str], ImportEdge] = {}
+        for source in sorted(self._edges):
+            targets = successors.setdefault(source, [])
+            for edge in self._edges[source]:
+                if edge.kind not in kinds:
+                    continue
+                key = (source, edge.target)
+                if key not in first_edge:
+                    first_edge[key] = edge
+                    targets.append(edge.target)
+
+        cycles = []
+        for component in strongly_connected_components(successors):
+            if len(component) == 1:
+                continue
+            members = sorted(component)
+            path = self._shortest_cycle(members[0], set(members), successors)
+            edges = [first_edge[(a, b)] for a, b in zip(path, path[1:])]
+            cycles.append(ImportCycle(members, edges))
+
+        cycles.sort(key=lambda cycle: cycle.modules)
+        return cycles
+
+    @staticmethod
+    def _shortest_cycle(
+        start: str, members: Set[str], successors: Dict[str, List[str]]
+    ) -> List[str]:
+        """Breadth-first search for the shortest path from ``start`` back to itself."""
+        previous: Dict[str, str] = {}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for successor in successors.get(node, ()):
+                if successor not in members:
+                    continue
+                if successor == start:
+                    path = [start]
+                    while node != start:
+                        path.append(node)
+                        node = previous[node]
+                    path.append(start)
+                    return list(reversed(path))
+                if successor not in previous:
+                    previous[successor] = node
+                    queue.append(successor)
+        return [start]
+
+    # Updates
+
+    def update(
+        self,
+        files: Sequence[Path],
+        workers: int = 1,
+        config: Optional[RefactronConfig] = None,
+    ) -> bool:
+        """
+        Bring the graph in line with the current project files.
+
+        Files whose size and modification time are unchanged are not read.
+
+        Args:
+            files: All Python files of the project
+            workers: Number of processes to scan with
+            config: Configuration for the worker processes
+
+        Returns:
+            True if anything changed
+        """
+        current = [absolute_path(path) for path in files]
+        wanted = set(current)
+        stale = []
+        for file_path in current:
+            node = self.files.get(file_path)
+            if node is None:
+                stale.append(file_path)
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            if stat.st_mtime_ns != node.mtime_ns or stat.st_size != node.size:
+                stale.append(file_path)
+        removed = [path for path in self.files if path not in wanted]
+        return self.update_files(stale, workers, config, removed=removed)
+
+    def update_files(
+        self,
+        changed: Iterable[Path],
+        workers: int = 1,
+        config: Optional[RefactronConfig] = None,
+        removed: Iterable[Path] = (),
+    ) -> bool:
+        """
+        Rescan specific files, e.g. the ones an editor saved.
+
+        Changed files that no longer exist are removed from the graph, as are
+        the ``removed`` files. Adding or removing a package ``__init__.py``
+        renames modules, so it rescans every file.
+
+        Returns:
+            True if anything changed
+        """
+        changed_paths = {absolute_path(path) for path in changed}
+        dropped = {absolute_path(path) for path in removed}
+        rescan = {path for path in changed_paths - dropped if path.is_file()}
+        gone = {path for path in (changed_paths | dropped) - rescan if path in self.files}
+        if not rescan and not gone:
+            self.scanned = 0
+            return False
+
+        packages_changed = any(
+            path.name == "__init__.py" and ((path in self.files) != (path in rescan))
+            for path in rescan | gone
+        )
+        if packages_changed:
+            files = sorted((set(self.files) - gone) | rescan)
+            self.files.clear()
+            self._scan(files, workers, config)
+            return True
+
+        previous = {path: self.files[path].name for path in rescan if path in self.files}
+        for path in rescan | gone:
+            self.files.pop(path, None)
+        self._scan(sorted(rescan), workers, config, rebuild=False)
+
+        renamed = bool(gone) or any(
+            path not in previous
+            or path not in self.files
+            or self.files[path].name != previous[path]
+            for path in rescan
+        )
+        if renamed:
+            # Modules appeared, disappeared or moved: imports elsewhere may resolve differently
+            self._index_names()
+            self._resolve_all()
+        else:
+            for path in rescan:
+                node = self.files.get(path)
+                if node is not None and self._names.get(node.name) == path:
+                    self._edges[node.name] = self._resolve(node)
+            self._importers = None
+        return True
+
+    def _scan(
+        self,
+        files: Sequence[Path],
+        workers: int,
+        config: Optional[RefactronConfig],
+        rebuild: bool = True,
+    ) -> None:
+        if workers > 1 and len(files) > 1:
+            from refactron.core.parallel import map_files
+
+            results: Iterable[Optional[ModuleNode]] = map_files(
+                scan_chunk, files, config or RefactronConfig.default(), workers
+            )
+        else:
+            results = scan_chunk(list(files))
+
+        self.scanned = 0
+        for node in results:
+            if node is not None:
+                self.files[node.file_path] = node
+                self.scanned += 1
+        if rebuild:
+            self._index_names()
+            self._resolve_all()
+
+    def _index_names(self) -> None:
+        # When two files map to the same name, the first in path order wins
+        names: Dict[str, Path] = {}
+        for path in sorted(self.files):
+            names.setdefault(self.files[path].name, path)
+        self._names = names
+
+    def _resolve_all(self) -> None:
+        self._edges = {name: self._resolve(self.files[path]) for name, path in self._names.items()}
+        self._importers = None
+
+    def _resolve(self, node: ModuleNode) -> List[ImportEdge]:
+        """Turn a module's import statements into edges to project modules."""
+        names = self._names
+        edges = []
+        for statement in node.imports:
+            targets = []
+            if statement.names:
+                for name in statement.names:
+                    if name == "*":
+                        if statement.module in names:
+                            targets.append(statement.module)
+                        continue
+                    submodule = f"{statement.module}.{name}" if statement.module else name
+                    if submodule in names:
+                        targets.append(submodule)
+                    elif statement.module in names:
+                        targets.append(statement.module)
+            else:
+                # "import a.b.c" points at the deepest project module
+                parts = statement.module.split(".")
+                for end in range(len(parts), 0, -1):
+                    candidate = ".".join(parts[:end])
+                    if candidate in names:
+                        targets.append(candidate)
+                        break
+            for target in dict.fromkeys(targets):
+                if target == node.name:
+                    # A package importing names from its own __init__
+                    continue
+                edges.append(ImportEdge(node.name, target, statement.line_number, statement.kind))
+        return edges
+
+    # Persistence
+
+    def save(self, path: Path) -> None:
+        """Write the graph to ``path`` atomically."""
+        payload = {
+            "format": GRAPH_FORMAT,
+            "root": str(self.root),
+            "modules": [
+                {
+                    "path": str(node.file_path),
+                    "name": node.name,
+                    "package": node.is_package,
+                    "mtime_ns": node.mtime_ns,
+                    "size": node.size,
+                    "imports": [list(statement) for statement in node.imports],
+                }
+                for node in self.files.values()
+            ],
+        }
+        write_json_atomically(Path(path), payload)
+
+    @classmethod
+    def load(cls, path: Path, root: Path) -> Optional["ImportGraph"]:
+        """
+        Read a graph written by :meth:`save`.
+
+        Returns:
+            The graph, or None if the file is missing, unreadable, in an older
+            format or was built for another root
+        """
+        graph = cls(root)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != GRAPH_FORMAT or data.get("root") != str(graph.root):
+                return None
+            for entry in data["modules"]:
+                file_path = Path(entry["path"])
+                graph.files[file_path] = ModuleNode(
+                    entry["name"],
+                    file_path,
+                    entry["package"],
+                    entry["mtime_ns"],
+                    entry["size"],
+                    [
+                        ImportStatement(module, tuple(names), line, kind)
+                        for module, names, line, kind in entry["imports"]
+                    ],
+                )
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+        graph._index_names()
+        graph._resolve_all()
+        return graph
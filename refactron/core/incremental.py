@@ -0,0 +1,199 @@
+"""Select the files an incremental analysis needs, based on local git changes."""
+
+import ast
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+
+class GitError(RuntimeError):
+    """Raised when git cannot report the changes for a working tree."""
+
+
+def _run_git(args: List[str], cwd: Path) -> str:
+    """Run a local git command and return its standard output."""
+    try:
+        completed = subprocess.run(
+            ["git", *args],
+            cwd=str(cwd),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=False,
+        )
+    except OSError as e:
+        raise GitError(f"Could not run git: {e}") from e
+
+    if completed.returncode != 0:
+        message = completed.stderr.strip() or f"git {' '.join(args)} failed"
+        raise GitError(message)
+    return completed.stdout
+
+
+def git_changed_files(path: Path, rev: str) -> List[Path]:
+    """
+    List Python files changed since ``rev`` in the git work tree containing ``path``.
+
+    Includes committed, staged and unstaged modifications, added and renamed
+    files, and untracked files that are not ignored. Deleted files are left out.
+
+    Args:
+        path: File or directory inside a git work tree
+        rev: Any revision git understands, e.g. ``HEAD~1`` or ``origin/main``
+
+    Returns:
+        Absolute, resolved paths of the changed Python files
+
+    Raises:
+        GitError: If ``path`` is not in a git work tree or ``rev`` is unknown
+    """
+    cwd = path if path.is_dir() else path.parent
+    root = Path(_run_git(["rev-parse", "--show-toplevel"], cwd).strip())
+
+    changed = _run_git(
+        ["diff", "--name-only", "--diff-filter=ACMR", "--no-renames", rev, "--"], root
+    ).splitlines()
+    untracked = _run_git(["ls-files", "--others", "--exclude-standard"], root).splitlines()
+
+    files = []
+    seen: Set[Path] = set()
+    for name in changed + untracked:
+        if not name.endswith(".py"):
+            continue
+        file_path = (root / name).resolve()
+        if file_path not in seen and file_path.is_file():
+            seen.add(file_path)
+            files.append(file_path)
+    return files
+
+
+def module_name_for(file_path: Path, root: Path) -> Optional[str]:
+    """
+    Return the dotted module name of ``file_path`` relative to ``root``.
+
+    ``pkg/sub/mod.py`` becomes ``pkg.sub.mod`` and ``pkg/__init__.py``
+    becomes ``pkg``. Returns None for files outside ``root``.
+    """
+    try:
+        relative = file_path.relative_to(root)
+    except ValueError:
+        return None
+
+    parts = list(relative.with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts) if parts else None
+
+
+def resolve_relative(module: Optional[str], level: int, importer: str, is_package: bool) -> str:
+    """Resolve a ``from ... import`` target to an absolute dotted name."""
+    if level == 0:
+        return module or ""
+
+    package = importer.split(".") if importer else []
+    if not is_package:
+        package = package[:-1]
+    if level > 1:
+        package = package[: len(package) - (level - 1)]
+    if module:
+        package.append(module)
+    return ".".join(package)
+
+
+def imported_modules(tree: ast.AST, importer: str, is_package: bool) -> Set[str]:
+    """
+    Collect the absolute names of every module ``tree`` may import.
+
+    For ``from pkg import name`` both ``pkg`` and ``pkg.name`` are included,
+    since ``name`` may be a submodule.
+    """
+    modules: Set[str] = set()
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = resolve_relative(node.module, node.level, importer, is_package)
+            if base:
+                modules.add(base)
+            for alias in node.names:
+                if alias.name != "*":
+                    modules.add(f"{base}.{alias.name}" if base else alias.name)
+
+    return modules
+
+
+def _dotted_suffixes(names: Iterable[str]) -> Set[str]:
+    """
+    Return every dotted suffix of ``names``.
+
+    ``src.pkg.mod`` yields ``src.pkg.mod``, ``pkg.mod`` and ``mod``, so that
+    imports still match when the analysis root sits above the import root.
+    """
+    suffixes: Set[str] = set()
+    for name in names:
+        parts = name.split(".")
+        for start in range(len(parts)):
+            suffixes.add(".".join(parts[start:]))
+    return suffixes
+
+
+def find_dependents(
+    files: Sequence[Path], changed: Iterable[Path], root: Path, max_depth: int = 1
+) -> List[Path]:
+    """
+    Find files among ``files`` that import one of the ``changed`` modules.
+
+    Only files whose source mentions the last component of a changed module
+    name are parsed, so most of a large tree is never read past a text scan.
+
+    Args:
+        files: Candidate files, resolved and under ``root``
+        changed: Changed files, resolved
+        root: Directory module names are computed against
+        max_depth: How many levels of importers to follow
+
+    Returns:
+        Dependent files not in ``changed``, in the order of ``files``
+    """
+    names: Dict[Path, str] = {}
+    for file_path in files:
+        name = module_name_for(file_path, root)
+        if name:
+            names[file_path] = name
+
+    affected: Set[Path] = set(changed)
+    frontier = {names[path] for path in affected if path in names}
+    dependents: Set[Path] = set()
+
+    for _ in range(max_depth):
+        if not frontier:
+            break
+        tails = {name.rsplit(".", 1)[-1] for name in frontier}
+        targets = _dotted_suffixes(frontier)
+        found: Set[Path] = set()
+
+        for file_path in files:
+            if file_path in affected:
+                continue
+            try:
+                source = file_path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            if not any(tail in source for tail in tails):
+                continue
+            try:
+                tree = ast.parse(source)
+            except SyntaxError:
+                continue
+
+            importer = names.get(file_path, "")
+            imports = imported_modules(tree, importer, file_path.name == "__init__.py")
+            if imports & targets:
+                found.add(file_path)
+
+        dependents.update(found)
+        affected.update(found)
+        frontier = {names[path] for path in found if path in names}
+
+    return [file_path for file_path in files if file_path in dependents]
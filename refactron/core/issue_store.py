@@ -0,0 +1,318 @@
+"""Compact, column-oriented storage for large numbers of code issues."""
+
+import copy
+from array import array
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+
+if TYPE_CHECKING:
+    from refactron.core.analysis_result import AnalysisResult
+
+K = TypeVar("K", bound=Hashable)
+
+_LEVELS = list(IssueLevel)
+_LEVEL_CODES = {level: code for code, level in enumerate(_LEVELS)}
+_CATEGORIES = list(IssueCategory)
+_CATEGORY_CODES = {category: code for code, category in enumerate(_CATEGORIES)}
+
+# Marks a missing optional value in an integer column
+_NONE = -1
+
+
+class _InternTable(Generic[K]):
+    """Assigns each distinct value a small integer id and stores it once."""
+
+    __slots__ = ("values", "_ids")
+
+    def __init__(self) -> None:
+        self.values: List[K] = []
+        self._ids: Dict[K, int] = {}
+
+    def intern(self, value: K) -> int:
+        """Return the id of ``value``, adding it on first use."""
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self._ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def intern_optional(self, value: Optional[K]) -> int:
+        """Like :meth:`intern`, but maps None to a sentinel id."""
+        return _NONE if value is None else self.intern(value)
+
+    def get(self, value_id: int) -> Optional[K]:
+        return None if value_id == _NONE else self.values[value_id]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class IssueRecord:
+    """
+    Lightweight handle to one issue in an :class:`IssueStore`.
+
+    Reads fields straight from the store's columns without building a
+    :class:`CodeIssue`. Call :meth:`to_issue` for a full object.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "IssueStore", index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def file_path(self) -> Path:
+        return self._store._paths.values[self._store._path_ids[self._index]]
+
+    @property
+    def line_number(self) -> int:
+        return self._store._lines[self._index]
+
+    @property
+    def column(self) -> int:
+        return self._store._columns[self._index]
+
+    @property
+    def level(self) -> IssueLevel:
+        return _LEVELS[self._store._levels[self._index]]
+
+    @property
+    def category(self) -> IssueCategory:
+        return _CATEGORIES[self._store._categories[self._index]]
+
+    @property
+    def confidence(self) -> float:
+        return self._store._confidences[self._index]
+
+    @property
+    def rule_id(self) -> Optional[str]:
+        return self._store._strings.get(self._store._rule_ids[self._index])
+
+    @property
+    def message(self) -> str:
+        return self._store._strings.values[self._store._messages[self._index]]
+
+    @property
+    def suggestion(self) -> Optional[str]:
+        return self._store._strings.get(self._store._suggestions[self._index])
+
+    def to_issue(self) -> CodeIssue:
+        """Build the full :class:`CodeIssue` for this record."""
+        return self._store[self._index]
+
+    def __repr__(self) -> str:
+        return f"IssueRecord({self.file_path}:{self.line_number} {self.rule_id})"
+
+
+class IssueStore:
+    """
+    Column-oriented, append-only store of :class:`CodeIssue` data.
+
+    File paths, rule IDs, messages, suggestions and code snippets are
+    interned, so repeated values are stored once. Line, column, end line,
+    level, category and confidence live in typed :mod:`array` columns, and
+    per-issue metadata is kept only for issues that have any, with identical
+    metadata shared. :class:`CodeIssue` objects are built on access, so a
+    store of hundreds of thousands of issues costs a fraction of the memory
+    of the equivalent list.
+
+    Build one from the issues of an analysis with :meth:`from_result` (or
+    ``IssueStore(result.all_issues)``) and drop the result to keep only the
+    compact copy.
+
+    Example:
+        >>> store = IssueStore.from_result(refactron.analyze("src"))
+        >>> store.count_by_level()[IssueLevel.CRITICAL]
+        >>> store[0].message
+    """
+
+    __slots__ = (
+        "_paths",
+        "_strings",
+        "_metadata",
+        "_path_ids",
+        "_lines",
+        "_columns",
+        "_end_lines",
+        "_levels",
+        "_categories",
+        "_confidences",
+        "_rule_ids",
+        "_messages",
+        "_suggestions",
+        "_snippets",
+        "_metadata_ids",
+    )
+
+    def __init__(self, issues: Iterable[CodeIssue] = ()):
+        """
+        Initialize the store.
+
+        Args:
+            issues: Issues to add initially
+        """
+        self._paths: _InternTable[Path] = _InternTable()
+        self._strings: _InternTable[str] = _InternTable()
+        self._metadata: _InternTable[Hashable] = _InternTable()
+        self._path_ids = array("l")
+        self._lines = array("l")
+        self._columns = array("l")
+        self._end_lines = array("l")
+        self._levels = array("B")
+        self._categories = array("B")
+        self._confidences = array("d")
+        self._rule_ids = array("l")
+        self._messages = array("l")
+        self._suggestions = array("l")
+        self._snippets = array("l")
+        # Sparse: only issues with non-empty metadata have an entry
+        self._metadata_ids: Dict[int, int] = {}
+        self.extend(issues)
+
+    @classmethod
+    def from_result(cls, result: "AnalysisResult") -> "IssueStore":
+        """Build a store of every issue of an analysis result, file by file."""
+        return cls(issue for metrics in result.file_metrics for issue in metrics.issues)
+
+    def append(self, issue: CodeIssue) -> None:
+        """Add an issue to the store."""
+        index = len(self._lines)
+        strings = self._strings
+
+        self._path_ids.append(self._paths.intern(issue.file_path))
+        self._lines.append(issue.line_number)
+        self._columns.append(issue.column)
+        self._end_lines.append(_NONE if issue.end_line is None else issue.end_line)
+        self._levels.append(_LEVEL_CODES[issue.level])
+        self._categories.append(_CATEGORY_CODES[issue.category])
+        self._confidences.append(issue.confidence)
+        self._rule_ids.append(strings.intern_optional(issue.rule_id))
+        self._messages.append(strings.intern(issue.message))
+        self._suggestions.append(strings.intern_optional(issue.suggestion))
+        self._snippets.append(strings.intern_optional(issue.code_snippet))
+
+        if issue.metadata:
+            self._metadata_ids[index] = self._metadata.intern(_freeze(issue.metadata))
+
+    def extend(self, issues: Iterable[CodeIssue]) -> None:
+        """Add several issues to the store."""
+        for issue in issues:
+            self.append(issue)
+
+    def record(self, index: int) -> IssueRecord:
+        """Return a lightweight handle to the issue at ``index``."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("issue index out of range")
+        return IssueRecord(self, index)
+
+    def records(self) -> Iterator[IssueRecord]:
+        """Iterate over lightweight handles to every issue."""
+        for index in range(len(self)):
+            yield IssueRecord(self, index)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __getitem__(self, index: int) -> CodeIssue:
+        """Build the :class:`CodeIssue` at ``index``."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("issue index out of range")
+
+        strings = self._strings
+        end_line = self._end_lines[index]
+        metadata_id = self._metadata_ids.get(index)
+
+        return CodeIssue(
+            category=_CATEGORIES[self._categories[index]],
+            level=_LEVELS[self._levels[index]],
+            message=strings.values[self._messages[index]],
+            file_path=self._paths.values[self._path_ids[index]],
+            line_number=self._lines[index],
+            column=self._columns[index],
+            end_line=None if end_line == _NONE else end_line,
+            code_snippet=strings.get(self._snippets[index]),
+            suggestion=strings.get(self._suggestions[index]),
+            rule_id=strings.get(self._rule_ids[index]),
+            confidence=self._confidences[index],
+            metadata={} if metadata_id is None else _thaw(self._metadata.values[metadata_id]),
+        )
+
+    def __iter__(self) -> Iterator[CodeIssue]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_list(self) -> List[CodeIssue]:
+        """Build every issue as a regular list of :class:`CodeIssue`."""
+        return list(self)
+
+    def count_by_level(self) -> Dict[IssueLevel, int]:
+        """Count issues per level straight from the level column."""
+        counts = [0] * len(_LEVELS)
+        for code in self._levels:
+            counts[code] += 1
+        return {level: counts[code] for code, level in enumerate(_LEVELS)}
+
+
+class _Unhashable:
+    """Wraps metadata with unhashable values, so it is stored but never shared."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Dict[str, Any]):
+        self.value = value
+
+
+def _tag(value: Any) -> Any:
+    """Pair a value with its type, so equal values of different types (1, 1.0, True) differ."""
+    if isinstance(value, tuple):
+        return (tuple, tuple(_tag(item) for item in value))
+    if isinstance(value, frozenset):
+        return (frozenset, frozenset(_tag(item) for item in value))
+    return (type(value), value)
+
+
+def _untag(tagged: Any) -> Any:
+    kind, value = tagged
+    if kind is tuple:
+        return tuple(_untag(item) for item in value)
+    if kind is frozenset:
+        return frozenset(_untag(item) for item in value)
+    return value
+
+
+def _freeze(metadata: Dict[str, Any]) -> Hashable:
+    """Turn metadata into a hashable value so identical metadata is stored once."""
+    frozen = tuple((key, _tag(value)) for key, value in metadata.items())
+    try:
+        hash(frozen)
+    except TypeError:
+        return _Unhashable(copy.deepcopy(metadata))
+    return frozen
+
+
+def _thaw(frozen: Hashable) -> Dict[str, Any]:
+    """Rebuild a fresh metadata dict, so callers can never mutate shared state."""
+    if isinstance(frozen, _Unhashable):
+        return copy.deepcopy(frozen.value)
+    items: Tuple[Tuple[str, Any], ...] = frozen  # type: ignore[assignment]
+    return {key: _untag(tagged) for key, tagged in items}
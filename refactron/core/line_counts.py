@@ -0,0 +1,156 @@
+"""Line counts of a module from a single pass over its token stream."""
+
+import tokenize
+from dataclasses import dataclass
+from typing import List, Sequence
+
+# Tokens that only shape the layout and never make a line count as code
+_LAYOUT_TOKENS = (tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER)
+_LINE_ENDS = (tokenize.NL, tokenize.NEWLINE)
+
+# Stands for a ":" operator among token types when counting logical lines
+_COLON = -1
+
+
+@dataclass
+class LineCounts:
+    """
+    Raw line counts, with the same meaning as ``radon.raw.analyze``.
+
+    ``loc == sloc + blank + multi + single_comments`` always holds.
+    """
+
+    # Total lines
+    loc: int = 0
+    # Logical lines: statements, with "if x: y" counting twice
+    lloc: int = 0
+    # Lines of code, including lines of multi-line strings that are not docstrings
+    sloc: int = 0
+    # Comment tokens, whether alone on their line or after code
+    comments: int = 0
+    # Non-blank lines of multi-line strings standing alone as a statement (docstrings)
+    multi: int = 0
+    # Blank or whitespace-only lines
+    blank: int = 0
+    # Lines holding only a comment or a single-line string statement
+    single_comments: int = 0
+
+    @property
+    def documentation(self) -> int:
+        """Comment-only and docstring lines."""
+        return self.single_comments + self.multi
+
+
+def count_lines(tokens: Sequence[tokenize.TokenInfo], lines: Sequence[str]) -> LineCounts:
+    """
+    Count code, comment, docstring and blank lines in one pass over the tokens.
+
+    Tokens are grouped into the same chunks radon tokenizes separately: a
+    statement with all its continuation lines, or a single blank or
+    comment-only line. Lines after a tokenizer error, which ends the token
+    stream early, count as code or blank lines.
+
+    Args:
+        tokens: Token stream of the module, as from ``tokenize.generate_tokens``
+        lines: Source lines, split on newlines
+
+    Returns:
+        The line counts
+    """
+    counts = LineCounts()
+    chunk: List[tokenize.TokenInfo] = []
+    has_code = False
+    first_row = 1
+    last_row = 0
+
+    for token in tokens:
+        kind = token.type
+        if kind in _LAYOUT_TOKENS:
+            continue
+        if not chunk:
+            first_row = token.start[0]
+        chunk.append(token)
+        if kind == tokenize.NEWLINE or (kind == tokenize.NL and not has_code):
+            last_row = max(token.end[0], first_row)
+            _count_chunk(counts, chunk, lines, first_row, last_row)
+            chunk = []
+            has_code = False
+        elif kind not in (tokenize.COMMENT, tokenize.NL):
+            has_code = True
+
+    if chunk:
+        last_row = max(chunk[-1].end[0], first_row)
+        _count_chunk(counts, chunk, lines, first_row, last_row)
+
+    # Lines the tokenizer never reached, or did not report (blank lines at the end)
+    total = len(lines) - 1 if lines and not lines[-1] else len(lines)
+    for row in range(last_row + 1, total + 1):
+        if lines[row - 1].strip():
+            counts.sloc += 1
+        else:
+            counts.blank += 1
+
+    counts.loc = counts.sloc + counts.blank + counts.multi + counts.single_comments
+    return counts
+
+
+def _count_chunk(
+    counts: LineCounts,
+    chunk: List[tokenize.TokenInfo],
+    lines: Sequence[str],
+    first_row: int,
+    last_row: int,
+) -> None:
+    """Add the counts of one chunk of lines."""
+    significant = [token for token in chunk if token.type not in _LINE_ENDS]
+    counts.comments += sum(1 for token in significant if token.type == tokenize.COMMENT)
+
+    rows = range(first_row, last_row + 1)
+    if len(significant) == 1 and significant[0].type == tokenize.COMMENT:
+        counts.single_comments += 1
+    elif len(significant) == 1 and significant[0].type == tokenize.STRING:
+        if significant[0].start[0] == significant[0].end[0]:
+            counts.single_comments += 1
+        else:
+            for row in rows:
+                if lines[row - 1].strip():
+                    counts.multi += 1
+                else:
+                    counts.blank += 1
+    else:
+        for row in rows:
+            if lines[row - 1].strip():
+                counts.sloc += 1
+            else:
+                counts.blank += 1
+
+    counts.lloc += _logical_lines(chunk)
+
+
+def _logical_lines(chunk: List[tokenize.TokenInfo]) -> int:
+    """
+    Count the logical lines of a chunk the way radon does.
+
+    Each ``;``-separated part is one logical line, or two when it has a
+    colon that does not end it (``if x: y``). Radon finds the end of the
+    last part one token later than that of the others, as its chunks end
+    with an end marker token; that is reproduced so the counts agree.
+    """
+    parts: List[List[int]] = [[]]
+    for token in chunk:
+        if token.type == tokenize.OP and token.string == ";":
+            parts.append([])
+        elif token.type not in (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE):
+            is_colon = token.type == tokenize.OP and token.string == ":"
+            parts[-1].append(_COLON if is_colon else token.type)
+
+    total = 0
+    for index, part in enumerate(parts):
+        if index == len(parts) - 1:
+            part = part + [tokenize.ENDMARKER]
+        if _COLON in part:
+            colon = len(part) - 1 - part[::-1].index(_COLON)
+            total += 2 - (colon == len(part) - 2)
+        elif part and any(kind != tokenize.ENDMARKER for kind in part):
+            total += 1
+    return total
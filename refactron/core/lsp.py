@@ -0,0 +1,621 @@
+"""Language Server Protocol front end serving diagnostics and code actions over stdio."""
+
+import ast
+import bisect
+import dataclasses
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+from refactron.autofix.models import FixRiskLevel
+from refactron.core import module_resolver
+from refactron.core.config import RefactronConfig
+from refactron.core.models import CodeIssue, FileMetrics, IssueLevel, RefactoringOperation
+from refactron.core.parsed_module import ParsedModule
+
+if TYPE_CHECKING:
+    from refactron.autofix.engine import AutoFixEngine
+    from refactron.core.refactron import Refactron
+
+SERVER_NAME = "refactron"
+
+# Seconds without further edits before a document is analyzed again
+DEBOUNCE_SECONDS = 0.15
+
+# Analyses kept across documents and versions, so undoing an edit is not analyzed again
+MAX_CACHED_ANALYSES = 64
+
+# JSON-RPC and LSP error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+SERVER_NOT_INITIALIZED = -32002
+REQUEST_CANCELLED = -32800
+CONTENT_MODIFIED = -32801
+
+# Diagnostic severities: 1 error, 2 warning, 3 information
+_SEVERITIES = {
+    IssueLevel.CRITICAL: 1,
+    IssueLevel.ERROR: 1,
+    IssueLevel.WARNING: 2,
+    IssueLevel.INFO: 3,
+}
+
+QUICK_FIX = "quickfix"
+REFACTOR = "refactor.rewrite"
+
+# LSP counts "\r\n", "\r" and "\n" as line breaks, and nothing else
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+# Tells the worker thread to stop
+_STOP = object()
+
+
+def read_message(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """
+    Read one ``Content-Length`` framed JSON-RPC message.
+
+    Returns:
+        The message, or None at the end of the input
+
+    Raises:
+        ValueError: If the headers or the JSON content are malformed
+    """
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii", "replace").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    if length is None:
+        raise ValueError("missing Content-Length header")
+
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    message = json.loads(body)
+    if not isinstance(message, dict):
+        raise ValueError("message must be a JSON object")
+    return message
+
+
+def write_message(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    """Write one JSON-RPC message with its ``Content-Length`` header."""
+    body = json.dumps(message).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+def uri_to_path(uri: str) -> Path:
+    """Return the file path of a ``file:`` URI, or a name for an unsaved buffer."""
+    parsed = urlparse(uri)
+    if parsed.scheme == "file":
+        return Path(url2pathname(unquote(parsed.path)))
+    return Path(unquote(parsed.path) or "untitled.py")
+
+
+def _utf16_length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+class TextPositions:
+    """Converts between string offsets and LSP positions, in UTF-16 code units."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.starts = [0] + [match.end() for match in _LINE_BREAK.finditer(text)]
+
+    def line_end(self, line: int) -> int:
+        """Offset of the end of a line, before its line break."""
+        end = self.starts[line + 1] if line + 1 < len(self.starts) else len(self.text)
+        while end > self.starts[line] and self.text[end - 1] in "\r\n":
+            end -= 1
+        return end
+
+    def offset(self, position: Dict[str, int]) -> int:
+        """Offset of a position; positions past the end of a line or the text are clamped."""
+        line = position["line"]
+        if line >= len(self.starts):
+            return len(self.text)
+        offset = self.starts[line]
+        end = self.line_end(line)
+        units = position["character"]
+        while offset < end and units > 0:
+            units -= 2 if ord(self.text[offset]) > 0xFFFF else 1
+            offset += 1
+        return offset
+
+    def position(self, offset: int) -> Dict[str, int]:
+        """Position of an offset."""
+        line = bisect.bisect_right(self.starts, offset) - 1
+        return {"line": line, "character": _utf16_length(self.text[self.starts[line] : offset])}
+
+    def issue_range(self, issue: CodeIssue) -> Dict[str, Dict[str, int]]:
+        """Range of an issue: from its column to the end of its line."""
+        line = min(max(issue.line_number - 1, 0), len(self.starts) - 1)
+        start, end = self.starts[line], self.line_end(line)
+        # AST columns count UTF-8 bytes
+        prefix = self.text[start:end].encode("utf-8")[: max(issue.column, 0)]
+        column = len(prefix.decode("utf-8", "ignore"))
+        return {
+            "start": {"line": line, "character": _utf16_length(self.text[start : start + column])},
+            "end": {"line": line, "character": _utf16_length(self.text[start:end])},
+        }
+
+
+def text_edit(old: str, new: str) -> Dict[str, Any]:
+    """Return a single edit turning ``old`` into ``new``, spanning the lines that differ."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    prefix = 0
+    while prefix < min(len(old_lines), len(new_lines)) and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < min(len(old_lines), len(new_lines)) - prefix
+        and old_lines[-1 - suffix] == new_lines[-1 - suffix]
+    ):
+        suffix += 1
+
+    start = sum(len(line) for line in old_lines[:prefix])
+    end = len(old) - sum(len(line) for line in old_lines[len(old_lines) - suffix :])
+    positions = TextPositions(old)
+    return {
+        "range": {"start": positions.position(start), "end": positions.position(end)},
+        "newText": "".join(new_lines[prefix : len(new_lines) - suffix]),
+    }
+
+
+def apply_operation(text: str, operation: RefactoringOperation) -> Optional[str]:
+    """
+    Replace an operation's old code with its new code.
+
+    Returns:
+        The new text, or None if the text at the operation's line is not its old code
+    """
+    lines = text.split("\n")
+    old = operation.old_code.split("\n")
+    start = operation.line_number - 1
+    if start < 0 or lines[start : start + len(old)] != old:
+        return None
+    return "\n".join(lines[:start] + operation.new_code.split("\n") + lines[start + len(old) :])
+
+
+def _parses(text: str) -> bool:
+    try:
+        ast.parse(text)
+    except (SyntaxError, ValueError):
+        return False
+    return True
+
+
+class TextDocument:
+    """An open editor buffer, kept in sync with the editor's changes."""
+
+    def __init__(self, uri: str, version: int, text: str):
+        self.uri = uri
+        self.version = version
+        self.text = text
+        self.path = uri_to_path(uri)
+
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        """Apply one ``contentChanges`` entry of ``textDocument/didChange``."""
+        if "range" not in change:
+            self.text = change["text"]
+            return
+        positions = TextPositions(self.text)
+        start = positions.offset(change["range"]["start"])
+        end = positions.offset(change["range"]["end"])
+        self.text = self.text[:start] + change["text"] + self.text[end:]
+
+
+@dataclass
+class DocumentAnalysis:
+    """What was computed for one version of a document's text."""
+
+    metrics: FileMetrics
+    # Refactoring operations, computed on the first code action request
+    operations: Optional[List[RefactoringOperation]] = None
+
+
+@dataclass
+class _Request:
+    id: Union[int, str]
+    method: str
+    params: Dict[str, Any]
+    # Version of the document when the request arrived
+    version: Optional[int]
+
+
+class _ContentModified(Exception):
+    """The document changed after the request was made."""
+
+
+class LanguageServer:
+    """
+    Serves Refactron diagnostics and code actions to an editor over LSP.
+
+    Documents are analyzed from the editor's buffers, never read from or
+    written to disk. The main thread only reads messages and keeps the
+    buffers in sync, so the editor is never kept waiting; analysis and
+    code actions run on a worker thread. Edits are debounced, and the
+    results of a version that changed while it was analyzed are dropped
+    instead of published. Analyses are cached by document and contents,
+    and code action requests that were cancelled, or whose document changed
+    since, are answered without doing the work.
+
+    Issues are published as diagnostics. Code actions offer the
+    :class:`AutoFixEngine` fix for each issue in the requested range, and
+    the refactoring operations that start in it.
+
+    Example:
+        >>> server = LanguageServer(sys.stdin.buffer, sys.stdout.buffer)
+        >>> exit_code = server.serve()
+    """
+
+    def __init__(
+        self,
+        reader: BinaryIO,
+        writer: BinaryIO,
+        config: Optional[RefactronConfig] = None,
+        safety_level: FixRiskLevel = FixRiskLevel.LOW,
+        debounce: float = DEBOUNCE_SECONDS,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            reader: Stream the client's messages are read from
+            writer: Stream messages to the client are written to
+            config: Configuration of the analyzers and refactorers
+            safety_level: Highest risk of the fixes offered as code actions
+            debounce: Seconds without further edits before analyzing
+        """
+        self.reader = reader
+        self.writer = writer
+        # Buffers are analyzed in memory, so the on-disk cache never applies
+        self.config = dataclasses.replace(config or RefactronConfig.default(), cache_enabled=False)
+        self.safety_level = safety_level
+        self.debounce = debounce
+
+        self.documents: Dict[str, TextDocument] = {}
+        self.analyses: "OrderedDict[Tuple[str, bytes], DocumentAnalysis]" = OrderedDict()
+        self.initialized = False
+        self.shutdown_requested = False
+        self._refactron: Optional["Refactron"] = None
+        self._engine: Optional["AutoFixEngine"] = None
+        self._cancelled: Set[Union[int, str]] = set()
+        self._jobs: "queue.Queue[Any]" = queue.Queue()
+        # Guards the documents and the cancelled requests
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @property
+    def refactron(self) -> "Refactron":
+        if self._refactron is None:
+            from refactron.core.refactron import Refactron
+
+            self._refactron = Refactron(self.config)
+        return self._refactron
+
+    @property
+    def engine(self) -> "AutoFixEngine":
+        if self._engine is None:
+            from refactron.autofix.engine import AutoFixEngine
+
+            self._engine = AutoFixEngine(self.safety_level)
+        return self._engine
+
+    def serve(self) -> int:
+        """
+        Handle messages until the client sends ``exit`` or closes the input.
+
+        Returns:
+            The process exit code: 0 if the client asked to shut down first, 1 otherwise
+        """
+        worker = threading.Thread(target=self._work, name="refactron-lsp", daemon=True)
+        worker.start()
+        try:
+            while True:
+                try:
+                    message = read_message(self.reader)
+                except ValueError as e:
+                    self._send_error(None, PARSE_ERROR, str(e))
+                    continue
+                if message is None or message.get("method") == "exit":
+                    break
+                self._dispatch(message)
+        finally:
+            self._jobs.put(_STOP)
+            worker.join()
+        return 0 if self.shutdown_requested else 1
+
+    # Messages
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        with self._write_lock:
+            write_message(self.writer, {"jsonrpc": "2.0", **message})
+
+    def _send_error(self, request_id: Any, code: int, message: str) -> None:
+        self._send({"id": request_id, "error": {"code": code, "message": message}})
+
+    def _notify(self, method: str, params: Dict[str, Any]) -> None:
+        self._send({"method": method, "params": params})
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        method = message.get("method")
+        params = message.get("params") or {}
+        if method is None:
+            # A response; the server sends no requests
+            return
+        if "id" not in message:
+            self._handle_notification(method, params)
+            return
+
+        request_id = message["id"]
+        if method == "initialize":
+            self.initialized = True
+            self._send({"id": request_id, "result": self._capabilities()})
+        elif not self.initialized:
+            self._send_error(request_id, SERVER_NOT_INITIALIZED, "Server not initialized")
+        elif self.shutdown_requested:
+            self._send_error(request_id, INVALID_REQUEST, "Server is shutting down")
+        elif method == "shutdown":
+            self.shutdown_requested = True
+            self._send({"id": request_id, "result": None})
+        elif method == "textDocument/codeAction":
+            uri = params.get("textDocument", {}).get("uri")
+            with self._lock:
+                document = self.documents.get(uri)
+            version = document.version if document is not None else None
+            self._jobs.put(_Request(request_id, method, params, version))
+        else:
+            self._send_error(request_id, METHOD_NOT_FOUND, f"Unsupported method: {method}")
+
+    def _capabilities(self) -> Dict[str, Any]:
+        from refactron import __version__
+
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": 2},
+                "codeActionProvider": {"codeActionKinds": [QUICK_FIX, REFACTOR]},
+            },
+            "serverInfo": {"name": SERVER_NAME, "version": __version__},
+        }
+
+    def _handle_notification(self, method: str, params: Dict[str, Any]) -> None:
+        if method == "textDocument/didOpen":
+            item = params["textDocument"]
+            if item.get("languageId", "python") != "python":
+                return
+            with self._lock:
+                self.documents[item["uri"]] = TextDocument(
+                    item["uri"], item.get("version", 0), item["text"]
+                )
+            self._jobs.put(item["uri"])
+        elif method == "textDocument/didChange":
+            uri = params["textDocument"]["uri"]
+            with self._lock:
+                document = self.documents.get(uri)
+                if document is None:
+                    return
+                for change in params["contentChanges"]:
+                    document.apply_change(change)
+                document.version = params["textDocument"].get("version", document.version + 1)
+            self._jobs.put(uri)
+        elif method == "textDocument/didClose":
+            uri = params["textDocument"]["uri"]
+            with self._lock:
+                closed = self.documents.pop(uri, None)
+            if closed is not None:
+                self._notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+        elif method == "$/cancelRequest":
+            with self._lock:
+                self._cancelled.add(params["id"])
+
+    # Worker thread
+
+    def _work(self) -> None:
+        """Run requests as they come, and analyses once their documents stop changing."""
+        due: Dict[str, float] = {}
+        while True:
+            timeout = max(0.0, min(due.values()) - time.monotonic()) if due else None
+            try:
+                job = self._jobs.get(timeout=timeout)
+            except queue.Empty:
+                job = None
+            if job is _STOP:
+                return
+            if isinstance(job, str):
+                due[job] = time.monotonic() + self.debounce
+            elif job is not None:
+                self._run_request(job)
+
+            now = time.monotonic()
+            for uri in [uri for uri, when in due.items() if when <= now]:
+                del due[uri]
+                try:
+                    self._publish_diagnostics(uri)
+                except Exception as e:
+                    self._notify("window/logMessage", {"type": 1, "message": f"{uri}: {e}"})
+
+    def _snapshot(self, uri: str) -> Optional[Tuple[int, str, Path]]:
+        with self._lock:
+            document = self.documents.get(uri)
+            if document is None:
+                return None
+            return document.version, document.text, document.path
+
+    def _is_current(self, uri: str, version: int) -> bool:
+        with self._lock:
+            document = self.documents.get(uri)
+            return document is not None and document.version == version
+
+    def analysis(self, uri: str, path: Path, text: str) -> DocumentAnalysis:
+        """Return the analysis of a document's text, from the cache when it was analyzed before."""
+        key = (uri, hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest())
+        if module_resolver.refresh_caches():
+            # Modules were added or removed, so imports may be classified differently
+            self.analyses.clear()
+        analysis = self.analyses.get(key)
+        if analysis is None:
+            metrics = self.refactron._analyze_module(ParsedModule(path, text))
+            analysis = DocumentAnalysis(metrics)
+            self.analyses[key] = analysis
+            while len(self.analyses) > MAX_CACHED_ANALYSES:
+                self.analyses.popitem(last=False)
+        self.analyses.move_to_end(key)
+        return analysis
+
+    def _publish_diagnostics(self, uri: str) -> None:
+        snapshot = self._snapshot(uri)
+        if snapshot is None:
+            return
+        version, text, path = snapshot
+        analysis = self.analysis(uri, path, text)
+        if not self._is_current(uri, version):
+            # Edited meanwhile: the newer version is already scheduled
+            return
+        positions = TextPositions(text)
+        self._notify(
+            "textDocument/publishDiagnostics",
+            {
+                "uri": uri,
+                "version": version,
+                "diagnostics": [
+                    self._diagnostic(issue, positions) for issue in analysis.metrics.issues
+                ],
+            },
+        )
+
+    @staticmethod
+    def _diagnostic(issue: CodeIssue, positions: TextPositions) -> Dict[str, Any]:
+        diagnostic: Dict[str, Any] = {
+            "range": positions.issue_range(issue),
+            "severity": _SEVERITIES[issue.level],
+            "source": SERVER_NAME,
+            "message": issue.message,
+        }
+        if issue.rule_id:
+            diagnostic["code"] = issue.rule_id
+        return diagnostic
+
+    def _run_request(self, request: _Request) -> None:
+        with self._lock:
+            cancelled = request.id in self._cancelled
+            self._cancelled.discard(request.id)
+        if cancelled:
+            self._send_error(request.id, REQUEST_CANCELLED, "Request cancelled")
+            return
+        try:
+            result = self._code_actions(request)
+        except _ContentModified:
+            self._send_error(request.id, CONTENT_MODIFIED, "Document changed")
+            return
+        except Exception as e:
+            self._send_error(request.id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+            return
+        self._send({"id": request.id, "result": result})
+
+    # Code actions
+
+    def _code_actions(self, request: _Request) -> List[Dict[str, Any]]:
+        params = request.params
+        uri = params["textDocument"]["uri"]
+        snapshot = self._snapshot(uri)
+        if snapshot is None:
+            return []
+        version, text, path = snapshot
+        if version != request.version:
+            raise _ContentModified()
+
+        first = params["range"]["start"]["line"]
+        last = params["range"]["end"]["line"]
+        only = params.get("context", {}).get("only")
+        analysis = self.analysis(uri, path, text)
+
+        actions = []
+        if _wanted(only, QUICK_FIX):
+            actions.extend(self._fix_actions(uri, text, analysis, first, last))
+        if _wanted(only, REFACTOR):
+            actions.extend(self._refactor_actions(uri, path, text, analysis, first, last))
+        return actions
+
+    def _fix_actions(
+        self, uri: str, text: str, analysis: DocumentAnalysis, first: int, last: int
+    ) -> List[Dict[str, Any]]:
+        positions = TextPositions(text)
+        actions = []
+        seen: Set[str] = set()
+        for issue in analysis.metrics.issues:
+            if not first <= issue.line_number - 1 <= last or not self.engine.can_fix(issue):
+                continue
+            result = self.engine.fix(issue, text)
+            fixed = result.fixed
+            # Fixes that break the code, or repeat one already offered, are left out
+            if not result.success or not fixed or fixed == text or fixed in seen:
+                continue
+            if not _parses(fixed):
+                continue
+            seen.add(fixed)
+            actions.append(
+                {
+                    "title": f"Refactron: {result.reason}",
+                    "kind": QUICK_FIX,
+                    "diagnostics": [self._diagnostic(issue, positions)],
+                    "edit": {"changes": {uri: [text_edit(text, fixed)]}},
+                }
+            )
+        return actions
+
+    def _refactor_actions(
+        self,
+        uri: str,
+        path: Path,
+        text: str,
+        analysis: DocumentAnalysis,
+        first: int,
+        last: int,
+    ) -> List[Dict[str, Any]]:
+        if analysis.operations is None:
+            analysis.operations = [
+                operation
+                for refactorer in self.refactron.refactorers
+                for operation in refactorer.refactor(path, text)
+            ]
+
+        actions = []
+        for operation in analysis.operations:
+            if not first <= operation.line_number - 1 <= last:
+                continue
+            new_text = apply_operation(text, operation)
+            if new_text is None or new_text == text:
+                continue
+            actions.append(
+                {
+                    "title": f"Refactron: {operation.description}",
+                    "kind": REFACTOR,
+                    "edit": {"changes": {uri: [text_edit(text, new_text)]}},
+                }
+            )
+        return actions
+
+
+def _wanted(only: Optional[List[str]], kind: str) -> bool:
+    """Whether code actions of ``kind`` match the kinds a request asks for."""
+    return only is None or any(kind == wanted or kind.startswith(f"{wanted}.") for wanted in only)
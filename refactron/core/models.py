@@ -3,7 +3,10 @@
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from refactron.core.profiling import FileProfile
 
 
 class IssueLevel(Enum):
@@ -65,6 +68,8 @@ class FileMetrics:
     functions: int
     classes: int
     issues: List[CodeIssue] = field(default_factory=list)
+    # Timing figures, only set when the analysis runs with profiling enabled
+    profile: Optional["FileProfile"] = field(default=None, compare=False, repr=False)
 
     @property
     def total_lines(self) -> int:
@@ -0,0 +1,248 @@
+"""Classification of imported modules as standard library, third-party or first-party."""
+
+import functools
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
+
+try:  # Python 3.11+
+    import tomllib as _toml
+except ImportError:  # pragma: no cover - depends on the interpreter
+    try:
+        import tomli as _toml  # type: ignore[no-redef]
+    except ImportError:
+        _toml = None  # type: ignore[assignment]
+
+# Import kinds, in PEP 8 order
+STDLIB = "stdlib"
+THIRD_PARTY = "third_party"
+LOCAL = "local"
+
+# Size of the classification LRU shared by every analyzer in a process
+CLASSIFY_CACHE_SIZE = 4096
+
+# Files that mark the root of a project
+PROJECT_MARKERS = ("pyproject.toml", "setup.py", "setup.cfg", ".git")
+
+# Standard library modules for interpreters without sys.stdlib_module_names (before 3.10)
+_FALLBACK_STDLIB_MODULES = """
+    __future__ _ast _collections_abc _io _thread _weakref abc aifc argparse array ast asynchat
+    asyncio asyncore atexit audioop base64 bdb binascii binhex bisect builtins bz2 calendar cgi
+    cgitb chunk cmath cmd code codecs codeop collections colorsys compileall concurrent
+    configparser contextlib contextvars copy copyreg cProfile crypt csv ctypes curses
+    dataclasses datetime dbm decimal difflib dis distutils doctest email encodings ensurepip
+    enum errno faulthandler fcntl filecmp fileinput fnmatch formatter fractions ftplib
+    functools gc genericpath getopt getpass gettext glob graphlib grp gzip hashlib heapq hmac
+    html http idlelib imaplib imghdr imp importlib inspect io ipaddress itertools json keyword
+    lib2to3 linecache locale logging lzma mailbox mailcap marshal math mimetypes mmap
+    modulefinder msvcrt multiprocessing netrc nis nntplib ntpath nturl2path numbers opcode
+    operator optparse os ossaudiodev parser pathlib pdb pickle pickletools pipes pkgutil
+    platform plistlib poplib posix posixpath pprint profile pstats pty pwd py_compile pyclbr
+    pydoc pydoc_data queue quopri random re readline reprlib resource rlcompleter runpy sched
+    secrets select selectors shelve shlex shutil signal site smtpd smtplib sndhdr socket
+    socketserver spwd sqlite3 sre_compile sre_constants sre_parse ssl stat statistics string
+    stringprep struct subprocess sunau symbol symtable sys sysconfig syslog tabnanny tarfile
+    telnetlib tempfile termios test textwrap threading time timeit tkinter token tokenize
+    tomllib trace traceback tracemalloc tty turtle turtledemo types typing unicodedata unittest
+    urllib uu uuid venv warnings wave weakref webbrowser winreg winsound wsgiref xdrlib xml
+    xmlrpc zipapp zipfile zipimport zlib zoneinfo
+    """.split()
+
+
+@functools.lru_cache(maxsize=None)
+def stdlib_module_names() -> FrozenSet[str]:
+    """Return the top-level names of the standard library modules of this interpreter."""
+    names = getattr(sys, "stdlib_module_names", None) or _FALLBACK_STDLIB_MODULES
+    return frozenset(names).union(sys.builtin_module_names)
+
+
+@functools.lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def import_root(directory: str) -> str:
+    """
+    Return the directory a module in ``directory`` is imported from.
+
+    That is the first directory above the packages the module belongs to,
+    i.e. ``src`` for ``src/pkg/sub/mod.py`` when ``pkg`` and ``sub`` hold an
+    ``__init__.py``.
+    """
+    path = directory
+    while os.path.isfile(os.path.join(path, "__init__.py")):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+@functools.lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def first_party_names(root: str) -> FrozenSet[str]:
+    """
+    Return the top-level module names that belong to the project imported from ``root``.
+
+    These are the packages and modules directly in ``root``, plus the
+    packages declared in, or laid out next to, the ``pyproject.toml`` of the
+    project ``root`` is part of.
+    """
+    names = set(_top_level_modules(root))
+
+    project = _project_root(root)
+    _layout_stamps[root] = _layout_stamp(root, project)
+    if project is not None:
+        names.update(_top_level_modules(os.path.join(project, "src")))
+        if project != root:
+            names.update(_top_level_modules(project))
+        names.update(_pyproject_packages(os.path.join(project, "pyproject.toml")))
+    return frozenset(names)
+
+
+@functools.lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def classify_module(module: str, root: Optional[str] = None) -> str:
+    """
+    Classify an imported module as :data:`STDLIB`, :data:`THIRD_PARTY` or :data:`LOCAL`.
+
+    Args:
+        module: Dotted module name; relative names start with a dot
+        root: Directory the importing module is imported from, as returned
+            by :func:`import_root`; without it nothing counts as first-party
+            except relative imports
+
+    Returns:
+        The kind of import
+    """
+    if module.startswith("."):
+        return LOCAL
+    top = module.split(".", 1)[0]
+    if top in stdlib_module_names():
+        return STDLIB
+    if root is not None and top in first_party_names(root):
+        return LOCAL
+    return THIRD_PARTY
+
+
+def classify_import(module: str, file_path: Union[str, Path, None] = None) -> str:
+    """
+    Classify a module imported by the file at ``file_path``.
+
+    Results are memoized in process-wide LRU caches, so every analyzer and
+    every file of a project share them; worker processes started by forking
+    inherit what the parent has already resolved.
+    """
+    root = None
+    if file_path is not None:
+        root = import_root(os.path.dirname(os.path.abspath(file_path)))
+    return classify_module(module, root)
+
+
+def layout_fingerprint(file_path: Union[str, Path]) -> str:
+    """Return the first-party names seen by the file at ``file_path``, for cache keys."""
+    root = import_root(os.path.dirname(os.path.abspath(file_path)))
+    return "\n".join(sorted(first_party_names(root)))
+
+
+def clear_caches() -> None:
+    """Forget everything resolved so far, e.g. after the project layout changed."""
+    import_root.cache_clear()
+    first_party_names.cache_clear()
+    classify_module.cache_clear()
+    _layout_stamps.clear()
+
+
+def refresh_caches() -> bool:
+    """
+    Clear the caches if the layout of a project resolved so far has changed.
+
+    Long-running processes call this before each analysis: it only stats the
+    directories and ``pyproject.toml`` the first-party names were read from,
+    whose modification times change when modules are added or removed.
+
+    Returns:
+        Whether the caches were cleared
+    """
+    for root, stamp in list(_layout_stamps.items()):
+        if _layout_stamp(root, _project_root(root)) != stamp:
+            clear_caches()
+            return True
+    return False
+
+
+# Modification times of what first_party_names() read, by root
+_layout_stamps: Dict[str, Tuple[Optional[int], ...]] = {}
+
+
+def _layout_stamp(root: str, project: Optional[str]) -> Tuple[Optional[int], ...]:
+    paths = [root]
+    if project is not None:
+        paths.extend(
+            [project, os.path.join(project, "src"), os.path.join(project, "pyproject.toml")]
+        )
+    stamp: List[Optional[int]] = []
+    for path in paths:
+        try:
+            stamp.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _top_level_modules(directory: str) -> List[str]:
+    """Return the packages and modules directly inside ``directory``."""
+    names = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(".py") and entry.is_file():
+                    names.append(name[:-3])
+                elif entry.is_dir() and os.path.isfile(os.path.join(entry.path, "__init__.py")):
+                    names.append(name)
+    except OSError:
+        pass
+    return names
+
+
+def _project_root(directory: str) -> Optional[str]:
+    """Return the nearest directory at or above ``directory`` with a project marker."""
+    path = directory
+    while True:
+        if any(os.path.exists(os.path.join(path, marker)) for marker in PROJECT_MARKERS):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _pyproject_packages(path: str) -> Set[str]:
+    """Return the top-level package names declared in a ``pyproject.toml``."""
+    if _toml is None or not os.path.isfile(path):
+        return set()
+    try:
+        with open(path, "rb") as f:
+            data: Dict[str, Any] = _toml.load(f)
+    except (OSError, ValueError):
+        return set()
+
+    names: Set[str] = set()
+    project_name = data.get("project", {}).get("name")
+    if isinstance(project_name, str):
+        names.add(project_name.replace("-", "_").replace(".", "_").lower())
+
+    tool = data.get("tool", {})
+    setuptools = tool.get("setuptools", {})
+    packages = setuptools.get("packages")
+    if isinstance(packages, list):
+        names.update(str(package).split(".")[0] for package in packages)
+    elif isinstance(packages, dict):
+        find = packages.get("find", {})
+        for pattern in find.get("include", []):
+            top = str(pattern).split(".")[0].rstrip("*")
+            if top:
+                names.add(top)
+        for where in find.get("where", []):
+            names.update(_top_level_modules(os.path.join(os.path.dirname(path), where)))
+
+    for package in tool.get("poetry", {}).get("packages", []):
+        if isinstance(package, dict) and isinstance(package.get("include"), str):
+            names.add(package["include"].split("/")[0].split(".")[0])
+    return names
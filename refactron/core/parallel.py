@@ -0,0 +1,150 @@
+"""Process-pool execution of per-file analysis and refactoring."""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from refactron.core.config import RefactronConfig
+from refactron.core.models import FileMetrics, RefactoringOperation
+
+if TYPE_CHECKING:
+    from refactron.core.refactron import Refactron
+    from refactron.core.reference_index import ModuleReferences
+
+T = TypeVar("T")
+
+# Upper bound on files per submitted chunk, so slow files do not pile up in one worker
+MAX_CHUNK_SIZE = 64
+
+# Chunks kept in flight per worker; bounds memory on very large trees
+CHUNKS_PER_WORKER = 4
+
+# Refactron instance owned by a worker process, built once by _init_worker
+_worker_refactron: Optional["Refactron"] = None
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """
+    Turn a ``workers`` option into a process count.
+
+    Args:
+        workers: Requested number of processes. ``None`` or 1 means serial,
+            0 or a negative number means one process per CPU.
+
+    Returns:
+        Number of processes to use (1 means run in-process)
+    """
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def chunk_size_for(total: int, workers: int) -> int:
+    """Pick a chunk size giving each worker several chunks to balance load."""
+    size = -(-total // (workers * CHUNKS_PER_WORKER))
+    return max(1, min(MAX_CHUNK_SIZE, size))
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[List[T]]:
+    """Split ``items`` into consecutive lists of at most ``size`` items."""
+    for start in range(0, len(items), size):
+        yield list(items[start : start + size])
+
+
+def _init_worker(config: RefactronConfig) -> None:
+    """Build the worker's analyzers and refactorers once, when the process starts."""
+    global _worker_refactron
+    from refactron.core.refactron import Refactron
+
+    _worker_refactron = Refactron(config)
+
+
+def _get_worker_refactron() -> "Refactron":
+    """Return the Refactron built for this worker process."""
+    if _worker_refactron is None:
+        raise RuntimeError("Worker process was not initialized")
+    return _worker_refactron
+
+
+def analyze_chunk(files: List[Path]) -> List[FileMetrics]:
+    """Analyze a chunk of files inside a worker process."""
+    refactron = _get_worker_refactron()
+    return [refactron._analyze_file(file_path) for file_path in files]
+
+
+def analyze_references_chunk(
+    files: List[Path],
+) -> List[Tuple[FileMetrics, Optional["ModuleReferences"]]]:
+    """Analyze a chunk of files inside a worker process, with their reference index entries."""
+    from refactron.core.import_graph import PackageLayout
+
+    refactron = _get_worker_refactron()
+    layout = PackageLayout()
+    return [refactron._analyze_with_references(file_path, layout) for file_path in files]
+
+
+def refactor_chunk(
+    files: List[Path], operation_types: Optional[List[str]]
+) -> List[List[RefactoringOperation]]:
+    """Collect refactoring operations for a chunk of files inside a worker process."""
+    refactron = _get_worker_refactron()
+    return [refactron._refactor_file(file_path, operation_types) for file_path in files]
+
+
+def map_files(
+    chunk_func: Callable[..., List[T]],
+    files: Sequence[Path],
+    config: RefactronConfig,
+    workers: int,
+    *args: Any,
+) -> Generator[T, None, None]:
+    """
+    Run ``chunk_func`` over ``files`` in a process pool.
+
+    Files are submitted in chunks, with a bounded number of chunks in flight.
+    Results are yielded per file in the order of ``files``, regardless of
+    which worker finishes first, so merging them is deterministic.
+
+    Args:
+        chunk_func: Module-level function taking a list of files (plus ``args``)
+            and returning one result per file
+        files: Files to process
+        config: Configuration used to build each worker's Refactron
+        workers: Number of worker processes
+        *args: Extra arguments passed to ``chunk_func``
+
+    Returns:
+        Iterator over per-file results
+    """
+    size = chunk_size_for(len(files), workers)
+    chunks = chunked(files, size)
+    max_in_flight = workers * CHUNKS_PER_WORKER
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(config,)
+    ) as executor:
+        pending: Deque["Future[List[T]]"] = deque()
+
+        for chunk in chunks:
+            pending.append(executor.submit(chunk_func, chunk, *args))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
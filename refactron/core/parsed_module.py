@@ -0,0 +1,225 @@
+"""Per-file parsed module shared by all analyzers."""
+
+import ast
+import io
+import os
+import tokenize
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from refactron.core.clones import StatementHashes
+    from refactron.core.code_metrics import CodeMetrics
+    from refactron.core.line_counts import LineCounts
+    from refactron.core.symbols import SymbolTable
+
+
+class ParsedModule:
+    """
+    Source code of a single file together with its lazily computed views.
+
+    The lines, AST, token stream, line counts, symbol table, code metrics and
+    statement hashes are each computed at most once and then shared by every
+    analyzer that runs over the file. Analyzers must treat the tree as
+    read-only.
+
+    Example:
+        >>> module = ParsedModule(Path("example.py"), "x = 1\\n")
+        >>> isinstance(module.tree, ast.Module)
+        True
+    """
+
+    def __init__(self, file_path: Path, source_code: str):
+        """
+        Initialize the parsed module.
+
+        Args:
+            file_path: Path to the file the source was read from
+            source_code: Source code content
+        """
+        self.file_path = file_path
+        self.source = source_code
+        self._lines: Optional[List[str]] = None
+        self._tree: Optional[ast.Module] = None
+        self._syntax_error: Optional[SyntaxError] = None
+        self._tokens: Optional[List[tokenize.TokenInfo]] = None
+        self._symbols: Optional["SymbolTable"] = None
+        self._code_metrics: Optional["CodeMetrics"] = None
+        self._line_counts: Optional["LineCounts"] = None
+        self._statement_hashes: Optional["StatementHashes"] = None
+
+    @classmethod
+    def from_file(cls, file_path: Union[str, Path]) -> "ParsedModule":
+        """Read a file from disk and wrap it without parsing it yet."""
+        path = Path(file_path)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(path, f.read())
+
+    @classmethod
+    def from_bytes(cls, file_path: Union[str, Path], data: bytes) -> "ParsedModule":
+        """Wrap raw file contents, decoded exactly as :meth:`from_file` reads them."""
+        with io.TextIOWrapper(io.BytesIO(data), encoding="utf-8") as f:
+            return cls(Path(file_path), f.read())
+
+    @property
+    def lines(self) -> List[str]:
+        """Source lines, split on newlines exactly like ``source.split("\\n")``."""
+        if self._lines is None:
+            self._lines = self.source.split("\n")
+        return self._lines
+
+    @property
+    def tree(self) -> ast.Module:
+        """
+        The parsed AST.
+
+        Raises:
+            SyntaxError: If the source cannot be parsed. The error is cached
+                and re-raised on every access so the file is parsed only once.
+        """
+        if self._tree is None:
+            if self._syntax_error is not None:
+                raise self._syntax_error
+            try:
+                self._tree = ast.parse(self.source)
+            except SyntaxError as e:
+                self._syntax_error = e
+                raise
+        return self._tree
+
+    @property
+    def syntax_error(self) -> Optional[SyntaxError]:
+        """The syntax error raised while parsing, or None if the source is valid."""
+        try:
+            self.tree
+        except SyntaxError:
+            pass
+        return self._syntax_error
+
+    @property
+    def tokens(self) -> List[tokenize.TokenInfo]:
+        """
+        The token stream of the source.
+
+        Tokenization stops at the first tokenizer error, in which case the
+        tokens produced so far are returned.
+        """
+        if self._tokens is None:
+            tokens: List[tokenize.TokenInfo] = []
+            try:
+                for token in tokenize.generate_tokens(io.StringIO(self.source).readline):
+                    tokens.append(token)
+            except (tokenize.TokenError, SyntaxError):
+                pass
+            self._tokens = tokens
+        return self._tokens
+
+    @property
+    def line_counts(self) -> "LineCounts":
+        """Code, comment, docstring and blank line counts, from the token stream."""
+        if self._line_counts is None:
+            from refactron.core.line_counts import count_lines
+
+            self._line_counts = count_lines(self.tokens, self.lines)
+        return self._line_counts
+
+    @property
+    def symbols(self) -> "SymbolTable":
+        """
+        Name bindings and references of the module, by scope.
+
+        Raises:
+            SyntaxError: If the source cannot be parsed
+        """
+        if self._symbols is None:
+            from refactron.core.symbols import SymbolTable
+
+            self._symbols = SymbolTable.build(self.tree)
+        return self._symbols
+
+    @property
+    def code_metrics(self) -> "CodeMetrics":
+        """
+        Complexity, Halstead and maintainability figures of the module.
+
+        Raises:
+            SyntaxError: If the source cannot be parsed
+        """
+        if self._code_metrics is None:
+            from refactron.core.code_metrics import measure_module
+
+            self._code_metrics = measure_module(self)
+        return self._code_metrics
+
+    @property
+    def statement_hashes(self) -> "StatementHashes":
+        """
+        Normalized hashes of the module's statements, for finding repeated code.
+
+        Raises:
+            SyntaxError: If the source cannot be parsed
+        """
+        if self._statement_hashes is None:
+            from refactron.core.clones import StatementHashes
+
+            self._statement_hashes = StatementHashes.build(self.tree)
+        return self._statement_hashes
+
+
+class ModuleCache:
+    """
+    Recently read modules, kept with everything already computed for them.
+
+    A module is served again as long as its file's size and modification
+    time are unchanged, so a long-running process such as the daemon parses
+    an unchanged file only once. The least recently used modules are
+    dropped beyond ``max_entries``.
+
+    Example:
+        >>> cache = ModuleCache()
+        >>> cache.load(Path("example.py")) is cache.load(Path("example.py"))
+        True
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Number of modules to keep
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, int, ParsedModule]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, file_path: Union[str, Path]) -> ParsedModule:
+        """
+        Return the module for a file, reading it only if it changed since last time.
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        module = ParsedModule.from_file(file_path)
+        self._entries[key] = (stat.st_mtime_ns, stat.st_size, module)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return module
+
+    def clear(self) -> None:
+        """Drop every module."""
+        self._entries.clear()
@@ -0,0 +1,229 @@
+"""Opt-in timing of analyzers, node rules and files."""
+
+import cProfile
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from refactron.analyzers.base_analyzer import BaseAnalyzer
+    from refactron.core.dispatch import NodeRule, RuleContext
+
+T = TypeVar("T")
+
+# Slowest files kept by an AnalysisProfile
+DEFAULT_MAX_FILES = 25
+
+
+@dataclass
+class TimingStats:
+    """Accumulated wall time and counters for one analyzer or rule."""
+
+    seconds: float = 0.0
+    nodes: int = 0
+    files: int = 0
+    issues: int = 0
+
+    def merge(self, other: "TimingStats") -> None:
+        """Add another set of figures to this one."""
+        self.seconds += other.seconds
+        self.nodes += other.nodes
+        self.files += other.files
+        self.issues += other.issues
+
+
+@dataclass
+class FileProfile:
+    """
+    Timing figures for the analysis of a single file.
+
+    ``analyzers`` maps analyzer names to the time spent in each analyzer
+    (setup, node rules and final checks), the nodes handed to its rules and
+    the issues it returned. ``rules`` maps ``analyzer.rule`` names to the
+    time and node count of each node rule, and the issues reported directly
+    from the rule; issues an analyzer only emits once the traversal is done
+    are counted for the analyzer alone.
+    """
+
+    file_path: Path
+    seconds: float = 0.0
+    parse_seconds: float = 0.0
+    nodes: int = 0
+    issues: int = 0
+    analyzers: Dict[str, TimingStats] = field(default_factory=dict)
+    rules: Dict[str, TimingStats] = field(default_factory=dict)
+
+
+class Profiler:
+    """
+    Collects timing figures for the files analyzed by one process.
+
+    :meth:`profile_file` returns a :class:`FileProfiler` that
+    :func:`refactron.core.dispatch.run_analyzers` uses to time each analyzer
+    call and each node rule. Without a profiler nothing is wrapped, so a
+    normal analysis pays no overhead.
+
+    Optionally runs :mod:`cProfile` around every call into one analyzer;
+    :meth:`dump_stats` writes the collected statistics in :mod:`pstats`
+    format.
+
+    Example:
+        >>> profiler = Profiler(cprofile_analyzer="security")
+        >>> refactron = Refactron(config, profiler=profiler)
+        >>> result = refactron.analyze("src")
+        >>> profiler.dump_stats(Path("security.pstats"))
+    """
+
+    def __init__(self, cprofile_analyzer: Optional[str] = None):
+        """
+        Initialize the profiler.
+
+        Args:
+            cprofile_analyzer: Name of an analyzer to run under cProfile
+        """
+        self.cprofile_analyzer = cprofile_analyzer
+        self.cprofile: Optional[cProfile.Profile] = (
+            cProfile.Profile() if cprofile_analyzer else None
+        )
+
+    def profile_file(self, file_path: Path) -> "FileProfiler":
+        """Start recording the figures of one file."""
+        return FileProfiler(self, FileProfile(file_path))
+
+    def cprofile_for(self, analyzer: "BaseAnalyzer") -> Optional[cProfile.Profile]:
+        """Return the cProfile profile to enable around ``analyzer``, if any."""
+        if self.cprofile is not None and analyzer.name == self.cprofile_analyzer:
+            return self.cprofile
+        return None
+
+    def dump_stats(self, path: Path) -> bool:
+        """
+        Write the cProfile statistics collected so far.
+
+        Args:
+            path: Output file, readable with :class:`pstats.Stats`
+
+        Returns:
+            False if no analyzer was run under cProfile
+        """
+        if self.cprofile is None:
+            return False
+        self.cprofile.dump_stats(str(path))
+        return True
+
+
+class FileProfiler:
+    """Records the :class:`FileProfile` of one file while its analyzers run."""
+
+    def __init__(self, profiler: Profiler, record: FileProfile):
+        self.profiler = profiler
+        self.record = record
+
+    def _analyzer_stats(self, analyzer: "BaseAnalyzer") -> TimingStats:
+        stats = self.record.analyzers.get(analyzer.name)
+        if stats is None:
+            stats = self.record.analyzers[analyzer.name] = TimingStats(files=1)
+        return stats
+
+    def call(self, analyzer: "BaseAnalyzer", func: Callable[..., T], *args: Any) -> T:
+        """Call ``func(*args)`` on behalf of ``analyzer`` and add the time it took."""
+        profile = self.profiler.cprofile_for(analyzer)
+        if profile is not None:
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            self._analyzer_stats(analyzer).seconds += elapsed
+
+    def wrap_rule(self, analyzer: "BaseAnalyzer", rule: "NodeRule") -> "NodeRule":
+        """Return ``rule`` wrapped to add its time, nodes and issues to the record."""
+        analyzer_stats = self._analyzer_stats(analyzer)
+        name = f"{analyzer.name}.{getattr(rule, '__name__', 'rule')}"
+        rule_stats = self.record.rules.get(name)
+        if rule_stats is None:
+            rule_stats = self.record.rules[name] = TimingStats(files=1)
+        profile = self.profiler.cprofile_for(analyzer)
+        clock = time.perf_counter
+
+        def timed_rule(node: Any, context: "RuleContext") -> None:
+            before = len(context.issues)
+            if profile is not None:
+                profile.enable()
+            start = clock()
+            try:
+                rule(node, context)
+            finally:
+                elapsed = clock() - start
+                if profile is not None:
+                    profile.disable()
+                rule_stats.seconds += elapsed
+                rule_stats.nodes += 1
+                rule_stats.issues += len(context.issues) - before
+                analyzer_stats.seconds += elapsed
+                analyzer_stats.nodes += 1
+
+        return timed_rule
+
+    def finish_analyzer(self, analyzer: "BaseAnalyzer", issues: List[Any]) -> None:
+        """Record the issues an analyzer returned for the file."""
+        self._analyzer_stats(analyzer).issues += len(issues)
+
+
+@dataclass
+class AnalysisProfile:
+    """
+    Figures summed over every profiled file of an analysis.
+
+    Only the ``max_files`` slowest files are kept, so memory stays bounded
+    on very large trees.
+    """
+
+    files: int = 0
+    seconds: float = 0.0
+    parse_seconds: float = 0.0
+    nodes: int = 0
+    issues: int = 0
+    analyzers: Dict[str, TimingStats] = field(default_factory=dict)
+    rules: Dict[str, TimingStats] = field(default_factory=dict)
+    max_files: int = DEFAULT_MAX_FILES
+    _slowest: List[Tuple[float, int, FileProfile]] = field(
+        default_factory=list, init=False, repr=False
+    )
+    _counter: Iterator[int] = field(default_factory=itertools.count, init=False, repr=False)
+
+    def add(self, record: FileProfile) -> None:
+        """Add the figures of one more file."""
+        self.files += 1
+        self.seconds += record.seconds
+        self.parse_seconds += record.parse_seconds
+        self.nodes += record.nodes
+        self.issues += record.issues
+        for totals, figures in ((self.analyzers, record.analyzers), (self.rules, record.rules)):
+            for name, stats in figures.items():
+                totals.setdefault(name, TimingStats()).merge(stats)
+
+        entry = (record.seconds, next(self._counter), record)
+        if len(self._slowest) < self.max_files:
+            heapq.heappush(self._slowest, entry)
+        elif entry[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest_analyzers(self, limit: Optional[int] = None) -> List[Tuple[str, TimingStats]]:
+        """Return analyzers ordered by total time, slowest first."""
+        return sorted(self.analyzers.items(), key=lambda item: -item[1].seconds)[:limit]
+
+    def slowest_rules(self, limit: Optional[int] = None) -> List[Tuple[str, TimingStats]]:
+        """Return node rules ordered by total time, slowest first."""
+        return sorted(self.rules.items(), key=lambda item: -item[1].seconds)[:limit]
+
+    def slowest_files(self, limit: Optional[int] = None) -> List[FileProfile]:
+        """Return the slowest files kept, slowest first."""
+        ordered = sorted(self._slowest, key=lambda entry: (-entry[0], entry[1]))
+        return [record for _, _, record in ordered][:limit]
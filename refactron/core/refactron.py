@@ -1,27 +1,56 @@
 """Main Refactron class - the entry point for all operations."""
 
+import dataclasses
 import os
+import time
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from refactron.analyzers.base_analyzer import BaseAnalyzer
-from refactron.analyzers.code_smell_analyzer import CodeSmellAnalyzer
-from refactron.analyzers.complexity_analyzer import ComplexityAnalyzer
-from refactron.analyzers.dead_code_analyzer import DeadCodeAnalyzer
-from refactron.analyzers.dependency_analyzer import DependencyAnalyzer
-from refactron.analyzers.performance_analyzer import PerformanceAnalyzer
-from refactron.analyzers.security_analyzer import SecurityAnalyzer
-from refactron.analyzers.type_hint_analyzer import TypeHintAnalyzer
-from refactron.core.analysis_result import AnalysisResult
+from refactron.core.analysis_result import AnalysisAggregate, AnalysisResult
+from refactron.core.cache import AnalysisCache
+from refactron.core.clone_index import CloneIndex
 from refactron.core.config import RefactronConfig
+from refactron.core.discovery import discover_files
+from refactron.core.dispatch import NodeDispatcher, run_analyzers
+from refactron.core.import_graph import ImportGraph, PackageLayout, graph_cache_path
+from refactron.core.incremental import find_dependents, git_changed_files
 from refactron.core.models import FileMetrics
+from refactron.core.parallel import (
+    analyze_chunk,
+    analyze_references_chunk,
+    map_files,
+    refactor_chunk,
+    resolve_workers,
+)
+from refactron.core.parsed_module import ModuleCache, ParsedModule
+from refactron.core.profiling import AnalysisProfile, Profiler
 from refactron.core.refactor_result import RefactorResult
-from refactron.refactorers.add_docstring_refactorer import AddDocstringRefactorer
+from refactron.core.reference_index import ModuleReferences, ReferenceIndex, module_references
+from refactron.core.registry import analyzer_cacheable, create_analyzers, create_refactorers
 from refactron.refactorers.base_refactorer import BaseRefactorer
-from refactron.refactorers.extract_method_refactorer import ExtractMethodRefactorer
-from refactron.refactorers.magic_number_refactorer import MagicNumberRefactorer
-from refactron.refactorers.reduce_parameters_refactorer import ReduceParametersRefactorer
-from refactron.refactorers.simplify_conditionals_refactorer import SimplifyConditionalsRefactorer
+
+if TYPE_CHECKING:
+    from refactron.analyzers.dead_code_analyzer import DeadCodeAnalyzer
+
+T = TypeVar("T")
+ProjectIndex = TypeVar("ProjectIndex", ImportGraph, ReferenceIndex, CloneIndex)
 
 
 class Refactron:
@@ -34,115 +63,497 @@ class Refactron:
         >>> print(result.report())
     """
 
-    def __init__(self, config: Optional[RefactronConfig] = None):
+    def __init__(
+        self, config: Optional[RefactronConfig] = None, profiler: Optional[Profiler] = None
+    ):
         """
         Initialize Refactron.
 
         Args:
             config: Configuration object. If None, uses default config.
+            profiler: Profiler recording analyzer, rule and file timings. One
+                is created when ``config.profiling_enabled`` is set; pass one
+                to also run an analyzer under cProfile.
         """
         self.config = config or RefactronConfig.default()
+        self.profiler = profiler
+        if self.profiler is None and self.config.profiling_enabled:
+            self.profiler = Profiler()
         self.analyzers: List[BaseAnalyzer] = []
         self.refactorers: List[BaseRefactorer] = []
         self._initialize_analyzers()
         self._initialize_refactorers()
+        self.cache: Optional[AnalysisCache] = None
+        if self.config.cache_enabled:
+            self.cache = AnalysisCache.from_config(self.config, self._cached_analyzers())
+        # Keeps parsed modules between analyses in long-running processes
+        self.module_cache: Optional[ModuleCache] = None
 
     def _initialize_analyzers(self) -> None:
         """Initialize all enabled analyzers."""
-        if "complexity" in self.config.enabled_analyzers:
-            self.analyzers.append(ComplexityAnalyzer(self.config))
+        self.analyzers.extend(create_analyzers(self.config))
 
-        if "code_smells" in self.config.enabled_analyzers:
-            self.analyzers.append(CodeSmellAnalyzer(self.config))
+    def _initialize_refactorers(self) -> None:
+        """Initialize all enabled refactorers."""
+        self.refactorers.extend(create_refactorers(self.config))
 
-        if "security" in self.config.enabled_analyzers:
-            self.analyzers.append(SecurityAnalyzer(self.config))
+    def analyze(
+        self,
+        target: Union[str, Path],
+        workers: Optional[int] = None,
+        changed_since: Optional[str] = None,
+        files: Optional[Sequence[Path]] = None,
+    ) -> AnalysisResult:
+        """
+        Analyze a file or directory.
 
-        if "dependency" in self.config.enabled_analyzers:
-            self.analyzers.append(DependencyAnalyzer(self.config))
+        Args:
+            target: Path to file or directory to analyze
+            workers: Number of worker processes. ``None`` or 1 analyzes in this
+                process, 0 uses one process per CPU. Workers build their own
+                analyzers from ``self.config``.
+            changed_since: Git revision. If given, only Python files changed
+                since this revision (and the files importing them) are
+                analyzed; cached results are reported for the other files.
+            files: Files to analyze, as returned by :meth:`discover_files`
+                for ``target``. Discovered from ``target`` when None.
 
-        if "dead_code" in self.config.enabled_analyzers:
-            self.analyzers.append(DeadCodeAnalyzer(self.config))
+        Returns:
+            AnalysisResult containing all detected issues
 
-        if "type_hints" in self.config.enabled_analyzers:
-            self.analyzers.append(TypeHintAnalyzer(self.config))
+        Raises:
+            FileNotFoundError: If the target does not exist
+            GitError: If ``changed_since`` is given and git cannot list the changes
+        """
+        result = AnalysisResult()
+        if self.profiler is not None:
+            result.profile = AnalysisProfile()
 
-        if "performance" in self.config.enabled_analyzers:
-            self.analyzers.append(PerformanceAnalyzer(self.config))
+        for file_metrics in self.iter_analyze(target, workers, changed_since, files=files):
+            result.file_metrics.append(file_metrics)
+            result.total_issues += file_metrics.issue_count
+            if result.profile is not None and file_metrics.profile is not None:
+                result.profile.add(file_metrics.profile)
 
-    def _initialize_refactorers(self) -> None:
-        """Initialize all enabled refactorers."""
-        if "extract_method" in self.config.enabled_refactorers:
-            self.refactorers.append(ExtractMethodRefactorer(self.config))
+        result.total_files = len(result.file_metrics)
+        return result
 
-        if "extract_constant" in self.config.enabled_refactorers:
-            self.refactorers.append(MagicNumberRefactorer(self.config))
+    def iter_analyze(
+        self,
+        target: Union[str, Path],
+        workers: Optional[int] = None,
+        changed_since: Optional[str] = None,
+        aggregate: Optional[AnalysisAggregate] = None,
+        files: Optional[Sequence[Path]] = None,
+    ) -> Iterator[FileMetrics]:
+        """
+        Analyze a file or directory, yielding each file's results as they are ready.
 
-        if "simplify_conditionals" in self.config.enabled_refactorers:
-            self.refactorers.append(SimplifyConditionalsRefactorer(self.config))
+        Unlike :meth:`analyze`, nothing is accumulated: results can be
+        reported and dropped one file at a time, keeping memory bounded on
+        very large trees. Files are yielded in the same order as
+        :meth:`analyze` reports them.
 
-        if "reduce_parameters" in self.config.enabled_refactorers:
-            self.refactorers.append(ReduceParametersRefactorer(self.config))
+        With ``project_dead_code``, files missing from the saved reference
+        index, or changed since it was saved, are analyzed before the first
+        result is yielded, since their references can change the dead code
+        findings of any other file.
 
-        if "add_docstring" in self.config.enabled_refactorers:
-            self.refactorers.append(AddDocstringRefactorer(self.config))
+        Args:
+            target: Path to file or directory to analyze
+            workers: Number of worker processes, as for :meth:`analyze`
+            changed_since: Git revision, as for :meth:`analyze`
+            aggregate: Running totals to update before each file is yielded
+            files: Files to analyze, as for :meth:`analyze`
+
+        Yields:
+            FileMetrics for each analyzed file
 
-    def analyze(self, target: Union[str, Path]) -> AnalysisResult:
+        Raises:
+            FileNotFoundError: If the target does not exist
+            GitError: If ``changed_since`` is given and git cannot list the changes
         """
-        Analyze a file or directory.
+        target_path = Path(target)
+
+        if not target_path.exists():
+            raise FileNotFoundError(f"Target not found: {target}")
+
+        if files is None:
+            files = self.discover_files(target_path)
+        project_files = files
+
+        reused: Dict[Path, FileMetrics] = {}
+        to_analyze = files
+        if changed_since is not None:
+            to_analyze, reused = self._select_changed_files(target_path, files, changed_since)
+            selected = set(to_analyze)
+            files = [f for f in files if f in selected or f in reused]
+
+        dead_code = self._dead_code_analyzer(target_path)
+        index: Optional[ReferenceIndex] = None
+        early: Dict[Path, FileMetrics] = {}
+        if dead_code is not None:
+            index, early = self._update_reference_index(
+                target_path, workers, project_files, to_analyze
+            )
+        rest = [file_path for file_path in to_analyze if file_path not in early]
+        analyzed = self._map_files(rest, workers, analyze_chunk, self._analyze_file)
+
+        try:
+            for file_path in files:
+                if file_path in reused:
+                    file_metrics = reused[file_path]
+                elif file_path in early:
+                    file_metrics = early.pop(file_path)
+                else:
+                    file_metrics = next(analyzed)
+                if dead_code is not None and index is not None:
+                    dead_code.apply_reference_index(file_metrics, index)
+                if aggregate is not None:
+                    aggregate.add(file_metrics)
+                yield file_metrics
+        finally:
+            analyzed.close()
+            # Workers write to the cache from their own processes
+            if self.cache is not None and (self.cache.writes or resolve_workers(workers) > 1):
+                self.cache.prune()
+
+    def _dead_code_analyzer(
+        self, target_path: Path, streaming: bool = True
+    ) -> Optional["DeadCodeAnalyzer"]:
+        """
+        Return the dead code analyzer when its results are judged by the whole project.
+
+        Unless ``project_dead_code`` says otherwise, streamed analyses only do
+        so with the cache, which keeps the reference index between runs.
+        """
+        enabled = self.config.project_dead_code
+        if enabled is None:
+            enabled = self.cache is not None or not streaming
+        if not enabled or not target_path.is_dir():
+            return None
+        from refactron.analyzers.dead_code_analyzer import DeadCodeAnalyzer
+
+        for analyzer in self.analyzers:
+            if isinstance(analyzer, DeadCodeAnalyzer):
+                return analyzer
+        return None
+
+    def _update_reference_index(
+        self,
+        target_path: Path,
+        workers: Optional[int],
+        files: Sequence[Path],
+        to_analyze: Sequence[Path],
+    ) -> Tuple[ReferenceIndex, Dict[Path, FileMetrics]]:
+        """
+        Bring the project reference index up to date from the analysis itself.
+
+        The index saved in the cache directory is loaded and its entries are
+        kept for unchanged files. Stale files among ``to_analyze`` are analyzed
+        now and indexed from the same parse; only the other stale files are
+        scanned.
+
+        Returns:
+            The index, and the metrics of the files analyzed to build it
+        """
+        index = self._saved_reference_index(target_path)
+        stale, removed = index.stale(files)
+
+        wanted = set(to_analyze)
+        run = [file_path for file_path in stale if file_path in wanted]
+        unscanned = [file_path for file_path in stale if file_path not in wanted]
+        early = dict(zip(run, self.analyze_files(run, workers, reference_index=index)))
+        changed = index.update_files(
+            unscanned, resolve_workers(workers), self.config, removed=removed
+        )
+        if run or changed:
+            self.save_reference_index(index)
+        return index, early
+
+    def _saved_reference_index(self, target_path: Path) -> ReferenceIndex:
+        """Return the reference index saved in the cache directory as is, or an empty one."""
+        index, _ = self._load_project_index(ReferenceIndex, "reference-index", target_path)
+        return index if index is not None else ReferenceIndex(target_path)
+
+    def analyze_files(
+        self,
+        files: Sequence[Path],
+        workers: Optional[int] = None,
+        reference_index: Optional[ReferenceIndex] = None,
+    ) -> List[FileMetrics]:
+        """
+        Analyze exactly the given files, e.g. those that changed since the last analysis.
+
+        No project-wide judgement is applied; see :meth:`apply_reference_index`.
 
         Args:
-            target: Path to file or directory to analyze
+            files: Files to analyze
+            workers: Number of worker processes, as for :meth:`analyze`
+            reference_index: Index to update with the files, from the same
+                parse as their analysis; its :attr:`~ReferenceIndex.affected`
+                then lists the files whose dead code findings may have changed
 
         Returns:
-            AnalysisResult containing all detected issues
+            FileMetrics of each file, in the order of ``files``
+        """
+        if reference_index is None:
+            return list(self._map_files(files, workers, analyze_chunk, self._analyze_file))
+
+        layout = PackageLayout()
+        results = self._map_files(
+            files,
+            workers,
+            analyze_references_chunk,
+            lambda file_path: self._analyze_with_references(file_path, layout),
+        )
+        metrics: List[FileMetrics] = []
+        entries: List[ModuleReferences] = []
+        unscanned: List[Path] = []
+        for file_path, (file_metrics, entry) in zip(files, results):
+            metrics.append(file_metrics)
+            if entry is None:
+                # Served from the cache without parsing
+                unscanned.append(file_path)
+            else:
+                entries.append(entry)
+        reference_index.update_files(
+            unscanned, resolve_workers(workers), self.config, entries=entries
+        )
+        return metrics
+
+    def project_reference_index(self, target: Union[str, Path]) -> Optional[ReferenceIndex]:
+        """
+        Return the reference index dead code is judged by, for long-running analyses.
+
+        The index is returned as saved in the cache directory, or empty, and
+        is brought up to date with :meth:`analyze_files` and
+        :meth:`update_reference_index`.
+
+        Args:
+            target: Project directory
+
+        Returns:
+            The index, or None when dead code is not judged by the whole project
         """
         target_path = Path(target)
+        if self._dead_code_analyzer(target_path, streaming=False) is None:
+            return None
+        return self._saved_reference_index(target_path)
 
-        if not target_path.exists():
-            raise FileNotFoundError(f"Target not found: {target}")
+    def update_reference_index(
+        self,
+        index: ReferenceIndex,
+        changed: Iterable[Path] = (),
+        removed: Iterable[Path] = (),
+        workers: Optional[int] = None,
+    ) -> Set[Path]:
+        """
+        Rescan changed files and drop removed ones from a reference index.
 
-        if target_path.is_file():
-            files = [target_path]
-        else:
-            files = self._get_python_files(target_path)
+        Args:
+            index: Index to update, e.g. from :meth:`project_reference_index`
+            changed: Files to scan again
+            removed: Files no longer in the project
+            workers: Number of worker processes for scanning
 
-        result = AnalysisResult(total_files=len(files))
+        Returns:
+            The files whose dead code findings may have changed
+        """
+        if not index.update_files(changed, resolve_workers(workers), self.config, removed=removed):
+            return set()
+        return index.affected
 
-        for file_path in files:
-            file_metrics = self._analyze_file(file_path)
-            result.file_metrics.append(file_metrics)
-            result.total_issues += file_metrics.issue_count
+    def apply_reference_index(self, metrics: FileMetrics, index: ReferenceIndex) -> FileMetrics:
+        """
+        Judge a file's dead code findings by the whole project.
 
-        return result
+        Args:
+            metrics: Results of :meth:`analyze_files` for one file
+            index: Up-to-date reference index of the project
+
+        Returns:
+            A copy of ``metrics`` with the findings adjusted; ``metrics`` is
+            left as is
+        """
+        metrics = dataclasses.replace(metrics, issues=list(metrics.issues))
+        dead_code = self._dead_code_analyzer(index.root, streaming=False)
+        if dead_code is not None:
+            dead_code.apply_reference_index(metrics, index)
+        return metrics
+
+    def save_reference_index(self, index: ReferenceIndex) -> None:
+        """Save a reference index to the cache directory, when the cache is enabled."""
+        if self.cache is not None:
+            self._save_project_index(
+                index, graph_cache_path(self.cache.cache_dir, index.root, "reference-index")
+            )
+
+    def _select_changed_files(
+        self, target_path: Path, files: Sequence[Path], rev: str
+    ) -> Tuple[List[Path], Dict[Path, FileMetrics]]:
+        """
+        Split ``files`` into those to re-analyze and cached results for the rest.
+
+        Files changed since ``rev`` are re-analyzed together with the files
+        that import them, since cross-file findings there may have changed.
+        """
+        resolved = {file_path.resolve(): file_path for file_path in files}
+        changed = [path for path in git_changed_files(target_path, rev) if path in resolved]
+        root = target_path.resolve() if target_path.is_dir() else target_path.resolve().parent
+        dependents = find_dependents(list(resolved), changed, root)
+
+        affected = {resolved[path] for path in changed + dependents}
+        to_analyze = [file_path for file_path in files if file_path in affected]
+
+        reused: Dict[Path, FileMetrics] = {}
+        if self.cache is not None:
+            for file_path in files:
+                if file_path not in affected:
+                    metrics = self._cached_metrics(file_path)
+                    if metrics is not None:
+                        reused[file_path] = metrics
+
+        return to_analyze, reused
+
+    def _cached_analyzers(self) -> List[BaseAnalyzer]:
+        """Return the analyzers whose results may be cached."""
+        return [analyzer for analyzer in self.analyzers if analyzer_cacheable(analyzer)]
+
+    def _uncached_analyzers(self) -> List[BaseAnalyzer]:
+        """Return the analyzers that must run again even when a file is unchanged."""
+        return [analyzer for analyzer in self.analyzers if not analyzer_cacheable(analyzer)]
+
+    def _cached_metrics(self, file_path: Path) -> Optional[FileMetrics]:
+        """Return cached metrics for a file without analyzing it on a miss."""
+        if self.cache is None:
+            return None
+        data = file_path.read_bytes()
+        metrics = self.cache.get(self.cache.key_for(file_path, data), file_path)
+        uncached = self._uncached_analyzers()
+        if metrics is not None and uncached:
+            self._run_uncached(metrics, self._parse_bytes(file_path, data), uncached)
+        return metrics
 
     def _analyze_file(self, file_path: Path) -> FileMetrics:
-        """Analyze a single file."""
-        with open(file_path, "r", encoding="utf-8") as f:
-            source_code = f.read()
+        """Analyze a single file, reusing cached results for unchanged files."""
+        return self._analyze_file_module(file_path)[0]
 
-        # Initialize basic metrics
-        lines = source_code.split("\n")
-        loc = len([line for line in lines if line.strip() and not line.strip().startswith("#")])
-        comment_lines = len([line for line in lines if line.strip().startswith("#")])
-        blank_lines = len([line for line in lines if not line.strip()])
+    def _analyze_with_references(
+        self, file_path: Path, layout: PackageLayout
+    ) -> Tuple[FileMetrics, Optional[ModuleReferences]]:
+        """
+        Analyze a file and build its reference index entry from the same parse.
 
+        Returns:
+            The metrics, and the entry or None when the file was not parsed
+            because its results came from the cache
+        """
+        stat = os.stat(file_path)
+        metrics, module = self._analyze_file_module(file_path)
+        if module is None:
+            return metrics, None
+        return metrics, module_references(module, layout, stat.st_mtime_ns, stat.st_size)
+
+    def _analyze_file_module(self, file_path: Path) -> Tuple[FileMetrics, Optional[ParsedModule]]:
+        """Analyze a file; also return its parsed module, or None if it came from the cache."""
+        if self.cache is None:
+            loaded = self._load_module(file_path)
+            return self._analyze_module(loaded), loaded
+
+        data = file_path.read_bytes()
+        key = self.cache.key_for(file_path, data)
+        metrics = self.cache.get(key, file_path)
+        uncached = self._uncached_analyzers()
+        module: Optional[ParsedModule] = None
+        if metrics is None:
+            module = self._parse_bytes(file_path, data)
+            metrics = self._analyze_module(module, self._cached_analyzers() if uncached else None)
+            self.cache.put(key, metrics)
+        if uncached:
+            module = module or self._parse_bytes(file_path, data)
+            self._run_uncached(metrics, module, uncached)
+        return metrics, module
+
+    def _parse_bytes(self, file_path: Path, data: bytes) -> ParsedModule:
+        """Wrap a file's contents, or take it from the module cache when there is one."""
+        if self.module_cache is not None:
+            return self.module_cache.load(file_path)
+        return ParsedModule.from_bytes(file_path, data)
+
+    def _run_uncached(
+        self, metrics: FileMetrics, module: ParsedModule, analyzers: Sequence[BaseAnalyzer]
+    ) -> None:
+        """Add the issues of analyzers that are never cached to a file's metrics."""
+        for issues in run_analyzers(analyzers, module):
+            metrics.issues.extend(issues)
+
+    def _load_module(self, file_path: Path) -> ParsedModule:
+        """Read a file, or take it from the module cache when there is one."""
+        if self.module_cache is not None:
+            return self.module_cache.load(file_path)
+        return ParsedModule.from_file(file_path)
+
+    def _analyze_module(
+        self, module: ParsedModule, analyzers: Optional[Sequence[BaseAnalyzer]] = None
+    ) -> FileMetrics:
+        """Compute metrics and run the analyzers (all by default) over a module."""
+        if analyzers is None:
+            analyzers = self.analyzers
+        if self.profiler is not None:
+            return self._profile_module(module, self.profiler, analyzers)
+
+        metrics = self._file_metrics(module)
+
+        # Run all analyzers over a single shared traversal of the tree
+        for issues in run_analyzers(analyzers, module):
+            metrics.issues.extend(issues)
+
+        return metrics
+
+    def _file_metrics(self, module: ParsedModule) -> FileMetrics:
+        """Compute the line and complexity metrics of a module, with no issues yet."""
+        counts = module.line_counts
         metrics = FileMetrics(
-            file_path=file_path,
-            lines_of_code=loc,
-            comment_lines=comment_lines,
-            blank_lines=blank_lines,
+            file_path=module.file_path,
+            lines_of_code=counts.sloc,
+            comment_lines=counts.documentation,
+            blank_lines=counts.blank,
             complexity=0.0,
             maintainability_index=100.0,
             functions=0,
             classes=0,
         )
+        if module.syntax_error is None:
+            code_metrics = module.code_metrics
+            metrics.complexity = code_metrics.average_complexity
+            if code_metrics.maintainability_index is not None:
+                metrics.maintainability_index = code_metrics.maintainability_index
+            metrics.functions = code_metrics.functions
+            metrics.classes = code_metrics.classes
+        return metrics
 
-        # Run all analyzers
-        for analyzer in self.analyzers:
-            issues = analyzer.analyze(file_path, source_code)
+    def _profile_module(
+        self, module: ParsedModule, profiler: Profiler, analyzers: Sequence[BaseAnalyzer]
+    ) -> FileMetrics:
+        """Analyze a module like :meth:`_analyze_module`, recording timings on the metrics."""
+        file_profiler = profiler.profile_file(module.file_path)
+        record = file_profiler.record
+        start = time.perf_counter()
+
+        # Parse up front so its cost is reported apart from the analyzers
+        module.syntax_error
+        record.parse_seconds = time.perf_counter() - start
+
+        metrics = self._file_metrics(module)
+        dispatcher = NodeDispatcher()
+        for issues in run_analyzers(analyzers, module, dispatcher, file_profiler):
             metrics.issues.extend(issues)
 
+        record.seconds = time.perf_counter() - start
+        record.nodes = dispatcher.nodes_visited
+        record.issues = len(metrics.issues)
+        metrics.profile = record
         return metrics
 
     def refactor(
@@ -150,6 +561,7 @@ class Refactron:
         target: Union[str, Path],
         preview: bool = True,
         operation_types: Optional[List[str]] = None,
+        workers: Optional[int] = None,
     ) -> RefactorResult:
         """
         Refactor a file or directory.
@@ -158,6 +570,7 @@ class Refactron:
             target: Path to file or directory to refactor
             preview: If True, show changes without applying them
             operation_types: Specific refactoring operations to apply (None = all)
+            workers: Number of worker processes, as for :meth:`analyze`
 
         Returns:
             RefactorResult containing all proposed operations
@@ -167,15 +580,17 @@ class Refactron:
         if not target_path.exists():
             raise FileNotFoundError(f"Target not found: {target}")
 
-        if target_path.is_file():
-            files = [target_path]
-        else:
-            files = self._get_python_files(target_path)
+        files = self.discover_files(target_path)
 
         result = RefactorResult(preview_mode=preview)
 
-        for file_path in files:
-            operations = self._refactor_file(file_path, operation_types)
+        for operations in self._map_files(
+            files,
+            workers,
+            refactor_chunk,
+            lambda file_path: self._refactor_file(file_path, operation_types),
+            operation_types,
+        ):
             result.operations.extend(operations)
 
         return result
@@ -201,34 +616,146 @@ class Refactron:
 
         return operations
 
-    def _get_python_files(self, directory: Path) -> List[Path]:
-        """Get all Python files in a directory, respecting exclude patterns."""
-        python_files = []
+    def _map_files(
+        self,
+        files: Sequence[Path],
+        workers: Optional[int],
+        chunk_func: Callable[..., List[T]],
+        file_func: Callable[[Path], T],
+        *args: Any,
+    ) -> Generator[T, None, None]:
+        """Yield per-file results in file order, serially or from a process pool."""
+        processes = min(resolve_workers(workers), len(files))
+        if processes <= 1:
+            return (file_func(file_path) for file_path in files)
+        return map_files(chunk_func, files, self.config, processes, *args)
+
+    def discover_files(self, target: Union[str, Path]) -> List[Path]:
+        """
+        List the files :meth:`analyze` and :meth:`refactor` process for ``target``.
 
-        for root, dirs, files in os.walk(directory):
-            root_path = Path(root)
+        Directories are walked once, honoring the configured include and
+        exclude patterns and ``.gitignore`` files. Pass the result to
+        :meth:`analyze` or :meth:`iter_analyze` to reuse the walk.
 
-            # Check if this directory should be excluded
-            if self._should_exclude(root_path):
-                dirs.clear()  # Don't descend into this directory
-                continue
+        Args:
+            target: Path to file or directory
 
-            for file in files:
-                if file.endswith(".py"):
-                    file_path = root_path / file
-                    if not self._should_exclude(file_path):
-                        python_files.append(file_path)
+        Returns:
+            Files in analysis order
+        """
+        return discover_files(Path(target), self.config)
 
-        return python_files
+    def import_graph(
+        self,
+        target: Union[str, Path],
+        workers: Optional[int] = None,
+        files: Optional[Sequence[Path]] = None,
+    ) -> ImportGraph:
+        """
+        Build the import graph of the project at ``target``.
 
-    def _should_exclude(self, path: Path) -> bool:
-        """Check if a path should be excluded based on patterns."""
-        path_str = str(path)
+        With the cache enabled, the graph is saved in the cache directory and
+        later calls only rescan the files that changed since.
 
-        for pattern in self.config.exclude_patterns:
-            # Simple pattern matching
-            pattern_clean = pattern.replace("**/", "").replace("/**", "")
-            if pattern_clean in path_str:
-                return True
+        Args:
+            target: Project directory, or a file whose directory is the project
+            workers: Number of worker processes for scanning (None = serial,
+                0 = one per CPU)
+            files: Files of the project, as returned by :meth:`discover_files`
+
+        Returns:
+            The up-to-date import graph
+        """
+        return self._project_index(ImportGraph, "import-graph", target, workers, files)
 
-        return False
+    def reference_index(
+        self,
+        target: Union[str, Path],
+        workers: Optional[int] = None,
+        files: Optional[Sequence[Path]] = None,
+    ) -> ReferenceIndex:
+        """
+        Build the index of module-level definitions and references of a project.
+
+        Cached and updated the same way as :meth:`import_graph`.
+
+        Args:
+            target: Project directory, or a file whose directory is the project
+            workers: Number of worker processes for scanning (None = serial,
+                0 = one per CPU)
+            files: Files of the project, as returned by :meth:`discover_files`
+
+        Returns:
+            The up-to-date reference index
+        """
+        return self._project_index(ReferenceIndex, "reference-index", target, workers, files)
+
+    def clone_index(
+        self,
+        target: Union[str, Path],
+        workers: Optional[int] = None,
+        files: Optional[Sequence[Path]] = None,
+    ) -> CloneIndex:
+        """
+        Build the index of code fingerprints of a project, for finding clones across files.
+
+        Cached and updated the same way as :meth:`import_graph`.
+
+        Args:
+            target: Project directory, or a file whose directory is the project
+            workers: Number of worker processes for scanning (None = serial,
+                0 = one per CPU)
+            files: Files of the project, as returned by :meth:`discover_files`
+
+        Returns:
+            The up-to-date clone index
+        """
+        return self._project_index(CloneIndex, "clone-index", target, workers, files)
+
+    def _project_index(
+        self,
+        index_type: Type[ProjectIndex],
+        kind: str,
+        target: Union[str, Path],
+        workers: Optional[int],
+        files: Optional[Sequence[Path]],
+    ) -> ProjectIndex:
+        """Load, update and save a project-wide index, or build it from scratch."""
+        target_path = Path(target)
+        root = target_path if target_path.is_dir() else target_path.parent
+        if files is None:
+            files = self.discover_files(root)
+        processes = resolve_workers(workers)
+
+        index, cache_path = self._load_project_index(index_type, kind, root)
+        if index is None:
+            index = index_type.build(root, files, processes, self.config)
+            changed = True
+        else:
+            changed = index.update(files, processes, self.config)
+
+        if changed:
+            self._save_project_index(index, cache_path)
+        return index
+
+    def _load_project_index(
+        self, index_type: Type[ProjectIndex], kind: str, root: Path
+    ) -> Tuple[Optional[ProjectIndex], Optional[Path]]:
+        """Return the index saved in the cache directory, if any, and where it is saved."""
+        if self.cache is None:
+            return None, None
+        cache_path = graph_cache_path(self.cache.cache_dir, root, kind)
+        return index_type.load(cache_path, root), cache_path
+
+    def _save_project_index(
+        self, index: Union[ImportGraph, ReferenceIndex, CloneIndex], cache_path: Optional[Path]
+    ) -> None:
+        """Save a project-wide index to the cache directory, when there is one."""
+        if cache_path is None:
+            return
+        try:
+            index.save(cache_path)
+        except OSError:
+            # The saved index is an optimization; never fail because of it
+            pass
@@ -0,0 +1,464 @@
+"""Project-wide index of module-level definitions and the references to them."""
+
+import ast
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from refactron.core.config import RefactronConfig
+from refactron.core.import_graph import (
+    PackageLayout,
+    absolute_path,
+    scan_imports,
+    write_json_atomically,
+)
+from refactron.core.symbols import DEFINITION, SymbolTable
+
+if TYPE_CHECKING:
+    from refactron.core.parsed_module import ParsedModule
+
+# Bump when the on-disk index format changes
+INDEX_FORMAT = 1
+
+# Definition kinds
+FUNCTION = "function"
+CLASS = "class"
+
+
+@dataclass(frozen=True)
+class Definition:
+    """A function or class defined at module level."""
+
+    name: str
+    kind: str
+    line_number: int
+
+
+@dataclass
+class ModuleReferences:
+    """What one module defines at module level, and what it refers to."""
+
+    name: str
+    file_path: Path
+    mtime_ns: int
+    size: int
+    # Public, undecorated definitions that the module itself never refers to
+    candidates: List[Definition] = field(default_factory=list)
+    # Names listed in __all__
+    exports: List[str] = field(default_factory=list)
+    # "module.name" of every "from module import name"; "module.*" for star imports
+    imported: List[str] = field(default_factory=list)
+    # Attribute names read anywhere in the module
+    attributes: List[str] = field(default_factory=list)
+
+
+def is_test_module(file_path: Path) -> bool:
+    """Whether a file holds tests, whose definitions are found by the test runner."""
+    name = file_path.name
+    return name.startswith("test_") or name.endswith("_test.py") or name == "conftest.py"
+
+
+def scan_references(
+    tree: ast.Module,
+    entry: ModuleReferences,
+    is_package: bool,
+    table: Optional[SymbolTable] = None,
+) -> None:
+    """Fill in a module's definitions and references from its parsed tree and symbol table."""
+    if table is None:
+        table = SymbolTable.build(tree)
+
+    if not is_test_module(entry.file_path):
+        for binding in table.bindings:
+            if binding.scope is not table.module or binding.kind != DEFINITION:
+                continue
+            node = binding.node
+            if binding.name.startswith("_") or binding.used:
+                continue
+            if getattr(node, "decorator_list", None):
+                continue
+            kind = CLASS if isinstance(node, ast.ClassDef) else FUNCTION
+            entry.candidates.append(Definition(binding.name, kind, binding.lineno))
+
+    entry.exports = list(table.exports or [])
+    entry.attributes = sorted(table.attributes)
+    for statement in scan_imports(tree, entry.name, is_package):
+        for name in statement.names:
+            entry.imported.append(f"{statement.module}.{name}" if statement.module else name)
+
+
+def _scan_file(file_path: Path, layout: PackageLayout) -> Optional[ModuleReferences]:
+    """Read and scan one file; None if it cannot be read."""
+    try:
+        stat = file_path.stat()
+        data = file_path.read_bytes()
+    except OSError:
+        return None
+
+    name, is_package = layout.module(file_path)
+    entry = ModuleReferences(name, file_path, stat.st_mtime_ns, stat.st_size)
+    try:
+        tree = ast.parse(data)
+    except (SyntaxError, ValueError):
+        return entry
+    scan_references(tree, entry, is_package)
+    return entry
+
+
+def module_references(
+    module: "ParsedModule", layout: PackageLayout, mtime_ns: int, size: int
+) -> ModuleReferences:
+    """
+    Build a file's index entry from a module the analysis has already parsed.
+
+    The tree and symbol table the analyzers used are reused, so indexing
+    during an analysis never parses a file a second time.
+
+    Args:
+        module: Parsed module of the file
+        layout: Package layout to name the module with
+        mtime_ns: Modification time of the file when it was read
+        size: Size of the file when it was read
+    """
+    file_path = absolute_path(module.file_path)
+    name, is_package = layout.module(file_path)
+    entry = ModuleReferences(name, file_path, mtime_ns, size)
+    if module.syntax_error is None:
+        scan_references(module.tree, entry, is_package, module.symbols)
+    return entry
+
+
+def index_chunk(files: List[Path]) -> List[Optional[ModuleReferences]]:
+    """Scan a chunk of files inside a worker process."""
+    layout = PackageLayout()
+    return [_scan_file(file_path, layout) for file_path in files]
+
+
+class ReferenceIndex:
+    """
+    Module-level functions and classes of a project, and every reference to them.
+
+    A definition counts as used when its own module refers to it, when it is
+    listed in its module's ``__all__``, when another module imports it by
+    name (``from pkg.mod import name``) or star-imports its module, or when
+    an attribute of that name is read anywhere in the project, which covers
+    ``mod.name`` and ``obj.name`` alike. Private (underscore) and decorated
+    definitions, and definitions in test modules, are never reported.
+
+    Like :class:`ImportGraph`, the index can be saved and loaded again, and
+    :meth:`update` rescans only files whose size or modification time changed.
+
+    Example:
+        >>> index = ReferenceIndex.build(Path("src"), files)
+        >>> for definition in index.unreferenced(Path("src/pkg/mod.py")):
+        ...     print(definition.name)
+    """
+
+    def __init__(self, root: Path):
+        """
+        Initialize an empty index.
+
+        Args:
+            root: Directory the project files are under
+        """
+        self.root = Path(root).resolve()
+        self.files: Dict[Path, ModuleReferences] = {}
+        # Files parsed by the last build or update
+        self.scanned = 0
+        # Files whose unreferenced definitions the last update may have changed
+        self.affected: Set[Path] = set()
+        # How many files import or read each name, and which files define each
+        # candidate, kept up to date once built so updates cost O(changed files)
+        self._aggregated = False
+        self._imported: "Counter[str]" = Counter()
+        self._attributes: "Counter[str]" = Counter()
+        self._modules: Dict[str, Path] = {}
+        self._defining: Dict[str, Set[Path]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        root: Path,
+        files: Sequence[Path],
+        workers: int = 1,
+        config: Optional[RefactronConfig] = None,
+    ) -> "ReferenceIndex":
+        """
+        Scan every file and build the index.
+
+        Args:
+            root: Directory the project files are under
+            files: Python files of the project
+            workers: Number of processes to scan with
+            config: Configuration for the worker processes
+
+        Returns:
+            The built index
+        """
+        index = cls(root)
+        index._scan([absolute_path(path) for path in files], workers, config)
+        return index
+
+    def _aggregate(self) -> None:
+        """Count the imported names and attributes of all files, on first use."""
+        if not self._aggregated:
+            self._aggregated = True
+            for entry in self.files.values():
+                self._count(entry, 1)
+
+    def _count(self, entry: ModuleReferences, delta: int) -> None:
+        """Add (``delta=1``) or remove (``-1``) an entry's share of the aggregates."""
+        for counter, names in (
+            (self._imported, entry.imported),
+            (self._attributes, entry.attributes),
+        ):
+            for name in set(names):
+                counter[name] += delta
+                if counter[name] <= 0:
+                    del counter[name]
+        for definition in entry.candidates:
+            defining = self._defining.setdefault(definition.name, set())
+            if delta > 0:
+                defining.add(entry.file_path)
+            else:
+                defining.discard(entry.file_path)
+                if not defining:
+                    del self._defining[definition.name]
+        if delta > 0:
+            self._modules[entry.name] = entry.file_path
+        elif self._modules.get(entry.name) == entry.file_path:
+            del self._modules[entry.name]
+
+    def _put(self, entry: ModuleReferences) -> None:
+        self._drop(entry.file_path)
+        self.files[entry.file_path] = entry
+        if self._aggregated:
+            self._count(entry, 1)
+
+    def _drop(self, file_path: Path) -> None:
+        entry = self.files.pop(file_path, None)
+        if entry is not None and self._aggregated:
+            self._count(entry, -1)
+
+    def _dependents(self, entries: Iterable[ModuleReferences]) -> Set[Path]:
+        """Return the files whose definitions the references of ``entries`` may be about."""
+        self._aggregate()
+        dependents: Set[Path] = set()
+        for entry in entries:
+            for name in entry.attributes:
+                dependents.update(self._defining.get(name, ()))
+            for reference in entry.imported:
+                module, _, name = reference.rpartition(".")
+                file_path = self._modules.get(module)
+                if file_path is not None and (
+                    name == "*" or file_path in self._defining.get(name, ())
+                ):
+                    dependents.add(file_path)
+        return dependents
+
+    def unreferenced(self, file_path: Path) -> List[Definition]:
+        """
+        Return the module-level definitions of a file used nowhere in the project.
+
+        Returns:
+            Unused definitions in source order; empty for files not in the index
+        """
+        entry = self.files.get(absolute_path(file_path))
+        if entry is None or not entry.candidates:
+            return []
+        self._aggregate()
+        imported = self._imported
+        if f"{entry.name}.*" in imported:
+            return []
+
+        exports = set(entry.exports)
+        return [
+            definition
+            for definition in entry.candidates
+            if definition.name not in exports
+            and f"{entry.name}.{definition.name}" not in imported
+            and definition.name not in self._attributes
+        ]
+
+    def knows(self, file_path: Path) -> bool:
+        """Whether a file was scanned into the index."""
+        return absolute_path(file_path) in self.files
+
+    def reads_attribute(self, name: str) -> bool:
+        """Whether any file of the project reads an attribute called ``name``."""
+        self._aggregate()
+        return name in self._attributes
+
+    def candidates(self, file_path: Path) -> List[Definition]:
+        """Return the definitions of a file that its own module never refers to."""
+        entry = self.files.get(absolute_path(file_path))
+        return list(entry.candidates) if entry is not None else []
+
+    # Updates
+
+    def update(
+        self,
+        files: Sequence[Path],
+        workers: int = 1,
+        config: Optional[RefactronConfig] = None,
+    ) -> bool:
+        """
+        Bring the index in line with the current project files.
+
+        Files whose size and modification time are unchanged are not read.
+
+        Returns:
+            True if anything changed
+        """
+        stale, removed = self.stale(files)
+        return self.update_files(stale, workers, config, removed=removed)
+
+    def stale(self, files: Sequence[Path]) -> Tuple[List[Path], List[Path]]:
+        """
+        Find what differs between the index and the current project files.
+
+        Returns:
+            The files of ``files`` that are new or whose size or modification
+            time changed, and the indexed files no longer among ``files``
+        """
+        wanted = set()
+        stale = []
+        for path in files:
+            file_path = absolute_path(path)
+            wanted.add(file_path)
+            entry = self.files.get(file_path)
+            if entry is None:
+                stale.append(path)
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            if stat.st_mtime_ns != entry.mtime_ns or stat.st_size != entry.size:
+                stale.append(path)
+        removed = [path for path in self.files if path not in wanted]
+        return stale, removed
+
+    def update_files(
+        self,
+        changed: Iterable[Path],
+        workers: int = 1,
+        config: Optional[RefactronConfig] = None,
+        removed: Iterable[Path] = (),
+        entries: Iterable[ModuleReferences] = (),
+    ) -> bool:
+        """
+        Rescan specific files; files that no longer exist, and ``removed``, are dropped.
+
+        Args:
+            changed: Files to scan again
+            workers: Number of processes to scan with
+            config: Configuration for the worker processes
+            removed: Files to drop from the index
+            entries: Up-to-date entries of further changed files, e.g. built by
+                :func:`module_references` during an analysis; they are stored
+                without scanning their files
+
+        Returns:
+            True if anything changed; :attr:`affected` then lists the files
+            whose unreferenced definitions may have changed
+        """
+        built = {entry.file_path: entry for entry in entries}
+        changed_paths = {absolute_path(path) for path in changed} | set(built)
+        dropped = {absolute_path(path) for path in removed}
+        rescan = {path for path in changed_paths - dropped if path.is_file()}
+        gone = {path for path in (changed_paths | dropped) - rescan if path in self.files}
+        self.affected = set()
+        if not rescan and not gone:
+            self.scanned = 0
+            return False
+
+        if any(path.name == "__init__.py" and path not in self.files for path in rescan) or any(
+            path.name == "__init__.py" for path in gone
+        ):
+            # Module names under the package change, so rescan everything
+            rescan |= set(self.files) - gone
+        before = [self.files[path] for path in rescan | gone if path in self.files]
+        for path in gone:
+            self._drop(path)
+        for path, entry in built.items():
+            if path in rescan:
+                self._put(entry)
+        self._scan(sorted(rescan - set(built)), workers, config)
+
+        after = [self.files[path] for path in rescan if path in self.files]
+        self.affected = rescan | gone | self._dependents(before + after)
+        return True
+
+    def _scan(self, files: Sequence[Path], workers: int, config: Optional[RefactronConfig]) -> None:
+        if workers > 1 and len(files) > 1:
+            from refactron.core.parallel import map_files
+
+            results: Iterable[Optional[ModuleReferences]] = map_files(
+                index_chunk, files, config or RefactronConfig.default(), workers
+            )
+        else:
+            results = index_chunk(list(files))
+
+        self.scanned = 0
+        for entry in results:
+            if entry is not None:
+                self._put(entry)
+                self.scanned += 1
+
+    # Persistence
+
+    def save(self, path: Path) -> None:
+        """Write the index to ``path`` atomically."""
+        payload = {
+            "format": INDEX_FORMAT,
+            "root": str(self.root),
+            "modules": [
+                {
+                    "path": str(entry.file_path),
+                    "name": entry.name,
+                    "mtime_ns": entry.mtime_ns,
+                    "size": entry.size,
+                    "candidates": [[d.name, d.kind, d.line_number] for d in entry.candidates],
+                    "exports": entry.exports,
+                    "imported": entry.imported,
+                    "attributes": entry.attributes,
+                }
+                for entry in self.files.values()
+            ],
+        }
+        write_json_atomically(Path(path), payload)
+
+    @classmethod
+    def load(cls, path: Path, root: Path) -> Optional["ReferenceIndex"]:
+        """
+        Read an index written by :meth:`save`.
+
+        Returns:
+            The index, or None if the file is missing, unreadable, in an older
+            format or was built for another root
+        """
+        index = cls(root)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != INDEX_FORMAT or data.get("root") != str(index.root):
+                return None
+            for item in data["modules"]:
+                file_path = Path(item["path"])
+                index.files[file_path] = ModuleReferences(
+                    item["name"],
+                    file_path,
+                    item["mtime_ns"],
+                    item["size"],
+                    [Definition(name, kind, line) for name, kind, line in item["candidates"]],
+                    list(item["exports"]),
+                    list(item["imported"]),
+                    list(item["attributes"]),
+                )
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+        return index
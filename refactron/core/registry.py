@@ -0,0 +1,276 @@
+"""
+Registry of the analyzers, refactorers and fixers Refactron can run.
+
+Built-in plugins are listed here; other packages add their own under the
+``refactron.analyzers``, ``refactron.refactorers`` and ``refactron.fixers``
+entry point groups, e.g. in their ``pyproject.toml``::
+
+    [project.entry-points."refactron.analyzers"]
+    no_print = "my_rules.analyzers:NoPrintAnalyzer"
+
+A plugin is imported and instantiated only when it is enabled by name
+(``enabled_analyzers``, ``enabled_refactorers``) or, for fixers, first
+looked up. Installed entry points are only scanned when a name is not built
+in, so configurations using only built-ins never pay for the scan.
+
+Each plugin class declares what it works on and what it costs with the
+class attributes ``node_types``, ``cost`` and ``cacheable``. Results of a
+third-party plugin are only cached when the version of its distribution is
+known, and are keyed on it, so upgrading the plugin misses the cache.
+"""
+
+import functools
+import importlib
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from refactron.core.config import RefactronConfig
+
+if TYPE_CHECKING:
+    from refactron.analyzers.base_analyzer import BaseAnalyzer
+    from refactron.refactorers.base_refactorer import BaseRefactorer
+
+# Entry point groups other packages register plugins under
+ANALYZER_GROUP = "refactron.analyzers"
+REFACTORER_GROUP = "refactron.refactorers"
+FIXER_GROUP = "refactron.fixers"
+
+# Cost classes: a few checks per visited node; per-module tables such as
+# symbols, metrics or a second parse; project-wide indexes or external tools
+COST_CHEAP = "cheap"
+COST_MODERATE = "moderate"
+COST_EXPENSIVE = "expensive"
+COST_CLASSES = (COST_CHEAP, COST_MODERATE, COST_EXPENSIVE)
+
+
+def load(spec: str) -> Any:
+    """Import the module of a ``module:attribute`` spec and return the attribute."""
+    module_name, _, attribute = spec.partition(":")
+    value: Any = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        value = getattr(value, part)
+    return value
+
+
+def _entry_points(group: str) -> List[Any]:
+    """Return the installed entry points of a group."""
+    from importlib import metadata
+
+    points = metadata.entry_points()
+    if hasattr(points, "select"):
+        return list(points.select(group=group))
+    # Python < 3.10 returns a dict of groups
+    return list(points.get(group, ()))
+
+
+@functools.lru_cache(maxsize=None)
+def _distribution_version(distribution: str) -> Optional[str]:
+    """Return the installed version of a distribution, or None if it cannot be found."""
+    from importlib import metadata
+
+    try:
+        return metadata.version(distribution)
+    except (metadata.PackageNotFoundError, ValueError):
+        return None
+
+
+@dataclass
+class Plugin:
+    """An analyzer, refactorer or fixer that can be loaded by name."""
+
+    name: str
+    spec: str
+    group: str
+    distribution: Optional[str] = None
+    _class: Optional[type] = field(default=None, repr=False, compare=False)
+
+    @property
+    def builtin(self) -> bool:
+        """Whether the plugin ships with Refactron."""
+        return self.distribution is None
+
+    @property
+    def version(self) -> Optional[str]:
+        """Version of a third-party plugin's distribution; None for built-ins or if unknown."""
+        if self.distribution is None:
+            return None
+        return _distribution_version(self.distribution)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the plugin's module has been imported."""
+        return self._class is not None
+
+    def load(self) -> type:
+        """Import and return the plugin class."""
+        if self._class is None:
+            self._class = load(self.spec)
+        return self._class
+
+    @property
+    def node_types(self) -> Tuple[type, ...]:
+        """AST node types the plugin works on; empty when it needs the whole module."""
+        return tuple(getattr(self.load(), "node_types", ()))
+
+    @property
+    def cost(self) -> str:
+        """Cost class of running the plugin, one of :data:`COST_CLASSES`."""
+        return str(getattr(self.load(), "cost", COST_MODERATE))
+
+    @property
+    def cacheable(self) -> bool:
+        """Whether results depend only on the file's contents, the configuration and versions."""
+        if not self.builtin and self.version is None:
+            return False
+        return bool(getattr(self.load(), "cacheable", True))
+
+
+class Registry:
+    """Plugins of one kind by name: the built-ins, then those installed as entry points."""
+
+    def __init__(self, group: str, builtins: Dict[str, str]):
+        """
+        Initialize the registry.
+
+        Args:
+            group: Entry point group of third-party plugins
+            builtins: ``module:Class`` specs of the built-in plugins by name,
+                in the order they run
+        """
+        self.group = group
+        self._plugins = {name: Plugin(name, spec, group) for name, spec in builtins.items()}
+        self._discovered = False
+
+    def discover(self) -> None:
+        """Add the plugins installed as entry points; built-in names cannot be replaced."""
+        if self._discovered:
+            return
+        self._discovered = True
+        for point in _entry_points(self.group):
+            if point.name not in self._plugins:
+                dist = getattr(point, "dist", None)
+                self._plugins[point.name] = Plugin(
+                    point.name,
+                    point.value,
+                    self.group,
+                    distribution=getattr(dist, "name", None) or "unknown",
+                )
+
+    def get(self, name: str) -> Optional[Plugin]:
+        """Return the plugin registered under ``name``, or None."""
+        if name not in self._plugins:
+            self.discover()
+        return self._plugins.get(name)
+
+    def names(self) -> List[str]:
+        """Return the names of all plugins, in the order they run."""
+        self.discover()
+        return list(self._plugins)
+
+    def plugins(self) -> List[Plugin]:
+        """Return all plugins, in the order they run."""
+        self.discover()
+        return list(self._plugins.values())
+
+    def plugin_of(self, plugin_class: type) -> Optional[Plugin]:
+        """Return the loaded plugin whose class is ``plugin_class``, or None."""
+        for plugin in self._plugins.values():
+            if plugin._class is plugin_class:
+                return plugin
+        return None
+
+    def enabled(self, names: Iterable[str]) -> List[Plugin]:
+        """Return the plugins for ``names`` in the order they run; unknown names are skipped."""
+        wanted = set(names)
+        if not wanted.issubset(self._plugins):
+            self.discover()
+        return [plugin for name, plugin in self._plugins.items() if name in wanted]
+
+    def create(self, names: Iterable[str], *args: Any) -> List[Any]:
+        """Instantiate the plugins for ``names`` with ``args``, importing only their modules."""
+        return [plugin.load()(*args) for plugin in self.enabled(names)]
+
+
+ANALYZERS = Registry(
+    ANALYZER_GROUP,
+    {
+        "complexity": "refactron.analyzers.complexity_analyzer:ComplexityAnalyzer",
+        "code_smells": "refactron.analyzers.code_smell_analyzer:CodeSmellAnalyzer",
+        "security": "refactron.analyzers.security_analyzer:SecurityAnalyzer",
+        "dependency": "refactron.analyzers.dependency_analyzer:DependencyAnalyzer",
+        "dead_code": "refactron.analyzers.dead_code_analyzer:DeadCodeAnalyzer",
+        "type_hints": "refactron.analyzers.type_hint_analyzer:TypeHintAnalyzer",
+        "performance": "refactron.analyzers.performance_analyzer:PerformanceAnalyzer",
+    },
+)
+
+REFACTORERS = Registry(
+    REFACTORER_GROUP,
+    {
+        "extract_method": "refactron.refactorers.extract_method_refactorer:ExtractMethodRefactorer",
+        "extract_constant": "refactron.refactorers.magic_number_refactorer:MagicNumberRefactorer",
+        "simplify_conditionals": (
+            "refactron.refactorers.simplify_conditionals_refactorer:SimplifyConditionalsRefactorer"
+        ),
+        "reduce_parameters": (
+            "refactron.refactorers.reduce_parameters_refactorer:ReduceParametersRefactorer"
+        ),
+        "add_docstring": "refactron.refactorers.add_docstring_refactorer:AddDocstringRefactorer",
+    },
+)
+
+FIXERS = Registry(
+    FIXER_GROUP,
+    {
+        "remove_unused_imports": "refactron.autofix.fixers:RemoveUnusedImportsFixer",
+        "extract_magic_numbers": "refactron.autofix.fixers:ExtractMagicNumbersFixer",
+        "add_docstrings": "refactron.autofix.fixers:AddDocstringsFixer",
+        "remove_dead_code": "refactron.autofix.fixers:RemoveDeadCodeFixer",
+        "fix_type_hints": "refactron.autofix.fixers:FixTypeHintsFixer",
+        "sort_imports": "refactron.autofix.fixers:SortImportsFixer",
+        "remove_trailing_whitespace": "refactron.autofix.fixers:RemoveTrailingWhitespaceFixer",
+        "normalize_quotes": "refactron.autofix.fixers:NormalizeQuotesFixer",
+        "simplify_boolean": "refactron.autofix.fixers:SimplifyBooleanFixer",
+        "convert_to_fstring": "refactron.autofix.fixers:ConvertToFStringFixer",
+        "remove_unused_variables": "refactron.autofix.fixers:RemoveUnusedVariablesFixer",
+        "fix_indentation": "refactron.autofix.fixers:FixIndentationFixer",
+        "add_missing_commas": "refactron.autofix.fixers:AddMissingCommasFixer",
+        "remove_print_statements": "refactron.autofix.fixers:RemovePrintStatementsFixer",
+    },
+)
+
+
+def create_analyzers(config: RefactronConfig) -> List["BaseAnalyzer"]:
+    """Instantiate the enabled analyzers, importing only their modules."""
+    return ANALYZERS.create(config.enabled_analyzers, config)
+
+
+def analyzer_cacheable(analyzer: "BaseAnalyzer") -> bool:
+    """Whether an analyzer's results may be cached, see :attr:`Plugin.cacheable`."""
+    plugin = ANALYZERS.plugin_of(type(analyzer))
+    if plugin is not None:
+        return plugin.cacheable
+    return bool(analyzer.cacheable)
+
+
+def installed_plugins() -> List[str]:
+    """
+    Describe the plugins installed as entry points, without importing them.
+
+    Returns:
+        One sorted line per entry point with its group, name, spec,
+        distribution and version, to tell whether two processes would run
+        the same plugins
+    """
+    found = []
+    for group in (ANALYZER_GROUP, REFACTORER_GROUP, FIXER_GROUP):
+        for point in _entry_points(group):
+            distribution = getattr(getattr(point, "dist", None), "name", None)
+            version = _distribution_version(distribution) if distribution else None
+            found.append(f"{group}:{point.name}={point.value} ({distribution} {version})")
+    return sorted(found)
+
+
+def create_refactorers(config: RefactronConfig) -> List["BaseRefactorer"]:
+    """Instantiate the enabled refactorers, importing only their modules."""
+    return REFACTORERS.create(config.enabled_refactorers, config)
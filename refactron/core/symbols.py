@@ -0,0 +1,559 @@
+"""Scope-aware symbol table: where each name is bound and where it is used."""
+
+import ast
+from typing import Dict, Iterator, List, Optional, Set, Union
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+ScopeNode = Union[
+    ast.Module,
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.Lambda,
+    ast.ClassDef,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+]
+
+# Scope kinds
+MODULE = "module"
+FUNCTION = "function"
+CLASS = "class"
+COMPREHENSION = "comprehension"
+
+# Binding kinds
+IMPORT = "import"
+DEFINITION = "definition"  # def or class statement
+PARAMETER = "parameter"
+ASSIGNMENT = "assignment"  # assignment, for/with target, walrus, match capture
+ANNOTATION = "annotation"  # annotated name without a value
+EXCEPT = "except"  # name bound by "except ... as name"
+
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+class Binding:
+    """A single place where a name is bound in a scope."""
+
+    __slots__ = ("name", "kind", "node", "scope", "lineno", "module", "statement", "type_checking")
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        node: ast.AST,
+        scope: "Scope",
+        lineno: int,
+        module: Optional[str] = None,
+        statement: Optional[ast.stmt] = None,
+        type_checking: bool = False,
+    ):
+        self.name = name
+        self.kind = kind
+        self.node = node
+        self.scope = scope
+        self.lineno = lineno
+        # Imports only: the qualified name of what is imported, e.g. "os.path"
+        self.module = module
+        # The statement the binding comes from
+        self.statement = statement
+        self.type_checking = type_checking
+
+    @property
+    def used(self) -> bool:
+        """Whether any reference resolves to this name in this scope."""
+        return self.name in self.scope.references
+
+    def __repr__(self) -> str:
+        return f"Binding({self.name!r}, {self.kind}, line {self.lineno})"
+
+
+class Scope:
+    """A module, class, function or comprehension scope and the names it binds."""
+
+    def __init__(self, kind: str, node: ast.AST, parent: Optional["Scope"] = None):
+        self.kind = kind
+        self.node = node
+        self.parent = parent
+        self.children: List[Scope] = []
+        self.bindings: Dict[str, List[Binding]] = {}
+        # Names declared with "global" or "nonlocal" in this scope
+        self.globals: Set[str] = set()
+        self.nonlocals: Set[str] = set()
+        # Names read in this scope, resolved to their scopes once the tree is built
+        self.loads: List[str] = []
+        # Number of references that resolve to each name bound here
+        self.references: Dict[str, int] = {}
+        self.has_star_import = False
+        if parent is not None:
+            parent.children.append(self)
+
+    @property
+    def name(self) -> str:
+        """Name of the function or class, ``<lambda>``, or ``<module>``."""
+        if isinstance(self.node, ast.Lambda):
+            return "<lambda>"
+        return getattr(self.node, "name", f"<{self.kind}>")
+
+    def lookup(self, name: str) -> Optional["Scope"]:
+        """
+        Find the scope a name read in this scope refers to.
+
+        Follows Python's rules: ``global`` and ``nonlocal`` declarations are
+        honored, and class scopes are not visible from the scopes nested in
+        them. Returns None for builtins and names bound nowhere.
+        """
+        if name in self.globals:
+            return self.module_scope() if name in self.module_scope().bindings else None
+        if name in self.bindings and name not in self.nonlocals:
+            return self
+
+        scope = self.parent
+        while scope is not None:
+            if scope.kind != CLASS:
+                if name in scope.globals:
+                    module = self.module_scope()
+                    return module if name in module.bindings else None
+                if name in scope.bindings and name not in scope.nonlocals:
+                    return scope
+            scope = scope.parent
+        return None
+
+    def module_scope(self) -> "Scope":
+        scope = self
+        while scope.parent is not None:
+            scope = scope.parent
+        return scope
+
+    def walk(self) -> Iterator["Scope"]:
+        """Yield this scope and every scope nested in it."""
+        stack = [self]
+        while stack:
+            scope = stack.pop()
+            yield scope
+            stack.extend(reversed(scope.children))
+
+    def __repr__(self) -> str:
+        return f"Scope({self.kind}, {len(self.bindings)} names)"
+
+
+class SymbolTable:
+    """
+    Name bindings and references of a module, built in one pass over its tree.
+
+    Every name binding (imports, definitions, parameters, assignments) is
+    recorded in its scope, and every reference is resolved to the scope that
+    binds it, following Python's scoping rules. References include names
+    inside string annotations, and names listed in ``__all__`` count as
+    references to the module scope. Imports inside ``if TYPE_CHECKING:``
+    blocks are marked as such.
+
+    Usually obtained from :attr:`ParsedModule.symbols`, so the table is built
+    once per file and shared by every analyzer.
+
+    Example:
+        >>> table = SymbolTable.build(ast.parse("import os\\nimport sys\\nprint(sys)"))
+        >>> [binding.name for binding in table.unused_imports()]
+        ['os']
+    """
+
+    def __init__(self, module: Scope):
+        self.module = module
+        self.bindings: List[Binding] = []
+        # Names listed in __all__, or None if the module does not define it
+        self.exports: Optional[List[str]] = None
+        # Attribute names read anywhere in the module, e.g. "run" for "self.run()"
+        self.attributes: Set[str] = set()
+        self._scopes: Dict[ast.AST, Scope] = {module.node: module}
+
+    @classmethod
+    def build(cls, tree: ast.Module) -> "SymbolTable":
+        """Build the symbol table of a parsed module."""
+        table = cls(Scope(MODULE, tree))
+        _Builder(table).build(tree)
+        return table
+
+    def scope_of(self, node: ast.AST) -> Optional[Scope]:
+        """Return the scope introduced by a module, class, function or comprehension node."""
+        return self._scopes.get(node)
+
+    @property
+    def scopes(self) -> Iterator[Scope]:
+        """All scopes, outermost first, in source order."""
+        return self.module.walk()
+
+    def imports(self) -> Iterator[Binding]:
+        """Yield every import binding, in source order."""
+        return (binding for binding in self.bindings if binding.kind == IMPORT)
+
+    def is_exported(self, name: str) -> bool:
+        """Whether ``name`` is listed in the module's ``__all__``."""
+        return self.exports is not None and name in self.exports
+
+    def unused_imports(self) -> List[Binding]:
+        """
+        Return import bindings nothing refers to, in source order.
+
+        ``__future__`` imports, names listed in ``__all__`` and explicit
+        re-exports (``import a as a``, ``from m import x as x``) are never
+        reported.
+        """
+        unused = []
+        for binding in self.imports():
+            if binding.used or binding.module == "__future__":
+                continue
+            if binding.scope is self.module and self.is_exported(binding.name):
+                continue
+            alias = binding.node
+            if isinstance(alias, ast.alias) and alias.asname and alias.asname == alias.name:
+                continue
+            unused.append(binding)
+        return unused
+
+
+def is_type_checking(test: ast.expr) -> bool:
+    """Whether an ``if`` test is ``TYPE_CHECKING`` or ``typing.TYPE_CHECKING``."""
+    if isinstance(test, ast.Name):
+        return test.id == "TYPE_CHECKING"
+    return isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING"
+
+
+def _string_items(node: ast.AST) -> Optional[List[str]]:
+    """Return the strings of a list or tuple literal of string constants."""
+    if isinstance(node, (ast.List, ast.Tuple)):
+        items = []
+        for element in node.elts:
+            if isinstance(element, ast.Constant) and isinstance(element.value, str):
+                items.append(element.value)
+        return items
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left = _string_items(node.left) or []
+        right = _string_items(node.right) or []
+        return left + right
+    return None
+
+
+class _Builder(ast.NodeVisitor):
+    """Visits a module once, filling in a :class:`SymbolTable`."""
+
+    def __init__(self, table: SymbolTable):
+        self.table = table
+        self.scope = table.module
+        self.type_checking = False
+        self.statement: Optional[ast.stmt] = None
+
+    def build(self, tree: ast.Module) -> None:
+        self.visit_body(tree.body)
+        self._resolve()
+
+    def _resolve(self) -> None:
+        for scope in self.table.scopes:
+            for name in scope.loads:
+                target = scope.lookup(name)
+                if target is not None:
+                    target.references[name] = target.references.get(name, 0) + 1
+        exports = self.table.exports
+        if exports:
+            module = self.table.module
+            for name in exports:
+                if name in module.bindings:
+                    module.references[name] = module.references.get(name, 0) + 1
+
+    # Scopes and bindings
+
+    def _push(self, kind: str, node: ast.AST) -> Scope:
+        scope = Scope(kind, node, self.scope)
+        self.table._scopes[node] = scope
+        self.scope = scope
+        return scope
+
+    def _pop(self, scope: Scope) -> None:
+        assert scope.parent is not None
+        self.scope = scope.parent
+
+    def _binding_scope(self, name: str) -> Scope:
+        scope = self.scope
+        if name in scope.globals:
+            return scope.module_scope()
+        if name in scope.nonlocals:
+            outer = scope.parent
+            while outer is not None and (outer.kind == CLASS or name not in outer.bindings):
+                if outer.parent is None:
+                    break
+                outer = outer.parent
+            if outer is not None:
+                return outer
+        return scope
+
+    def bind(
+        self,
+        name: str,
+        kind: str,
+        node: ast.AST,
+        module: Optional[str] = None,
+        scope: Optional[Scope] = None,
+    ) -> Binding:
+        if scope is None:
+            scope = self._binding_scope(name)
+        binding = Binding(
+            name,
+            kind,
+            node,
+            scope,
+            getattr(node, "lineno", getattr(self.statement, "lineno", 0)),
+            module=module,
+            statement=self.statement,
+            type_checking=self.type_checking,
+        )
+        scope.bindings.setdefault(name, []).append(binding)
+        self.table.bindings.append(binding)
+        return binding
+
+    def load(self, name: str) -> None:
+        self.scope.loads.append(name)
+
+    # Statements
+
+    def visit_body(self, body: List[ast.stmt]) -> None:
+        for statement in body:
+            self.visit(statement)
+
+    def visit(self, node: ast.AST) -> None:
+        if isinstance(node, ast.stmt):
+            outer = self.statement
+            self.statement = node
+            super().visit(node)
+            self.statement = outer
+        else:
+            super().visit(node)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".")[0]
+            self.bind(name, IMPORT, alias, module=alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        prefix = "." * node.level + (node.module or "")
+        for alias in node.names:
+            if alias.name == "*":
+                self.scope.has_star_import = True
+                continue
+            qualified = f"{prefix}.{alias.name}" if node.module else f"{prefix}{alias.name}"
+            if node.module == "__future__":
+                qualified = "__future__"
+            self.bind(alias.asname or alias.name, IMPORT, alias, module=qualified)
+
+    def _visit_function(self, node: Union[FunctionNode, ast.Lambda]) -> None:
+        args = node.args
+        # Decorators, defaults and annotations are evaluated in the enclosing scope
+        if not isinstance(node, ast.Lambda):
+            for decorator in node.decorator_list:
+                self.visit(decorator)
+        for default in args.defaults + [d for d in args.kw_defaults if d is not None]:
+            self.visit(default)
+        all_args = getattr(args, "posonlyargs", []) + args.args + args.kwonlyargs
+        for extra in (args.vararg, args.kwarg):
+            if extra is not None:
+                all_args.append(extra)
+        if not isinstance(node, ast.Lambda):
+            for arg in all_args:
+                self._visit_annotation(arg.annotation)
+            self._visit_annotation(node.returns)
+            self.bind(node.name, DEFINITION, node)
+
+        scope = self._push(FUNCTION, node)
+        for arg in all_args:
+            self.bind(arg.arg, PARAMETER, arg, scope=scope)
+        if isinstance(node, ast.Lambda):
+            self.visit(node.body)
+        else:
+            self.visit_body(node.body)
+        self._pop(scope)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        self._visit_function(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        for base in node.bases:
+            self.visit(base)
+        for keyword in node.keywords:
+            self.visit(keyword.value)
+        self.bind(node.name, DEFINITION, node)
+
+        scope = self._push(CLASS, node)
+        self.visit_body(node.body)
+        self._pop(scope)
+
+    def visit_Global(self, node: ast.Global) -> None:
+        self.scope.globals.update(node.names)
+
+    def visit_Nonlocal(self, node: ast.Nonlocal) -> None:
+        self.scope.nonlocals.update(node.names)
+        # The enclosing function's variable is shared state, so declaring it counts as a use
+        self.scope.loads.extend(node.names)
+
+    def visit_If(self, node: ast.If) -> None:
+        self.visit(node.test)
+        outer = self.type_checking
+        if is_type_checking(node.test):
+            self.type_checking = True
+        self.visit_body(node.body)
+        self.type_checking = outer
+        self.visit_body(node.orelse)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        self.visit(node.value)
+        for target in node.targets:
+            self.visit(target)
+        if self.scope is self.table.module:
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == "__all__":
+                    self.table.exports = _string_items(node.value)
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        self.visit(node.value)
+        if isinstance(node.target, ast.Name):
+            # Reads the current value, then rebinds it
+            self.load(node.target.id)
+            self.bind(node.target.id, ASSIGNMENT, node.target)
+            if node.target.id == "__all__" and self.scope is self.table.module:
+                self._extend_exports(_string_items(node.value))
+        else:
+            self.visit(node.target)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self._visit_annotation(node.annotation)
+        if node.value is not None:
+            self.visit(node.value)
+        if isinstance(node.target, ast.Name):
+            kind = ASSIGNMENT if node.value is not None else ANNOTATION
+            self.bind(node.target.id, kind, node.target)
+        else:
+            self.visit(node.target)
+
+    def visit_Expr(self, node: ast.Expr) -> None:
+        self.visit(node.value)
+        # __all__.extend([...]) and __all__.append("name")
+        call = node.value
+        if (
+            self.scope is self.table.module
+            and isinstance(call, ast.Call)
+            and isinstance(call.func, ast.Attribute)
+            and isinstance(call.func.value, ast.Name)
+            and call.func.value.id == "__all__"
+            and len(call.args) == 1
+        ):
+            arg = call.args[0]
+            if call.func.attr == "extend":
+                self._extend_exports(_string_items(arg))
+            elif (
+                call.func.attr == "append"
+                and isinstance(arg, ast.Constant)
+                and isinstance(arg.value, str)
+            ):
+                self._extend_exports([arg.value])
+
+    def _extend_exports(self, names: Optional[List[str]]) -> None:
+        if names is not None:
+            self.table.exports = (self.table.exports or []) + names
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.type is not None:
+            self.visit(node.type)
+        if node.name:
+            self.bind(node.name, EXCEPT, node)
+        self.visit_body(node.body)
+
+    # Expressions
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Store):
+            self.bind(node.id, ASSIGNMENT, node)
+        else:
+            # Loads, and "del name", which needs the name to be bound
+            self.load(node.id)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        if isinstance(node.ctx, ast.Load):
+            self.table.attributes.add(node.attr)
+        self.visit(node.value)
+
+    def visit_NamedExpr(self, node: "ast.NamedExpr") -> None:
+        self.visit(node.value)
+        # The target of := in a comprehension binds in the enclosing scope
+        scope = self.scope
+        while scope.kind == COMPREHENSION and scope.parent is not None:
+            scope = scope.parent
+        name = node.target.id
+        self.bind(name, ASSIGNMENT, node.target, scope=scope if scope is not self.scope else None)
+
+    def _visit_comprehension(
+        self, node: Union[ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp]
+    ) -> None:
+        generators = node.generators
+        # The first iterable is evaluated in the enclosing scope
+        self.visit(generators[0].iter)
+        scope = self._push(COMPREHENSION, node)
+        for index, generator in enumerate(generators):
+            if index:
+                self.visit(generator.iter)
+            self.visit(generator.target)
+            for condition in generator.ifs:
+                self.visit(condition)
+        if isinstance(node, ast.DictComp):
+            self.visit(node.key)
+            self.visit(node.value)
+        else:
+            self.visit(node.elt)
+        self._pop(scope)
+
+    visit_ListComp = _visit_comprehension
+    visit_SetComp = _visit_comprehension
+    visit_DictComp = _visit_comprehension
+    visit_GeneratorExp = _visit_comprehension
+
+    def visit_arg(self, node: ast.arg) -> None:
+        # Arguments are bound by _visit_function
+        pass
+
+    def _visit_annotation(self, annotation: Optional[ast.expr]) -> None:
+        """Visit an annotation, including the names inside string annotations."""
+        if annotation is None:
+            return
+        for node in ast.walk(annotation):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                try:
+                    parsed = ast.parse(node.value.strip(), mode="eval")
+                except SyntaxError:
+                    continue
+                self._visit_annotation(parsed.body)
+            elif isinstance(node, ast.Name):
+                self.load(node.id)
+
+    # Match statements (Python 3.10+)
+
+    def visit_MatchAs(self, node: ast.AST) -> None:
+        self.generic_visit(node)
+        name = getattr(node, "name", None)
+        if name:
+            self.bind(name, ASSIGNMENT, node)
+
+    def visit_MatchStar(self, node: ast.AST) -> None:
+        name = getattr(node, "name", None)
+        if name:
+            self.bind(name, ASSIGNMENT, node)
+
+    def visit_MatchMapping(self, node: ast.AST) -> None:
+        self.generic_visit(node)
+        rest = getattr(node, "rest", None)
+        if rest:
+            self.bind(rest, ASSIGNMENT, node)
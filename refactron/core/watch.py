@@ -0,0 +1,543 @@
+"""Continuous analysis of a directory tree, re-analyzing files as they change."""
+
+import hashlib
+import os
+import re
+import select
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from refactron.core import module_resolver
+from refactron.core.analysis_result import AnalysisResult
+from refactron.core.config import WATCH_DEBOUNCE_SECONDS, WATCH_POLL_INTERVAL
+from refactron.core.discovery import FileDiscovery
+from refactron.core.import_graph import absolute_path
+from refactron.core.models import CodeIssue, FileMetrics
+
+if TYPE_CHECKING:
+    from refactron.core.refactron import Refactron
+    from refactron.core.reference_index import ReferenceIndex
+
+# Seconds between two snapshots of the tree when inotify is not available
+POLL_INTERVAL = WATCH_POLL_INTERVAL
+
+# Seconds without further changes before a burst of saves is analyzed
+DEBOUNCE_SECONDS = WATCH_DEBOUNCE_SECONDS
+
+# inotify events that may change what discovery finds or what a file contains
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+
+# Modification time and size of a file
+FileState = Tuple[int, int]
+
+
+@dataclass
+class WatchUpdate:
+    """What one round of re-analysis changed."""
+
+    analyzed: List[Path] = field(default_factory=list)
+    removed: List[Path] = field(default_factory=list)
+    new_issues: List[CodeIssue] = field(default_factory=list)
+    resolved_issues: List[CodeIssue] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def _issue_key(issue: CodeIssue) -> Hashable:
+    # Line numbers are left out, so issues that only moved are not reported
+    return (str(issue.file_path), issue.rule_id, issue.level, issue.message)
+
+
+def diff_issues(
+    before: Iterable[CodeIssue], after: Iterable[CodeIssue]
+) -> Tuple[List[CodeIssue], List[CodeIssue]]:
+    """
+    Compare the issues of some files before and after a change.
+
+    Issues are matched by file, rule, level and message, counting
+    duplicates, so an issue that only moved to another line is neither new
+    nor resolved.
+
+    Args:
+        before: Issues before the change
+        after: Issues after the change
+
+    Returns:
+        The issues only found after the change, and those only found before it
+    """
+    before = list(before)
+    after = list(after)
+    return _unmatched(after, before), _unmatched(before, after)
+
+
+def _unmatched(issues: List[CodeIssue], others: List[CodeIssue]) -> List[CodeIssue]:
+    """Return the issues with no counterpart among ``others``."""
+    remaining = Counter(_issue_key(issue) for issue in others)
+    result = []
+    for issue in issues:
+        key = _issue_key(issue)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            result.append(issue)
+    return result
+
+
+def _stat(path: Union[str, Path]) -> Optional[FileState]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _digest(path: Path) -> Optional[bytes]:
+    try:
+        return hashlib.sha256(path.read_bytes()).digest()
+    except OSError:
+        return None
+
+
+class InotifyWaiter:
+    """
+    Blocks until something changes in a set of directories, using Linux inotify.
+
+    Only wake-ups are taken from inotify; what changed is found by comparing
+    snapshots of the tree, so no event needs to be decoded and an
+    overflowing event queue loses nothing.
+    """
+
+    def __init__(self, libc: Any, fd: int):
+        """
+        Wrap an inotify instance; use :meth:`create` instead.
+
+        Args:
+            libc: The C library providing ``inotify_add_watch``
+            fd: File descriptor of the inotify instance
+        """
+        self._libc = libc
+        self._fd = fd
+
+    @classmethod
+    def create(cls) -> Optional["InotifyWaiter"]:
+        """Return a waiter, or None where inotify is not available."""
+        if not sys.platform.startswith("linux"):
+            return None
+        import ctypes
+        import ctypes.util
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def watch(self, directories: Iterable[str]) -> bool:
+        """
+        Watch directories for changes to their entries; watching one again is harmless.
+
+        Returns:
+            False if a directory could not be watched, for example because the
+            system limit on watches was reached
+        """
+        for directory in directories:
+            if self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK) < 0:
+                if os.path.isdir(directory):
+                    return False
+        return True
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """
+        Wait for changes in the watched directories.
+
+        Args:
+            timeout: Seconds to wait at most; None waits until something changes
+
+        Returns:
+            True if something changed
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain the queue; the events themselves are not needed
+        while True:
+            try:
+                if not os.read(self._fd, 65536):
+                    break
+            except OSError:
+                break
+        return True
+
+    def close(self) -> None:
+        """Release the inotify instance."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class AnalysisWatcher:
+    """
+    Keeps the analysis of a directory tree up to date as its files change.
+
+    After a full analysis by :meth:`start`, each snapshot of the tree stats
+    the discovered files and directories. Only files whose size or
+    modification time changed, and whose contents hash differently, are
+    analyzed again; the tree is walked again only when a directory changed.
+    The project reference index is updated with the changed files alone,
+    and dead code findings are judged again only in the files the index
+    reports as affected. :attr:`result` always holds the analysis of the
+    whole tree and is updated one file at a time.
+
+    Snapshots are taken when Linux inotify reports a change in a watched
+    directory, and every :data:`POLL_INTERVAL` seconds elsewhere. Bursts of
+    saves are debounced into a single update.
+
+    Example:
+        >>> with AnalysisWatcher(Refactron(), "src") as watcher:
+        ...     watcher.start()
+        ...     while True:
+        ...         update = watcher.wait()
+        ...         print(len(update.new_issues), len(update.resolved_issues))
+    """
+
+    def __init__(
+        self,
+        refactron: "Refactron",
+        target: Union[str, Path],
+        debounce: float = DEBOUNCE_SECONDS,
+        interval: float = POLL_INTERVAL,
+        use_inotify: bool = True,
+    ):
+        """
+        Initialize the watcher; nothing is analyzed before :meth:`start`.
+
+        Args:
+            refactron: Refactron whose configuration and analyzers are used
+            target: File or directory to watch
+            debounce: Seconds without further changes before analyzing
+            interval: Seconds between snapshots when polling
+            use_inotify: Whether to use inotify where it is available
+        """
+        self.refactron = refactron
+        self.target = Path(target)
+        self.debounce = debounce
+        self.interval = interval
+        self.result = AnalysisResult()
+        self._waiter = InotifyWaiter.create() if use_inotify else None
+
+        self._files: List[Path] = []
+        # Discovered files by absolute path, as the reference index names them
+        self._paths: Dict[Path, Path] = {}
+        self._directories: Dict[str, Optional[FileState]] = {}
+        self._states: Dict[Path, FileState] = {}
+        self._digests: Dict[Path, Optional[bytes]] = {}
+        # Results of the analyzers alone, before the project-wide dead code check
+        self._raw: Dict[Path, FileMetrics] = {}
+        self._index: Optional["ReferenceIndex"] = None
+        # First-party module names by import root, when an analyzer depends on them
+        self._layouts: Dict[str, FrozenSet[str]] = {}
+
+    @property
+    def mode(self) -> str:
+        """How changes are noticed: ``"inotify"`` or ``"polling"``."""
+        return "inotify" if self._waiter is not None else "polling"
+
+    def __enter__(self) -> "AnalysisWatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop watching for changes."""
+        if self._waiter is not None:
+            self._waiter.close()
+            self._waiter = None
+
+    def start(self, workers: Optional[int] = None) -> AnalysisResult:
+        """
+        Analyze the whole tree and take the first snapshot.
+
+        Args:
+            workers: Number of worker processes for this first analysis, as
+                for :meth:`Refactron.analyze`
+
+        Returns:
+            The analysis of the tree, also kept in :attr:`result`
+
+        Raises:
+            FileNotFoundError: If the target does not exist
+        """
+        if not self.target.exists():
+            raise FileNotFoundError(f"Target not found: {self.target}")
+
+        files = self._discover()
+        for path in files:
+            state = _stat(path)
+            if state is not None:
+                self._states[path] = state
+                self._digests[path] = _digest(path)
+
+        refactron = self.refactron
+        self._index = refactron.project_reference_index(self.target)
+        if self._index is not None:
+            # Files the saved index is missing or stale for are indexed from their analysis
+            stale, removed = self._index.stale(files)
+            analyzed = refactron.analyze_files(stale, workers, reference_index=self._index)
+            self._raw.update(zip(stale, analyzed))
+            refactron.update_reference_index(self._index, removed=removed, workers=workers)
+            if stale or removed:
+                refactron.save_reference_index(self._index)
+        rest = [path for path in files if path not in self._raw]
+        self._raw.update(zip(rest, refactron.analyze_files(rest, workers)))
+
+        self.result = AnalysisResult()
+        for path in files:
+            metrics = self._judge(path)
+            self.result.file_metrics.append(metrics)
+            self.result.total_issues += metrics.issue_count
+        self.result.total_files = len(files)
+        self._layouts = self._project_layouts()
+        return self.result
+
+    # Snapshots
+
+    def _discover(self) -> List[Path]:
+        """Walk the target again, watching every directory listed."""
+        directories: List[str] = []
+        if self.target.is_dir():
+            discovery = FileDiscovery.from_config(self.refactron.config)
+            files = list(discovery.iter_files(self.target, directories))
+        else:
+            files = [self.target] if self.target.exists() else []
+            directories.append(os.path.dirname(os.path.abspath(self.target)))
+
+        self._files = files
+        self._paths = {absolute_path(path): path for path in files}
+        self._directories = {directory: _stat(directory) for directory in directories}
+        if self._waiter is not None and not self._waiter.watch(directories):
+            # Out of inotify watches: fall back to polling
+            self.close()
+        return files
+
+    def changes(self) -> Set[Path]:
+        """
+        Take a new snapshot of the tree.
+
+        Returns:
+            Files added, removed or modified since the previous snapshot
+        """
+        changed: Set[Path] = set()
+        if any(_stat(path) != state for path, state in self._directories.items()):
+            present = set(self._discover())
+            for path in [path for path in self._states if path not in present]:
+                del self._states[path]
+                self._digests.pop(path, None)
+                changed.add(path)
+
+        for path in self._files:
+            state = _stat(path)
+            if state == self._states.get(path):
+                continue
+            if state is None:
+                del self._states[path]
+                self._digests.pop(path, None)
+                changed.add(path)
+                continue
+
+            self._states[path] = state
+            digest = _digest(path)
+            # Saved again without changes, or only touched
+            if digest is not None and digest == self._digests.get(path):
+                continue
+            self._digests[path] = digest
+            changed.add(path)
+        return changed | self._layout_changes()
+
+    def _project_layouts(self) -> Dict[str, FrozenSet[str]]:
+        """Return the first-party module names of the watched files' projects, by import root."""
+        analyzers = self.refactron.analyzers
+        if not any(getattr(analyzer, "uses_project_layout", False) for analyzer in analyzers):
+            return {}
+        layouts = {}
+        for path in self._files:
+            root = module_resolver.import_root(os.path.dirname(os.path.abspath(path)))
+            if root not in layouts:
+                layouts[root] = module_resolver.first_party_names(root)
+        return layouts
+
+    def _layout_changes(self) -> Set[Path]:
+        """Return the files to analyze again because a module they import changed kind."""
+        # Modules added or removed, or pyproject.toml changed
+        if not module_resolver.refresh_caches():
+            return set()
+        layouts = self._project_layouts()
+        # Names that became or stopped being first-party, by import root
+        patterns: Dict[str, "re.Pattern[str]"] = {}
+        for root, names in layouts.items():
+            difference = names.symmetric_difference(self._layouts.get(root, frozenset()))
+            if difference:
+                patterns[root] = re.compile(r"\b(%s)\b" % "|".join(map(re.escape, difference)))
+        self._layouts = layouts
+
+        changed = set()
+        for path in self._files:
+            root = module_resolver.import_root(os.path.dirname(os.path.abspath(path)))
+            if path not in self._states or root not in patterns:
+                continue
+            # A file can only import a name it mentions
+            try:
+                if patterns[root].search(path.read_text(encoding="utf-8", errors="replace")):
+                    changed.add(path)
+            except OSError:
+                continue
+        return changed
+
+    def poll(self) -> Optional[WatchUpdate]:
+        """Take a snapshot and re-analyze what changed, without waiting."""
+        changed = self.changes()
+        return self.refresh(changed) if changed else None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[WatchUpdate]:
+        """
+        Wait until files change, then re-analyze them.
+
+        Changes are collected until none have been seen for ``debounce``
+        seconds, so saving many files at once results in a single update.
+
+        Args:
+            timeout: Seconds to wait for a change at most; None waits forever
+
+        Returns:
+            The update, or None if nothing changed before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if self._waiter is None:
+                remaining = self.interval if remaining is None else min(self.interval, remaining)
+            if not self._may_have_changed(remaining):
+                continue
+            changed = self.changes()
+            if not changed:
+                continue
+
+            while self._may_have_changed(self.debounce):
+                more = self.changes()
+                if not more:
+                    break
+                changed |= more
+            return self.refresh(changed)
+
+    def _may_have_changed(self, seconds: Optional[float]) -> bool:
+        """Wait up to ``seconds``; False if nothing can have changed meanwhile."""
+        if self._waiter is not None:
+            return self._waiter.wait(seconds)
+        time.sleep(seconds or 0.0)
+        return True
+
+    # Updates
+
+    def refresh(self, changed: Iterable[Path]) -> WatchUpdate:
+        """
+        Re-analyze changed files and update :attr:`result`.
+
+        Args:
+            changed: Files as returned by :meth:`changes`; those no longer in
+                the snapshot are dropped from the results
+
+        Returns:
+            The files analyzed and removed, and the issues found and resolved
+        """
+        start = time.perf_counter()
+        changed = set(changed)
+        update = WatchUpdate()
+        affected: Set[Path] = set()
+        for path in self._files:
+            if path in changed and path in self._states:
+                try:
+                    (metrics,) = self.refactron.analyze_files([path], reference_index=self._index)
+                except OSError:
+                    # Deleted since the snapshot; the next one notices
+                    continue
+                self._raw[path] = metrics
+                update.analyzed.append(path)
+                if self._index is not None:
+                    affected |= self._index.affected
+        update.removed = sorted(
+            path for path in changed if path in self._raw and path not in self._states
+        )
+        if self._index is not None and update.removed:
+            affected |= self.refactron.update_reference_index(self._index, removed=update.removed)
+
+        # Definitions elsewhere may have become used or unused
+        affected = {self._paths.get(path, path) for path in affected}
+        affected.update(update.analyzed, update.removed)
+        before = [issue for path in sorted(affected) for issue in self._issues(path)]
+        for path in update.removed:
+            self._raw.pop(path, None)
+            self.result.discard(path)
+        for path in sorted(affected):
+            if path not in self._raw:
+                continue
+            metrics = self._judge(path)
+            if self.result.metrics_for_file(path) is None:
+                self.result.file_metrics.append(metrics)
+                self.result.total_files += 1
+                self.result.total_issues += metrics.issue_count
+            else:
+                self.result.replace(metrics)
+        after = [issue for path in sorted(affected) for issue in self._issues(path)]
+
+        update.new_issues, update.resolved_issues = diff_issues(before, after)
+        update.seconds = time.perf_counter() - start
+        return update
+
+    def _issues(self, path: Path) -> List[CodeIssue]:
+        metrics = self.result.metrics_for_file(path)
+        return metrics.issues if metrics is not None else []
+
+    def _judge(self, path: Path) -> FileMetrics:
+        """Return a file's metrics with its dead code findings judged by the whole project."""
+        if self._index is None:
+            return self._raw[path]
+        return self.refactron.apply_reference_index(self._raw[path], self._index)
@@ -1,15 +1,28 @@
 """Base refactorer class."""
 
+import ast
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List
+from typing import List, Tuple, Type
 
 from refactron.core.config import RefactronConfig
 from refactron.core.models import RefactoringOperation
+from refactron.core.registry import COST_MODERATE
 
 
 class BaseRefactorer(ABC):
-    """Base class for all refactorers."""
+    """
+    Base class for all refactorers.
+
+    Subclasses describe themselves to the plugin registry with the class
+    attributes ``node_types`` (the AST nodes they look for; empty for the
+    whole module), ``cost`` (see :data:`refactron.core.registry.COST_CLASSES`)
+    and ``cacheable``.
+    """
+
+    node_types: Tuple[Type[ast.AST], ...] = ()
+    cost = COST_MODERATE
+    cacheable = True
 
     def __init__(self, config: RefactronConfig):
         """
@@ -5,12 +5,16 @@ from pathlib import Path
 from typing import List, Union
 
 from refactron.core.models import RefactoringOperation
+from refactron.core.registry import COST_MODERATE
 from refactron.refactorers.base_refactorer import BaseRefactorer
 
 
 class ExtractMethodRefactorer(BaseRefactorer):
     """Suggests extracting methods from overly complex functions."""
 
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef)
+    cost = COST_MODERATE
+
     @property
     def operation_type(self) -> str:
         return "extract_method"
@@ -5,12 +5,16 @@ from pathlib import Path
 from typing import Dict, List, Tuple, Union
 
 from refactron.core.models import RefactoringOperation
+from refactron.core.registry import COST_MODERATE
 from refactron.refactorers.base_refactorer import BaseRefactorer
 
 
 class MagicNumberRefactorer(BaseRefactorer):
     """Suggests extracting magic numbers into named constants."""
 
+    node_types = (ast.Constant,)
+    cost = COST_MODERATE
+
     @property
     def operation_type(self) -> str:
         return "extract_constant"
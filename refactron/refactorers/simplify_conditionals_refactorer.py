@@ -5,12 +5,16 @@ from pathlib import Path
 from typing import List, Union
 
 from refactron.core.models import RefactoringOperation
+from refactron.core.registry import COST_MODERATE
 from refactron.refactorers.base_refactorer import BaseRefactorer
 
 
 class SimplifyConditionalsRefactorer(BaseRefactorer):
     """Suggests simplifying deeply nested conditionals."""
 
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef)
+    cost = COST_MODERATE
+
     @property
     def operation_type(self) -> str:
         return "simplify_conditionals"
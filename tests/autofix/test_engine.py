@@ -54,6 +54,22 @@ class TestAutoFixEngine:
         )
         assert engine.can_fix(issue) is False
 
+    def test_can_fix_analyzer_rule_id(self):
+        """Test issues reported by the analyzers find their fixer by rule ID."""
+        engine = AutoFixEngine()
+        issue = CodeIssue(
+            category=IssueCategory.CODE_SMELL,
+            level=IssueLevel.INFO,
+            message="Unused import: 'os'",
+            file_path=Path("test.py"),
+            line_number=1,
+            rule_id="S006",
+        )
+        assert engine.fixer_for(issue) is engine.fixers["remove_unused_imports"]
+        result = engine.fix(issue, "import os\nimport sys\n\nprint(sys.argv)\n")
+        assert result.success
+        assert result.fixed == "import sys\n\nprint(sys.argv)\n"
+
     def test_can_fix_with_no_rule_id(self):
         """Test can_fix returns False when rule_id is None."""
         engine = AutoFixEngine()
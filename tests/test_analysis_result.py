@@ -0,0 +1,204 @@
+"""Tests for the indexed AnalysisResult."""
+
+import pickle
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from refactron.core.analysis_result import AnalysisResult
+from refactron.core.models import CodeIssue, FileMetrics, IssueCategory, IssueLevel
+
+
+def make_issue(
+    file_path: Path, level: IssueLevel, category: IssueCategory, rule_id: str, line: int = 1
+) -> CodeIssue:
+    return CodeIssue(
+        category=category,
+        level=level,
+        message=f"{rule_id} issue",
+        file_path=file_path,
+        line_number=line,
+        rule_id=rule_id,
+    )
+
+
+def make_metrics(name: str, issues: List[CodeIssue]) -> FileMetrics:
+    return FileMetrics(
+        file_path=Path(name),
+        lines_of_code=10,
+        comment_lines=0,
+        blank_lines=0,
+        complexity=1.0,
+        maintainability_index=100.0,
+        functions=1,
+        classes=0,
+        issues=issues,
+    )
+
+
+@pytest.fixture
+def result() -> AnalysisResult:
+    a, b = Path("a.py"), Path("b.py")
+    result = AnalysisResult()
+    result.file_metrics.append(
+        make_metrics(
+            "a.py",
+            [
+                make_issue(a, IssueLevel.CRITICAL, IssueCategory.SECURITY, "SEC001"),
+                make_issue(a, IssueLevel.INFO, IssueCategory.TYPE_HINTS, "TYPE001", 2),
+            ],
+        )
+    )
+    result.file_metrics.append(
+        make_metrics(
+            "b.py",
+            [
+                make_issue(b, IssueLevel.WARNING, IssueCategory.COMPLEXITY, "C002"),
+                make_issue(b, IssueLevel.INFO, IssueCategory.TYPE_HINTS, "TYPE001", 3),
+                make_issue(b, IssueLevel.ERROR, IssueCategory.SECURITY, "SEC002", 4),
+            ],
+        )
+    )
+    result.total_files = 2
+    result.total_issues = 5
+    return result
+
+
+def flatten(result: AnalysisResult) -> List[CodeIssue]:
+    return [issue for metrics in result.file_metrics for issue in metrics.issues]
+
+
+def test_indexes(result):
+    assert result.all_issues == flatten(result)
+    assert [i.rule_id for i in result.critical_issues] == ["SEC001"]
+    assert [i.rule_id for i in result.error_issues] == ["SEC002"]
+    assert len(result.issues_by_level(IssueLevel.INFO)) == 2
+    assert [i.rule_id for i in result.issues_by_category(IssueCategory.SECURITY)] == [
+        "SEC001",
+        "SEC002",
+    ]
+    assert [i.line_number for i in result.issues_by_rule("TYPE001")] == [2, 3]
+    assert result.issues_by_rule("MISSING") == []
+    assert len(result.issues_by_file(Path("b.py"))) == 3
+    assert result.issues_by_file(Path("missing.py")) == []
+    assert result.metrics_for_file(Path("a.py")) is result.file_metrics[0]
+
+
+def test_summary(result):
+    assert result.summary() == {
+        "total_files": 2,
+        "total_issues": 5,
+        "critical": 1,
+        "errors": 1,
+        "warnings": 1,
+        "info": 2,
+    }
+
+
+def test_append_updates_indexes(result):
+    assert result.summary()["critical"] == 1
+    c = Path("c.py")
+
+    result.file_metrics.append(
+        make_metrics("c.py", [make_issue(c, IssueLevel.CRITICAL, IssueCategory.SECURITY, "X")])
+    )
+
+    assert result.summary()["critical"] == 2
+    assert result.all_issues[-1].file_path == c
+    assert len(result.issues_by_rule("X")) == 1
+
+
+def test_other_mutations_rebuild_indexes(result):
+    assert len(result.all_issues) == 5
+
+    result.file_metrics.reverse()
+    assert result.all_issues == flatten(result)
+
+    del result.file_metrics[0]
+    assert result.all_issues == flatten(result)
+    assert result.issues_by_file(Path("b.py")) == []
+
+    result.file_metrics = []
+    assert result.all_issues == []
+    result.file_metrics.extend([make_metrics("d.py", [])])
+    assert result.metrics_for_file(Path("d.py")) is not None
+
+
+def test_reindex_after_in_place_change(result):
+    assert len(result.critical_issues) == 1
+    a = Path("a.py")
+
+    result.file_metrics[0].issues.append(
+        make_issue(a, IssueLevel.CRITICAL, IssueCategory.SECURITY, "SEC003")
+    )
+    result.reindex()
+
+    assert len(result.critical_issues) == 2
+
+
+def test_replace_and_discard_update_single_files(result):
+    a = Path("a.py")
+    files = result.file_metrics
+    new_a = make_metrics("a.py", [make_issue(a, IssueLevel.WARNING, IssueCategory.STYLE, "S001")])
+
+    old_a = files[0]
+    assert result.replace(new_a) is old_a
+    assert result.file_metrics is files
+    assert files[0] is new_a
+    # The replaced file keeps its place in every index
+    assert result.all_issues == flatten(result)
+    assert [i.file_path for i in result.issues_by_level(IssueLevel.WARNING)] == [a, Path("b.py")]
+    assert result.critical_issues == []
+    assert result.summary()["total_issues"] == 4
+
+    result.file_metrics.append(make_metrics("c.py", []))
+    result.total_files += 1
+    dropped = result.discard(Path("b.py"))
+    assert dropped is not None and dropped.issue_count == 3
+    assert result.discard(Path("b.py")) is None
+    assert [metrics.file_path for metrics in files] == [a, Path("c.py")]
+    assert result.all_issues == flatten(result)
+    assert result.issues_by_rule("TYPE001") == []
+    assert (result.total_files, result.total_issues) == (2, 1)
+
+    c = Path("c.py")
+    result.replace(
+        make_metrics("c.py", [make_issue(c, IssueLevel.INFO, IssueCategory.STYLE, "S001")])
+    )
+    assert result.all_issues == flatten(result)
+    assert result.summary()["info"] == 1
+    with pytest.raises(KeyError):
+        result.replace(make_metrics("missing.py", []))
+
+
+def test_filters_return_lists(result):
+    issues = result.all_issues
+    issues.append(issues[0])
+
+    # Changing a returned list leaves the indexes alone
+    assert isinstance(issues, list)
+    assert result.all_issues == flatten(result)
+    assert result.critical_issues + result.error_issues == [
+        flatten(result)[0],
+        flatten(result)[4],
+    ]
+
+
+def test_pickle_round_trip(result):
+    restored = pickle.loads(pickle.dumps(result))
+
+    assert restored == result
+    assert [i.rule_id for i in restored.issues_by_rule("TYPE001")] == ["TYPE001", "TYPE001"]
+    restored.file_metrics.append(
+        make_metrics(
+            "c.py",
+            [make_issue(Path("c.py"), IssueLevel.CRITICAL, IssueCategory.SECURITY, "SEC004")],
+        )
+    )
+    assert [i.rule_id for i in restored.critical_issues] == ["SEC001", "SEC004"]
+    assert pickle.loads(pickle.dumps(result.file_metrics)) == result.file_metrics
+
+
+def test_results_compare_equal():
+    assert AnalysisResult() == AnalysisResult(file_metrics=[])
@@ -0,0 +1,203 @@
+"""Tests for the persistent analysis cache."""
+
+import ast
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from refactron import Refactron
+from refactron.core import module_resolver
+from refactron.core.cache import AnalysisCache
+from refactron.core.config import RefactronConfig
+from refactron.core.models import CodeIssue, FileMetrics, IssueCategory, IssueLevel
+
+SOURCE = """
+import os
+
+
+def compute(a, b, c, d, e, f):
+    if a:
+        return eval(b)
+    return 42
+"""
+
+
+@pytest.fixture
+def config(tmp_path: Path) -> RefactronConfig:
+    return RefactronConfig(cache_enabled=True, cache_dir=str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "first.py").write_text(SOURCE)
+    (project / "second.py").write_text(SOURCE.replace("42", "43"))
+    return project
+
+
+def issue_keys(result):
+    return [
+        (str(m.file_path), m.lines_of_code, [(i.rule_id, i.line_number, i.level) for i in m.issues])
+        for m in result.file_metrics
+    ]
+
+
+def make_metrics(file_path: Path) -> FileMetrics:
+    return FileMetrics(
+        file_path=file_path,
+        lines_of_code=3,
+        comment_lines=1,
+        blank_lines=0,
+        complexity=2.0,
+        maintainability_index=80.0,
+        functions=1,
+        classes=0,
+        issues=[
+            CodeIssue(
+                category=IssueCategory.SECURITY,
+                level=IssueLevel.CRITICAL,
+                message="Dangerous call",
+                file_path=file_path,
+                line_number=2,
+                rule_id="SEC001",
+                confidence=0.9,
+                metadata={"function": "eval"},
+            )
+        ],
+    )
+
+
+def test_warm_run_skips_parsing(config, project):
+    cold = Refactron(config).analyze(project)
+
+    refactron = Refactron(config)
+    with mock.patch("refactron.core.parsed_module.ast.parse", wraps=ast.parse) as parse:
+        warm = refactron.analyze(project)
+
+    parse.assert_not_called()
+    assert refactron.cache.hits == 2
+    assert issue_keys(warm) == issue_keys(cold)
+    assert warm.total_issues == cold.total_issues
+
+
+def test_changed_file_is_reanalyzed(config, project):
+    Refactron(config).analyze(project)
+    (project / "second.py").write_text(SOURCE + "\nx = eval('1')\n")
+
+    refactron = Refactron(config)
+    result = refactron.analyze(project)
+
+    assert refactron.cache.hits == 1
+    assert refactron.cache.misses == 1
+    assert issue_keys(result) == issue_keys(Refactron().analyze(project))
+
+
+def test_config_change_invalidates_cache(config, project):
+    Refactron(config).analyze(project)
+
+    config.max_parameters = 2
+    refactron = Refactron(config)
+    refactron.analyze(project)
+
+    assert refactron.cache.hits == 0
+
+
+def test_new_first_party_module_invalidates_import_order(config, project):
+    (project / "app.py").write_text("import mylib\nimport os\n")
+
+    def import_order():
+        result = Refactron(config).analyze(project / "app.py")
+        return [i.message for i in result.all_issues if i.rule_id == "DEP004"]
+
+    assert import_order() == ["Import order: stdlib import after third_party"]
+    (project / "mylib.py").write_text("")
+    # A new run starts with empty module resolver caches
+    module_resolver.clear_caches()
+    assert import_order() == ["Import order: stdlib import after local"]
+
+
+def test_cache_settings_do_not_change_fingerprint(config, tmp_path):
+    other = RefactronConfig(
+        cache_enabled=True, cache_dir=str(tmp_path / "cache"), cache_max_size_mb=1
+    )
+
+    assert Refactron(config).cache.fingerprint == Refactron(other).cache.fingerprint
+
+
+def test_analyzer_set_changes_fingerprint(config, tmp_path):
+    other = RefactronConfig(
+        cache_enabled=True, cache_dir=str(tmp_path / "cache"), enabled_analyzers=["security"]
+    )
+
+    assert Refactron(config).cache.fingerprint != Refactron(other).cache.fingerprint
+
+
+def test_cache_disabled_by_default():
+    assert Refactron().cache is None
+
+
+def test_round_trip_uses_requested_path(tmp_path):
+    cache = AnalysisCache(tmp_path, "fingerprint")
+    key = cache.key_for(tmp_path / "a.py", b"data")
+    cache.put(key, make_metrics(tmp_path / "a.py"))
+
+    metrics = cache.get(key, tmp_path / "a.py")
+
+    assert metrics == make_metrics(tmp_path / "a.py")
+
+
+def test_key_depends_on_content_and_path(tmp_path):
+    cache = AnalysisCache(tmp_path, "fingerprint")
+
+    assert cache.key_for(Path("a.py"), b"x") == cache.key_for(Path("a.py"), b"x")
+    assert cache.key_for(Path("a.py"), b"x") != cache.key_for(Path("a.py"), b"y")
+    assert cache.key_for(Path("a.py"), b"x") != cache.key_for(Path("b.py"), b"x")
+    assert cache.key_for(Path("a.py"), b"x") != AnalysisCache(tmp_path, "other").key_for(
+        Path("a.py"), b"x"
+    )
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = AnalysisCache(tmp_path, "fingerprint")
+    key = cache.key_for(Path("a.py"), b"data")
+    cache.put(key, make_metrics(Path("a.py")))
+    entry = next(tmp_path.rglob("*.json"))
+    entry.write_text("{not json")
+
+    assert cache.get(key, Path("a.py")) is None
+    assert not entry.exists()
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = AnalysisCache(tmp_path, "fingerprint")
+    keys = [cache.key_for(Path(f"{i}.py"), b"data") for i in range(4)]
+    for index, key in enumerate(keys):
+        cache.put(key, make_metrics(Path(f"{index}.py")))
+    entries = sorted(tmp_path.rglob("*.json"))
+    entry_size = entries[0].stat().st_size
+    for age, key in enumerate(keys):
+        entry = next(tmp_path.rglob(f"{key}.json"))
+        os.utime(entry, (1000 + age, 1000 + age))
+
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get(keys[0], Path("0.py")) is not None
+    cache.max_size_bytes = entry_size * 2
+
+    assert cache.prune() == 2
+    assert cache.get(keys[0], Path("0.py")) is not None
+    assert cache.get(keys[1], Path("1.py")) is None
+    assert cache.get(keys[2], Path("2.py")) is None
+    assert cache.get(keys[3], Path("3.py")) is not None
+
+
+def test_parallel_workers_share_cache(config, project):
+    cold = Refactron(config).analyze(project, workers=2)
+
+    refactron = Refactron(config)
+    warm = refactron.analyze(project)
+
+    assert refactron.cache.hits == 2
+    assert issue_keys(warm) == issue_keys(cold)
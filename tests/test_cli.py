@@ -1,6 +1,8 @@
 """Comprehensive tests for the CLI interface."""
 
 import os
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
 
@@ -28,6 +30,21 @@ class TestCLIBasics:
         assert result.exit_code == 0
         assert "1.0.0" in result.output
 
+    def test_startup_defers_heavy_imports(self):
+        """Test importing the CLI loads no analyzers, refactorers, rich or yaml."""
+        code = (
+            "import sys, refactron.cli; "
+            "print('\\n'.join(m for m in sys.modules "
+            "if m.split('.')[0] in ('rich', 'yaml', 'radon', 'libcst') "
+            "or m.startswith(('refactron.analyzers', 'refactron.refactorers', "
+            "'refactron.autofix.fixers', 'refactron.core.refactron', 'refactron.core.watch', "
+            "'refactron.core.import_graph', 'refactron.core.symbols'))))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.split() == []
+
 
 class TestAnalyzeCommand:
     """Test the analyze command."""
@@ -106,6 +123,65 @@ def test_function(a, b, c, d, e, f):
             result = runner.invoke(analyze, [tmpdir])
             assert result.exit_code == 0
 
+    def test_analyze_with_jobs(self):
+        """Test analyzing a directory with several worker processes."""
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i in range(3):
+                (Path(tmpdir) / f"module_{i}.py").write_text("def f():\n    return 1\n")
+
+            result = runner.invoke(analyze, [tmpdir, "--jobs", "2"])
+            assert result.exit_code == 0
+            assert "Files Analyzed" in result.output
+
+    def test_analyze_with_cache_dir(self):
+        """Test that analysis results are cached in the given directory."""
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            test_file = Path(tmpdir) / "module.py"
+            test_file.write_text("def f():\n    return 1\n")
+            cache_dir = Path(tmpdir) / "cache"
+
+            result = runner.invoke(analyze, [str(test_file), "--cache-dir", str(cache_dir)])
+            assert result.exit_code == 0
+            assert list(cache_dir.rglob("*.json"))
+
+    def test_analyze_with_no_cache(self):
+        """Test that --no-cache leaves the cache directory untouched."""
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            test_file = Path(tmpdir) / "module.py"
+            test_file.write_text("def f():\n    return 1\n")
+            cache_dir = Path(tmpdir) / "cache"
+
+            result = runner.invoke(
+                analyze, [str(test_file), "--no-cache", "--cache-dir", str(cache_dir)]
+            )
+            assert result.exit_code == 0
+            assert not cache_dir.exists()
+
+    def test_analyze_changed_since_outside_git_repo(self):
+        """Test that --changed-since fails cleanly outside a git work tree."""
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "module.py").write_text("x = 1\n")
+
+            result = runner.invoke(analyze, [tmpdir, "--changed-since", "HEAD", "--no-cache"])
+            assert result.exit_code == 1
+            assert "changed files" in result.output
+
+    def test_analyze_rejects_negative_jobs(self):
+        """Test that a negative job count is rejected."""
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = runner.invoke(analyze, [tmpdir, "-j", "-1"])
+            assert result.exit_code != 0
+
     def test_analyze_detects_issues(self):
         """Test that analyze actually detects issues."""
         runner = CliRunner()
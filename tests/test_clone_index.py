@@ -0,0 +1,182 @@
+"""Tests for the project-wide clone index."""
+
+import os
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from click.testing import CliRunner
+
+from refactron import Refactron
+from refactron.cli import clones
+from refactron.core.clone_index import CloneGroup, CloneIndex
+from refactron.core.clones import sized_windows, winnow
+from refactron.core.config import RefactronConfig
+
+PARSER = """
+def parse_config(path, defaults):
+    settings = dict(defaults)
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, _, value = line.partition("=")
+            settings[key.strip()] = value.strip()
+    return settings
+"""
+
+# The same function, renamed and with other names and constants
+COPY = """
+import os
+
+
+def read_settings(filename, base):
+    settings = dict(base)
+    with open(filename) as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith(";"):
+                continue
+            key, _, value = line.partition(":")
+            settings[key.strip()] = value.strip()
+    return settings
+
+
+def unrelated():
+    return os.getcwd()
+"""
+
+OTHER = """
+def total(values):
+    result = 0
+    for value in values:
+        result += value
+    return result
+"""
+
+
+def write(root: Path, files: Dict[str, str]) -> List[Path]:
+    paths = []
+    for name, source in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+        paths.append(path)
+    return sorted(paths)
+
+
+def spans(groups: List[CloneGroup], root: Path) -> List[List[str]]:
+    return [
+        [
+            f"{location.file_path.relative_to(root).as_posix()}:{location.start_line}"
+            for location in group.locations
+        ]
+        for group in groups
+    ]
+
+
+PROJECT = {"config.py": PARSER, "legacy/settings.py": COPY, "math.py": OTHER}
+
+
+def test_finds_clones_across_files(tmp_path: Path) -> None:
+    files = write(tmp_path, PROJECT)
+
+    groups = CloneIndex.build(tmp_path, files).clone_groups()
+
+    # Found through the function bodies, which match apart from names and constants
+    assert spans(groups, tmp_path) == [["config.py:3", "legacy/settings.py:6"]]
+    assert [location.end_line for location in groups[0].locations] == [10, 13]
+    assert groups[0].duplicated_lines == 8
+
+
+def test_no_clones(tmp_path: Path) -> None:
+    files = write(tmp_path, {"config.py": PARSER, "math.py": OTHER})
+
+    assert CloneIndex.build(tmp_path, files).clone_groups() == []
+
+
+def test_save_load_and_update(tmp_path: Path) -> None:
+    files = write(tmp_path, PROJECT)
+    saved = tmp_path / "index.json"
+    CloneIndex.build(tmp_path, files).save(saved)
+
+    index = CloneIndex.load(saved, tmp_path)
+    assert index is not None
+    assert not index.update(files)
+    assert len(index.clone_groups()) == 1
+    assert CloneIndex.load(saved, tmp_path / "legacy") is None
+
+    copy = tmp_path / "legacy/settings.py"
+    copy.write_text(OTHER)
+    stat = copy.stat()
+    os.utime(copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert index.update(files)
+    assert index.scanned == 1
+    assert index.clone_groups() == []
+
+    assert index.update(files[:1])
+    assert list(index.files) == [files[0]]
+
+
+def test_parallel_build_matches_serial(tmp_path: Path) -> None:
+    files = write(tmp_path, PROJECT)
+
+    serial = CloneIndex.build(tmp_path, files)
+    parallel = CloneIndex.build(tmp_path, files, workers=2)
+
+    assert parallel.clone_groups() == serial.clone_groups()
+
+
+def test_cached_index_is_reused(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    write(project, PROJECT)
+    config = RefactronConfig(cache_enabled=True, cache_dir=str(tmp_path / "cache"))
+
+    first = Refactron(config).clone_index(project)
+    second = Refactron(config).clone_index(project)
+
+    assert first.scanned == len(PROJECT)
+    assert second.scanned == 0
+    assert second.clone_groups() == first.clone_groups()
+
+
+def test_sized_windows_match_naive_hashing() -> None:
+    rng = random.Random(0)
+    hashes = [rng.randrange(1 << 64) for _ in range(40)]
+    sizes = [rng.randrange(1, 30) for _ in range(40)]
+
+    windows = sized_windows(hashes, sizes, 50)
+
+    for value, start, end in windows:
+        assert sum(sizes[start:end]) >= 50 > sum(sizes[start : end - 1])
+        assert value == sized_windows(hashes[start:end], sizes[start:end], 50)[0][0]
+    assert [start for _, start, _ in windows] == list(range(len(windows)))
+
+
+def test_winnowing_guarantee() -> None:
+    rng = random.Random(1)
+    shared = [rng.randrange(1000) for _ in range(4)]
+    first = [rng.randrange(1000) for _ in range(30)] + shared
+    second = shared + [rng.randrange(1000) for _ in range(10)]
+
+    selected_first = {first[index] for index in winnow(first, 4)}
+    selected_second = {second[index] for index in winnow(second, 4)}
+
+    assert selected_first & selected_second & set(shared)
+    assert len(winnow(first, 4)) < len(first)
+    assert winnow([5, 3, 3], 4) == [2]
+    assert winnow([], 4) == []
+
+
+def test_cli_reports_clones(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    write(project, PROJECT)
+
+    result = CliRunner().invoke(clones, [str(project), "--no-cache"])
+
+    assert result.exit_code == 0
+    assert "Clone 1" in result.output
+    assert os.path.join("legacy", "settings.py") + ":6-13" in result.output
+    assert "Found 1 clone group(s), 8 duplicated lines" in result.output
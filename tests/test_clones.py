@@ -0,0 +1,134 @@
+"""Tests for the normalized statement hashes and repeated code detection."""
+
+import ast
+from pathlib import Path
+from typing import List
+
+from refactron.analyzers.code_smell_analyzer import CodeSmellAnalyzer
+from refactron.core.clones import StatementHashes, repeated_windows, window_hashes
+from refactron.core.config import RefactronConfig
+from refactron.core.parsed_module import ParsedModule
+
+REPEATED = """
+def process(items):
+    total = 0
+    total += items[0] * 2
+    if total > 10:
+        print("large")
+    total += items[1] * 3
+    if total > 20:
+        print("larger")
+    total += items[2] * 4
+    if total > 30:
+        print("largest")
+    return total
+"""
+
+DUPLICATES = '''
+def load_users(path):
+    """Load users."""
+    with open(path) as handle:
+        rows = [line.split(",") for line in handle if line.strip()]
+    return {row[0]: row[1:] for row in rows}
+
+
+def load_groups(source):
+    with open(source) as handle:
+        rows = [line.split(";") for line in handle if line.strip()]
+    return {row[0]: row[1:] for row in rows}
+
+
+def load_other(path):
+    with open(path) as handle:
+        rows = [line.split(",") for line in handle]
+    return {row[0]: row[1:] for row in rows}
+'''
+
+
+def statement_hashes(source: str) -> StatementHashes:
+    return StatementHashes.build(ast.parse(source))
+
+
+def naive_groups(hashes: List[int], width: int) -> List[List[int]]:
+    groups: dict = {}
+    for start in range(len(hashes) - width + 1):
+        groups.setdefault(tuple(hashes[start : start + width]), []).append(start)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def analyze(source: str) -> list:
+    analyzer = CodeSmellAnalyzer(RefactronConfig())
+    return analyzer.analyze_module(ParsedModule(Path("example.py"), source))
+
+
+def test_hashes_normalize_constants_and_names_read() -> None:
+    hashes = statement_hashes("x = a + 1\nx = b + 2\ny = a + 1\nx = a - 1\nx = a.b + 1\n")
+    first, constants, target, operator, attribute = (
+        hashes.hashes[statement] for statement in hashes.tree.body
+    )
+
+    assert first == constants
+    assert len({first, target, operator, attribute}) == 4
+    # Assign, Name, Store, BinOp, Name, Load, Add and Constant
+    assert hashes.sizes[hashes.tree.body[0]] == 8
+
+
+def test_sequences_combine_and_sizes_add_up() -> None:
+    hashes = statement_hashes("a = 1\nb = 2\na = 3\nb = 4\n")
+    body = hashes.tree.body
+
+    assert hashes.sequence(body)[:2] == hashes.sequence(body)[2:]
+    assert hashes.combined(body[:2]) == hashes.combined(body[2:])
+    assert hashes.combined(body[:2]) != hashes.combined(body[1:3])
+    assert hashes.size(body) == sum(hashes.sizes[statement] for statement in body)
+
+
+def test_repeated_windows_match_naive_grouping() -> None:
+    hashes = [1, 2, 3, 1, 2, 3, 1, 2, 4, 5, 1, 2, 3]
+
+    assert repeated_windows(hashes, 3) == naive_groups(hashes, 3)
+    assert repeated_windows(hashes, 2) == naive_groups(hashes, 2)
+    assert len(window_hashes(hashes, 3)) == len(hashes) - 2
+    assert repeated_windows(hashes, 20) == []
+
+
+def test_rolling_hash_collisions_are_not_grouped() -> None:
+    # With base-1000003 rolling hashes, (1, 0) and (0, 1000003) collide
+    hashes = [1, 0, 0, 1000003]
+
+    assert window_hashes(hashes, 2)[0] == window_hashes(hashes, 2)[2]
+    assert repeated_windows(hashes, 2) == []
+
+
+def test_repeated_block_reports_lines() -> None:
+    issues = [issue for issue in analyze(REPEATED) if issue.rule_id == "S007"]
+
+    assert len(issues) == 1
+    assert issues[0].metadata == {"occurrences": 2, "lines": [4, 7]}
+    assert issues[0].line_number == 4
+
+
+def test_duplicate_function_bodies() -> None:
+    issues = [issue for issue in analyze(DUPLICATES) if issue.rule_id == "S003"]
+
+    assert [issue.message for issue in issues] == ["Potential duplicate function: 'load_groups'"]
+    assert issues[0].metadata == {"duplicate_of": "load_users", "duplicate_line": 2}
+
+
+def test_numbered_names_alone_are_not_duplicates() -> None:
+    source = "def step1():\n    return 1\n\n\ndef step2(x):\n    return [x] * 2\n"
+
+    assert not [issue for issue in analyze(source) if issue.rule_id == "S003"]
+
+
+def test_deeply_nested_source_does_not_recurse() -> None:
+    depth = 5000
+    tree = ast.Module(body=[], type_ignores=[])
+    value: ast.expr = ast.Constant(value=0)
+    for _ in range(depth):
+        value = ast.UnaryOp(op=ast.USub(), operand=value)
+    tree.body.append(ast.Expr(value=value))
+
+    hashes = StatementHashes.build(tree)
+
+    assert hashes.sizes[tree.body[0]] == 2 * depth + 2
@@ -0,0 +1,147 @@
+"""Tests for the native complexity, Halstead and maintainability metrics."""
+
+import ast
+import sys
+from pathlib import Path
+
+import pytest
+from radon.metrics import h_visit_ast, mi_visit
+from radon.visitors import ComplexityVisitor
+
+from refactron import Refactron
+from refactron.core.code_metrics import CLASS, FUNCTION, METHOD, measure
+from refactron.core.parsed_module import ParsedModule
+
+SOURCE = '''
+"""Module docstring."""
+
+import os
+
+DEBUG = os.environ.get("DEBUG") == "1" and not os.environ.get("QUIET")
+
+
+def parse(values, strict=lambda v: v if v else None):
+    # Closures and asserts
+    assert values, "values required"
+
+    def clean(value):
+        return value.strip() if isinstance(value, str) else value
+
+    result = [clean(v) for v in values if v is not None if v != ""]
+    for index, value in enumerate(result):
+        if index > 2 or value == "stop":
+            break
+    else:
+        result.append(None)
+    try:
+        total = sum(len(v) for v in result if v)
+    except TypeError:
+        total = -1
+    except ValueError:
+        total = -2
+    else:
+        total += 1
+    return total
+
+
+@decorator(flag=True)
+class Service(Base, metaclass=Meta if DEBUG else type):
+    limit = 10 if DEBUG else 5
+
+    def run(self, items):
+        while items and self.limit > 0:
+            items.pop()
+            self.limit -= 1
+
+    async def fetch(self, url):
+        async for chunk in stream(url):
+            if not chunk:
+                continue
+        return url
+
+    class Inner:
+        def method(self):
+            return 1 + 2 * 3
+'''
+
+MATCH_SOURCE = """
+def route(command):
+    match command:
+        case "go" | "run":
+            return 1
+        case [first, *rest] if first:
+            return 2
+        case _:
+            return 3
+"""
+
+
+def test_matches_radon() -> None:
+    tree = ast.parse(SOURCE)
+    metrics = measure(tree)
+    visitor = ComplexityVisitor.from_ast(tree)
+    halstead = h_visit_ast(tree).total
+
+    assert [(b.name, b.lineno, b.complexity) for b in metrics.blocks] == [
+        (b.name, b.lineno, b.complexity) for b in visitor.blocks
+    ]
+    assert metrics.total_complexity == visitor.total_complexity
+    assert metrics.halstead.distinct_operators == halstead.h1
+    assert metrics.halstead.distinct_operands == halstead.h2
+    assert metrics.halstead.operators == halstead.N1
+    assert metrics.halstead.operands == halstead.N2
+    assert metrics.halstead.volume == pytest.approx(halstead.volume)
+    assert metrics.halstead.difficulty == pytest.approx(halstead.difficulty)
+
+    module = ParsedModule(Path("example.py"), SOURCE)
+    assert module.code_metrics.maintainability_index == pytest.approx(mi_visit(SOURCE, True))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="match statements need Python 3.10")
+def test_match_statement_matches_radon() -> None:
+    tree = ast.parse(MATCH_SOURCE)
+    expected = ComplexityVisitor.from_ast(tree).blocks[0].complexity
+
+    assert measure(tree).blocks[0].complexity == expected
+
+
+def test_blocks_and_counts() -> None:
+    metrics = measure(ast.parse(SOURCE))
+
+    assert [(b.fullname, b.kind) for b in metrics.blocks] == [
+        ("parse", FUNCTION),
+        ("Service", CLASS),
+        ("Service.run", METHOD),
+        ("Service.fetch", METHOD),
+    ]
+    assert [closure.name for closure in metrics.blocks[0].closures] == ["clean"]
+    # Nested functions and classes count too
+    assert metrics.functions == 5
+    assert metrics.classes == 2
+    assert metrics.average_complexity == pytest.approx(
+        sum(b.complexity for b in metrics.blocks) / 4
+    )
+
+
+def test_code_metrics_are_computed_once() -> None:
+    module = ParsedModule(Path("example.py"), SOURCE)
+
+    assert module.code_metrics is module.code_metrics
+
+
+def test_file_metrics_are_populated(tmp_path: Path) -> None:
+    path = tmp_path / "example.py"
+    path.write_text(SOURCE)
+    (tmp_path / "broken.py").write_text("def broken(:\n")
+
+    result = Refactron().analyze(tmp_path)
+    metrics = result.metrics_for_file(path)
+    broken = result.metrics_for_file(tmp_path / "broken.py")
+
+    assert metrics is not None and broken is not None
+    assert metrics.functions == 5
+    assert metrics.classes == 2
+    assert metrics.complexity == pytest.approx(measure(ast.parse(SOURCE)).average_complexity)
+    assert metrics.maintainability_index == pytest.approx(mi_visit(SOURCE, True))
+    assert (broken.complexity, broken.maintainability_index) == (0.0, 100.0)
+    assert (broken.functions, broken.classes) == (0, 0)
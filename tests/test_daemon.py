@@ -0,0 +1,202 @@
+"""Tests for the resident analysis daemon."""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from click.testing import CliRunner
+
+from refactron import Refactron
+from refactron.cli import analyze, daemon, refactor
+from refactron.core.cache import metrics_to_dict
+from refactron.core.config import RefactronConfig
+from refactron.core.daemon import AnalysisDaemon, DaemonClient, DaemonError, serve
+from refactron.core.incremental import GitError
+from refactron.core.parsed_module import ModuleCache
+from refactron.core.registry import installed_plugins
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+SOURCE = '''
+import os
+
+
+def process(data, flag, mode, level, extra, more):
+    """Process the data."""
+    if flag:
+        if mode:
+            if level:
+                if extra:
+                    return eval(data)
+    return os.path.join(data, "out")
+'''
+
+
+@pytest.fixture
+def short_tmp() -> Iterator[Path]:
+    # Unix socket paths are limited to about 100 characters, and tmp_path's
+    # test_* name matches the default security ignore patterns
+    with tempfile.TemporaryDirectory(prefix="rfd") as tmp:
+        yield Path(tmp)
+
+
+@pytest.fixture
+def running(short_tmp: Path) -> Iterator[DaemonClient]:
+    path = short_tmp / "daemon.sock"
+    state = AnalysisDaemon()
+    thread = threading.Thread(target=serve, args=(path, state), daemon=True)
+    thread.start()
+    for _ in range(100):
+        client = DaemonClient.connect(path)
+        if client is not None:
+            break
+        time.sleep(0.02)
+    else:
+        pytest.fail("daemon did not start")
+    client.state = state  # type: ignore[attr-defined]
+    yield client
+    if not state.stopping:
+        client.shutdown()
+    thread.join(timeout=5)
+    assert not path.exists()
+
+
+def project(tmp_path: Path) -> Path:
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "app.py").write_text(SOURCE)
+    (root / "util.py").write_text("def helper():\n    return 1\n")
+    return root
+
+
+def test_ping_and_status(running: DaemonClient) -> None:
+    status = running.ping()
+
+    assert status["pid"] == os.getpid()
+    assert status["modules"] == 0
+
+
+def test_daemon_running_other_code_is_not_used(
+    running: DaemonClient, short_tmp: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    state: AnalysisDaemon = running.state  # type: ignore[attr-defined]
+    state.plugins = ["refactron.analyzers:no_print=old:NoPrint (old-plugin 1.0)"]
+
+    with pytest.warns(RuntimeWarning, match="plugins differ"):
+        assert DaemonClient.connect(running.socket_path) is None
+    assert DaemonClient.connect(running.socket_path, same_code=False) is not None
+
+    state.plugins = installed_plugins()
+    state.version = "0.0.1"
+    with pytest.warns(RuntimeWarning, match="it runs Refactron 0.0.1"):
+        assert DaemonClient.connect(running.socket_path) is None
+
+    # The CLI says why and analyzes in process instead
+    monkeypatch.setenv("REFACTRON_DAEMON_SOCKET", str(running.socket_path))
+    result = CliRunner().invoke(analyze, [str(project(short_tmp)), "--no-cache"])
+    assert "Not using the Refactron daemon" in result.output
+    assert "Using the running Refactron daemon" not in result.output
+    assert "[CRITICAL]" in result.output
+
+
+def test_analysis_matches_in_process(running: DaemonClient, tmp_path: Path) -> None:
+    root = project(tmp_path)
+    config = RefactronConfig()
+
+    remote = list(running.iter_analyze(root, config))
+    local = Refactron(config).analyze(root).file_metrics
+
+    assert [m.file_path for m in remote] == [m.file_path for m in local]
+    assert [metrics_to_dict(m) for m in remote] == [metrics_to_dict(m) for m in local]
+    assert remote[0].issues[0].file_path == root / "app.py"
+
+
+def test_warm_state_is_reused(running: DaemonClient, tmp_path: Path) -> None:
+    root = project(tmp_path)
+    state: AnalysisDaemon = running.state  # type: ignore[attr-defined]
+
+    list(running.iter_analyze(root))
+    list(running.iter_analyze(root))
+
+    assert running.ping()["instances"] == 1
+    assert state.modules.misses == 2
+    assert state.modules.hits == 2
+
+    list(running.iter_analyze(root, RefactronConfig(enabled_analyzers=["security"])))
+    assert running.ping()["instances"] == 2
+
+
+def test_errors_are_raised_in_the_client(running: DaemonClient, tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        list(running.iter_analyze(tmp_path / "missing"))
+    with pytest.raises(GitError):
+        list(running.iter_analyze(project(tmp_path), changed_since="HEAD"))
+    with pytest.raises(DaemonError, match="Unknown command"):
+        list(running.request({"command": "explode"}))
+
+    # The daemon keeps serving after a failed request (and the fixture's ping)
+    assert running.ping()["requests"] == 5
+
+
+def test_refactor(running: DaemonClient, tmp_path: Path) -> None:
+    root = project(tmp_path)
+
+    remote = running.refactor(root)
+    local = Refactron().refactor(root)
+
+    assert [str(op) for op in remote.operations] == [str(op) for op in local.operations]
+    assert remote.preview_mode
+
+
+def test_module_cache_rereads_changed_files(tmp_path: Path) -> None:
+    path = tmp_path / "example.py"
+    path.write_text("x = 1\n")
+    cache = ModuleCache(max_entries=1)
+
+    first = cache.load(path)
+    assert cache.load(path) is first
+
+    path.write_text("x = 2  # changed\n")
+    assert cache.load(path).source == "x = 2  # changed\n"
+
+    other = tmp_path / "other.py"
+    other.write_text("y = 1\n")
+    cache.load(other)
+    assert len(cache) == 1
+
+
+def test_cli_uses_running_daemon(
+    running: DaemonClient, short_tmp: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    root = project(short_tmp)
+    monkeypatch.setenv("REFACTRON_DAEMON_SOCKET", str(running.socket_path))
+    runner = CliRunner()
+
+    result = runner.invoke(analyze, [str(root), "--no-cache"])
+    assert "Using the running Refactron daemon" in result.output
+    assert "[CRITICAL]" in result.output
+    assert result.exit_code == 1
+
+    local = runner.invoke(analyze, [str(root), "--no-cache", "--no-daemon"])
+    assert "daemon" not in local.output
+    assert local.exit_code == 1
+
+    refactored = runner.invoke(refactor, [str(root)])
+    assert "Using the running Refactron daemon" in refactored.output
+    assert refactored.exit_code == 0
+
+    status = runner.invoke(daemon, ["status"])
+    assert "Daemon running" in status.output
+
+    stopped = runner.invoke(daemon, ["stop"])
+    assert stopped.exit_code == 0
+    for _ in range(100):
+        if not running.socket_path.exists():
+            break
+        time.sleep(0.02)
+    assert runner.invoke(daemon, ["status"]).exit_code == 1
@@ -0,0 +1,210 @@
+"""Tests for file discovery."""
+
+import os
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+import pytest
+
+from refactron import Refactron
+from refactron.core.config import RefactronConfig
+from refactron.core.discovery import (
+    FileDiscovery,
+    GlobMatcher,
+    discover_files,
+    parse_gitignore,
+    translate_glob,
+)
+
+
+def make_tree(root: Path, files: List[str]) -> None:
+    for name in files:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n")
+
+
+def relative(root: Path, files: List[Path]) -> List[str]:
+    return [path.relative_to(root).as_posix() for path in files]
+
+
+@pytest.mark.parametrize(
+    "pattern, path, expected",
+    [
+        ("*.py", "a.py", True),
+        ("*.py", "pkg/a.py", True),
+        ("*.py", "a.pyc", False),
+        ("**/test_*.py", "test_a.py", True),
+        ("**/test_*.py", "pkg/sub/test_a.py", True),
+        ("**/test_*.py", "pkg/contest_a.py", False),
+        ("pkg/*.py", "pkg/a.py", True),
+        ("pkg/*.py", "pkg/sub/a.py", False),
+        ("pkg/*.py", "other/pkg/a.py", False),
+        ("/a.py", "a.py", True),
+        ("/a.py", "pkg/a.py", False),
+        ("pkg/**/a.py", "pkg/a.py", True),
+        ("pkg/**/a.py", "pkg/x/y/a.py", True),
+        ("**/venv/**", "venv/lib/a.py", True),
+        ("**/venv/**", "myvenv/a.py", False),
+        ("mod_?.py", "mod_1.py", True),
+        ("mod_?.py", "mod_12.py", False),
+        ("mod_[0-9].py", "mod_3.py", True),
+        ("mod_[!0-9].py", "mod_3.py", False),
+        ("mod_[!0-9].py", "mod_x.py", True),
+        ("a\\*.py", "a*.py", True),
+        ("a\\*.py", "ab.py", False),
+    ],
+)
+def test_glob_semantics(pattern: str, path: str, expected: bool) -> None:
+    assert bool(GlobMatcher([pattern]).match(path)) is expected
+
+
+def test_trailing_double_star_matches_the_directory_itself() -> None:
+    matcher = GlobMatcher(["**/__pycache__/**"])
+
+    assert matcher.match("pkg/__pycache__", is_dir=True)
+    assert not matcher.match("pkg/__pycache__")
+
+
+def test_trailing_slash_matches_directories_only() -> None:
+    matcher = GlobMatcher(["build/"])
+
+    assert matcher.match("build", is_dir=True)
+    assert matcher.match("sub/build", is_dir=True)
+    assert not matcher.match("build")
+
+
+def test_negation_last_match_wins() -> None:
+    matcher = GlobMatcher(["*.py", "!keep.py"])
+
+    assert matcher.match("drop.py") is True
+    assert matcher.match("keep.py") is False
+    assert matcher.match("README") is None
+
+
+def test_translate_glob_unclosed_class_is_literal() -> None:
+    assert translate_glob("a[b") == "a\\[b"
+
+
+def test_parse_gitignore() -> None:
+    text = "# comment\n\nbuild/\n*.log   \n\\#notes\nfile\\ \n"
+
+    assert parse_gitignore(text) == ["build/", "*.log", "#notes", "file\\ "]
+
+
+def test_default_config_walk(tmp_path: Path) -> None:
+    make_tree(
+        tmp_path,
+        [
+            "b.py",
+            "a.py",
+            "notes.txt",
+            "pkg/mod.py",
+            "pkg/test_mod.py",
+            "pkg/__pycache__/mod.py",
+            "venv/lib/site.py",
+            "myvenv/keep.py",
+        ],
+    )
+
+    files = discover_files(tmp_path, RefactronConfig())
+
+    assert relative(tmp_path, files) == ["a.py", "b.py", "myvenv/keep.py", "pkg/mod.py"]
+
+
+def test_discover_single_file(tmp_path: Path) -> None:
+    make_tree(tmp_path, ["test_a.py"])
+
+    assert discover_files(tmp_path / "test_a.py", RefactronConfig()) == [tmp_path / "test_a.py"]
+
+
+def test_excluded_directories_are_not_listed(tmp_path: Path) -> None:
+    make_tree(tmp_path, ["a.py", "venv/lib/site.py"])
+    scanned = []
+    real_scandir = os.scandir
+
+    def tracking_scandir(path: str) -> "os._ScandirIterator[str]":  # type: ignore[name-defined]
+        scanned.append(Path(path).name)
+        return real_scandir(path)
+
+    with mock.patch("refactron.core.discovery.os.scandir", side_effect=tracking_scandir):
+        files = list(FileDiscovery(exclude_patterns=["**/venv/**"]).iter_files(tmp_path))
+
+    assert relative(tmp_path, files) == ["a.py"]
+    assert "venv" not in scanned
+    assert "lib" not in scanned
+
+
+def test_include_patterns(tmp_path: Path) -> None:
+    make_tree(tmp_path, ["a.py", "b.pyi", "c.txt"])
+
+    files = FileDiscovery(include_patterns=["*.py", "*.pyi"]).iter_files(tmp_path)
+
+    assert relative(tmp_path, list(files)) == ["a.py", "b.pyi"]
+
+
+def test_gitignore_is_honored(tmp_path: Path) -> None:
+    make_tree(
+        tmp_path,
+        ["a.py", "build/gen.py", "pkg/generated.py", "pkg/mod.py", "pkg/sub/keep.py"],
+    )
+    (tmp_path / ".gitignore").write_text("build/\ngenerated.py\n")
+    (tmp_path / "pkg" / "sub" / ".gitignore").write_text("*.py\n!keep.py\n")
+
+    files = list(FileDiscovery().iter_files(tmp_path))
+
+    assert relative(tmp_path, files) == ["a.py", "pkg/mod.py", "pkg/sub/keep.py"]
+
+
+def test_gitignore_can_be_disabled(tmp_path: Path) -> None:
+    make_tree(tmp_path, ["a.py", "build/gen.py"])
+    (tmp_path / ".gitignore").write_text("build/\n")
+
+    files = list(FileDiscovery(respect_gitignore=False).iter_files(tmp_path))
+
+    assert relative(tmp_path, files) == ["a.py", "build/gen.py"]
+
+
+def test_parent_gitignore_inside_work_tree(tmp_path: Path) -> None:
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("generated/\n")
+    make_tree(tmp_path, ["src/a.py", "src/generated/b.py"])
+
+    files = list(FileDiscovery().iter_files(tmp_path / "src"))
+
+    assert relative(tmp_path, files) == ["src/a.py"]
+
+
+def test_parent_gitignore_outside_work_tree_is_ignored(tmp_path: Path) -> None:
+    (tmp_path / ".gitignore").write_text("generated/\n")
+    make_tree(tmp_path, ["src/a.py", "src/generated/b.py"])
+
+    files = list(FileDiscovery().iter_files(tmp_path / "src"))
+
+    assert relative(tmp_path, files) == ["src/a.py", "src/generated/b.py"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_symlinked_directories_are_not_followed(tmp_path: Path) -> None:
+    make_tree(tmp_path, ["real/a.py"])
+    try:
+        (tmp_path / "link").symlink_to(tmp_path / "real", target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks not permitted")
+
+    files = list(FileDiscovery().iter_files(tmp_path))
+
+    assert relative(tmp_path, files) == ["real/a.py"]
+
+
+def test_analyze_reuses_discovered_files(tmp_path: Path) -> None:
+    make_tree(tmp_path, ["a.py", "b.py"])
+    refactron = Refactron()
+    files = refactron.discover_files(tmp_path)
+
+    with mock.patch.object(refactron, "discover_files") as discover:
+        result = refactron.analyze(tmp_path, files=files)
+
+    discover.assert_not_called()
+    assert [m.file_path for m in result.file_metrics] == files
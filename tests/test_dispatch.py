@@ -0,0 +1,209 @@
+"""Tests for the single-pass node dispatch engine."""
+
+import ast
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+import pytest
+
+from refactron import Refactron
+from refactron.analyzers.base_analyzer import BaseAnalyzer
+from refactron.core.config import RefactronConfig
+from refactron.core.dispatch import NodeDispatcher, RuleContext, node_rule, run_analyzers
+from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+from refactron.core.parsed_module import ParsedModule
+
+SOURCE = """
+def outer():
+    for item in range(3):
+        print(item)
+
+class Widget:
+    def method(self):
+        return call()
+"""
+
+
+def make_issue(message: str, line: int = 1) -> CodeIssue:
+    return CodeIssue(
+        category=IssueCategory.STYLE,
+        level=IssueLevel.INFO,
+        message=message,
+        file_path=Path("test.py"),
+        line_number=line,
+    )
+
+
+class CallAnalyzer(BaseAnalyzer):
+    """Reports every call together with its enclosing function."""
+
+    @property
+    def name(self) -> str:
+        return "calls"
+
+    @node_rule(ast.Call)
+    def _check_calls(self, node: ast.Call, context: RuleContext) -> None:
+        function = next(context.enclosing(ast.FunctionDef), None)
+        owner = function.name if isinstance(function, ast.FunctionDef) else "<module>"
+        context.report(make_issue(f"call in {owner}", node.lineno))
+
+
+class CountingAnalyzer(BaseAnalyzer):
+    """Counts statements and loops, reporting the totals at the end."""
+
+    @property
+    def name(self) -> str:
+        return "counting"
+
+    def begin_module(self, context: RuleContext) -> None:
+        context.state["statements"] = 0
+        context.state["loops"] = 0
+
+    def finish_module(self, context: RuleContext) -> List[CodeIssue]:
+        return [
+            make_issue(f"statements={context.state['statements']}"),
+            make_issue(f"loops={context.state['loops']}"),
+        ]
+
+    def on_syntax_error(self, module: ParsedModule, error: SyntaxError) -> List[CodeIssue]:
+        return [make_issue("syntax error")]
+
+    @node_rule(ast.stmt)
+    def _count_statements(self, node: ast.stmt, context: RuleContext) -> None:
+        context.state["statements"] += 1
+
+    @node_rule(ast.For, ast.While)
+    def _count_loops(self, node: ast.AST, context: RuleContext) -> None:
+        context.state["loops"] += 1
+
+
+class SubclassedCallAnalyzer(CallAnalyzer):
+    """Inherits the call rule and adds a function rule."""
+
+    @node_rule(ast.FunctionDef)
+    def _check_functions(self, node: ast.FunctionDef, context: RuleContext) -> None:
+        context.report(make_issue(f"function {node.name}", node.lineno))
+
+
+class SkippingAnalyzer(CallAnalyzer):
+    """Never analyzes any module."""
+
+    def should_analyze(self, module: ParsedModule) -> bool:
+        return False
+
+
+class DirectAnalyzer(BaseAnalyzer):
+    """Implements analyze_module itself instead of declaring rules."""
+
+    @property
+    def name(self) -> str:
+        return "direct"
+
+    def analyze_module(self, module: ParsedModule) -> List[CodeIssue]:
+        return [make_issue("direct")]
+
+
+@pytest.fixture
+def config():
+    return RefactronConfig.default()
+
+
+@pytest.fixture
+def module():
+    return ParsedModule(Path("test.py"), SOURCE)
+
+
+def test_node_rule_requires_node_types():
+    with pytest.raises(ValueError):
+        node_rule()
+
+
+def test_rules_receive_enclosing_nodes(config, module):
+    issues = CallAnalyzer(config).analyze_module(module)
+
+    assert [issue.message for issue in issues] == [
+        "call in outer",
+        "call in outer",
+        "call in method",
+    ]
+
+
+def test_rules_for_base_node_types_match_subclasses(config, module):
+    issues = CountingAnalyzer(config).analyze_module(module)
+
+    assert [issue.message for issue in issues] == ["statements=6", "loops=1"]
+
+
+def test_inherited_rules_are_registered(config, module):
+    analyzer = SubclassedCallAnalyzer(config)
+
+    assert [rule.__name__ for _, rule in analyzer.node_rules()] == [
+        "_check_calls",
+        "_check_functions",
+    ]
+    messages = [issue.message for issue in analyzer.analyze_module(module)]
+    assert "function outer" in messages
+    assert "function method" in messages
+
+
+def test_run_analyzers_walks_tree_once(config, module):
+    dispatcher = NodeDispatcher()
+    node_count = sum(1 for _ in ast.walk(module.tree))
+
+    results = run_analyzers(
+        [CallAnalyzer(config), CountingAnalyzer(config), SubclassedCallAnalyzer(config)],
+        module,
+        dispatcher,
+    )
+
+    assert dispatcher.nodes_visited == node_count
+    assert len(results) == 3
+    assert len(results[0]) == 3
+    assert len(results[2]) == 5
+
+
+def test_run_analyzers_mixes_rule_and_direct_analyzers(config, module):
+    results = run_analyzers(
+        [DirectAnalyzer(config), SkippingAnalyzer(config), CallAnalyzer(config)], module
+    )
+
+    assert [issue.message for issue in results[0]] == ["direct"]
+    assert results[1] == []
+    assert len(results[2]) == 3
+
+
+def test_run_analyzers_reports_syntax_errors(config):
+    module = ParsedModule(Path("broken.py"), "def broken(:\n")
+
+    results = run_analyzers([CountingAnalyzer(config), CallAnalyzer(config)], module)
+
+    assert [issue.message for issue in results[0]] == ["syntax error"]
+    assert results[1] == []
+
+
+def test_skipped_module_is_not_parsed(config):
+    module = ParsedModule(Path("broken.py"), "def broken(:\n")
+
+    with mock.patch("refactron.core.parsed_module.ast.parse", wraps=ast.parse) as parse:
+        assert run_analyzers([SkippingAnalyzer(config)], module) == [[]]
+
+    parse.assert_not_called()
+
+
+def test_refactron_analyzers_share_one_traversal(tmp_path, monkeypatch):
+    file_path = tmp_path / "sample.py"
+    file_path.write_text(SOURCE)
+    traversals = []
+    original_run = NodeDispatcher.run
+
+    def counting_run(self: NodeDispatcher, tree: ast.AST) -> int:
+        traversals.append(tree)
+        return original_run(self, tree)
+
+    monkeypatch.setattr(NodeDispatcher, "run", counting_run)
+    refactron = Refactron()
+    refactron.analyze(file_path)
+
+    assert len(traversals) == 1
+    assert all(analyzer.uses_node_rules for analyzer in refactron.analyzers)
@@ -1,11 +1,13 @@
 """Tests for false positive reduction features in security analyzer."""
 
+import fnmatch
 import tempfile
 from pathlib import Path
 
-from refactron.analyzers.security_analyzer import SecurityAnalyzer
+from refactron.analyzers.security_analyzer import SecurityAnalyzer, compile_patterns
 from refactron.core.config import RefactronConfig
 from refactron.core.false_positive_tracker import FalsePositiveTracker
+from refactron.core.parsed_module import ParsedModule
 
 
 class TestConfidenceScores:
@@ -295,6 +297,68 @@ class TestFalsePositiveTracker:
             assert not tracker.is_false_positive("SEC002", "pattern2")
 
 
+class TestFileContext:
+    """Test the per-file security context computed from the path."""
+
+    def test_combined_patterns_match_like_fnmatch(self):
+        """A compiled pattern list matches exactly the paths fnmatch matches."""
+        patterns = ["**/test_*.py", "**/tests/**/*.py", "*_test.py", "docs/[ab]?.py"]
+        paths = [
+            "tests/test_utils.py",
+            "/src/tests/unit/helpers.py",
+            "src/app_test.py",
+            "docs/a1.py",
+            "docs/c1.py",
+            "src/app.py",
+            "test_top.py",
+        ]
+        combined = compile_patterns(patterns)
+
+        assert combined is not None
+        for path in paths:
+            expected = any(fnmatch.fnmatch(path, pattern) for pattern in patterns)
+            assert (combined.match(path) is not None) == expected, path
+        assert compile_patterns([]) is None
+
+    def test_context_is_computed_once_per_file(self):
+        """Whitelist, confidence and ignore decisions come from one context per file."""
+        config = RefactronConfig(
+            security_ignore_patterns=["**/vendor/**"],
+            security_rule_whitelist={"SEC011": ["**/examples/**"], "SEC001": ["*/scripts/*"]},
+        )
+        analyzer = SecurityAnalyzer(config)
+
+        context = analyzer.file_context(Path("src/examples/demo/run.py"))
+        assert analyzer.file_context(Path("src/examples/demo/run.py")) is context
+        assert context.whitelisted_rules == frozenset({"SEC011"})
+        assert not context.ignored
+        assert context.confidence("SEC001") == SecurityAnalyzer.DEMO_FILE_CONFIDENCE_MULTIPLIER
+        assert context.confidence("SEC003") == 1.0
+        assert context.has_sample_secrets
+        assert analyzer.file_context(Path("lib/vendor/pkg/mod.py")).ignored
+        assert not analyzer.file_context(Path("lib/vendor/pkg/mod.py")).has_sample_secrets
+
+    def test_sample_secrets_have_lower_confidence(self):
+        """SEC003 confidence comes from the file context."""
+        analyzer = SecurityAnalyzer(RefactronConfig())
+        source = 'API_KEY = "sk-live-1234"\n'
+
+        def confidence(path: str) -> float:
+            issues = analyzer.analyze_module(ParsedModule(Path(path), source))
+            return [issue.confidence for issue in issues if issue.rule_id == "SEC003"][0]
+
+        assert confidence("src/app/settings.py") == 0.8
+        assert confidence("src/sample_settings.py") == 0.5
+
+    def test_ignored_files_are_not_parsed(self):
+        """Ignored files are rejected from their path, before the module is parsed."""
+        analyzer = SecurityAnalyzer(RefactronConfig())
+        module = ParsedModule(Path("tests/test_utils.py"), "eval(input())\n")
+
+        assert analyzer.analyze_module(module) == []
+        assert module._tree is None
+
+
 class TestIntegration:
     """Integration tests for false positive reduction features."""
 
@@ -0,0 +1,192 @@
+"""Tests for the project-wide import graph."""
+
+import os
+from pathlib import Path
+from typing import Dict, List
+
+from click.testing import CliRunner
+
+from refactron import Refactron
+from refactron.cli import cycles
+from refactron.core.config import RefactronConfig
+from refactron.core.import_graph import (
+    DEFERRED,
+    RUNTIME,
+    TYPE_CHECKING_ONLY,
+    ImportGraph,
+    strongly_connected_components,
+)
+
+
+def write(root: Path, files: Dict[str, str]) -> List[Path]:
+    paths = []
+    for name, source in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+        paths.append(path)
+    return sorted(paths)
+
+
+def bump_mtime(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+PROJECT = {
+    "src/app/__init__.py": "from .models import Model\n",
+    "src/app/models.py": "from app import services\n\nclass Model:\n    pass\n",
+    "src/app/services.py": "from .models import Model\nfrom . import utils\n",
+    "src/app/utils.py": (
+        "from typing import TYPE_CHECKING\n\n"
+        "if TYPE_CHECKING:\n    from app.services import Service\n\n"
+        "def load():\n    from app import models\n    return models\n"
+    ),
+    "src/app/sub/__init__.py": "",
+    "src/app/sub/leaf.py": "from ..utils import load\nimport app.sub\nimport os.path\n",
+    "scripts/run.py": "import app.sub.leaf\n",
+}
+
+
+def test_module_names_and_edges(tmp_path: Path) -> None:
+    graph = ImportGraph.build(tmp_path, write(tmp_path, PROJECT))
+
+    assert graph.modules == [
+        "app",
+        "app.models",
+        "app.services",
+        "app.sub",
+        "app.sub.leaf",
+        "app.utils",
+        "run",
+    ]
+    edges = {(e.source, e.target, e.kind) for name in graph.modules for e in graph.imports_of(name)}
+    assert ("app", "app.models", RUNTIME) in edges
+    assert ("app.models", "app.services", RUNTIME) in edges
+    assert ("app.services", "app.utils", RUNTIME) in edges
+    assert ("app.utils", "app.services", TYPE_CHECKING_ONLY) in edges
+    assert ("app.utils", "app.models", DEFERRED) in edges
+    assert ("app.sub.leaf", "app.utils", RUNTIME) in edges
+    assert ("app.sub.leaf", "app.sub", RUNTIME) in edges
+    assert ("run", "app.sub.leaf", RUNTIME) in edges
+    assert not any(target.startswith("os") for _, target, _ in edges)
+    assert [e.source for e in graph.importers_of("app.utils")] == ["app.services", "app.sub.leaf"]
+
+
+def test_cycles(tmp_path: Path) -> None:
+    graph = ImportGraph.build(tmp_path, write(tmp_path, PROJECT))
+
+    found = graph.cycles()
+    assert len(found) == 1
+    assert found[0].modules == ["app.models", "app.services"]
+    assert found[0].path == ["app.models", "app.services", "app.models"]
+    assert [edge.line_number for edge in found[0].edges] == [1, 1]
+
+    # The deferred import in app.utils closes a larger cycle
+    deferred = graph.cycles(include_deferred=True)
+    assert deferred[0].modules == ["app.models", "app.services", "app.utils"]
+
+
+def test_strongly_connected_components_deep_chain() -> None:
+    size = 5000
+    chain = {f"m{i}": [f"m{i + 1}"] for i in range(size)}
+    chain[f"m{size}"] = ["m0"]
+
+    components = strongly_connected_components(chain)
+
+    assert len(components) == 1
+    assert len(components[0]) == size + 1
+
+
+def test_update_rescans_only_changed_files(tmp_path: Path) -> None:
+    files = write(tmp_path, PROJECT)
+    graph = ImportGraph.build(tmp_path, files)
+    services = tmp_path / "src/app/services.py"
+
+    assert not graph.update(files)
+    assert graph.scanned == 0
+
+    services.write_text("from . import utils\n")
+    bump_mtime(services)
+    assert graph.update(files)
+    assert graph.scanned == 1
+    assert graph.cycles() == []
+
+
+def test_update_files_handles_new_and_deleted_modules(tmp_path: Path) -> None:
+    files = write(tmp_path, PROJECT)
+    graph = ImportGraph.build(tmp_path, files)
+
+    # "from app import services" points at app.services only while it exists
+    (tmp_path / "src/app/services.py").unlink()
+    graph.update_files([tmp_path / "src/app/services.py"])
+    assert "app.services" not in graph.modules
+    assert [e.target for e in graph.imports_of("app.models")] == ["app"]
+
+    new = tmp_path / "src/app/services.py"
+    new.write_text("import app.models\n")
+    graph.update_files([new])
+    assert graph.cycles()[0].modules == ["app.models", "app.services"]
+
+
+def test_new_package_renames_modules(tmp_path: Path) -> None:
+    files = write(tmp_path, PROJECT)
+    graph = ImportGraph.build(tmp_path, files)
+
+    init = tmp_path / "src/__init__.py"
+    init.write_text("")
+    graph.update_files([init])
+
+    assert "src.app.models" in graph.modules
+    assert graph.scanned == len(files) + 1
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    files = write(project, PROJECT)
+    graph = ImportGraph.build(project, files)
+    saved = tmp_path / "graph.json"
+    graph.save(saved)
+
+    loaded = ImportGraph.load(saved, project)
+
+    assert loaded is not None
+    assert loaded.modules == graph.modules
+    assert loaded.cycles() == graph.cycles()
+    assert not loaded.update(files)
+    assert ImportGraph.load(saved, tmp_path) is None
+    assert ImportGraph.load(tmp_path / "missing.json", project) is None
+
+
+def test_refactron_reuses_saved_graph(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    write(project, PROJECT)
+    config = RefactronConfig(cache_enabled=True, cache_dir=str(tmp_path / "cache"))
+
+    first = Refactron(config).import_graph(project)
+    second = Refactron(config).import_graph(project)
+
+    assert first.scanned == len(PROJECT)
+    assert second.scanned == 0
+    assert second.modules == first.modules
+
+
+def test_cli_reports_cycles(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    write(project, PROJECT)
+
+    result = CliRunner().invoke(cycles, [str(project), "--no-cache"])
+
+    assert result.exit_code == 1
+    assert "app.models → app.services → app.models" in result.output
+    assert "Found 1 import cycle" in result.output
+
+
+def test_cli_without_cycles(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    write(project, {"a.py": "import b\n", "b.py": "x = 1\n"})
+
+    result = CliRunner().invoke(cycles, [str(project), "--no-cache"])
+
+    assert result.exit_code == 0
+    assert "No import cycles found" in result.output
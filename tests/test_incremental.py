@@ -0,0 +1,133 @@
+"""Tests for incremental analysis of files changed since a git revision."""
+
+import ast
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from refactron import Refactron
+from refactron.core.config import RefactronConfig
+from refactron.core.incremental import (
+    GitError,
+    find_dependents,
+    git_changed_files,
+    imported_modules,
+    module_name_for,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=str(repo),
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    package = repo / "pkg"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "core.py").write_text("def helper(x):\n    return x\n")
+    (package / "user.py").write_text("from .core import helper\n\nvalue = helper(1)\n")
+    (package / "other.py").write_text("import os\n\nprint(os.sep)\n")
+    (package / "legacy.py").write_text("x = 1\n")
+    (repo / "README.md").write_text("readme\n")
+    git(repo, "init", "-q")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "initial")
+    return repo
+
+
+def test_git_changed_files(repo):
+    (repo / "pkg" / "core.py").write_text("def helper(x):\n    return x * 2\n")
+    (repo / "pkg" / "new.py").write_text("y = 2\n")
+    (repo / "pkg" / "legacy.py").unlink()
+    (repo / "README.md").write_text("changed\n")
+
+    changed = git_changed_files(repo, "HEAD")
+
+    assert sorted(path.name for path in changed) == ["core.py", "new.py"]
+    assert all(path.is_absolute() for path in changed)
+
+
+def test_git_changed_files_includes_committed_changes(repo):
+    (repo / "pkg" / "other.py").write_text("import sys\n")
+    git(repo, "commit", "-q", "-am", "second")
+
+    assert [path.name for path in git_changed_files(repo / "pkg", "HEAD~1")] == ["other.py"]
+    assert git_changed_files(repo, "HEAD") == []
+
+
+def test_git_errors(repo, tmp_path):
+    with pytest.raises(GitError):
+        git_changed_files(repo, "no-such-revision")
+
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    with pytest.raises(GitError):
+        git_changed_files(outside, "HEAD")
+
+
+def test_module_names_and_imports():
+    root = Path("/project")
+
+    assert module_name_for(root / "pkg" / "core.py", root) == "pkg.core"
+    assert module_name_for(root / "pkg" / "__init__.py", root) == "pkg"
+    assert module_name_for(Path("/elsewhere/x.py"), root) is None
+
+    tree = ast.parse("import os.path\nfrom . import core\nfrom ..base import thing\n")
+    assert imported_modules(tree, "pkg.sub.mod", False) == {
+        "os.path",
+        "pkg.sub",
+        "pkg.sub.core",
+        "pkg.base",
+        "pkg.base.thing",
+    }
+
+
+def test_find_dependents(repo):
+    files = sorted(path.resolve() for path in repo.rglob("*.py"))
+    core = (repo / "pkg" / "core.py").resolve()
+
+    dependents = find_dependents(files, [core], repo.resolve())
+
+    assert [path.name for path in dependents] == ["user.py"]
+
+
+def test_analyze_changed_since_only_analyzes_affected_files(repo):
+    (repo / "pkg" / "core.py").write_text("def helper(x):\n    return eval(x)\n")
+
+    result = Refactron().analyze(repo, changed_since="HEAD")
+
+    assert sorted(m.file_path.name for m in result.file_metrics) == ["core.py", "user.py"]
+    assert result.total_files == 2
+    assert any(issue.file_path.name == "core.py" for issue in result.all_issues)
+
+
+def test_analyze_changed_since_reuses_cache_for_other_files(repo, tmp_path):
+    config = RefactronConfig(cache_enabled=True, cache_dir=str(tmp_path / "cache"))
+    full = Refactron(config).analyze(repo)
+    (repo / "pkg" / "other.py").write_text("import os\n\nprint(os.getcwd())\n")
+
+    refactron = Refactron(config)
+    result = refactron.analyze(repo, changed_since="HEAD")
+
+    assert [m.file_path for m in result.file_metrics] == [m.file_path for m in full.file_metrics]
+    assert refactron.cache.misses == 1
+    assert refactron.cache.hits == len(full.file_metrics) - 1
+
+
+def test_analyze_without_changes_reports_nothing(repo):
+    result = Refactron().analyze(repo, changed_since="HEAD")
+
+    assert result.total_files == 0
+    assert result.file_metrics == []
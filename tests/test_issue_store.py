@@ -0,0 +1,161 @@
+"""Tests for the compact issue store."""
+
+from pathlib import Path
+
+import pytest
+
+from refactron.core.analysis_result import AnalysisResult
+from refactron.core.issue_store import IssueStore
+from refactron.core.models import CodeIssue, FileMetrics, IssueCategory, IssueLevel
+
+
+def make_issue(index: int, **overrides: object) -> CodeIssue:
+    values = dict(
+        category=IssueCategory.COMPLEXITY,
+        level=IssueLevel.WARNING,
+        message=f"Function 'f{index % 3}' is too complex",
+        file_path=Path(f"module_{index % 2}.py"),
+        line_number=index + 1,
+        column=index % 4,
+        rule_id="C001",
+        suggestion="Split the function",
+        confidence=0.75,
+        metadata={"function": f"f{index % 3}"},
+    )
+    values.update(overrides)
+    return CodeIssue(**values)  # type: ignore[arg-type]
+
+
+def test_round_trips_issues() -> None:
+    issues = [make_issue(i) for i in range(10)]
+    issues.append(
+        make_issue(
+            10,
+            level=IssueLevel.CRITICAL,
+            category=IssueCategory.SECURITY,
+            end_line=42,
+            code_snippet="eval(x)",
+            suggestion=None,
+            rule_id=None,
+            confidence=0.123456789,
+            metadata={},
+        )
+    )
+
+    store = IssueStore(issues)
+
+    assert len(store) == len(issues)
+    assert list(store) == issues
+    assert store.to_list() == issues
+    assert store[-1] == issues[-1]
+
+
+def test_index_out_of_range() -> None:
+    store = IssueStore([make_issue(0)])
+
+    with pytest.raises(IndexError):
+        store[1]
+    with pytest.raises(IndexError):
+        store.record(-2)
+
+
+def test_interns_repeated_values() -> None:
+    store = IssueStore(make_issue(i) for i in range(100))
+
+    first, second = store[0], store[3]
+    assert first.message is second.message
+    assert first.file_path is store[2].file_path
+    assert first.suggestion is second.suggestion
+
+
+def test_metadata_is_copied_on_access() -> None:
+    store = IssueStore([make_issue(0), make_issue(3)])
+
+    store[0].metadata["function"] = "changed"
+
+    assert store[0].metadata == {"function": "f0"}
+    assert store[1].metadata == {"function": "f0"}
+
+
+def test_unhashable_metadata_is_kept() -> None:
+    names = ["a", "b"]
+    store = IssueStore([make_issue(0, metadata={"names": names})])
+    names.append("c")
+
+    store[0].metadata["names"].append("d")
+
+    assert store[0].metadata == {"names": ["a", "b"]}
+
+
+def test_metadata_of_equal_values_keeps_its_type() -> None:
+    values = [1, True, 1.0, (1,), (True,)]
+    store = IssueStore(make_issue(0, metadata={"x": value}) for value in values)
+
+    for index, value in enumerate(values):
+        assert store[index].metadata["x"] == value
+        assert type(store[index].metadata["x"]) is type(value)
+    assert type(store[4].metadata["x"][0]) is bool
+
+
+def test_from_result() -> None:
+    issues = [make_issue(i) for i in range(4)]
+    result = AnalysisResult()
+    for path in (Path("module_0.py"), Path("module_1.py")):
+        result.file_metrics.append(
+            FileMetrics(
+                file_path=path,
+                lines_of_code=1,
+                comment_lines=0,
+                blank_lines=0,
+                complexity=1.0,
+                maintainability_index=100.0,
+                functions=0,
+                classes=0,
+                issues=[issue for issue in issues if issue.file_path == path],
+            )
+        )
+
+    assert IssueStore.from_result(result).to_list() == result.all_issues
+
+
+def test_records_read_columns_without_building_issues() -> None:
+    issue = make_issue(5, level=IssueLevel.ERROR)
+    store = IssueStore([issue])
+
+    record = store.record(0)
+
+    assert record.file_path == issue.file_path
+    assert record.line_number == 6
+    assert record.column == 1
+    assert record.level == IssueLevel.ERROR
+    assert record.category == IssueCategory.COMPLEXITY
+    assert record.rule_id == "C001"
+    assert record.message == issue.message
+    assert record.suggestion == "Split the function"
+    assert record.confidence == 0.75
+    assert record.to_issue() == issue
+    assert [r.line_number for r in store.records()] == [6]
+
+
+def test_count_by_level() -> None:
+    store = IssueStore(
+        [
+            make_issue(0, level=IssueLevel.INFO),
+            make_issue(1, level=IssueLevel.INFO),
+            make_issue(2, level=IssueLevel.CRITICAL),
+        ]
+    )
+
+    counts = store.count_by_level()
+
+    assert counts[IssueLevel.INFO] == 2
+    assert counts[IssueLevel.CRITICAL] == 1
+    assert counts[IssueLevel.WARNING] == 0
+
+
+def test_append_after_construction() -> None:
+    store = IssueStore()
+    store.append(make_issue(0))
+    store.extend([make_issue(1), make_issue(2)])
+
+    assert [issue.line_number for issue in store] == [1, 2, 3]
@@ -0,0 +1,102 @@
+"""Tests for the token-based line counts."""
+
+from pathlib import Path
+
+import pytest
+from radon.raw import analyze
+
+from refactron import Refactron
+from refactron.core.line_counts import LineCounts, count_lines
+from refactron.core.parsed_module import ParsedModule
+
+SOURCE = '''#!/usr/bin/env python
+"""
+Module docstring.
+
+# Not a comment
+"""
+
+import os  # trailing comment
+
+
+def f(x):
+    """One-line docstring."""
+    if x: return 1
+    y = {"a": 1,
+         # comment inside brackets
+
+         "b": 2}
+    z = 1; w = 2
+    text = """
+# inside a string
+"""
+    total = x + \\
+        y["a"]
+    return text
+
+
+class A: pass
+'''
+
+
+def counts(source: str) -> LineCounts:
+    module = ParsedModule(Path("example.py"), source)
+    return count_lines(module.tokens, module.lines)
+
+
+def as_tuple(counts: LineCounts) -> tuple:
+    return (
+        counts.loc,
+        counts.lloc,
+        counts.sloc,
+        counts.comments,
+        counts.multi,
+        counts.blank,
+        counts.single_comments,
+    )
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        SOURCE,
+        SOURCE.rstrip("\n"),
+        SOURCE + "\n\n\n",
+        "",
+        "x = 1",
+        "for i in range(3): print(i); continue\nelse: pass\n",
+        "lambda: 0\nd = {1: 2}\nx[1:2]\n",
+    ],
+)
+def test_matches_radon(source: str) -> None:
+    assert as_tuple(counts(source)) == tuple(analyze(source))
+
+
+def test_strings_and_docstrings_are_not_code_or_comments() -> None:
+    result = counts(SOURCE)
+
+    # Shebang, trailing and bracketed comments; not the '#' lines inside strings
+    assert result.comments == 3
+    # The non-blank lines of the module docstring
+    assert result.multi == 4
+    assert result.documentation == result.single_comments + result.multi
+
+
+def test_unterminated_source_counts_remaining_lines() -> None:
+    result = counts("x = (\n  1,\n\n")
+
+    assert result.loc == 3
+    assert result.blank == 1
+
+
+def test_file_metrics_use_line_counts(tmp_path: Path) -> None:
+    path = tmp_path / "example.py"
+    path.write_text(SOURCE)
+
+    metrics = Refactron().analyze(path).file_metrics[0]
+    expected = analyze(SOURCE)
+
+    assert metrics.lines_of_code == expected.sloc
+    assert metrics.comment_lines == expected.single_comments + expected.multi
+    assert metrics.blank_lines == expected.blank
+    assert metrics.total_lines == expected.loc
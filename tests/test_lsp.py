@@ -0,0 +1,336 @@
+"""End-to-end tests for the language server, driven by a scripted LSP client."""
+
+import io
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pytest
+
+from refactron.core.lsp import (
+    CONTENT_MODIFIED,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    REQUEST_CANCELLED,
+    LanguageServer,
+    TextPositions,
+    read_message,
+    text_edit,
+    write_message,
+)
+
+# The buffer only exists in the editor: nothing is on disk at this path
+URI = "file:///nonexistent/refactron-lsp/module.py"
+
+SOURCE = '''"""Prices."""
+import os
+
+
+def price(amount):
+    """Apply the discount."""
+    if amount > 1000:
+        return amount * 0.85
+    return amount
+'''
+
+
+class ScriptedClient:
+    """Talks to a LanguageServer running in a thread over a pair of pipes."""
+
+    def __init__(
+        self,
+        server_factory: Callable[..., LanguageServer] = LanguageServer,
+        debounce: float = 0.05,
+    ):
+        to_server_r, to_server_w = os.pipe()
+        to_client_r, to_client_w = os.pipe()
+        self.server = server_factory(
+            os.fdopen(to_server_r, "rb"), os.fdopen(to_client_w, "wb"), debounce=debounce
+        )
+        self._out = os.fdopen(to_server_w, "wb")
+        self._in = os.fdopen(to_client_r, "rb")
+        self._messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self.received: List[Dict[str, Any]] = []
+        self.exit_code: Optional[int] = None
+        self._next_id = 0
+
+        self._server_thread = threading.Thread(target=self._run_server, daemon=True)
+        self._server_thread.start()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _run_server(self) -> None:
+        self.exit_code = self.server.serve()
+        self.server.writer.close()
+
+    def _read(self) -> None:
+        while True:
+            message = read_message(self._in)
+            if message is None:
+                return
+            self._messages.put(message)
+
+    def send(self, message: Dict[str, Any]) -> None:
+        write_message(self._out, {"jsonrpc": "2.0", **message})
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> int:
+        self._next_id += 1
+        self.send({"id": self._next_id, "method": method, "params": params or {}})
+        return self._next_id
+
+    def notify(self, method: str, params: Dict[str, Any]) -> None:
+        self.send({"method": method, "params": params})
+
+    def wait_for(
+        self, predicate: Callable[[Dict[str, Any]], bool], timeout: float = 10
+    ) -> Dict[str, Any]:
+        for message in self.received:
+            if predicate(message):
+                self.received.remove(message)
+                return message
+        deadline = time.monotonic() + timeout
+        while True:
+            message = self._messages.get(timeout=max(0.0, deadline - time.monotonic()))
+            if predicate(message):
+                return message
+            self.received.append(message)
+
+    def response(self, request_id: int) -> Dict[str, Any]:
+        return self.wait_for(lambda message: message.get("id") == request_id)
+
+    def diagnostics(self, version: int) -> Dict[str, Any]:
+        return self.wait_for(
+            lambda message: message.get("method") == "textDocument/publishDiagnostics"
+            and message["params"].get("version") == version
+        )["params"]
+
+    def open(self, text: str = SOURCE) -> None:
+        self.notify(
+            "textDocument/didOpen",
+            {"textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": text}},
+        )
+
+    def change(self, version: int, changes: List[Dict[str, Any]]) -> None:
+        self.notify(
+            "textDocument/didChange",
+            {"textDocument": {"uri": URI, "version": version}, "contentChanges": changes},
+        )
+
+    def code_actions(self, line: int, only: Optional[List[str]] = None) -> int:
+        context: Dict[str, Any] = {"diagnostics": []}
+        if only is not None:
+            context["only"] = only
+        position = {"line": line, "character": 0}
+        return self.request(
+            "textDocument/codeAction",
+            {
+                "textDocument": {"uri": URI},
+                "range": {"start": position, "end": position},
+                "context": context,
+            },
+        )
+
+    def close(self) -> Optional[int]:
+        self.request("shutdown")
+        self.notify("exit", {})
+        self._server_thread.join(10)
+        self._out.close()
+        return self.exit_code
+
+
+@pytest.fixture
+def client() -> Iterator[ScriptedClient]:
+    client = ScriptedClient()
+    client.request("initialize", {"capabilities": {}})
+    client.notify("initialized", {})
+    yield client
+    if client.exit_code is None:
+        client.close()
+
+
+def _apply(text: str, edit: Dict[str, Any]) -> str:
+    positions = TextPositions(text)
+    start = positions.offset(edit["range"]["start"])
+    end = positions.offset(edit["range"]["end"])
+    return text[:start] + edit["newText"] + text[end:]
+
+
+def test_initialize_and_shutdown() -> None:
+    client = ScriptedClient()
+    result = client.response(client.request("initialize", {"capabilities": {}}))["result"]
+    assert result["serverInfo"]["name"] == "refactron"
+    assert result["capabilities"]["codeActionProvider"]["codeActionKinds"] == [
+        "quickfix",
+        "refactor.rewrite",
+    ]
+    assert client.close() == 0
+
+
+def test_unsaved_buffers_are_published_as_diagnostics(client: ScriptedClient) -> None:
+    client.open()
+    diagnostics = client.diagnostics(1)["diagnostics"]
+    unused = [d for d in diagnostics if d.get("code") == "S006"]
+    assert len(unused) == 1
+    assert unused[0]["range"]["start"] == {"line": 1, "character": 0}
+    assert unused[0]["source"] == "refactron"
+    assert unused[0]["severity"] == 3
+
+
+def test_incremental_edits_are_debounced_to_the_latest_version() -> None:
+    client = ScriptedClient(debounce=0.5)
+    client.request("initialize", {"capabilities": {}})
+    client.open()
+    client.diagnostics(1)
+
+    # Delete "import os\n" one character at a time
+    for version in range(2, 12):
+        client.change(
+            version,
+            [
+                {
+                    "range": {
+                        "start": {"line": 1, "character": 0},
+                        "end": {"line": 1, "character": 1},
+                    },
+                    "text": "",
+                }
+            ],
+        )
+    latest = client.diagnostics(11)
+    assert not [d for d in latest["diagnostics"] if d.get("code") == "S006"]
+    published = [
+        message["params"]["version"]
+        for message in client.received
+        if message.get("method") == "textDocument/publishDiagnostics"
+    ]
+    assert published == []
+    assert client.close() == 0
+
+
+def test_quick_fix_removes_unused_import(client: ScriptedClient) -> None:
+    client.open()
+    actions = client.response(client.code_actions(1, only=["quickfix"]))["result"]
+    assert [action["title"] for action in actions] == ["Refactron: Removed 1 unused import(s)"]
+    assert actions[0]["diagnostics"][0]["code"] == "S006"
+
+    (edit,) = actions[0]["edit"]["changes"][URI]
+    assert _apply(SOURCE, edit) == SOURCE.replace("import os\n", "")
+
+
+def test_refactoring_operations_are_code_actions(client: ScriptedClient) -> None:
+    client.open()
+    actions = client.response(client.code_actions(4, only=["refactor"]))["result"]
+    assert {action["kind"] for action in actions} == {"refactor.rewrite"}
+    extract = [action for action in actions if "constant" in action["title"].lower()]
+    assert extract
+
+    (edit,) = extract[0]["edit"]["changes"][URI]
+    fixed = _apply(SOURCE, edit)
+    assert "THRESHOLD_HIGH = 1000" in fixed
+    assert "if amount > THRESHOLD_HIGH:" in fixed
+
+
+def test_cancelled_and_stale_requests_are_not_run() -> None:
+    started = threading.Event()
+    release = threading.Event()
+
+    class SlowServer(LanguageServer):
+        def analysis(self, *args: Any) -> Any:
+            started.set()
+            release.wait(10)
+            return super().analysis(*args)
+
+    client = ScriptedClient(SlowServer)
+    client.request("initialize", {"capabilities": {}})
+    client.open()
+    assert started.wait(10)
+
+    # The worker is busy analyzing, so both requests wait in line
+    cancelled = client.code_actions(1)
+    client.notify("$/cancelRequest", {"id": cancelled})
+    stale = client.code_actions(1)
+    client.change(2, [{"text": SOURCE + "\n"}])
+    release.set()
+
+    assert client.response(cancelled)["error"]["code"] == REQUEST_CANCELLED
+    assert client.response(stale)["error"]["code"] == CONTENT_MODIFIED
+    assert client.close() == 0
+
+
+def test_protocol_errors_are_reported(client: ScriptedClient) -> None:
+    client._out.write(b"Content-Length: 7\r\n\r\n{bogus}")
+    client._out.flush()
+    assert client.wait_for(lambda m: "error" in m)["error"]["code"] == PARSE_ERROR
+
+    response = client.response(client.request("textDocument/hover", {}))
+    assert response["error"]["code"] == METHOD_NOT_FOUND
+
+
+def test_exit_without_shutdown_fails() -> None:
+    stdin = io.BytesIO()
+    write_message(stdin, {"jsonrpc": "2.0", "method": "exit"})
+    stdin.seek(0)
+    assert LanguageServer(stdin, io.BytesIO()).serve() == 1
+
+
+def test_text_edit_spans_changed_lines_in_utf16() -> None:
+    old = "a = '\U0001f600'\nb = 1\nc = 2\n"
+    new = "a = '\U0001f600'\nb = 2\nc = 2\n"
+    edit = text_edit(old, new)
+    assert edit["range"] == {
+        "start": {"line": 1, "character": 0},
+        "end": {"line": 2, "character": 0},
+    }
+    assert edit["newText"] == "b = 2\n"
+    assert TextPositions(old).position(len("a = '\U0001f600'")) == {"line": 0, "character": 8}
+
+
+def test_lsp_command_over_stdio() -> None:
+    messages = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"capabilities": {}}},
+        {
+            "jsonrpc": "2.0",
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": SOURCE}
+            },
+        },
+        {
+            "jsonrpc": "2.0",
+            "id": 2,
+            "method": "textDocument/codeAction",
+            "params": {
+                "textDocument": {"uri": URI},
+                "range": {"start": {"line": 1, "character": 0}, "end": {"line": 1, "character": 0}},
+                "context": {"diagnostics": [], "only": ["quickfix"]},
+            },
+        },
+        {"jsonrpc": "2.0", "id": 3, "method": "shutdown"},
+        {"jsonrpc": "2.0", "method": "exit"},
+    ]
+    stdin = io.BytesIO()
+    for message in messages:
+        write_message(stdin, message)
+
+    process = subprocess.run(
+        [sys.executable, "-m", "refactron.cli", "lsp"],
+        input=stdin.getvalue(),
+        capture_output=True,
+        timeout=60,
+    )
+    assert process.returncode == 0, process.stderr.decode()
+
+    stdout = io.BytesIO(process.stdout)
+    responses = {}
+    while True:
+        message = read_message(stdout)
+        if message is None:
+            break
+        if "id" in message:
+            responses[message["id"]] = message
+    assert responses[1]["result"]["serverInfo"]["name"] == "refactron"
+    assert len(responses[2]["result"]) == 1
+    assert responses[3]["result"] is None
@@ -0,0 +1,114 @@
+"""Tests for import classification."""
+
+import os
+import sys
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from refactron.analyzers.dependency_analyzer import DependencyAnalyzer
+from refactron.core.config import RefactronConfig
+from refactron.core.module_resolver import (
+    LOCAL,
+    STDLIB,
+    THIRD_PARTY,
+    classify_import,
+    classify_module,
+    clear_caches,
+    first_party_names,
+    import_root,
+    refresh_caches,
+    stdlib_module_names,
+)
+from refactron.core.parsed_module import ParsedModule
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches() -> Iterator[None]:
+    clear_caches()
+    yield
+    clear_caches()
+
+
+def write_project(root: Path) -> Path:
+    (root / "pyproject.toml").write_text(
+        '[project]\nname = "my-app"\n\n[tool.setuptools]\npackages = ["corelib"]\n'
+    )
+    for name in ("src/app/__init__.py", "src/app/sub/__init__.py", "tools/__init__.py"):
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text("")
+    module = root / "src/app/sub/mod.py"
+    module.write_text("")
+    (root / "src/helpers.py").write_text("")
+    return module
+
+
+def test_stdlib_names() -> None:
+    names = stdlib_module_names()
+
+    assert {"os", "sys", "__future__", "asyncio", "importlib"} <= names
+    assert "yaml" not in names
+    assert stdlib_module_names() is names
+    if hasattr(sys, "stdlib_module_names"):
+        assert "zoneinfo" in names
+
+
+def test_first_party_from_layout_and_pyproject(tmp_path: Path) -> None:
+    module = write_project(tmp_path)
+
+    root = import_root(str(module.parent))
+    assert root == str(tmp_path / "src")
+    assert {"app", "helpers", "tools"} <= first_party_names(root)
+
+    assert classify_import("app.sub", module) == LOCAL
+    assert classify_import("helpers", module) == LOCAL
+    assert classify_import(".mod", module) == LOCAL
+    assert classify_import("os.path", module) == STDLIB
+    assert classify_import("yaml", module) == THIRD_PARTY
+    if sys.version_info >= (3, 11):
+        assert classify_import("my_app", module) == LOCAL
+        assert classify_import("corelib.io", module) == LOCAL
+
+
+def test_classification_is_memoized(tmp_path: Path) -> None:
+    module = write_project(tmp_path)
+
+    for _ in range(3):
+        classify_import("app", module)
+
+    info = classify_module.cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+
+
+def test_refresh_after_layout_change(tmp_path: Path) -> None:
+    module = write_project(tmp_path)
+    assert classify_import("extra", module) == THIRD_PARTY
+    assert not refresh_caches()
+
+    (tmp_path / "src" / "extra.py").write_text("")
+    stat = (tmp_path / "src").stat()
+    # Make sure the directory's mtime moves even on coarse-grained filesystems
+    os.utime(tmp_path / "src", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert refresh_caches()
+    assert classify_import("extra", module) == LOCAL
+    assert not refresh_caches()
+
+
+def import_order_modules(file_path: Path, source: str) -> List[str]:
+    parsed = ParsedModule(file_path, source)
+    issues = DependencyAnalyzer(RefactronConfig()).analyze_module(parsed)
+    return [issue.metadata["module"] for issue in issues if issue.rule_id == "DEP004"]
+
+
+def test_import_order_uses_project_layout(tmp_path: Path) -> None:
+    module = write_project(tmp_path)
+
+    ordered = "import os\n\nimport click\nimport yaml\n\nfrom app import sub\nfrom . import mod\n"
+    assert import_order_modules(module, ordered) == []
+
+    # Lowercase first-party packages were taken for third-party ones before
+    assert import_order_modules(module, "from app import sub\nimport click\n") == ["click"]
+    assert import_order_modules(module, "from .mod import x\nimport json\n") == ["json"]
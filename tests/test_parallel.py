@@ -0,0 +1,86 @@
+"""Tests for parallel multi-process analysis and refactoring."""
+
+from pathlib import Path
+
+import pytest
+
+from refactron import Refactron
+from refactron.core.parallel import chunk_size_for, chunked, resolve_workers
+
+MODULE_TEMPLATE = """
+import os
+import sys
+
+
+def function_{index}(a, b, c, d, e, f):
+    total = 0
+    for item in range(a):
+        if item > 5:
+            total += item * 42
+    return eval(str(total))
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    for index in range(12):
+        package = tmp_path / f"pkg_{index % 3}"
+        package.mkdir(exist_ok=True)
+        (package / f"module_{index}.py").write_text(MODULE_TEMPLATE.format(index=index))
+    return tmp_path
+
+
+def issue_keys(result):
+    return [
+        (str(metrics.file_path), [(i.rule_id, i.line_number, i.message) for i in metrics.issues])
+        for metrics in result.file_metrics
+    ]
+
+
+def test_resolve_workers():
+    assert resolve_workers(None) == 1
+    assert resolve_workers(1) == 1
+    assert resolve_workers(3) == 3
+    assert resolve_workers(0) >= 1
+
+
+def test_chunking_keeps_order():
+    items = list(range(10))
+
+    assert list(chunked(items, 4)) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert 1 <= chunk_size_for(10, 4) <= 10
+    assert chunk_size_for(100000, 2) == 64
+
+
+def test_parallel_analysis_matches_serial(project):
+    refactron = Refactron()
+
+    serial = refactron.analyze(project)
+    parallel = refactron.analyze(project, workers=3)
+
+    assert parallel.total_files == serial.total_files == 12
+    assert parallel.total_issues == serial.total_issues
+    assert issue_keys(parallel) == issue_keys(serial)
+
+
+def test_parallel_refactoring_matches_serial(project):
+    refactron = Refactron()
+
+    serial = refactron.refactor(project, preview=True)
+    parallel = refactron.refactor(project, preview=True, workers=2)
+
+    assert [(op.file_path, op.line_number, op.description) for op in parallel.operations] == [
+        (op.file_path, op.line_number, op.description) for op in serial.operations
+    ]
+
+
+def test_single_file_runs_in_process(project, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("process pool should not be used")
+
+    monkeypatch.setattr("refactron.core.refactron.map_files", fail)
+    file_path = next(project.rglob("*.py"))
+
+    result = Refactron().analyze(file_path, workers=4)
+
+    assert result.total_files == 1
@@ -0,0 +1,101 @@
+"""Tests for the shared per-file parsed module."""
+
+import ast
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+import pytest
+
+from refactron import Refactron
+from refactron.analyzers.base_analyzer import BaseAnalyzer
+from refactron.core.config import RefactronConfig
+from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+from refactron.core.parsed_module import ParsedModule
+
+
+class LegacyAnalyzer(BaseAnalyzer):
+    """Analyzer written against the old analyze(file_path, source_code) API."""
+
+    @property
+    def name(self) -> str:
+        return "legacy"
+
+    def analyze(self, file_path: Path, source_code: str) -> List[CodeIssue]:
+        return [
+            CodeIssue(
+                category=IssueCategory.STYLE,
+                level=IssueLevel.INFO,
+                message=f"{len(source_code)} chars",
+                file_path=file_path,
+                line_number=1,
+            )
+        ]
+
+
+class IncompleteAnalyzer(BaseAnalyzer):
+    """Analyzer that implements neither entry point."""
+
+    @property
+    def name(self) -> str:
+        return "incomplete"
+
+
+class TestParsedModule:
+    """Test lazy, cached views of a module."""
+
+    def test_tree_is_parsed_once(self) -> None:
+        module = ParsedModule(Path("example.py"), "x = 1\n")
+        with mock.patch("refactron.core.parsed_module.ast.parse", wraps=ast.parse) as parse:
+            first = module.tree
+            second = module.tree
+        assert first is second
+        assert parse.call_count == 1
+
+    def test_syntax_error_is_cached(self) -> None:
+        module = ParsedModule(Path("broken.py"), "def broken(:\n")
+        with pytest.raises(SyntaxError):
+            module.tree
+        assert isinstance(module.syntax_error, SyntaxError)
+        with pytest.raises(SyntaxError):
+            module.tree
+
+    def test_valid_module_has_no_syntax_error(self) -> None:
+        module = ParsedModule(Path("ok.py"), "x = 1\n")
+        assert module.syntax_error is None
+
+    def test_lines_and_tokens(self) -> None:
+        module = ParsedModule(Path("example.py"), "# comment\nx = 1\n")
+        assert module.lines == ["# comment", "x = 1", ""]
+        assert any(token.string == "# comment" for token in module.tokens)
+
+    def test_from_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "sample.py"
+        path.write_text("y = 2\n")
+        module = ParsedModule.from_file(path)
+        assert module.file_path == path
+        assert module.source == "y = 2\n"
+
+
+class TestAnalyzerEntryPoints:
+    """Test the analyze_module entry point and the legacy shim."""
+
+    def test_legacy_analyzer_runs_through_analyze_module(self) -> None:
+        analyzer = LegacyAnalyzer(RefactronConfig())
+        issues = analyzer.analyze_module(ParsedModule(Path("a.py"), "x = 1\n"))
+        assert issues[0].message == "6 chars"
+
+    def test_incomplete_analyzer_raises(self) -> None:
+        analyzer = IncompleteAnalyzer(RefactronConfig())
+        with pytest.raises(NotImplementedError):
+            analyzer.analyze(Path("a.py"), "x = 1\n")
+
+    def test_refactron_parses_each_file_once(self, tmp_path: Path) -> None:
+        path = tmp_path / "module.py"
+        path.write_text("import os\n\n\ndef f(a):\n    return os.path.join(a)\n")
+
+        with mock.patch("refactron.core.parsed_module.ast.parse", wraps=ast.parse) as parse:
+            result = Refactron().analyze(path)
+
+        assert result.total_files == 1
+        assert parse.call_count == 1
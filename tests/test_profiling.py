@@ -0,0 +1,166 @@
+"""Tests for opt-in analysis profiling."""
+
+import pstats
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from refactron import Refactron
+from refactron.cli import analyze
+from refactron.core.cache import config_fingerprint
+from refactron.core.config import RefactronConfig
+from refactron.core.dispatch import NodeDispatcher, run_analyzers
+from refactron.core.parsed_module import ParsedModule
+from refactron.core.profiling import AnalysisProfile, FileProfile, Profiler, TimingStats
+
+SOURCE = """
+import os
+
+
+def compute(values):
+    total = 0
+    for value in values:
+        if value > 10:
+            total += value * 3
+    return total
+
+
+class Holder:
+    def get(self, key):
+        return eval(key)
+"""
+
+
+def write_project(root: Path, count: int = 3) -> Path:
+    root.mkdir(exist_ok=True)
+    for i in range(count):
+        (root / f"module_{i}.py").write_text(SOURCE)
+    return root
+
+
+def test_run_analyzers_records_analyzers_and_rules() -> None:
+    refactron = Refactron()
+    module = ParsedModule(Path("example.py"), SOURCE)
+    file_profiler = Profiler().profile_file(module.file_path)
+    dispatcher = NodeDispatcher()
+
+    results = run_analyzers(refactron.analyzers, module, dispatcher, file_profiler)
+
+    record = file_profiler.record
+    assert set(record.analyzers) == {analyzer.name for analyzer in refactron.analyzers}
+    for analyzer, issues in zip(refactron.analyzers, results):
+        assert record.analyzers[analyzer.name].issues == len(issues)
+        assert record.analyzers[analyzer.name].files == 1
+    assert sum(stats.nodes for stats in record.rules.values()) == dispatcher.rule_calls
+    assert "security._check_dangerous_functions" in record.rules
+
+
+def test_profiling_does_not_change_results() -> None:
+    plain = Refactron()._analyze_module(ParsedModule(Path("example.py"), SOURCE))
+    profiled = Refactron(RefactronConfig(profiling_enabled=True))._analyze_module(
+        ParsedModule(Path("example.py"), SOURCE)
+    )
+
+    assert profiled.issues == plain.issues
+    assert plain.profile is None
+    assert profiled.profile is not None
+    assert profiled.profile.issues == len(profiled.issues)
+    assert profiled.profile.nodes > 0
+    assert profiled.profile.seconds >= profiled.profile.parse_seconds
+
+
+def test_analyze_aggregates_profile(tmp_path: Path) -> None:
+    project = write_project(tmp_path)
+
+    result = Refactron(RefactronConfig(profiling_enabled=True)).analyze(project)
+
+    assert result.profile is not None
+    assert result.profile.files == 3
+    assert result.profile.issues == result.total_issues
+    assert len(result.profile.slowest_files()) == 3
+    assert Refactron().analyze(project).profile is None
+
+
+def test_profile_from_worker_processes(tmp_path: Path) -> None:
+    project = write_project(tmp_path, count=4)
+
+    result = Refactron(RefactronConfig(profiling_enabled=True)).analyze(project, workers=2)
+
+    assert result.profile is not None
+    assert result.profile.files == 4
+    assert all(metrics.profile is not None for metrics in result.file_metrics)
+
+
+def test_analysis_profile_keeps_slowest_files() -> None:
+    profile = AnalysisProfile(max_files=2)
+    for seconds in (0.3, 0.1, 0.5, 0.2):
+        profile.add(FileProfile(Path(f"{seconds}.py"), seconds=seconds))
+
+    assert profile.files == 4
+    assert [record.seconds for record in profile.slowest_files()] == [0.5, 0.3]
+
+
+def test_slowest_analyzers_are_ordered() -> None:
+    profile = AnalysisProfile()
+    record = FileProfile(Path("a.py"))
+    record.analyzers["fast"] = TimingStats(seconds=0.1, files=1)
+    record.analyzers["slow"] = TimingStats(seconds=0.4, files=1)
+    profile.add(record)
+
+    assert [name for name, _ in profile.slowest_analyzers()] == ["slow", "fast"]
+    assert profile.slowest_analyzers(1)[0][1].seconds == 0.4
+
+
+def test_cprofile_dump_for_one_analyzer(tmp_path: Path) -> None:
+    project = write_project(tmp_path / "src")
+    profiler = Profiler(cprofile_analyzer="code_smells")
+
+    Refactron(RefactronConfig(profiling_enabled=True), profiler=profiler).analyze(project)
+
+    output = tmp_path / "code_smells.pstats"
+    assert profiler.dump_stats(output)
+    stats = pstats.Stats(str(output))
+    files = {filename for filename, _, _ in stats.stats}  # type: ignore[attr-defined]
+    assert any(name.endswith("code_smell_analyzer.py") for name in files)
+    assert not any(name.endswith("complexity_analyzer.py") for name in files)
+
+
+def test_dump_stats_without_cprofile(tmp_path: Path) -> None:
+    assert not Profiler().dump_stats(tmp_path / "none.pstats")
+
+
+def test_profiling_flag_does_not_change_cache_fingerprint() -> None:
+    assert config_fingerprint(RefactronConfig(profiling_enabled=True)) == config_fingerprint(
+        RefactronConfig()
+    )
+
+
+def test_cli_profile_prints_tables(tmp_path: Path) -> None:
+    project = write_project(tmp_path / "src")
+    stats_path = tmp_path / "out.pstats"
+
+    result = CliRunner().invoke(
+        analyze,
+        [
+            str(project),
+            "--summary",
+            "--profile-analyzer",
+            "complexity",
+            "--profile-output",
+            str(stats_path),
+        ],
+    )
+
+    assert "Slowest Analyzers" in result.output
+    assert "Slowest Rules" in result.output
+    assert "Slowest Files" in result.output
+    assert stats_path.exists()
+
+
+def test_cli_profile_rejects_unknown_analyzer(tmp_path: Path) -> None:
+    project = write_project(tmp_path)
+
+    result = CliRunner().invoke(analyze, [str(project), "--profile-analyzer", "nope"])
+
+    assert result.exit_code == 1
+    assert "Unknown or disabled analyzer" in result.output
@@ -0,0 +1,192 @@
+"""Tests for the project-wide reference index and cross-file dead code."""
+
+import ast
+import os
+from pathlib import Path
+from typing import Dict, List
+from unittest import mock
+
+from refactron import Refactron
+from refactron.core.config import RefactronConfig
+from refactron.core.reference_index import CLASS, FUNCTION, Definition, ReferenceIndex
+
+
+def write(root: Path, files: Dict[str, str]) -> List[Path]:
+    paths = []
+    for name, source in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+        paths.append(path)
+    return sorted(paths)
+
+
+PROJECT = {
+    "pkg/__init__.py": "from .api import public_entry\n\n__all__ = ['public_entry']\n",
+    "pkg/api.py": (
+        "def public_entry():\n    return 1\n\n\n"
+        "def helper():\n    return 2\n\n\n"
+        "def forgotten():\n    return 3\n\n\n"
+        "class Widget:\n    pass\n\n\n"
+        "class Orphan:\n    pass\n\n\n"
+        "class Plugin:\n    pass\n"
+    ),
+    "pkg/cli.py": "from pkg.api import helper\nimport pkg.api\n\nhelper()\npkg.api.Widget()\n",
+    "pkg/star.py": "def starred():\n    return 5\n",
+    "pkg/user.py": "from pkg.star import *\n\nstarred()\n",
+    "tests/conftest.py": "def pytest_configure(config):\n    config.quiet = True\n",
+}
+
+
+def names(definitions: List[Definition]) -> List[str]:
+    return [definition.name for definition in definitions]
+
+
+def test_unreferenced_definitions(tmp_path: Path) -> None:
+    files = write(tmp_path, PROJECT)
+    index = ReferenceIndex.build(tmp_path, files)
+
+    unused = index.unreferenced(tmp_path / "pkg/api.py")
+
+    assert names(unused) == ["forgotten", "Orphan", "Plugin"]
+    assert [definition.kind for definition in unused] == [FUNCTION, CLASS, CLASS]
+    assert index.unreferenced(tmp_path / "pkg/star.py") == []
+    assert index.unreferenced(tmp_path / "tests/conftest.py") == []
+    assert index.candidates(tmp_path / "tests/conftest.py") == []
+
+
+def test_save_load_and_update(tmp_path: Path) -> None:
+    files = write(tmp_path, PROJECT)
+    saved = tmp_path / "index.json"
+    ReferenceIndex.build(tmp_path, files).save(saved)
+
+    index = ReferenceIndex.load(saved, tmp_path)
+    assert index is not None
+    assert not index.update(files)
+    assert ReferenceIndex.load(saved, tmp_path / "pkg") is None
+
+    user = tmp_path / "pkg/user.py"
+    user.write_text("from pkg.api import forgotten\n\nforgotten()\n")
+    stat = user.stat()
+    os.utime(user, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert index.update(files)
+    assert index.scanned == 1
+    assert names(index.unreferenced(tmp_path / "pkg/api.py")) == ["Orphan", "Plugin"]
+    assert names(index.unreferenced(tmp_path / "pkg/star.py")) == ["starred"]
+
+
+def dead_code_issues(root: Path, config: RefactronConfig) -> Dict[str, List[str]]:
+    result = Refactron(config).analyze(root)
+    found: Dict[str, List[str]] = {}
+    for metrics in result.file_metrics:
+        for issue in metrics.issues:
+            if issue.rule_id in ("DEAD001", "DEAD007"):
+                key = metrics.file_path.relative_to(root).as_posix()
+                name = issue.metadata.get("function") or issue.metadata.get("class")
+                found.setdefault(key, []).append(f"{issue.rule_id}:{name}")
+    return found
+
+
+def test_analysis_uses_project_references(tmp_path: Path) -> None:
+    write(tmp_path, PROJECT)
+    config = RefactronConfig(enabled_analyzers=["dead_code"], project_dead_code=True)
+
+    assert dead_code_issues(tmp_path, config) == {
+        "pkg/api.py": ["DEAD001:forgotten", "DEAD007:Orphan", "DEAD007:Plugin"],
+    }
+
+    config.project_dead_code = False
+    local = dead_code_issues(tmp_path, config)
+    assert local["pkg/api.py"] == ["DEAD001:public_entry", "DEAD001:helper", "DEAD001:forgotten"]
+    assert local["tests/conftest.py"] == ["DEAD001:pytest_configure"]
+
+
+def test_methods_called_from_other_modules_are_used(tmp_path: Path) -> None:
+    write(
+        tmp_path,
+        {
+            "pkg/__init__.py": "",
+            "pkg/jobs.py": "class Job:\n    def run(self):\n        return 1\n\n"
+            "    def stale(self):\n        return 2\n",
+            "pkg/main.py": "from pkg.jobs import Job\n\nJob().run()\n",
+        },
+    )
+    config = RefactronConfig(enabled_analyzers=["dead_code"], project_dead_code=True)
+
+    assert dead_code_issues(tmp_path, config) == {"pkg/jobs.py": ["DEAD001:stale"]}
+
+
+def test_cached_index_is_reused(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    write(project, PROJECT)
+    config = RefactronConfig(
+        enabled_analyzers=["dead_code"], cache_enabled=True, cache_dir=str(tmp_path / "cache")
+    )
+
+    first = Refactron(config).reference_index(project)
+    second = Refactron(config).reference_index(project)
+
+    assert first.scanned == len(PROJECT)
+    assert second.scanned == 0
+    assert names(second.unreferenced(project / "pkg/api.py")) == ["forgotten", "Orphan", "Plugin"]
+
+
+def test_project_dead_code_defaults_to_the_cache(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    write(project, PROJECT)
+    config = RefactronConfig(enabled_analyzers=["dead_code"])
+
+    assert "DEAD007:Orphan" not in dead_code_issues(project, config)["pkg/api.py"]
+    config.cache_enabled = True
+    config.cache_dir = str(tmp_path / "cache")
+    assert "DEAD007:Orphan" in dead_code_issues(project, config)["pkg/api.py"]
+
+
+def test_index_is_built_from_the_analysis_parse(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    write(project, PROJECT)
+    config = RefactronConfig(
+        enabled_analyzers=["dead_code"], cache_enabled=True, cache_dir=str(tmp_path / "cache")
+    )
+
+    with mock.patch("ast.parse", wraps=ast.parse) as parse:
+        first = dead_code_issues(project, config)
+    assert parse.call_count == len(PROJECT)
+
+    user = project / "pkg/user.py"
+    user.write_text("from pkg.api import forgotten\n\nforgotten()\n")
+    stat = user.stat()
+    os.utime(user, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    with mock.patch("ast.parse", wraps=ast.parse) as parse:
+        second = dead_code_issues(project, config)
+
+    # Only the changed file is parsed; the saved index covers the others
+    assert parse.call_count == 1
+    assert first["pkg/api.py"] == ["DEAD001:forgotten", "DEAD007:Orphan", "DEAD007:Plugin"]
+    assert second["pkg/api.py"] == ["DEAD007:Orphan", "DEAD007:Plugin"]
+    assert second["pkg/star.py"] == ["DEAD001:starred"]
+
+
+def test_incremental_analysis_api(tmp_path: Path) -> None:
+    files = write(tmp_path, PROJECT)
+    api, cli, star, user = (
+        tmp_path / "pkg" / name for name in ("api.py", "cli.py", "star.py", "user.py")
+    )
+    refactron = Refactron(RefactronConfig(enabled_analyzers=["dead_code"]))
+    index = refactron.project_reference_index(tmp_path)
+    assert index is not None and index.files == {}
+
+    metrics = refactron.analyze_files(files, reference_index=index)
+    assert len(index.files) == len(PROJECT)
+
+    user.write_text("from pkg.api import forgotten\n\nforgotten()\n")
+    refactron.analyze_files([user], reference_index=index)
+    # Only the files defining what user.py used to or now refers to
+    assert index.affected == {user, api, star}
+    judged = refactron.apply_reference_index(metrics[files.index(api)], index)
+    assert "forgotten" not in [issue.metadata.get("function") for issue in judged.issues]
+    assert judged is not metrics[files.index(api)]
+
+    assert refactron.update_reference_index(index, removed=[cli]) == {cli, api}
+    assert refactron.update_reference_index(index, removed=[cli]) == set()
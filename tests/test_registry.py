@@ -0,0 +1,259 @@
+"""Tests for the plugin registry of analyzers, refactorers and fixers."""
+
+import ast
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from refactron import Refactron
+from refactron.analyzers.base_analyzer import BaseAnalyzer
+from refactron.autofix.engine import AutoFixEngine, BaseFixer
+from refactron.autofix.models import FixResult
+from refactron.core import registry
+from refactron.core.config import RefactronConfig
+from refactron.core.dispatch import RuleContext, node_rule
+from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+from refactron.core.registry import (
+    ANALYZER_GROUP,
+    COST_CHEAP,
+    COST_EXPENSIVE,
+    FIXER_GROUP,
+    Registry,
+)
+
+
+class NoPrintAnalyzer(BaseAnalyzer):
+    """Third-party analyzer reporting calls to print()."""
+
+    cost = COST_CHEAP
+    nodes_seen = 0
+
+    @property
+    def name(self) -> str:
+        return "no_print"
+
+    @node_rule(ast.Call)
+    def _check_print(self, node: ast.Call, context: RuleContext) -> None:
+        NoPrintAnalyzer.nodes_seen += 1
+        if isinstance(node.func, ast.Name) and node.func.id == "print":
+            context.report(
+                CodeIssue(
+                    category=IssueCategory.STYLE,
+                    level=IssueLevel.INFO,
+                    message="print() call",
+                    file_path=context.file_path,
+                    line_number=node.lineno,
+                    rule_id="NP001",
+                )
+            )
+
+
+class ClockAnalyzer(BaseAnalyzer):
+    """Third-party analyzer whose findings change between runs, so it is never cached."""
+
+    cost = COST_EXPENSIVE
+    cacheable = False
+    runs = 0
+
+    @property
+    def name(self) -> str:
+        return "clock"
+
+    def analyze_module(self, module: Any) -> List[CodeIssue]:
+        ClockAnalyzer.runs += 1
+        return [
+            CodeIssue(
+                category=IssueCategory.STYLE,
+                level=IssueLevel.INFO,
+                message=f"run {ClockAnalyzer.runs}",
+                file_path=module.file_path,
+                line_number=1,
+                rule_id="CLK001",
+            )
+        ]
+
+
+class UppercaseFixer(BaseFixer):
+    """Third-party fixer registered under the rule ID it fixes."""
+
+    def __init__(self) -> None:
+        super().__init__(name="NP001", risk_score=0.0)
+
+    def preview(self, issue: CodeIssue, code: str) -> FixResult:
+        return FixResult(success=True, original=code, fixed=code.upper())
+
+
+@pytest.fixture
+def entry_points(monkeypatch: pytest.MonkeyPatch) -> List[EntryPoint]:
+    """Entry points the registries will find, as if installed by another package."""
+    points = [
+        EntryPoint("no_print", f"{__name__}:NoPrintAnalyzer", ANALYZER_GROUP),
+        EntryPoint("clock", f"{__name__}:ClockAnalyzer", ANALYZER_GROUP),
+        EntryPoint("complexity", f"{__name__}:NoPrintAnalyzer", ANALYZER_GROUP),
+        EntryPoint("NP001", f"{__name__}:UppercaseFixer", FIXER_GROUP),
+    ]
+    monkeypatch.setattr(
+        registry,
+        "_entry_points",
+        lambda group: [point for point in points if point.group == group],
+    )
+    for instance in (registry.ANALYZERS, registry.FIXERS):
+        monkeypatch.setattr(instance, "_plugins", dict(instance._plugins))
+        monkeypatch.setattr(instance, "_discovered", False)
+    monkeypatch.setattr(registry, "_distribution_version", lambda distribution: "1.0")
+    return points
+
+
+def _config(*analyzers: str, **overrides: Any) -> RefactronConfig:
+    config = RefactronConfig(enabled_analyzers=list(analyzers), **overrides)
+    config.cache_enabled = overrides.get("cache_enabled", False)
+    return config
+
+
+def test_only_enabled_plugins_are_loaded() -> None:
+    analyzers = Registry(
+        ANALYZER_GROUP,
+        {
+            "complexity": "refactron.analyzers.complexity_analyzer:ComplexityAnalyzer",
+            "dead_code": "refactron.analyzers.dead_code_analyzer:DeadCodeAnalyzer",
+            "security": "refactron.analyzers.security_analyzer:SecurityAnalyzer",
+        },
+    )
+    created = analyzers.enabled(["security", "complexity"])
+    # Run in registry order, whatever the order of the names
+    assert [plugin.name for plugin in created] == ["complexity", "security"]
+    assert [type(a).__name__ for a in analyzers.create(["security"], RefactronConfig())] == [
+        "SecurityAnalyzer"
+    ]
+    assert [plugin.name for plugin in analyzers.plugins() if plugin.loaded] == ["security"]
+
+
+def test_builtin_configuration_does_not_scan_entry_points(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def fail(group: str) -> List[Any]:
+        raise AssertionError("entry points scanned")
+
+    monkeypatch.setattr(registry, "_entry_points", fail)
+    assert len(registry.create_analyzers(RefactronConfig())) == 7
+
+
+def test_plugins_declare_their_metadata() -> None:
+    security = registry.ANALYZERS.get("security")
+    assert security is not None and security.builtin
+    assert ast.Call in security.node_types
+    assert security.cost == COST_CHEAP
+    assert security.cacheable
+
+    # Node types of analyzers come from their node rules
+    assert NoPrintAnalyzer.node_types == (ast.Call,)
+    assert registry.REFACTORERS.get("extract_constant").node_types == (ast.Constant,)
+    assert registry.FIXERS.get("remove_unused_imports").node_types == (
+        ast.Import,
+        ast.ImportFrom,
+    )
+
+
+def test_entry_point_analyzer_runs_in_the_shared_traversal(
+    entry_points: List[EntryPoint], tmp_path: Path
+) -> None:
+    plugin = registry.ANALYZERS.get("no_print")
+    assert plugin is not None and plugin.distribution is not None
+    # Built-in names cannot be taken over by other packages
+    assert registry.ANALYZERS.get("complexity").builtin
+
+    source = tmp_path / "module.py"
+    source.write_text("def main():\n    print(len('x'))\n")
+    NoPrintAnalyzer.nodes_seen = 0
+    refactron = Refactron(_config("complexity", "no_print"))
+    assert [type(a).__name__ for a in refactron.analyzers] == [
+        "ComplexityAnalyzer",
+        "NoPrintAnalyzer",
+    ]
+
+    result = refactron.analyze(source, workers=1)
+    assert [issue.rule_id for issue in result.all_issues if issue.rule_id == "NP001"] == ["NP001"]
+    assert NoPrintAnalyzer.nodes_seen == 2
+
+
+def test_uncacheable_analyzer_runs_again_on_cache_hits(
+    entry_points: List[EntryPoint], tmp_path: Path
+) -> None:
+    source = tmp_path / "module.py"
+    source.write_text("def main():\n    print('x')\n")
+    config = _config("no_print", "clock", cache_enabled=True, cache_dir=str(tmp_path / "cache"))
+
+    ClockAnalyzer.runs = 0
+    first = Refactron(config).analyze(source, workers=1)
+    NoPrintAnalyzer.nodes_seen = 0
+    second = Refactron(config).analyze(source, workers=1)
+
+    # The cacheable analyzer's result came from the cache; the clock ran both times
+    assert NoPrintAnalyzer.nodes_seen == 0
+    assert ClockAnalyzer.runs == 2
+    assert [i.message for i in first.all_issues if i.rule_id == "CLK001"] == ["run 1"]
+    assert [i.message for i in second.all_issues if i.rule_id == "CLK001"] == ["run 2"]
+    assert [i.rule_id for i in second.all_issues if i.rule_id == "NP001"] == ["NP001"]
+
+
+def test_plugin_upgrade_misses_the_cache(
+    entry_points: List[EntryPoint], monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    versions = {"unknown": "1.0"}
+    monkeypatch.setattr(registry, "_distribution_version", versions.get)
+    source = tmp_path / "module.py"
+    source.write_text("def main():\n    print('x')\n")
+    config = _config("no_print", cache_enabled=True, cache_dir=str(tmp_path / "cache"))
+
+    def nodes_seen() -> int:
+        NoPrintAnalyzer.nodes_seen = 0
+        Refactron(config).analyze(source, workers=1)
+        return NoPrintAnalyzer.nodes_seen
+
+    assert nodes_seen() == 1
+    assert nodes_seen() == 0
+    versions["unknown"] = "2.0"
+    assert nodes_seen() == 1
+    assert nodes_seen() == 0
+
+    # Without a known version, the plugin's results are never cached
+    del versions["unknown"]
+    assert not registry.ANALYZERS.get("no_print").cacheable
+    assert nodes_seen() == 1
+    assert nodes_seen() == 1
+
+
+def test_fixers_are_created_when_first_looked_up(entry_points: List[EntryPoint]) -> None:
+    engine = AutoFixEngine()
+    assert dict.__len__(engine.fixers) == 0
+    assert "remove_dead_code" in engine.fixers
+    assert dict.__len__(engine.fixers) == 0
+
+    fixer = engine.fixers["remove_dead_code"]
+    assert engine.fixers["remove_dead_code"] is fixer
+    assert dict.__len__(engine.fixers) == 1
+
+    issue = CodeIssue(
+        category=IssueCategory.STYLE,
+        level=IssueLevel.INFO,
+        message="print() call",
+        file_path=Path("module.py"),
+        line_number=1,
+        rule_id="NP001",
+    )
+    assert isinstance(engine.fixer_for(issue), UppercaseFixer)
+    assert engine.fix(issue, "print('x')\n").fixed == "PRINT('X')\n"
+
+
+def test_plugins_command_lists_entry_points(entry_points: List[EntryPoint]) -> None:
+    from click.testing import CliRunner
+
+    from refactron.cli import main
+
+    result = CliRunner().invoke(main, ["plugins"])
+    assert result.exit_code == 0, result.output
+    assert "no_print" in result.output
+    assert "NP001" in result.output
+    assert "expensive" in result.output
@@ -0,0 +1,82 @@
+"""Tests for streaming analysis results."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from refactron import Refactron
+from refactron.core.analysis_result import AnalysisAggregate, write_report
+
+MODULE = """
+def compute(a, b, c, d, e, f):
+    if a:
+        return eval(b)
+    return 42
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    for index in range(5):
+        (tmp_path / f"module_{index}.py").write_text(MODULE + "\n" * index)
+    (tmp_path / "clean.py").write_text('"""Clean module."""\n')
+    return tmp_path
+
+
+def test_iter_analyze_matches_analyze(project):
+    refactron = Refactron()
+
+    streamed = list(refactron.iter_analyze(project))
+    result = refactron.analyze(project)
+
+    assert [m.file_path for m in streamed] == [m.file_path for m in result.file_metrics]
+    assert [m.issues for m in streamed] == [m.issues for m in result.file_metrics]
+
+
+def test_aggregate_matches_summary(project):
+    refactron = Refactron()
+    aggregate = AnalysisAggregate()
+
+    for _ in refactron.iter_analyze(project, aggregate=aggregate):
+        pass
+
+    assert aggregate.summary() == refactron.analyze(project).summary()
+    assert aggregate.total_files == 6
+
+
+def test_iter_analyze_is_lazy(project):
+    aggregate = AnalysisAggregate()
+    stream = Refactron().iter_analyze(project, aggregate=aggregate)
+
+    assert aggregate.total_files == 0
+    next(stream)
+    assert aggregate.total_files == 1
+    stream.close()
+
+
+def test_iter_analyze_missing_target(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        next(Refactron().iter_analyze(tmp_path / "missing"))
+
+
+def test_write_report_streams_issues_then_summary(project):
+    refactron = Refactron()
+    out = io.StringIO()
+
+    aggregate = write_report(refactron.iter_analyze(project), out)
+
+    text = out.getvalue()
+    assert aggregate.summary() == refactron.analyze(project).summary()
+    assert text.index("DETAILED ISSUES") < text.index("SUMMARY")
+    assert f"Total Issues: {aggregate.total_issues}" in text
+    assert text.count("[CRITICAL]") == aggregate.summary()["critical"]
+
+
+def test_write_report_without_details(project):
+    out = io.StringIO()
+
+    write_report(Refactron().iter_analyze(project), out, detailed=False)
+
+    assert "DETAILED ISSUES" not in out.getvalue()
+    assert "Files Analyzed: 6" in out.getvalue()
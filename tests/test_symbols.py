@@ -0,0 +1,348 @@
+"""Tests for the module symbol table."""
+
+import ast
+import textwrap
+from pathlib import Path
+from typing import List
+
+from refactron.analyzers.code_smell_analyzer import CodeSmellAnalyzer
+from refactron.analyzers.dead_code_analyzer import DeadCodeAnalyzer
+from refactron.analyzers.dependency_analyzer import DependencyAnalyzer
+from refactron.autofix.fixers import RemoveUnusedImportsFixer
+from refactron.core.config import RefactronConfig
+from refactron.core.models import CodeIssue, IssueCategory, IssueLevel
+from refactron.core.parsed_module import ParsedModule
+from refactron.core.symbols import CLASS, FUNCTION, IMPORT, PARAMETER, SymbolTable
+
+
+def build(source: str) -> SymbolTable:
+    return SymbolTable.build(ast.parse(textwrap.dedent(source)))
+
+
+def unused(source: str) -> List[str]:
+    return [binding.name for binding in build(source).unused_imports()]
+
+
+def test_used_and_unused_imports() -> None:
+    source = """
+    import os
+    import sys
+    import os.path as osp
+    from typing import List, Dict
+
+    def f(values: List[int]) -> None:
+        print(sys.argv, osp)
+    """
+
+    assert unused(source) == ["os", "Dict"]
+
+
+def test_dotted_import_binds_the_top_level_package() -> None:
+    assert unused("import os.path\nos.getcwd()\n") == []
+    assert unused("import os.path\n") == ["os"]
+
+
+def test_store_does_not_count_as_use() -> None:
+    assert unused("import json\njson = None\n") == ["json"]
+
+
+def test_augmented_assignment_and_del_count_as_use() -> None:
+    assert unused("from m import counter\ncounter += 1\n") == []
+    assert unused("import tmp\ndel tmp\n") == []
+
+
+def test_local_name_shadows_import() -> None:
+    source = """
+    import value
+
+    def f(value):
+        return value
+    """
+
+    assert unused(source) == ["value"]
+
+
+def test_class_scope_is_not_visible_from_methods() -> None:
+    source = """
+    import helper
+
+    class A:
+        import helper
+
+        def method(self):
+            return helper()
+    """
+
+    table = build(source)
+    unused_bindings = table.unused_imports()
+    assert len(unused_bindings) == 1
+    assert unused_bindings[0].scope.kind == CLASS
+
+
+def test_global_declaration_resolves_to_module_scope() -> None:
+    source = """
+    def setup():
+        global np
+        import numpy as np
+
+    def use():
+        return np.zeros(3)
+    """
+
+    assert unused(source) == []
+
+
+def test_string_annotations() -> None:
+    source = """
+    from typing import TYPE_CHECKING, Optional
+
+    if TYPE_CHECKING:
+        from pathlib import Path
+        from decimal import Decimal
+
+    def f(path: "Optional[Path]") -> "list['Decimal']":
+        pass
+    """
+
+    table = build(source)
+    assert table.unused_imports() == []
+    flagged = {binding.name for binding in table.imports() if binding.type_checking}
+    assert flagged == {"Path", "Decimal"}
+
+
+def test_exports_and_explicit_reexports() -> None:
+    source = """
+    from .core import Engine, Helper, Extra
+    from .models import Model as Model
+    import json as json
+
+    __all__ = ["Engine"]
+    __all__ += ["Helper"]
+    """
+
+    table = build(source)
+    assert table.exports == ["Engine", "Helper"]
+    assert [binding.name for binding in table.unused_imports()] == ["Extra"]
+
+
+def test_future_and_star_imports_are_never_unused() -> None:
+    table = build("from __future__ import annotations\nfrom os.path import *\n")
+
+    assert table.unused_imports() == []
+    assert table.module.has_star_import
+
+
+def test_comprehension_and_lambda_scopes() -> None:
+    source = """
+    import a, b, c
+
+    values = [x for x in a if b(x)]
+    call = lambda y: c(y)
+    """
+
+    table = build(source)
+    assert table.unused_imports() == []
+    kinds = [scope.kind for scope in table.scopes]
+    assert kinds == ["module", "comprehension", FUNCTION]
+
+
+def test_walrus_in_comprehension_binds_enclosing_scope() -> None:
+    table = build("def f(items):\n    any((last := x) for x in items)\n    return last\n")
+    function = next(scope for scope in table.scopes if scope.kind == FUNCTION)
+
+    assert "last" in function.bindings
+    assert function.references["last"] == 1
+    assert function.bindings["items"][0].kind == PARAMETER
+
+
+def test_parsed_module_caches_symbols() -> None:
+    module = ParsedModule(Path("example.py"), "import os\n")
+
+    assert module.symbols is module.symbols
+    assert [binding.kind for binding in module.symbols.bindings] == [IMPORT]
+
+
+SHARED_SOURCE = """
+import os
+import sys
+from typing import TYPE_CHECKING, List
+from collections import OrderedDict, defaultdict
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+__all__ = ["defaultdict"]
+
+
+def main(paths: "List[Path]") -> None:
+    print(sys.argv, paths)
+"""
+
+
+def test_analyzers_and_fixer_agree() -> None:
+    module = ParsedModule(Path("example.py"), SHARED_SOURCE)
+    config = RefactronConfig()
+
+    dependency = [i for i in DependencyAnalyzer(config).analyze_module(module)]
+    smells = [i for i in CodeSmellAnalyzer(config).analyze_module(module)]
+
+    dep001 = [(i.line_number, i.metadata["import"]) for i in dependency if i.rule_id == "DEP001"]
+    s006 = [(i.line_number, i.metadata["import"]) for i in smells if i.rule_id == "S006"]
+    assert dep001 == [(2, "os"), (5, "OrderedDict")]
+    assert s006 == [(2, "os"), (5, "collections.OrderedDict")]
+
+    issue = CodeIssue(
+        category=IssueCategory.MAINTAINABILITY,
+        level=IssueLevel.INFO,
+        message="Unused import",
+        file_path=Path("example.py"),
+        line_number=2,
+    )
+    fixed = RemoveUnusedImportsFixer().preview(issue, SHARED_SOURCE).fixed
+    assert "import os\n" not in fixed
+    # OrderedDict shares its statement with the used defaultdict
+    assert "from collections import OrderedDict, defaultdict" in fixed
+    assert "import sys" in fixed
+
+
+def test_fixer_keeps_blocks_valid() -> None:
+    source = "try:\n    import ujson\nexcept ImportError:\n    ujson = None\nimport os; x = 1\n"
+    issue = CodeIssue(
+        category=IssueCategory.MAINTAINABILITY,
+        level=IssueLevel.INFO,
+        message="Unused import",
+        file_path=Path("example.py"),
+        line_number=1,
+    )
+
+    result = RemoveUnusedImportsFixer().preview(issue, source)
+
+    assert result.fixed == source
+    ast.parse(result.fixed)
+
+
+def dead_code(source: str, rule_id: str) -> List[CodeIssue]:
+    module = ParsedModule(Path("example.py"), textwrap.dedent(source))
+    issues = DeadCodeAnalyzer(RefactronConfig()).analyze_module(module)
+    return [issue for issue in issues if issue.rule_id == rule_id]
+
+
+def test_scope_names_and_attributes() -> None:
+    table = build("class A:\n    def run(self):\n        self.go()\n")
+
+    assert [scope.name for scope in table.scopes] == ["<module>", "A", "run"]
+    assert table.attributes == {"go"}
+
+
+def test_unused_variables_are_reported_in_their_own_function() -> None:
+    source = """
+    def outer():
+        used = 1
+        unused = 2
+
+        def inner():
+            inner_only = used
+            return 3
+
+        return inner
+    """
+
+    issues = dead_code(source, "DEAD002")
+
+    assert [(i.metadata["variable"], i.metadata["function"]) for i in issues] == [
+        ("unused", "outer"),
+        ("inner_only", "inner"),
+    ]
+
+
+def test_global_and_nonlocal_assignments_are_not_local_variables() -> None:
+    source = """
+    counter = 0
+
+    def bump():
+        global counter
+        counter = counter + 1
+
+    def make():
+        total = 0
+
+        def add():
+            nonlocal total
+            total = 5
+
+        return add
+    """
+
+    assert dead_code(source, "DEAD002") == []
+
+
+def test_functions_referenced_without_calls_are_used() -> None:
+    source = """
+    def handler():
+        return 1
+
+    def unused():
+        return 2
+
+    def method_user(obj):
+        return obj.callback
+
+    class Service:
+        def callback(self):
+            return handler
+
+    @register
+    def plugin():
+        return 3
+
+    __all__ = ["method_user"]
+    """
+
+    names = [issue.metadata["function"] for issue in dead_code(source, "DEAD001")]
+
+    assert names == ["unused"]
+
+
+def test_methods_overriding_a_base_class_are_used() -> None:
+    source = """
+    from engine import BaseFixer
+
+    class Base:
+        def run(self):
+            return 1
+
+    class Local(Base):
+        def run(self):
+            return 2
+
+        def extra(self):
+            return 3
+
+    class Fixer(BaseFixer):
+        def apply(self):
+            return 4
+
+    class Plain(object):
+        def stale(self):
+            return 5
+    """
+
+    names = [issue.metadata["function"] for issue in dead_code(source, "DEAD001")]
+
+    # Base.run is never called either; overriding methods are called through their base
+    assert names == ["run", "extra", "stale"]
+
+
+def test_deeply_nested_functions() -> None:
+    depth = 60
+    lines = []
+    for level in range(depth):
+        indent = "    " * level
+        lines.append(f"{indent}def f{level}():")
+        lines.append(f"{indent}    value{level} = {level}")
+    lines.append("    " * depth + "return 0")
+
+    issues = dead_code("\n".join(lines) + "\n", "DEAD002")
+
+    assert len(issues) == depth
+    assert {issue.metadata["function"] for issue in issues} == {f"f{i}" for i in range(depth)}
@@ -0,0 +1,193 @@
+"""Tests for continuous analysis of a watched tree."""
+
+import os
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from refactron import Refactron
+from refactron.cli import watch
+from refactron.core.config import RefactronConfig
+from refactron.core.models import CodeIssue, FileMetrics, IssueCategory, IssueLevel
+from refactron.core.reference_index import ReferenceIndex
+from refactron.core.watch import AnalysisWatcher, diff_issues
+
+LIBRARY = '''
+def helper():
+    """Help."""
+    return 1
+
+
+def unused():
+    """Never called."""
+    return 2
+'''
+
+
+def _watcher(root: Path, **kwargs: object) -> AnalysisWatcher:
+    config = RefactronConfig.default()
+    config.cache_enabled = False
+    return AnalysisWatcher(Refactron(config), root, **kwargs)  # type: ignore[arg-type]
+
+
+def _rules(issues: list) -> list:
+    return sorted((Path(issue.file_path).name, issue.rule_id) for issue in issues)
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "lib.py").write_text(LIBRARY)
+    (tmp_path / "other.py").write_text('"""Other."""\n\nVALUE = 1\n')
+    return tmp_path
+
+
+def test_start_analyzes_the_whole_tree(tree: Path) -> None:
+    with _watcher(tree) as watcher:
+        result = watcher.start()
+        assert result.total_files == 2
+        assert ("lib.py", "DEAD001") in _rules(result.all_issues)
+        assert watcher.poll() is None
+
+
+def test_only_changed_files_are_analyzed_again(tree: Path) -> None:
+    with _watcher(tree) as watcher:
+        watcher.start()
+        (tree / "other.py").write_text('"""Other."""\n\n\ndef run():\n    return 1\n')
+
+        update = watcher.poll()
+        assert update is not None
+        assert update.analyzed == [tree / "other.py"]
+        assert ("other.py", "S005") in _rules(update.new_issues)
+        assert update.resolved_issues == []
+        assert watcher.result.total_issues == len(watcher.result.all_issues)
+
+
+def test_unchanged_contents_are_not_analyzed_again(tree: Path) -> None:
+    with _watcher(tree) as watcher:
+        watcher.start()
+        path = tree / "lib.py"
+        mtime = path.stat().st_mtime_ns + 5_000_000_000
+        os.utime(path, ns=(mtime, mtime))
+        assert watcher.poll() is None
+
+
+def test_added_and_removed_files(tree: Path) -> None:
+    with _watcher(tree) as watcher:
+        watcher.start()
+        (tree / "pkg").mkdir()
+        (tree / "pkg" / "new.py").write_text("def run():\n    return 1\n")
+        update = watcher.poll()
+        assert update is not None
+        assert update.analyzed == [tree / "pkg" / "new.py"]
+        assert watcher.result.total_files == 3
+
+        (tree / "pkg" / "new.py").unlink()
+        update = watcher.poll()
+        assert update is not None
+        assert update.removed == [tree / "pkg" / "new.py"]
+        assert update.new_issues == []
+        assert ("new.py", "S005") in _rules(update.resolved_issues)
+        assert watcher.result.total_files == 2
+
+
+def test_reference_index_is_updated_with_the_changed_files(tree: Path) -> None:
+    with _watcher(tree) as watcher:
+        watcher.start()
+        (tree / "main.py").write_text('"""Main."""\nfrom lib import helper\n\nhelper()\n')
+
+        update = watcher.poll()
+        assert update is not None
+        # lib.py is not analyzed again, but its finding for helper is resolved
+        assert update.analyzed == [tree / "main.py"]
+        assert [issue.message for issue in update.resolved_issues] == [
+            "Function 'helper' is defined but never called"
+        ]
+        dead = watcher.result.issues_by_rule("DEAD001")
+        assert [issue.metadata.get("function") for issue in dead] == ["unused"]
+
+
+def test_only_affected_files_are_judged_again(tree: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    with _watcher(tree) as watcher:
+        watcher.start()
+        file_metrics = watcher.result.file_metrics
+        judged = []
+        apply = watcher.refactron.apply_reference_index
+
+        def spy(metrics: FileMetrics, index: ReferenceIndex) -> FileMetrics:
+            judged.append(metrics.file_path.name)
+            return apply(metrics, index)
+
+        monkeypatch.setattr(watcher.refactron, "apply_reference_index", spy)
+        (tree / "main.py").write_text('"""Main."""\nfrom lib import helper\n\nhelper()\n')
+        assert watcher.poll() is not None
+
+        # other.py defines nothing main.py uses, so it is left alone
+        assert sorted(judged) == ["lib.py", "main.py"]
+        assert watcher.result.file_metrics is file_metrics
+        assert watcher.result.total_files == 3
+        assert watcher.result.total_issues == len(watcher.result.all_issues)
+
+
+def test_new_first_party_module_reclassifies_imports(tree: Path) -> None:
+    (tree / "app.py").write_text('"""App."""\nimport mylib\nimport os\n')
+    with _watcher(tree) as watcher:
+        watcher.start()
+        assert [i.message for i in watcher.result.issues_by_rule("DEP004")] == [
+            "Import order: stdlib import after third_party"
+        ]
+        (tree / "mylib.py").write_text('"""Library."""\n')
+        stat = tree.stat()
+        os.utime(tree, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        update = watcher.poll()
+        assert update is not None
+        # Files that do not mention mylib are not analyzed again
+        assert sorted(update.analyzed) == [tree / "app.py", tree / "mylib.py"]
+        assert [i.message for i in watcher.result.issues_by_rule("DEP004")] == [
+            "Import order: stdlib import after local"
+        ]
+
+
+def test_wait_debounces_changes_until_quiet(tree: Path) -> None:
+    with _watcher(tree, debounce=0.05, interval=0.01, use_inotify=False) as watcher:
+        assert watcher.mode == "polling"
+        watcher.start()
+        assert watcher.wait(timeout=0.05) is None
+
+        (tree / "one.py").write_text("X = 1\n")
+        (tree / "two.py").write_text("Y = 2\n")
+        update = watcher.wait(timeout=5)
+        assert update is not None
+        assert update.analyzed == [tree / "one.py", tree / "two.py"]
+
+
+def test_diff_issues_ignores_issues_that_only_moved() -> None:
+    def issue(line: int, message: str) -> CodeIssue:
+        return CodeIssue(
+            category=IssueCategory.STYLE,
+            level=IssueLevel.INFO,
+            message=message,
+            file_path=Path("a.py"),
+            line_number=line,
+            rule_id="S005",
+        )
+
+    before = [issue(1, "first"), issue(5, "second"), issue(9, "second")]
+    after = [issue(3, "first"), issue(7, "second"), issue(9, "third")]
+    new, resolved = diff_issues(before, after)
+    assert [(i.line_number, i.message) for i in new] == [(9, "third")]
+    assert [(i.line_number, i.message) for i in resolved] == [(9, "second")]
+
+
+def test_watch_command_reports_the_first_analysis(
+    tree: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def stop(self: AnalysisWatcher, timeout: object = None) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(AnalysisWatcher, "wait", stop)
+    result = CliRunner().invoke(watch, [str(tree), "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "Watching 2 file(s)" in result.output
+    assert "Stopped watching" in result.output